@@ -4,7 +4,7 @@ import asyncio
 
 from gsuid_core.sv import SL, Plugins
 from gsuid_core.logger import logger
-from gsuid_core.server import on_core_shutdown
+from gsuid_core.server import on_core_start, on_core_shutdown
 
 # 幂等: 防止跨插件 cross-import 让本文件在新 namespace 下重 exec 时
 # 把 disable_force_prefix 用默认值 False 覆盖掉。
@@ -37,7 +37,7 @@ from .utils.database.waves_subscribe import WavesSubscribe
 from .utils.database.waves_user_activity import WavesUserActivity
 from .utils.database.waves_group_activity import WavesGroupActivity, ANN_PUSH_GUARD
 from .utils.database.waves_user_sdk import WavesUserSdk  # noqa: F401
-from .utils.plugin_checker import is_from_waves_plugin
+from .utils.plugin_checker import is_from_waves_plugin, install_plugin_markers
 
 # ===== 活跃度批量写入缓冲 =====
 # 内存中暂存活跃度记录，定时批量写入，避免高并发写入损坏数据库
@@ -49,30 +49,29 @@ _FLUSH_INTERVAL = 60  # 秒
 
 
 async def _flush_activity_buffer():
-    """将缓冲区中的活跃度记录批量写入数据库"""
+    """将缓冲区中的活跃度记录批量写入数据库: 每类一次集合写入, 不再逐条开会话"""
     if _activity_buffer:
-        pending = dict(_activity_buffer)
+        pending = list(_activity_buffer.values())
         _activity_buffer.clear()
 
-        for key, (user_id, bot_id, bot_self_id, sender_avatar) in pending.items():
+        try:
+            await WavesUserActivity.bulk_update_user_activity([(u, b, s) for u, b, s, _ in pending])
+        except Exception as e:
+            logger.warning(f"[鸣潮·插件] 批量活跃度写入失败: {e}")
+        avatars = {(u, b): a for u, b, _, a in pending if a}
+        if avatars:
             try:
-                await WavesUserActivity.update_user_activity(user_id, bot_id, bot_self_id)
+                await WavesUser.bulk_update_avatar_url(avatars)
             except Exception as e:
-                logger.warning(f"[鸣潮·插件] 批量活跃度写入失败: {e}")
-            if sender_avatar:
-                try:
-                    await WavesUser.update_avatar_url(user_id, bot_id, sender_avatar)
-                except Exception as e:
-                    logger.warning(f"[鸣潮·插件] 头像更新失败: {e}")
+                logger.warning(f"[鸣潮·插件] 头像更新失败: {e}")
 
     if _group_activity_buffer:
-        group_pending = dict(_group_activity_buffer)
+        group_pending = list(_group_activity_buffer.values())
         _group_activity_buffer.clear()
-        for key, (group_id, bot_id, bot_self_id) in group_pending.items():
-            try:
-                await WavesGroupActivity.update_group_activity(group_id, bot_id, bot_self_id)
-            except Exception as e:
-                logger.warning(f"[鸣潮·插件] 批量群活跃度写入失败: {e}")
+        try:
+            await WavesGroupActivity.bulk_update_group_activity(group_pending)
+        except Exception as e:
+            logger.warning(f"[鸣潮·插件] 批量群活跃度写入失败: {e}")
 
 
 _shutdown_event = asyncio.Event()
@@ -170,6 +169,16 @@ register_user_activity_hook(waves_user_activity_hook)
 register_group_activity_hook(waves_group_activity_hook)
 
 logger.debug("[鸣潮·插件] Bot 消息发送 hook 已注册")
+
+
+@on_core_start
+async def _install_plugin_markers():
+    """各模块 SV / 定时任务注册完后打上插件标记, 发送 hook 据此判断来源, 不再逐帧扫描调用栈"""
+    try:
+        install_plugin_markers("XutheringWavesUID")
+    except Exception as e:
+        logger.warning(f"[鸣潮·插件] 插件标记安装失败, 未标记入口的消息不计入活跃度: {e}")
+
 logger.debug("[鸣潮·插件] 用户活跃度 hook 已注册")
 
 # 初始化本地化
@@ -0,0 +1,188 @@
+"""热点 pydantic 模型的 msgspec Struct 孪生类型与解码入口。
+
+孪生类型由 pydantic 模型的字段注解自动生成 (字段名/类型/默认值一致, 嵌套模型替换为对应孪生),
+并拷贝模型上的普通方法和属性 (get_chain_num / get_props / is_full ...), 所以按属性读取的调用方不用改;
+另补 model_dump / model_dump_json / model_copy / to_model 兼容 pydantic 的常用接口。
+
+解码走 msgspec (C 实现): 从 bytes 直接解出 Struct, 或把 json.loads / msgpack 的结果 convert 成 Struct,
+比 pydantic 逐个校验快数倍、对象更小。benchmark_decode 可在实际数据上对比两者。
+
+Struct 不是 pydantic 模型: 不能再 `Model(**obj)` / 塞进 pydantic 字段校验, 需要时先 to_model()。
+"""
+import copy
+import json
+import time
+import inspect
+import tracemalloc
+from typing import Any, Dict, List, Type, Tuple, Union, ClassVar, Optional, get_args, get_origin
+
+import msgspec
+from pydantic import BaseModel
+
+from .role import RoleList, RoleDetailData
+from .battle import MatrixDetail, SlashDetail, SlashChallenge, AbyssChallenge
+from .account import AccountBaseInfo
+
+# 拿来生成孪生类型的根模型; 嵌套模型随之生成
+STRUCT_MODELS: Tuple[Type[BaseModel], ...] = (
+    RoleDetailData,
+    RoleList,
+    AccountBaseInfo,
+    AbyssChallenge,
+    SlashDetail,
+    MatrixDetail,
+)
+
+
+class StructCompat(msgspec.Struct, kw_only=True):
+    """孪生类型基类: pydantic 常用接口的等价实现。"""
+
+    __model__: ClassVar[Type[BaseModel]]
+
+    def model_dump(self, **_: Any) -> Dict[str, Any]:
+        return msgspec.to_builtins(self)
+
+    def model_dump_json(self, **_: Any) -> str:
+        return msgspec.json.encode(self).decode("utf-8")
+
+    def model_copy(self, update: Optional[Dict[str, Any]] = None, deep: bool = False):
+        obj = copy.deepcopy(self) if deep else copy.copy(self)
+        if update:
+            obj = msgspec.structs.replace(obj, **update)
+        return obj
+
+    def to_model(self) -> BaseModel:
+        """转回对应的 pydantic 模型 (完整校验一次)。"""
+        return type(self).__model__.model_validate(self.model_dump())
+
+
+def _drop_none_halves(self) -> None:
+    # 同 SlashChallenge.filter_null_halves
+    self.halfList = [h for h in self.halfList if h is not None]
+
+
+# pydantic before 校验器的等价处理, 按模型名挂到孪生类型的 __post_init__
+_POST_INIT = {SlashChallenge: _drop_none_halves}
+
+_twins: Dict[Type[BaseModel], type] = {}
+
+
+def _map_type(tp: Any) -> Any:
+    if isinstance(tp, type) and issubclass(tp, BaseModel):
+        return struct_type(tp)
+    origin = get_origin(tp)
+    if origin is None:
+        return tp
+    args = tuple(_map_type(a) for a in get_args(tp))
+    if origin is Union:
+        # msgspec 的 Union 只允许一个数组类型, 如 List[Optional[X]] | List[None] 只留前者 (已覆盖后者)
+        kept, has_array = [], False
+        for a in args:
+            if get_origin(a) in (list, tuple, set):
+                if has_array:
+                    continue
+                has_array = True
+            kept.append(a)
+        return Union[tuple(kept)]
+    if origin is list:
+        return List[args]
+    if origin is dict:
+        return Dict[args]
+    return origin[args]
+
+
+def struct_type(model: Type[BaseModel]) -> type:
+    """pydantic 模型 → msgspec 孪生类型 (缓存)。"""
+    twin = _twins.get(model)
+    if twin is not None:
+        return twin
+
+    fields = []
+    for name, info in model.model_fields.items():
+        tp = _map_type(info.annotation)
+        if info.default_factory is not None:
+            fields.append((name, tp, msgspec.field(default_factory=info.default_factory)))
+        elif info.is_required():
+            fields.append((name, tp))
+        else:
+            fields.append((name, tp, info.default))
+
+    namespace: Dict[str, Any] = {"__model__": model}
+    for klass in reversed(model.__mro__):
+        if klass in (BaseModel, object) or not issubclass(klass, BaseModel):
+            continue
+        for attr, value in vars(klass).items():
+            if attr.startswith(("_", "model_")) or attr in model.model_fields:
+                continue
+            if inspect.isfunction(value) or isinstance(value, property):
+                namespace[attr] = value
+    if model in _POST_INIT:
+        namespace["__post_init__"] = _POST_INIT[model]
+
+    # 模块级同名注册, 保证可 pickle (进程池计算会传面板对象)
+    name = f"{model.__name__}Struct"
+    twin = msgspec.defstruct(name, fields, bases=(StructCompat,), module=__name__, namespace=namespace, kw_only=True)
+    globals()[name] = twin
+    _twins[model] = twin
+    return twin
+
+
+_json_decoders: Dict[Tuple[type, bool], msgspec.json.Decoder] = {}
+
+
+def _target(model: Type[BaseModel], many: bool) -> Any:
+    twin = struct_type(model)
+    return List[twin] if many else twin
+
+
+def decode_json(model: Type[BaseModel], data: Union[bytes, str], many: bool = False) -> Any:
+    """JSON bytes 直接解成孪生 Struct (many 为列表)。"""
+    key = (model, many)
+    decoder = _json_decoders.get(key)
+    if decoder is None:
+        decoder = _json_decoders[key] = msgspec.json.Decoder(_target(model, many), strict=False)
+    return decoder.decode(data)
+
+
+def convert(model: Type[BaseModel], obj: Any, many: bool = False) -> Any:
+    """已解析的 dict/list (json.loads / msgpack 结果) 转孪生 Struct; 与 pydantic 一样宽松转换数字字符串。"""
+    return msgspec.convert(obj, _target(model, many), strict=False)
+
+
+def is_struct(obj: Any) -> bool:
+    return isinstance(obj, StructCompat)
+
+
+def benchmark_decode(data: bytes, model: Type[BaseModel] = RoleDetailData, many: bool = True, rounds: int = 20) -> Dict[str, Dict[str, float]]:
+    """同一份 JSON 分别用 json+pydantic / msgspec Struct 解码, 返回每份耗时(ms)、吞吐(MB/s)、解码结果常驻内存(KiB)。"""
+    from pydantic import TypeAdapter
+
+    adapter = TypeAdapter(List[model] if many else model)
+    cases = {
+        "pydantic": lambda: adapter.validate_python(json.loads(data)),
+        "msgspec": lambda: decode_json(model, data, many),
+    }
+    out = {}
+    for name, fn in cases.items():
+        fn()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            fn()
+        per = (time.perf_counter() - start) / rounds
+        tracemalloc.start()
+        try:
+            result = fn()
+            retained, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del result
+        out[name] = {
+            "ms": round(per * 1000, 2),
+            "mb_per_s": round(len(data) / per / 1e6, 1),
+            "kib": round(retained / 1024, 1),
+        }
+    return out
+
+
+for _model in STRUCT_MODELS:
+    struct_type(_model)
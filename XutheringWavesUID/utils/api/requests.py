@@ -13,6 +13,7 @@ from .captcha import get_solver
 from ..hint import WAVES_ERROR_CODE
 from ..util import timed_async_cache
 from .captcha.base import CaptchaResult
+from .response_cache import response_cache, token_fingerprint
 from ..error_reply import WAVES_CODE_999, WAVES_CODE_104
 from .captcha.errors import CaptchaError
 from ..constants import WAVES_GAME_ID
@@ -377,7 +378,7 @@ class WavesApi:
         }
         if WutheringWavesConfig.get_config("CacheEverything").data:
             try:
-                info = await self._waves_request(BASE_DATA_URL, "POST", header, data=data)
+                info = await self._coalesced_request("get_base_info", BASE_DATA_URL, header, data, token)
                 base_info_path = CACHE_PATH / "base_info"
                 base_info_path.mkdir(parents=True, exist_ok=True)
                 with open(base_info_path / f"{roleId}.json", "w", encoding="utf-8") as f:
@@ -388,7 +389,7 @@ class WavesApi:
                     info = json.load(f)
                 info = KuroApiResp(**info)
         else:
-            info = await self._waves_request(BASE_DATA_URL, "POST", header, data=data)
+            info = await self._coalesced_request("get_base_info", BASE_DATA_URL, header, data, token)
         return info
 
     async def get_sign_in_init(
@@ -427,7 +428,7 @@ class WavesApi:
         }
         if WutheringWavesConfig.get_config("CacheEverything").data:
             try:
-                role_info = await self._waves_request(ROLE_DATA_URL, "POST", header, data=data)
+                role_info = await self._coalesced_request("get_role_info", ROLE_DATA_URL, header, data, token)
                 role_info_path = CACHE_PATH / "role_info"
                 role_info_path.mkdir(parents=True, exist_ok=True)
                 with open(role_info_path / f"{roleId}.json", "w", encoding="utf-8") as f:
@@ -438,7 +439,7 @@ class WavesApi:
                     role_info = json.load(f)
                 role_info = KuroApiResp(**role_info)
         else:
-            role_info = await self._waves_request(ROLE_DATA_URL, "POST", header, data=data)
+            role_info = await self._coalesced_request("get_role_info", ROLE_DATA_URL, header, data, token)
         return role_info
 
     async def get_tree(self):
@@ -468,7 +469,7 @@ class WavesApi:
         }
         if WutheringWavesConfig.get_config("CacheEverything").data:
             try:
-                role_detail = await self._waves_request(ROLE_DETAIL_URL, "POST", header, data=data)
+                role_detail = await self._coalesced_request("get_role_detail_info", ROLE_DETAIL_URL, header, data, token)
                 role_detail_path = CACHE_PATH / "role_detail"
                 role_detail_path.mkdir(parents=True, exist_ok=True)
                 with open(role_detail_path / f"{roleId}_{charId}.json", "w", encoding="utf-8") as f:
@@ -479,7 +480,7 @@ class WavesApi:
                     role_detail = json.load(f)
                 role_detail = KuroApiResp(**role_detail)
         else:
-            role_detail = await self._waves_request(ROLE_DETAIL_URL, "POST", header, data=data)
+            role_detail = await self._coalesced_request("get_role_detail_info", ROLE_DETAIL_URL, header, data, token)
         return role_detail
 
     async def get_calabash_data(self, roleId: str, token: str, serverId: Optional[str] = None):
@@ -495,7 +496,7 @@ class WavesApi:
         }
         if WutheringWavesConfig.get_config("CacheEverything").data:
             try:
-                calabash_data = await self._waves_request(CALABASH_DATA_URL, "POST", header, data=data)
+                calabash_data = await self._coalesced_request("get_calabash_data", CALABASH_DATA_URL, header, data, token)
                 calabash_data_path = CACHE_PATH / "calabash_data"
                 calabash_data_path.mkdir(parents=True, exist_ok=True)
                 with open(calabash_data_path / f"{roleId}.json", "w", encoding="utf-8") as f:
@@ -506,7 +507,7 @@ class WavesApi:
                     calabash_data = json.load(f)
                 calabash_data = KuroApiResp(**calabash_data)
         else:
-            calabash_data = await self._waves_request(CALABASH_DATA_URL, "POST", header, data=data)
+            calabash_data = await self._coalesced_request("get_calabash_data", CALABASH_DATA_URL, header, data, token)
         return calabash_data
 
     async def get_skin_data(self, roleId: str, token: str, serverId: Optional[str] = None):
@@ -583,7 +584,7 @@ class WavesApi:
         }
         if WutheringWavesConfig.get_config("CacheEverything").data:
             try:
-                explore_data = await self._waves_request(EXPLORE_DATA_URL, "POST", header, data=data)
+                explore_data = await self._coalesced_request("get_explore_data", EXPLORE_DATA_URL, header, data, token)
                 explore_data_path = CACHE_PATH / "explore_data"
                 explore_data_path.mkdir(parents=True, exist_ok=True)
                 with open(explore_data_path / f"{roleId}.json", "w", encoding="utf-8") as f:
@@ -594,7 +595,7 @@ class WavesApi:
                     explore_data = json.load(f)
                 explore_data = KuroApiResp(**explore_data)
         else:
-            explore_data = await self._waves_request(EXPLORE_DATA_URL, "POST", header, data=data)
+            explore_data = await self._coalesced_request("get_explore_data", EXPLORE_DATA_URL, header, data, token)
         return explore_data
 
     async def get_challenge_data(self, roleId: str, token: str, serverId: Optional[str] = None):
@@ -610,7 +611,7 @@ class WavesApi:
         }
         if WutheringWavesConfig.get_config("CacheEverything").data:
             try:
-                challenge_data = await self._waves_request(CHALLENGE_DATA_URL, "POST", header, data=data)
+                challenge_data = await self._coalesced_request("get_challenge_data", CHALLENGE_DATA_URL, header, data, token)
                 challenge_data_path = CACHE_PATH / "challenge_data"
                 challenge_data_path.mkdir(parents=True, exist_ok=True)
                 with open(challenge_data_path / f"{roleId}.json", "w", encoding="utf-8") as f:
@@ -621,7 +622,7 @@ class WavesApi:
                     challenge_data = json.load(f)
                 challenge_data = KuroApiResp(**challenge_data)
         else:
-            challenge_data = await self._waves_request(CHALLENGE_DATA_URL, "POST", header, data=data)
+            challenge_data = await self._coalesced_request("get_challenge_data", CHALLENGE_DATA_URL, header, data, token)
         return challenge_data
 
     async def get_abyss_data(self, roleId: str, token: str, serverId: Optional[str] = None):
@@ -636,7 +637,7 @@ class WavesApi:
         }
         if WutheringWavesConfig.get_config("CacheEverything").data:
             try:
-                abyss_data = await self._waves_request(TOWER_DETAIL_URL, "POST", header, data=data)
+                abyss_data = await self._coalesced_request("get_abyss_data", TOWER_DETAIL_URL, header, data, token)
                 abyss_data_path = CACHE_PATH / "abyss_data"
                 abyss_data_path.mkdir(parents=True, exist_ok=True)
                 with open(abyss_data_path / f"{roleId}.json", "w", encoding="utf-8") as f:
@@ -647,7 +648,7 @@ class WavesApi:
                     abyss_data = json.load(f)
                 abyss_data = KuroApiResp(**abyss_data)
         else:
-            abyss_data = await self._waves_request(TOWER_DETAIL_URL, "POST", header, data=data)
+            abyss_data = await self._coalesced_request("get_abyss_data", TOWER_DETAIL_URL, header, data, token)
         return abyss_data
 
     async def get_abyss_index(self, roleId: str, token: str, serverId: Optional[str] = None):
@@ -663,7 +664,7 @@ class WavesApi:
         }
         if WutheringWavesConfig.get_config("CacheEverything").data:
             try:
-                abyss_index = await self._waves_request(TOWER_INDEX_URL, "POST", header, data=data)
+                abyss_index = await self._coalesced_request("get_abyss_index", TOWER_INDEX_URL, header, data, token)
                 abyss_index_path = CACHE_PATH / "abyss_index"
                 abyss_index_path.mkdir(parents=True, exist_ok=True)
                 with open(abyss_index_path / f"{roleId}.json", "w", encoding="utf-8") as f:
@@ -674,7 +675,7 @@ class WavesApi:
                     abyss_index = json.load(f)
                 abyss_index = KuroApiResp(**abyss_index)
         else:
-            abyss_index = await self._waves_request(TOWER_INDEX_URL, "POST", header, data=data)
+            abyss_index = await self._coalesced_request("get_abyss_index", TOWER_INDEX_URL, header, data, token)
         return abyss_index
 
     async def get_slash_index(self, roleId: str, token: str, serverId: Optional[str] = None):
@@ -690,7 +691,7 @@ class WavesApi:
         }
         if WutheringWavesConfig.get_config("CacheEverything").data:
             try:
-                slash_index = await self._waves_request(SLASH_INDEX_URL, "POST", header, data=data)
+                slash_index = await self._coalesced_request("get_slash_index", SLASH_INDEX_URL, header, data, token)
                 slash_index_path = CACHE_PATH / "slash_index"
                 slash_index_path.mkdir(parents=True, exist_ok=True)
                 with open(slash_index_path / f"{roleId}.json", "w", encoding="utf-8") as f:
@@ -701,7 +702,7 @@ class WavesApi:
                     slash_index = json.load(f)
                 slash_index = KuroApiResp(**slash_index)
         else:
-            slash_index = await self._waves_request(SLASH_INDEX_URL, "POST", header, data=data)
+            slash_index = await self._coalesced_request("get_slash_index", SLASH_INDEX_URL, header, data, token)
         return slash_index
 
     async def get_slash_detail(self, roleId: str, token: str, serverId: Optional[str] = None):
@@ -717,7 +718,7 @@ class WavesApi:
         }
         if WutheringWavesConfig.get_config("CacheEverything").data:
             try:
-                slash_detail = await self._waves_request(SLASH_DETAIL_URL, "POST", header, data=data)
+                slash_detail = await self._coalesced_request("get_slash_detail", SLASH_DETAIL_URL, header, data, token)
                 slash_detail_path = CACHE_PATH / "slash_detail"
                 slash_detail_path.mkdir(parents=True, exist_ok=True)
                 with open(slash_detail_path / f"{roleId}.json", "w", encoding="utf-8") as f:
@@ -728,7 +729,7 @@ class WavesApi:
                     slash_detail = json.load(f)
                 slash_detail = KuroApiResp(**slash_detail)
         else:
-            slash_detail = await self._waves_request(SLASH_DETAIL_URL, "POST", header, data=data)
+            slash_detail = await self._coalesced_request("get_slash_detail", SLASH_DETAIL_URL, header, data, token)
         return slash_detail
 
     async def get_matrix_index(self, roleId: str, token: str, serverId: Optional[str] = None):
@@ -744,7 +745,7 @@ class WavesApi:
         }
         if WutheringWavesConfig.get_config("CacheEverything").data:
             try:
-                matrix_index = await self._waves_request(MATRIX_INDEX_URL, "POST", header, data=data)
+                matrix_index = await self._coalesced_request("get_matrix_index", MATRIX_INDEX_URL, header, data, token)
                 matrix_index_path = CACHE_PATH / "matrix_index"
                 matrix_index_path.mkdir(parents=True, exist_ok=True)
                 with open(matrix_index_path / f"{roleId}.json", "w", encoding="utf-8") as f:
@@ -755,7 +756,7 @@ class WavesApi:
                     matrix_index = json.load(f)
                 matrix_index = KuroApiResp(**matrix_index)
         else:
-            matrix_index = await self._waves_request(MATRIX_INDEX_URL, "POST", header, data=data)
+            matrix_index = await self._coalesced_request("get_matrix_index", MATRIX_INDEX_URL, header, data, token)
         return matrix_index
 
     async def get_matrix_detail(self, roleId: str, token: str, serverId: Optional[str] = None):
@@ -771,7 +772,7 @@ class WavesApi:
         }
         if WutheringWavesConfig.get_config("CacheEverything").data:
             try:
-                matrix_detail = await self._waves_request(MATRIX_DETAIL_URL, "POST", header, data=data)
+                matrix_detail = await self._coalesced_request("get_matrix_detail", MATRIX_DETAIL_URL, header, data, token)
                 matrix_detail_path = CACHE_PATH / "matrix_detail"
                 matrix_detail_path.mkdir(parents=True, exist_ok=True)
                 with open(matrix_detail_path / f"{roleId}.json", "w", encoding="utf-8") as f:
@@ -782,7 +783,7 @@ class WavesApi:
                     matrix_detail = json.load(f)
                 matrix_detail = KuroApiResp(**matrix_detail)
         else:
-            matrix_detail = await self._waves_request(MATRIX_DETAIL_URL, "POST", header, data=data)
+            matrix_detail = await self._coalesced_request("get_matrix_detail", MATRIX_DETAIL_URL, header, data, token)
         return matrix_detail
 
     async def get_more_activity(self, roleId: str, token: str, serverId: Optional[str] = None):
@@ -1114,6 +1115,23 @@ class WavesApi:
         }
         return await self._waves_request(LOGIN_URL, "POST", header, data=data)
 
+    async def _coalesced_request(
+        self, endpoint: str, url: str, header: Mapping[str, str], data: Dict[str, Any], token: str
+    ) -> KuroApiResp[Union[str, Dict[str, Any], List[Any]]]:
+        """读接口: 同 (url, roleId, serverId, 参数, token) 的并发请求合并, 成功结果按 ApiCacheTTL 短缓存。"""
+        key = (
+            url,
+            str(data.get("roleId", "")),
+            data.get("serverId"),
+            tuple(sorted((k, str(v)) for k, v in data.items() if k not in ("roleId", "serverId"))),
+            token_fingerprint(token),
+        )
+        return await response_cache.fetch(
+            endpoint,
+            key,
+            lambda: self._waves_request(url, "POST", header, data=data, caller=endpoint),
+        )
+
     async def _waves_request(
         self,
         url: str,
@@ -1124,12 +1142,13 @@ class WavesApi:
         data: Optional[Dict[str, Any]] = None,
         max_retries: int = 3,
         retry_delay: float = 1.0,
+        caller: Optional[str] = None,
     ) -> KuroApiResp[Union[str, Dict[str, Any], List[Any]]]:
         if header is None:
             header = await get_base_header()
 
         proxy_func = get_need_proxy_func()
-        if inspect.stack()[1].function in proxy_func or "all" in proxy_func:
+        if (caller or inspect.stack()[1].function) in proxy_func or "all" in proxy_func:
             proxy_url = get_local_proxy_url()
         else:
             proxy_url = None
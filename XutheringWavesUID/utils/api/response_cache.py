@@ -0,0 +1,127 @@
+"""库街区读接口的单飞合并 + 短 TTL 响应缓存。
+
+key = (url, roleId, serverId, 额外参数, token 指纹): 同 key 并发请求只发一次, 其余调用方等同一结果;
+成功响应按接口缓存 ApiCacheTTL 秒 (配置形如 "get_role_info:10", 0 为只合并不缓存)。
+返回给调用方的都是深拷贝, 调用方随意改 data 不影响缓存和其他调用方。
+"""
+import time
+import asyncio
+import hashlib
+from typing import Any, Dict, Tuple, Callable, Optional, Awaitable
+from collections import Counter
+
+from gsuid_core.logger import logger
+
+from .request_util import KuroApiResp
+from ...wutheringwaves_config import WutheringWavesConfig
+
+_MAX_ENTRIES = 2048
+
+_ttl_raw: Optional[Tuple[str, ...]] = None
+_ttl_map: Dict[str, int] = {}
+
+
+def token_fingerprint(token: Optional[str]) -> str:
+    if not token:
+        return ""
+    return hashlib.sha1(token.encode("utf-8")).hexdigest()[:16]
+
+
+def endpoint_ttl(endpoint: str) -> int:
+    global _ttl_raw, _ttl_map
+    raw = tuple(WutheringWavesConfig.get_config("ApiCacheTTL").data or ())
+    if raw != _ttl_raw:
+        parsed = {}
+        for item in raw:
+            name, _, sec = str(item).partition(":")
+            try:
+                parsed[name.strip()] = max(int(sec), 0)
+            except ValueError:
+                logger.warning(f"[鸣潮·API缓存] ApiCacheTTL 配置项无法解析: {item!r}")
+        _ttl_raw, _ttl_map = raw, parsed
+    return _ttl_map.get(endpoint, 0)
+
+
+class ResponseCoalescer:
+    def __init__(self):
+        self._cache: Dict[Tuple, Tuple[float, KuroApiResp]] = {}
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self.shared: Counter = Counter()
+
+    def _evict(self, now: float) -> None:
+        expired = [k for k, (exp, _) in self._cache.items() if exp <= now]
+        for k in expired:
+            del self._cache[k]
+        # 仍超量则按插入顺序丢最旧的
+        while len(self._cache) >= _MAX_ENTRIES:
+            del self._cache[next(iter(self._cache))]
+
+    async def fetch(
+        self,
+        endpoint: str,
+        key: Tuple,
+        factory: Callable[[], Awaitable[KuroApiResp]],
+    ) -> KuroApiResp:
+        key = (endpoint, *key)
+        now = time.monotonic()
+        hit = self._cache.get(key)
+        if hit is not None:
+            if hit[0] > now:
+                self.hits[endpoint] += 1
+                return hit[1].model_copy(deep=True)
+            del self._cache[key]
+
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self.shared[endpoint] += 1
+            try:
+                resp = await asyncio.shield(fut)
+            except asyncio.CancelledError:
+                if not fut.cancelled():
+                    raise
+                # 发起方被取消, 自己再发一次
+                return await factory()
+            return resp.model_copy(deep=True)
+
+        self.misses[endpoint] += 1
+        fut = asyncio.get_running_loop().create_future()
+        fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = fut
+        try:
+            resp = await factory()
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        stored = resp.model_copy(deep=True)
+        fut.set_result(stored)
+        ttl = endpoint_ttl(endpoint)
+        if ttl > 0 and resp.success:
+            self._evict(now)
+            self._cache[key] = (time.monotonic() + ttl, stored)
+        return resp
+
+    def invalidate(self, role_id: str) -> None:
+        """丢弃某 uid 的全部缓存响应 (key 第 3 位为 roleId); 刷新、绑定/解绑后调用。"""
+        role_id = str(role_id)
+        for k in [k for k in self._cache if k[2] == role_id]:
+            del self._cache[k]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._cache),
+            "inflight": len(self._inflight),
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "shared": dict(self.shared),
+        }
+
+
+response_cache = ResponseCoalescer()
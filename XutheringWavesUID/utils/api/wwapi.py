@@ -5,6 +5,8 @@ from pydantic import Field, BaseModel
 
 from gsuid_core.logger import logger
 
+from ..http_pool import get_client
+
 MAIN_URL = "https://wh.loping151.site"
 # MAIN_URL = "http://127.0.0.1:9001"
 
@@ -396,16 +398,16 @@ class CharRankOptionsResponse(BaseModel):
 
 async def get_char_rank_options(char_id: int) -> List[CharRankOption]:
     """该角色可选模态项 (WH 端按开关聚合上传数据); 无模态/失败返回 []。"""
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.post(
-                CHAR_RANK_OPTIONS_URL,
-                json={"char_id": char_id},
-                headers={"Content-Type": "application/json"},
-                timeout=httpx.Timeout(10),
-            )
-            if res.status_code == 200:
-                return CharRankOptionsResponse.model_validate(res.json()).data or []
-        except Exception as e:
-            logger.exception(f"[鸣潮·模态选项] 获取失败: {e}")
+    client = get_client(CHAR_RANK_OPTIONS_URL)
+    try:
+        res = await client.post(
+            CHAR_RANK_OPTIONS_URL,
+            json={"char_id": char_id},
+            headers={"Content-Type": "application/json"},
+            timeout=httpx.Timeout(10),
+        )
+        if res.status_code == 200:
+            return CharRankOptionsResponse.model_validate(res.json()).data or []
+    except Exception as e:
+        logger.exception(f"[鸣潮·模态选项] 获取失败: {e}")
     return []
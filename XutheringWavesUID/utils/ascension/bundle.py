@@ -0,0 +1,312 @@
+"""升级/图鉴数据 (detail_json/<kind>/*.json) 的编译包与按需解码。
+
+原先每类数据首次访问时 rglob 全部 json 逐个解码进模块级 dict, 全部常驻内存。
+现在编译成一个包 MAIN_PATH/ascension_bundle/<kind>-<指纹>.bin:
+
+    MAGIC(8) | 索引长度(4, 小端) | 索引 (JSON) | 各文件原始 JSON 依次拼接
+
+- 指纹由源目录的文件数/总大小/最大 mtime 算出 (只 stat 不读文件), 资源一变文件名就变,
+  旧包不会被原地覆盖, 多 worker / Windows 下也不存在读到一半被替换的问题。
+- 索引含每个 id 的 (偏移, 长度) 与名称/别名, 名称查 id 不用解码任何条目;
+  另存各类列表页要用的少量字段 (summary_fields, 如星级/类型), 整表列举走 summaries() 不碰磁盘。
+- 启动只读索引; 按 id 访问时才 seek 读出该段解码, 结果进 LRU。
+  cache_size=None 时 LRU 容量取包内条目数 (如角色: 持有率/出场率页会逐个遍历全部角色,
+  固定容量小于角色数时整轮都在换出重解码), 仍是首次访问才解码。
+- 资源下载后 ensure_data_loaded(force=True) 重新计算指纹, 需要时重编;
+  换包时 generation +1, 依赖条目内容的计算缓存 (memo.memoize) 以此失效。
+
+AscensionBundle 实现 Mapping, 原先直接遍历 char_id_data / weapon_id_data 的调用方不用改;
+整表遍历 (items/values) 一次顺序读完整个包、不写 LRU, 但仍要解码全部条目, 只用少数字段时应改用 summaries()。
+"""
+import gc
+import os
+import time
+import hashlib
+import threading
+import tracemalloc
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple, Iterator, Optional
+from collections.abc import Mapping
+
+import msgspec
+from msgspec import json as msgjson
+
+from gsuid_core.logger import logger
+
+from ..resource.RESOURCE_PATH import MAIN_PATH
+
+BUNDLE_DIR = MAIN_PATH / "ascension_bundle"
+MAGIC = b"WWASC002"
+_HEADER = len(MAGIC) + 4
+
+
+class _Index(msgspec.Struct):
+    offsets: Dict[str, Tuple[int, int]]
+    names: Dict[str, str]
+    aliases: Dict[str, List[str]]
+    summaries: Dict[str, Dict[str, Any]] = {}
+
+
+def _source_sig(directory: Path) -> str:
+    count = size = latest = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not name.endswith(".json"):
+                continue
+            try:
+                st = os.stat(os.path.join(root, name))
+            except OSError:
+                continue
+            count += 1
+            size += st.st_size
+            latest = max(latest, st.st_mtime_ns)
+    return hashlib.sha1(f"{count}:{size}:{latest}".encode()).hexdigest()[:16]
+
+
+class AscensionBundle(Mapping):
+    def __init__(
+        self,
+        kind: str,
+        directory: Path,
+        cache_size: Optional[int],
+        log_tag: str,
+        summary_fields: Tuple[str, ...] = (),
+    ):
+        self.kind = kind
+        self.summary_fields = summary_fields
+        self.directory = directory
+        self.cache_size = cache_size
+        self.log_tag = log_tag
+        self._path: Optional[Path] = None
+        self._base = 0
+        self._index = _Index(offsets={}, names={}, aliases={})
+        self._name_to_id: Dict[str, str] = {}
+        self._alias_to_id: Dict[str, str] = {}
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._loaded = False
+        self.generation = 0
+
+    # ---- 编译/打开 ----
+
+    def load(self, force: bool = False) -> None:
+        with self._lock:
+            if (self._loaded and not force) or not self.directory.exists():
+                return
+            previous = self._path
+            path = BUNDLE_DIR / f"{self.kind}-{_source_sig(self.directory)}.bin"
+            if not (path.exists() and self._open(path)):
+                self._build(path)
+                self._open(path)
+                self._cleanup(keep=path)
+            if self._path != previous:
+                self._cache.clear()
+                self.generation += 1
+            self._loaded = True
+
+    def _build(self, path: Path) -> None:
+        start = time.perf_counter()
+        chunks: List[bytes] = []
+        index = _Index(offsets={}, names={}, aliases={})
+        pos = 0
+        for file in sorted(self.directory.rglob("*.json")):
+            try:
+                raw = file.read_bytes()
+                data = msgjson.decode(raw)
+            except Exception as e:
+                logger.exception(f"[{self.log_tag}] 编译数据包时解码失败 {file}", e)
+                continue
+            fid = file.name.split(".")[0]
+            index.offsets[fid] = (pos, len(raw))
+            if isinstance(data, dict):
+                index.names[fid] = data.get("name") or ""
+                alias = data.get("alias")
+                if alias:
+                    index.aliases[fid] = [a for a in alias if isinstance(a, str)]
+                if self.summary_fields:
+                    index.summaries[fid] = {k: data[k] for k in self.summary_fields if k in data}
+            chunks.append(raw)
+            pos += len(raw)
+        header = msgjson.encode(index)
+        BUNDLE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, "wb") as f:
+                f.write(MAGIC)
+                f.write(len(header).to_bytes(4, "little"))
+                f.write(header)
+                for chunk in chunks:
+                    f.write(chunk)
+            tmp.replace(path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        logger.info(
+            f"[{self.log_tag}] 数据包已编译: {len(index.offsets)} 条, "
+            f"{pos / 1024:.0f} KiB, {(time.perf_counter() - start) * 1000:.0f} ms"
+        )
+
+    def _open(self, path: Path) -> bool:
+        try:
+            with open(path, "rb") as f:
+                head = f.read(_HEADER)
+                if len(head) != _HEADER or head[: len(MAGIC)] != MAGIC:
+                    return False
+                size = int.from_bytes(head[len(MAGIC):], "little")
+                index = msgjson.decode(f.read(size), type=_Index)
+        except (OSError, msgspec.DecodeError, msgspec.ValidationError) as e:
+            logger.warning(f"[{self.log_tag}] 数据包损坏, 重新编译 {path}: {e}")
+            return False
+        name_to_id: Dict[str, str] = {}
+        for fid, name in index.names.items():
+            name_to_id.setdefault(name, fid)
+        alias_to_id: Dict[str, str] = {}
+        for fid, aliases in index.aliases.items():
+            for a in aliases:
+                alias_to_id.setdefault(a, fid)
+        self._path, self._base, self._index = path, _HEADER + size, index
+        self._name_to_id, self._alias_to_id = name_to_id, alias_to_id
+        return True
+
+    def _cleanup(self, keep: Path) -> None:
+        for old in BUNDLE_DIR.glob(f"{self.kind}-*.bin"):
+            if old != keep:
+                try:
+                    old.unlink()
+                except OSError:
+                    pass  # 其它进程还开着, 下次再删
+
+    def _decode(self, key: str) -> Any:
+        offset, length = self._index.offsets[key]
+        with open(self._path, "rb") as f:  # type: ignore[arg-type]
+            f.seek(self._base + offset)
+            return msgjson.decode(f.read(length))
+
+    # ---- 查询 ----
+
+    def get_name(self, key: str) -> Optional[str]:
+        self.load()
+        return self._index.names.get(key)
+
+    def id_by_name(self, name: str) -> Optional[str]:
+        self.load()
+        return self._name_to_id.get(name)
+
+    def id_by_alias(self, alias: str) -> Optional[str]:
+        self.load()
+        return self._alias_to_id.get(alias)
+
+    def names(self) -> Dict[str, str]:
+        """{id: 名称}, 不解码条目。"""
+        self.load()
+        return self._index.names
+
+    def summaries(self) -> Dict[str, Dict[str, Any]]:
+        """{id: 编译时摘出的 summary_fields}, 不解码条目; 只读, 勿修改。"""
+        self.load()
+        return self._index.summaries
+
+    # ---- Mapping ----
+
+    def __getitem__(self, key: str) -> Any:
+        self.load()
+        with self._lock:
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+                return data
+            if key not in self._index.offsets:
+                raise KeyError(key)
+            try:
+                data = self._decode(key)
+            except OSError:
+                # 包被其它进程清理 (资源已更新): 按新指纹重开后再取
+                self.load(force=True)
+                if key not in self._index.offsets:
+                    raise KeyError(key)
+                data = self._decode(key)
+            self._cache[key] = data
+            limit = len(self._index.offsets) if self.cache_size is None else self.cache_size
+            while len(self._cache) > limit:
+                self._cache.popitem(last=False)
+            return data
+
+    def __contains__(self, key: object) -> bool:
+        self.load()
+        return key in self._index.offsets
+
+    def __iter__(self) -> Iterator[str]:
+        self.load()
+        return iter(list(self._index.offsets))
+
+    def __len__(self) -> int:
+        self.load()
+        return len(self._index.offsets)
+
+    def _decode_all(self) -> List[Tuple[str, Any]]:
+        self.load()
+        with self._lock:
+            if self._path is None:
+                return []  # 源目录不存在, 未编译
+            offsets = self._index.offsets
+            cache = dict(self._cache)
+            with open(self._path, "rb") as f:  # type: ignore[arg-type]
+                f.seek(self._base)
+                blob = f.read()
+        out = []
+        for key, (offset, length) in offsets.items():
+            data = cache.get(key)
+            if data is None:
+                data = msgjson.decode(blob[offset: offset + length])
+            out.append((key, data))
+        return out
+
+    def items(self):  # type: ignore[override]
+        return self._decode_all()
+
+    def values(self):  # type: ignore[override]
+        return [data for _, data in self._decode_all()]
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._index.offsets), "cached": len(self._cache)}
+
+
+def benchmark_load(directory: Path, kind: str = "bench", rounds: int = 3) -> Dict[str, Dict[str, float]]:
+    """对比原 rglob 全量解码与数据包 (已编译时) 的加载耗时(ms)与常驻内存(KiB), 以及按 id 取一条的耗时。"""
+
+    def eager() -> Dict[str, Any]:
+        out = {}
+        for file in directory.rglob("*.json"):
+            out[file.name.split(".")[0]] = msgjson.decode(file.read_bytes())
+        return out
+
+    def bundled() -> AscensionBundle:
+        b = AscensionBundle(kind, directory, cache_size=64, log_tag="鸣潮·数据包")
+        b.load()
+        return b
+
+    bundled()  # 先编译一次
+    out: Dict[str, Dict[str, float]] = {}
+    for name, fn in (("rglob", eager), ("bundle", bundled)):
+        gc.collect()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            fn()
+        per = (time.perf_counter() - start) / rounds
+        tracemalloc.start()
+        try:
+            result = fn()
+            retained, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        key = next(iter(result), None)
+        start = time.perf_counter()
+        if key is not None:
+            result[key]
+        out[name] = {
+            "load_ms": round(per * 1000, 2),
+            "kib": round(retained / 1024, 1),
+            "first_get_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+        del result
+    return out
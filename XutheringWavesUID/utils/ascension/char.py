@@ -1,48 +1,33 @@
-import copy
 import re
 from typing import Union, Optional
 
-from msgspec import json as msgjson
-
 from gsuid_core.logger import logger
 
 from .model import CharacterModel
+from .bundle import AscensionBundle
+from .memo import FrozenDict, FrozenResult, freeze, memoize
 from .constant import fixed_name, sum_percentages
 from ..resource.RESOURCE_PATH import MAP_DETAIL_PATH
 
 MAP_PATH = MAP_DETAIL_PATH / "char"
-char_id_data = {}
-_data_loaded = False
-
-
-def read_char_json_files(directory):
-    global char_id_data
-    files = directory.rglob("*.json")
-
-    for file in files:
-        try:
-            with open(file, "r", encoding="utf-8") as f:
-                data = msgjson.decode(f.read())
-                file_name = file.name.split(".")[0]
-                char_id_data[file_name] = data
-        except Exception as e:
-            logger.exception(f"[鸣潮·角色升级] read_char_json_files load fail decoding {file}", e)
+# 全角色遍历 (持有率/出场率) 很常见, LRU 按角色数定容, 整轮不换出
+char_id_data = AscensionBundle(
+    "char", MAP_PATH, cache_size=None, log_tag="鸣潮·角色升级", summary_fields=("starLevel",)
+)
 
 
 def ensure_data_loaded(force: bool = False):
-    """确保角色数据已加载
+    """确保角色数据包已打开 (只读索引, 条目按需解码)
 
     Args:
-        force: 如果为 True，强制重新加载所有数据，即使已经加载过
+        force: 如果为 True，重新检查资源目录，有变化则重新编译数据包
     """
-    global _data_loaded
-    if (_data_loaded and not force) or not MAP_PATH.exists():
-        return
-    read_char_json_files(MAP_PATH)
-    _data_loaded = True
+    char_id_data.load(force)
+
 
+class WavesCharResult(FrozenResult):
+    """get_char_detail 返回的是缓存共享的只读结果, 需要修改请先 thaw()"""
 
-class WavesCharResult:
     def __init__(self):
         self.name = ""
         self.starLevel = 4
@@ -53,7 +38,7 @@ class WavesCharResult:
             "weaknessTotalBonus": 0,
             "breakWeaknessRatio": 10000,
             "weaknessMastery": 0
-        },
+        }
         self.skillTrees = {}
         self.fixed_skill = {}
 
@@ -120,21 +105,23 @@ def get_char_detail(char_id: Union[str, int], level: int, breach: Union[int, Non
     resonLevel 谐振
     """
     ensure_data_loaded()
-    result = WavesCharResult()
     if str(char_id) not in char_id_data:
         logger.exception(f"[鸣潮·角色升级] get_char_detail char_id: {char_id} not found")
-        return result
+        return WavesCharResult().freeze()
+
+    return _char_detail(str(char_id), level, get_breach(breach, level))
 
-    breach = get_breach(breach, level)
 
-    char_data = char_id_data[str(char_id)]
+@memoize(char_id_data, maxsize=512)
+def _char_detail(char_id: str, level: int, breach: int) -> WavesCharResult:
+    result = WavesCharResult()
+    char_data = char_id_data[char_id]
     result.name = char_data["name"]
     result.starLevel = char_data["starLevel"]
-    result.stats = copy.deepcopy(char_data["stats"][str(breach)][str(level)])
-    result.statsWeakness = copy.deepcopy(char_data["statsWeakness"])
-    result.skillTrees = char_data["skillTree"]
+    result.stats = char_data["stats"][str(breach)][str(level)]
+    result.statsWeakness = char_data["statsWeakness"]
+    result.skillTrees = _skill_tree(char_id)
 
-    char_data["skillTree"].items()
     for key, value in char_data["skillTree"].items():
         skill_info = value.get("skill", {})
         name = skill_info.get("name", "")
@@ -173,7 +160,14 @@ def get_char_detail(char_id: Union[str, int], level: int, breach: Union[int, Non
                         except (IndexError, KeyError, TypeError) as e:
                             logger.warning(f"[鸣潮·角色升级] get_char_detail param[{param_index}] failed for char_id {char_id}, skill {name}: {e}")
 
-    return result
+    # freeze 新建只读容器, 与数据包 LRU 中的条目脱钩
+    return result.freeze()
+
+
+@memoize(char_id_data, maxsize=64)
+def _skill_tree(char_id: str) -> FrozenDict:
+    # 技能树与等级/突破无关, 各等级的结果共享同一份
+    return freeze(char_id_data[char_id]["skillTree"])
 
 
 def get_char_detail2(role) -> WavesCharResult:
@@ -184,15 +178,13 @@ def get_char_detail2(role) -> WavesCharResult:
 
 
 def get_char_id(char_name, loose: bool = False) -> Optional[str]:
-    ensure_data_loaded()
-    exact = next((_id for _id, value in char_id_data.items() if value["name"] == char_name), None)
+    exact = char_id_data.id_by_name(char_name)
     if exact is not None or not loose:
         return exact
     # 子串兜底取公共名最长的候选, 避免撞名 (如 秧秧 / 秧秧·玄翎) 受遍历顺序影响取错头像
     best_id = None
     best_len = -1
-    for _id, value in sorted(char_id_data.items()):
-        name = value["name"]
+    for _id, name in sorted(char_id_data.names().items()):
         if not name:
             continue
         if char_name in name or name in char_name:
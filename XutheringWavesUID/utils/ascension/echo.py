@@ -1,42 +1,20 @@
 from typing import Union, Optional
 
-from msgspec import json as msgjson
-
-from gsuid_core.logger import logger
-
 from .model import EchoModel
+from .bundle import AscensionBundle
 from ..resource.RESOURCE_PATH import MAP_DETAIL_PATH
 
 MAP_PATH = MAP_DETAIL_PATH / "echo"
-echo_id_data = {}
-_data_loaded = False
-
-
-def read_echo_json_files(directory):
-    global echo_id_data
-    files = directory.rglob("*.json")
-
-    for file in files:
-        try:
-            with open(file, "r", encoding="utf-8") as f:
-                data = msgjson.decode(f.read())
-                file_name = file.name.split(".")[0]
-                echo_id_data[file_name] = data
-        except Exception as e:
-            logger.exception(f"[鸣潮·声骸升级] read_echo_json_files load fail decoding {file}", e)
+echo_id_data = AscensionBundle("echo", MAP_PATH, cache_size=128, log_tag="鸣潮·声骸升级")
 
 
 def ensure_data_loaded(force: bool = False):
-    """确保声骸数据已加载
+    """确保声骸数据包已打开 (只读索引, 条目按需解码)
 
     Args:
-        force: 如果为 True，强制重新加载所有数据，即使已经加载过
+        force: 如果为 True，重新检查资源目录，有变化则重新编译数据包
     """
-    global _data_loaded
-    if (_data_loaded and not force) or not MAP_PATH.exists():
-        return
-    read_echo_json_files(MAP_PATH)
-    _data_loaded = True
+    echo_id_data.load(force)
 
 
 def get_echo_model(echo_id: Union[int, str]) -> Optional[EchoModel]:
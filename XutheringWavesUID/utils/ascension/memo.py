@@ -0,0 +1,109 @@
+"""角色/武器/合鸣详情计算结果的只读缓存。
+
+get_char_detail / get_weapon_detail 等的结果只取决于入参与数据包内容, 面板、评分、排行每行都要算一次,
+所以按 (数据包 generation, 入参) 缓存; 资源更新换包后 generation 变化, 旧结果自然不再命中。
+
+缓存结果被所有调用方共享, 必须只读:
+- FrozenResult.freeze() 之后不能再赋值属性, 其中的 dict 变为 FrozenDict, list 变为 tuple;
+- 需要改动时 thaw() (或 copy.copy / copy.deepcopy) 取一份可写的深拷贝, 写时复制, 不影响缓存。
+"""
+from functools import wraps, lru_cache
+from typing import Any, Callable
+
+from .bundle import AscensionBundle
+
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError("缓存共享的只读数据, 需要修改请先 thaw()")
+
+
+class FrozenDict(dict):
+    """只读 dict; 仍是 dict 子类, 读取、json 序列化、isinstance 判断都不受影响。"""
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+    def __copy__(self):
+        return thaw(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+
+def freeze(obj: Any) -> Any:
+    """dict/list 递归转为 FrozenDict/tuple (新建容器, 与数据包缓存中的原对象脱钩)。"""
+    if isinstance(obj, FrozenDict):
+        return obj  # 已冻结的可直接共享
+    if isinstance(obj, dict):
+        return FrozenDict((k, freeze(v)) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze(v) for v in obj)
+    return obj
+
+
+def thaw(obj: Any) -> Any:
+    """freeze 的逆操作, 得到可写的深拷贝。"""
+    if isinstance(obj, dict):
+        return {k: thaw(v) for k, v in obj.items()}
+    if isinstance(obj, tuple):
+        return [thaw(v) for v in obj]
+    if isinstance(obj, FrozenResult):
+        return obj.thaw()
+    return obj
+
+
+class FrozenResult:
+    """详情结果基类: freeze() 后只读, thaw() 取可写副本。"""
+
+    _frozen = False
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if self._frozen:
+            _readonly(self)
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name: str) -> None:
+        if self._frozen:
+            _readonly(self)
+        object.__delattr__(self, name)
+
+    def freeze(self):
+        state = vars(self)
+        for key in list(state):
+            state[key] = freeze(state[key])
+        object.__setattr__(self, "_frozen", True)
+        return self
+
+    def thaw(self):
+        obj = object.__new__(type(self))
+        vars(obj).update((k, thaw(v)) for k, v in vars(self).items() if k != "_frozen")
+        return obj
+
+    def __copy__(self):
+        return self.thaw()
+
+    def __deepcopy__(self, memo):
+        return self.thaw()
+
+
+def memoize(bundle: AscensionBundle, maxsize: int) -> Callable:
+    """按 (bundle.generation, 入参) 缓存; 入参需可哈希, 由调用方先规范化 (如 id 转 str)。"""
+
+    def decorator(func: Callable) -> Callable:
+        @lru_cache(maxsize=maxsize)
+        def cached(generation: int, *args):
+            return func(*args)
+
+        @wraps(func)
+        def wrapper(*args):
+            bundle.load()
+            return cached(bundle.generation, *args)
+
+        wrapper.cache_info = cached.cache_info  # type: ignore[attr-defined]
+        wrapper.cache_clear = cached.cache_clear  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
@@ -1,34 +1,24 @@
-from typing import Dict, List, Union, Optional
+from typing import Dict, List, Tuple, Union, Optional
 
 from msgspec import json as msgjson
-from pydantic import Field, BaseModel
+from pydantic import Field, BaseModel, ConfigDict, field_validator
 
 from gsuid_core.logger import logger
 
+from .memo import FrozenDict, memoize
+from .bundle import AscensionBundle
 from ..resource.RESOURCE_PATH import MAP_PATH, MAP_DETAIL_PATH
 
 MAP_PATH_SONATA = MAP_DETAIL_PATH / "sonata"
 SONATA_ID_MAP_PATH = MAP_PATH / "sonata_id.json"
 
-sonata_id_data = {}
+sonata_id_data = AscensionBundle(
+    "sonata", MAP_PATH_SONATA, cache_size=64, log_tag="鸣潮·合鸣", summary_fields=("name", "set", "version")
+)
 sonata_name_to_id = {}  # 中文名称 -> ID 映射
 _data_loaded = False
 
 
-def read_sonata_json_files(directory):
-    global sonata_id_data
-    files = directory.rglob("*.json")
-
-    for file in files:
-        try:
-            with open(file, "r", encoding="utf-8") as f:
-                data = msgjson.decode(f.read())
-                file_name = file.name.split(".")[0]
-                sonata_id_data[file_name] = data
-        except Exception as e:
-            logger.exception(f"[鸣潮·合鸣] read_char_json_files load fail decoding {file}", e)
-
-
 def load_sonata_name_mapping():
     """加载 sonata_id.json 映射文件"""
     global sonata_name_to_id
@@ -53,20 +43,31 @@ def ensure_data_loaded(force: bool = False):
     global _data_loaded
     if (_data_loaded and not force) or not MAP_PATH_SONATA.exists():
         return
-    read_sonata_json_files(MAP_PATH_SONATA)
+    sonata_id_data.load(force)
     load_sonata_name_mapping()
     _data_loaded = True
 
 
 class SonataSet(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     desc: str = Field(default="")
     effect: str = Field(default="")
-    param: List[str] = Field(default_factory=list)
+    param: Tuple[str, ...] = Field(default_factory=tuple)
 
 
 class WavesSonataResult(BaseModel):
+    """get_sonata_detail 返回的是缓存共享的只读结果, 需要修改请先 model_copy(deep=True)"""
+
+    model_config = ConfigDict(frozen=True)
+
     name: str = Field(default="")
-    set: Dict[str, SonataSet] = Field(default_factory=dict)
+    set: Dict[str, SonataSet] = Field(default_factory=FrozenDict)
+
+    @field_validator("set", mode="after")
+    @classmethod
+    def _freeze_set(cls, value: Dict[str, SonataSet]) -> Dict[str, SonataSet]:
+        return FrozenDict(value)
 
     def piece(self, piece_count: Union[str, int]) -> Optional[SonataSet]:
         """获取件套效果"""
@@ -94,6 +95,11 @@ def get_sonata_detail(sonata_name: Optional[str]) -> WavesSonataResult:
         logger.exception(f"[鸣潮·合鸣] get_sonata_detail sonata_name: {sonata_name} (converted to {sonata_key}) not found")
         return result
 
+    return _sonata_detail(sonata_key)
+
+
+@memoize(sonata_id_data, maxsize=128)
+def _sonata_detail(sonata_key: str) -> WavesSonataResult:
     return WavesSonataResult(**sonata_id_data[sonata_key])
 
 
@@ -109,8 +115,13 @@ COMBO_SONATA_RULES: Dict[int, Dict] = {
 def get_2pc_sonata_names(keywords: List[str]) -> List[str]:
     """返回具备 2 件效果、且 2 件 effect/desc 命中任一关键字的套装名 (排除 3 件/1 件套)。"""
     ensure_data_loaded()
+    return list(_2pc_sonata_names(tuple(keywords)))
+
+
+@memoize(sonata_id_data, maxsize=32)
+def _2pc_sonata_names(keywords: Tuple[str, ...]) -> Tuple[str, ...]:
     names = []
-    for data in sonata_id_data.values():
+    for data in sonata_id_data.summaries().values():
         two = (data.get("set") or {}).get("2")
         if not two:
             continue
@@ -119,7 +130,7 @@ def get_2pc_sonata_names(keywords: List[str]) -> List[str]:
             name = data.get("name")
             if name:
                 names.append(name)
-    return names
+    return tuple(names)
 
 
 def detect_combo_sonata(role_id: Union[int, str], ph_detail: List[Dict]) -> Optional[str]:
@@ -1,47 +1,33 @@
-import copy
 from typing import Union, Optional
 
-from msgspec import json as msgjson
-
-from gsuid_core.logger import logger
-
 from .model import WeaponModel
+from .bundle import AscensionBundle
+from .memo import FrozenResult, memoize
 from .constant import fixed_name
 from ..resource.RESOURCE_PATH import MAP_DETAIL_PATH
 
 MAP_PATH = MAP_DETAIL_PATH / "weapon"
-weapon_id_data = {}
-_data_loaded = False
-
-
-def read_weapon_json_files(directory):
-    global weapon_id_data
-    files = directory.rglob("*.json")
-
-    for file in files:
-        try:
-            with open(file, "r", encoding="utf-8") as f:
-                data = msgjson.decode(f.read())
-                file_name = file.name.split(".")[0]
-                weapon_id_data[file_name] = data
-        except Exception as e:
-            logger.exception(f"[鸣潮·武器升级] read_weapon_json_files load fail decoding {file}", e)
+weapon_id_data = AscensionBundle(
+    "weapon",
+    MAP_PATH,
+    cache_size=96,
+    log_tag="鸣潮·武器升级",
+    summary_fields=("name", "starLevel", "type", "effectName"),
+)
 
 
 def ensure_data_loaded(force: bool = False):
-    """确保武器数据已加载
+    """确保武器数据包已打开 (只读索引, 条目按需解码)
 
     Args:
-        force: 如果为 True，强制重新加载所有数据，即使已经加载过
+        force: 如果为 True，重新检查资源目录，有变化则重新编译数据包
     """
-    global _data_loaded
-    if (_data_loaded and not force) or not MAP_PATH.exists():
-        return
-    read_weapon_json_files(MAP_PATH)
-    _data_loaded = True
+    weapon_id_data.load(force)
+
 
+class WavesWeaponResult(FrozenResult):
+    """get_weapon_detail 返回的是缓存共享的只读结果, 需要修改请先 thaw()"""
 
-class WavesWeaponResult:
     def __init__(self):
         self.name: str = ""
         self.starLevel: int = 4
@@ -87,22 +73,26 @@ def get_weapon_detail(
     resonLevel 谐振
     """
     ensure_data_loaded()
-    result = WavesWeaponResult()
     if str(weapon_id) not in weapon_id_data:
-        return result
+        return WavesWeaponResult().freeze()
 
-    breach = get_breach(breach, level)
+    if resonLevel is None:
+        resonLevel = 1
+    return _weapon_detail(str(weapon_id), level, get_breach(breach, level), resonLevel)
 
-    weapon_data = weapon_id_data[str(weapon_id)]
+
+@memoize(weapon_id_data, maxsize=512)
+def _weapon_detail(weapon_id: str, level: int, breach: Union[int, None], resonLevel: int) -> WavesWeaponResult:
+    result = WavesWeaponResult()
+    weapon_data = weapon_id_data[weapon_id]
     result.name = weapon_data["name"]
     result.starLevel = weapon_data["starLevel"]
     result.type = weapon_data["type"]
     result.effectName = weapon_data["effectName"]
-    result.stats = copy.deepcopy(weapon_data["stats"][str(breach)][str(level)])
+    # 下面会改写 value, 先拷一份, 不能动数据包 LRU 里的条目
+    result.stats = [dict(stat) for stat in weapon_data["stats"][str(breach)][str(level)]]
     result.param = weapon_data["param"]
     effect = weapon_data["effect"]
-    if resonLevel is None:
-        resonLevel = 1
     result.resonLevel = resonLevel
     for i, p in enumerate(weapon_data["param"]):
         _temp = "{" + str(i) + "}"
@@ -124,25 +114,14 @@ def get_weapon_detail(
             name = v.replace("提升", "").replace("全", "")
             result.sub_effect = {"name": name, "value": f"{value}"}
 
-    return result
+    return result.freeze()
 
 
 def get_weapon_id(weapon_name, loose: bool = False) -> Optional[str]:
-    ensure_data_loaded()
-    if not loose:
-        return next(
-            (_id for _id, value in weapon_id_data.items() if value["name"] == weapon_name),
-            None,
-        )
-    else:
-        for _id, value in weapon_id_data.items():
-            if value["name"] == weapon_name:
-                return _id
-        for _id, value in weapon_id_data.items():
-            for alias in value.get("alias", []):
-                if alias == weapon_name:
-                    return _id
-    return None
+    weapon_id = weapon_id_data.id_by_name(weapon_name)
+    if weapon_id is not None or not loose:
+        return weapon_id
+    return weapon_id_data.id_by_alias(weapon_name)
 
 
 def get_weapon_star(weapon_name) -> int:
@@ -1,7 +1,12 @@
 """通过opencv分块直方图相似度将角色头像URL匹配到角色ID"""
 
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from typing import List, Optional
 from pathlib import Path
-from typing import Dict, List, Optional
 
 from PIL import Image
 from gsuid_core.logger import logger
@@ -43,8 +48,18 @@ _S_BINS = 16
 # 相似度阈值
 _MATCH_THRESHOLD = 0.3
 
-# 缓存: char_id_str -> feature vector
-_ref_feat_cache: Dict[str, object] = {}
+# 参考特征矩阵: 每行一个 L2 归一化的 float32 头像特征, 与 id 列表一一对应; 落盘到 AVATAR_PATH 旁
+_FEAT_VERSION = 1
+_REF_MATRIX_PATH = AVATAR_PATH.parent / "avatar_match_feats.npy"
+_REF_META_PATH = AVATAR_PATH.parent / "avatar_match_feats.json"
+# 头像目录变动检查间隔（秒）
+_SIGNATURE_CHECK_INTERVAL = 60
+
+_ref_ids: List[str] = []
+_ref_matrix = None
+_ref_signature: Optional[str] = None
+_ref_checked_at = 0.0
+_ref_lock = threading.Lock()
 
 
 def _compute_block_feature(img_bgr):
@@ -65,13 +80,11 @@ def _compute_block_feature(img_bgr):
     return _np.concatenate(hists)
 
 
-def _cosine_similarity(a, b):
-    """余弦相似度"""
-    dot = _np.dot(a, b)
-    norm = _np.linalg.norm(a) * _np.linalg.norm(b)
-    if norm < 1e-10:
-        return 0.0
-    return float(dot / norm)
+def _l2_normalize(mat):
+    """按行 L2 归一化, 零向量保持为 0 (相似度记 0)"""
+    mat = _np.asarray(mat, dtype=_np.float32)
+    norms = _np.linalg.norm(mat, axis=-1, keepdims=True)
+    return _np.where(norms < 1e-10, 0.0, mat / _np.maximum(norms, 1e-10)).astype(_np.float32)
 
 
 def _pil_to_cv2_bgr(pil_img: Image.Image):
@@ -80,64 +93,134 @@ def _pil_to_cv2_bgr(pil_img: Image.Image):
     return _cv2.cvtColor(rgb, _cv2.COLOR_RGB2BGR)
 
 
-def _load_reference_features() -> Dict[str, object]:
-    """加载本地头像并计算分块特征（带内存缓存）"""
-    if _ref_feat_cache:
-        return _ref_feat_cache
+def _avatar_files() -> List[Path]:
+    return sorted(AVATAR_PATH.glob("role_head_*.png"))
+
+
+def _avatar_signature(files: List[Path]) -> str:
+    h = hashlib.sha1(f"{_FEAT_VERSION}:{_MATCH_SIZE}:{_BLOCK_NUM}:{_H_BINS}:{_S_BINS}".encode())
+    for f in files:
+        try:
+            st = f.stat()
+        except OSError:
+            continue
+        h.update(f"{f.name}:{st.st_mtime_ns}:{st.st_size};".encode())
+    return h.hexdigest()
+
+
+def _load_persisted(signature: str) -> bool:
+    global _ref_ids, _ref_matrix
+    try:
+        meta = json.loads(_REF_META_PATH.read_text(encoding="utf-8"))
+        if meta.get("signature") != signature:
+            return False
+        matrix = _np.load(_REF_MATRIX_PATH)
+        if matrix.shape[0] != len(meta["ids"]):
+            return False
+    except Exception:
+        return False
+    _ref_ids, _ref_matrix = list(meta["ids"]), matrix
+    return True
 
-    if not AVATAR_PATH.exists():
-        logger.warning(f"[鸣潮·头像匹配] 头像目录不存在: {AVATAR_PATH}")
-        return {}
 
-    for avatar_file in AVATAR_PATH.glob("role_head_*.png"):
+def _build_reference_matrix(files: List[Path], signature: str) -> None:
+    global _ref_ids, _ref_matrix
+    ids, feats = [], []
+    for avatar_file in files:
         char_id_str = avatar_file.stem.replace("role_head_", "")
         try:
             img = _cv2.imread(str(avatar_file))
             if img is None:
                 continue
-            feat = _compute_block_feature(img)
-            _ref_feat_cache[char_id_str] = feat
+            feats.append(_compute_block_feature(img))
+            ids.append(char_id_str)
         except Exception as e:
             logger.debug(f"[鸣潮·头像匹配] 加载头像失败 {avatar_file}: {e}")
 
-    logger.info(f"[鸣潮·头像匹配] 加载了 {len(_ref_feat_cache)} 个参考头像用于矩阵匹配")
-    return _ref_feat_cache
+    dim = _BLOCK_NUM * _BLOCK_NUM * _H_BINS * _S_BINS
+    matrix = _l2_normalize(_np.stack(feats)) if feats else _np.zeros((0, dim), dtype=_np.float32)
+    _ref_ids, _ref_matrix = ids, matrix
+    try:
+        _np.save(_REF_MATRIX_PATH, matrix)
+        _REF_META_PATH.write_text(json.dumps({"signature": signature, "ids": ids}), encoding="utf-8")
+    except Exception as e:
+        logger.debug(f"[鸣潮·头像匹配] 特征矩阵落盘失败: {e}")
+    logger.info(f"[鸣潮·头像匹配] 加载了 {len(ids)} 个参考头像用于矩阵匹配")
 
 
-def match_avatar_image(pil_img: Image.Image) -> Optional[int]:
-    """将一个头像PIL Image匹配到角色ID
+def _load_reference_matrix():
+    """返回 (id 列表, 特征矩阵); 头像目录变动 (按签名判断) 时重建并落盘 .npy"""
+    global _ref_signature, _ref_checked_at
+    with _ref_lock:
+        now = time.monotonic()
+        if _ref_matrix is not None and now - _ref_checked_at < _SIGNATURE_CHECK_INTERVAL:
+            return _ref_ids, _ref_matrix
+        _ref_checked_at = now
+
+        if not AVATAR_PATH.exists():
+            logger.warning(f"[鸣潮·头像匹配] 头像目录不存在: {AVATAR_PATH}")
+            return [], None
+
+        files = _avatar_files()
+        signature = _avatar_signature(files)
+        if signature != _ref_signature:
+            if not _load_persisted(signature):
+                _build_reference_matrix(files, signature)
+            _ref_signature = signature
+        return _ref_ids, _ref_matrix
+
+
+def match_avatar_images(pil_imgs: List[Image.Image]) -> List[Optional[int]]:
+    """批量将头像PIL Image匹配到角色ID: 一次矩阵乘法 + argmax
 
     Returns:
-        匹配到的角色ID (int), 未匹配到返回 None
+        与输入等长, 未匹配到的位置为 None
     """
+    if not pil_imgs:
+        return []
     if _cv2 is None or _np is None:
-        return None
+        return [None] * len(pil_imgs)
 
     try:
-        bgr = _pil_to_cv2_bgr(pil_img)
-        query_feat = _compute_block_feature(bgr)
-
-        ref_feats = _load_reference_features()
-        if not ref_feats:
-            return None
+        ref_ids, ref_matrix = _load_reference_matrix()
+        if ref_matrix is None or not len(ref_ids):
+            return [None] * len(pil_imgs)
+
+        results: List[Optional[int]] = [None] * len(pil_imgs)
+        rows, feats = [], []
+        for i, pil_img in enumerate(pil_imgs):
+            if pil_img is None:
+                continue
+            try:
+                feats.append(_compute_block_feature(_pil_to_cv2_bgr(pil_img)))
+                rows.append(i)
+            except Exception as e:
+                logger.warning(f"[鸣潮·头像匹配] 头像特征计算失败: {e}")
+        if not feats:
+            return results
+
+        scores = _l2_normalize(_np.stack(feats)) @ ref_matrix.T
+        best = scores.argmax(axis=1)
+        for row, (i, j) in enumerate(zip(rows, best)):
+            best_score = float(scores[row, j])
+            if best_score >= _MATCH_THRESHOLD:
+                results[i] = int(ref_ids[j])
+            else:
+                logger.debug(f"[鸣潮·头像匹配] 头像匹配分数过低: {best_score:.3f}")
+        return results
 
-        best_score = -1.0
-        best_char_id = None
-        for char_id_str, ref_feat in ref_feats.items():
-            score = _cosine_similarity(query_feat, ref_feat)
-            if score > best_score:
-                best_score = score
-                best_char_id = char_id_str
+    except Exception as e:
+        logger.warning(f"[鸣潮·头像匹配] 头像匹配失败: {e}")
+        return [None] * len(pil_imgs)
 
-        if best_char_id and best_score >= _MATCH_THRESHOLD:
-            return int(best_char_id)
 
-        logger.debug(f"[鸣潮·头像匹配] 头像匹配分数过低: {best_score:.3f}")
-        return None
+def match_avatar_image(pil_img: Image.Image) -> Optional[int]:
+    """将一个头像PIL Image匹配到角色ID
 
-    except Exception as e:
-        logger.warning(f"[鸣潮·头像匹配] 头像匹配失败: {e}")
-        return None
+    Returns:
+        匹配到的角色ID (int), 未匹配到返回 None
+    """
+    return match_avatar_images([pil_img])[0]
 
 
 async def match_role_icons_to_char_ids(
@@ -158,16 +241,13 @@ async def match_role_icons_to_char_ids(
 
     from .image import pic_download_from_url
 
-    char_ids: List[int] = []
-    for icon_url in role_icons:
-        if not icon_url:
-            continue
+    async def _download(icon_url: str) -> Optional[Image.Image]:
         try:
-            pil_img = await pic_download_from_url(cache_path, icon_url)
-            char_id = match_avatar_image(pil_img)
-            if char_id is not None:
-                char_ids.append(char_id)
+            return await pic_download_from_url(cache_path, icon_url)
         except Exception as e:
-            logger.warning(f"[鸣潮·头像匹配] 下载/匹配角色头像失败: {e}")
+            logger.warning(f"[鸣潮·头像匹配] 下载角色头像失败: {e}")
+            return None
 
-    return char_ids
+    pil_imgs = await asyncio.gather(*(_download(url) for url in role_icons if url))
+    matched = await asyncio.to_thread(match_avatar_images, list(pil_imgs))
+    return [char_id for char_id in matched if char_id is not None]
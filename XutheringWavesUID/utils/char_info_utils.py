@@ -1,21 +1,49 @@
-from typing import Any, Dict, Union, Optional, Generator
+from typing import Any, Dict, List, Tuple, Union, Optional, Generator
 
-from .api.model import RoleDetailData
-from .player_store import read_player_json
+from .api.model import RoleDetailData, structs
+from .panel_cache import panel_cache
 from .resource.constant import SPECIAL_CHAR, SPECIAL_CHAR_RANK_MAP
 from .resource.RESOURCE_PATH import PLAYER_PATH
 
 PATTERN = r"[\u4e00-\u9fa5a-zA-Z0-9\U0001F300-\U0001FAFF\U00002600-\U000027BF\U00002B00-\U00002BFF\U00003200-\U000032FF-—·()（）]{1,15}"
 
+def _struct_decode() -> bool:
+    from ..wutheringwaves_config import WutheringWavesConfig
+
+    return bool(WutheringWavesConfig.get_config("PanelStructDecode").data)
+
+
+def _parse_role_list(player_data: List[Dict]) -> Tuple[RoleDetailData, ...]:
+    if _struct_decode():
+        # msgspec 孪生类型, 按属性读取与 RoleDetailData 一致
+        return tuple(structs.convert(RoleDetailData, player_data, many=True))
+    return tuple(RoleDetailData(**r) for r in player_data)
+
+
+def _parse_rover_map(data: Dict) -> Dict[str, RoleDetailData]:
+    use_struct = _struct_decode()
+    out: Dict[str, RoleDetailData] = {}
+    for k, v in data.items():
+        try:
+            if use_struct:
+                out[str(k)] = structs.convert(RoleDetailData, v)
+            else:
+                out[str(k)] = RoleDetailData(**v)
+        except Exception:
+            continue
+    return out
+
+
 async def get_all_role_detail_info_list(
     uid: str,
 ) -> Union[Generator[RoleDetailData, Any, None], None]:
+    """rawData 全部角色; 结果来自 panel_cache 共享对象, 修改前需 deepcopy。"""
     path = PLAYER_PATH / uid / "rawData.json"
-    player_data = await read_player_json(path)
-    if not player_data:
+    roles = await panel_cache.get_or_load(path, _parse_role_list)
+    if not roles:
         return None
 
-    return iter(RoleDetailData(**r) for r in player_data)
+    return iter(roles)
 
 
 async def get_all_role_detail_info(uid: str) -> Union[Dict[str, RoleDetailData], None]:
@@ -62,16 +90,10 @@ async def get_char_detail_for_id(uid: str, char_id: str) -> Optional[RoleDetailD
 
 async def get_rover_detail_map(uid: str) -> Dict[str, RoleDetailData]:
     """读 rover.json → {canonical_id: RoleDetailData}。"""
-    data = await read_player_json(PLAYER_PATH / uid / "rover.json")
+    data = await panel_cache.get_or_load(PLAYER_PATH / uid / "rover.json", _parse_rover_map)
     if not data:
         return {}
-    out: Dict[str, RoleDetailData] = {}
-    for k, v in data.items():
-        try:
-            out[str(k)] = RoleDetailData(**v)
-        except Exception:
-            continue
-    return out
+    return dict(data)
 
 
 def lookup_chain(role_detail_info_map, role_id) -> tuple[int, str]:
@@ -1,7 +1,7 @@
-from typing import Any, Dict, List, Type, TypeVar, Optional
+from typing import Any, Dict, List, Type, Tuple, TypeVar, Optional
 
 from sqlmodel import Field, col, select
-from sqlalchemy import null, delete, update
+from sqlalchemy import null, delete, update, bindparam
 from sqlalchemy.sql import or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -505,6 +505,35 @@ class WavesUser(User, table=True):
         result = await session.execute(sql)
         return result.rowcount
 
+    @classmethod
+    @with_session
+    async def bulk_update_avatar_url(
+        cls: Type[T_WavesUser],
+        session: AsyncSession,
+        avatars: Dict[Tuple[str, str], str],
+    ) -> int:
+        """批量更新头像, avatars 为 {(user_id, bot_id): avatar_url}; 一条语句 executemany, 空值跳过"""
+        params = [
+            {"_user_id": user_id, "_bot_id": bot_id, "_avatar_url": url}
+            for (user_id, bot_id), url in avatars.items()
+            if url
+        ]
+        if not params:
+            return 0
+        table = cls.__table__
+        sql = (
+            update(table)
+            .where(
+                and_(
+                    table.c.user_id == bindparam("_user_id"),
+                    table.c.bot_id == bindparam("_bot_id"),
+                )
+            )
+            .values(avatar_url=bindparam("_avatar_url"))
+        )
+        await session.execute(sql, params)
+        return len(params)
+
     @classmethod
     @with_session
     async def get_active_user_count(
@@ -680,6 +709,22 @@ class WavesStaminaRecord(BaseModel, table=True):
         result = await session.execute(sql)
         return result.rowcount
 
+    @classmethod
+    @with_session
+    async def get_push_subscribers(
+        cls: Type[T_WavesStaminaRecord],
+        session: AsyncSession,
+    ) -> List[T_WavesStaminaRecord]:
+        """开启体力推送且 CK 未判定失效的记录"""
+        sql = select(cls).where(
+            and_(
+                cls.stamina_push_switch != "off",
+                or_(col(cls.is_ck_valid).is_(None), col(cls.is_ck_valid).is_(True)),
+            )
+        )
+        result = await session.execute(sql)
+        return list(result.scalars().all())
+
 
 T_WavesLangSettings = TypeVar("T_WavesLangSettings", bound="WavesLangSettings")
 
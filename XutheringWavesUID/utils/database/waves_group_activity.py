@@ -1,12 +1,15 @@
 from contextvars import ContextVar
-from typing import Any, Dict, Optional, Set, Type, TypeVar
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type, TypeVar
 
-from sqlmodel import Field, select
+from sqlmodel import Field, col, select
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import and_
 
 from gsuid_core.utils.database.base_models import BaseBotIDModel, with_session
 
+from .waves_user_activity import _chunks
+
 # 公告推送期间置位, 群活跃 hook 据此跳过推送自身
 ANN_PUSH_GUARD: ContextVar[bool] = ContextVar("waves_ann_push_guard", default=False)
 
@@ -61,6 +64,41 @@ class WavesGroupActivity(BaseBotIDModel, table=True):
 
         return True
 
+    @classmethod
+    @with_session
+    async def bulk_update_group_activity(
+        cls: Type[T_WavesGroupActivity],
+        session: AsyncSession,
+        entries: Iterable[Tuple[str, str, str]],
+    ) -> int:
+        """批量更新群活跃时间: 已有记录一条 UPDATE 刷新, 其余批量插入。entries 为 (group_id, bot_id, bot_self_id)"""
+        import time
+
+        keys = {k for k in entries if k[0]}
+        if not keys:
+            return 0
+        current_time = int(time.time())
+
+        existing: Dict[Tuple[str, str, str], List[int]] = {}
+        for chunk in _chunks(sorted({k[0] for k in keys})):
+            result = await session.execute(
+                select(cls.id, cls.group_id, cls.bot_id, cls.bot_self_id).where(col(cls.group_id).in_(chunk))
+            )
+            for row_id, group_id, bot_id, bot_self_id in result.all():
+                existing.setdefault((group_id, bot_id, bot_self_id), []).append(row_id)
+
+        touch_ids = [i for k in keys for i in existing.get(k, ())]
+        for chunk in _chunks(touch_ids):
+            await session.execute(update(cls).where(col(cls.id).in_(chunk)).values(last_active_time=current_time))
+        new_records = [
+            cls(group_id=g, bot_id=b, bot_self_id=s, last_active_time=current_time)
+            for g, b, s in keys
+            if (g, b, s) not in existing
+        ]
+        if new_records:
+            session.add_all(new_records)
+        return len(keys)
+
     @classmethod
     @with_session
     async def get_active_group_ids(
@@ -1,6 +1,6 @@
-from typing import Any, Dict, Optional, Set, Type, TypeVar
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type, TypeVar
 
-from sqlmodel import Field, select
+from sqlmodel import Field, col, select
 from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import and_, or_
@@ -9,6 +9,14 @@ from gsuid_core.utils.database.base_models import BaseBotIDModel, with_session
 
 T_WavesUserActivity = TypeVar("T_WavesUserActivity", bound="WavesUserActivity")
 
+# IN 列表分批, 避开 SQLite 变量个数上限
+_IN_CHUNK = 500
+
+
+def _chunks(items: List, size: int = _IN_CHUNK):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
 
 class WavesUserActivity(BaseBotIDModel, table=True):
     """用户活跃度记录表
@@ -91,6 +99,77 @@ class WavesUserActivity(BaseBotIDModel, table=True):
 
         return True
 
+    @classmethod
+    @with_session
+    async def bulk_update_user_activity(
+        cls: Type[T_WavesUserActivity],
+        session: AsyncSession,
+        entries: Iterable[Tuple[str, str, str]],
+    ) -> int:
+        """批量更新用户活跃时间, 语义同 update_user_activity
+
+        一次按 user_id 批量查出已有记录, 已存在的用一条 UPDATE ... WHERE id IN 刷新时间,
+        旧格式记录逐条迁移 (仅首次), 其余批量插入。
+
+        Args:
+            entries: (user_id, bot_id, bot_self_id) 列表
+
+        Returns:
+            int: 处理的条目数
+        """
+        import time
+
+        keys = {k for k in entries if k[0]}
+        if not keys:
+            return 0
+        current_time = int(time.time())
+
+        rows = []
+        for chunk in _chunks(sorted({k[0] for k in keys})):
+            result = await session.execute(
+                select(cls.id, cls.user_id, cls.bot_id, cls.bot_self_id).where(col(cls.user_id).in_(chunk))
+            )
+            rows.extend(result.all())
+
+        exact: Dict[Tuple[str, str, str], List[int]] = {}
+        # 兼容旧数据：bot_id 里存的是 bot_self_id，且 bot_self_id 为空
+        legacy: Dict[Tuple[str, str], int] = {}
+        for row_id, user_id, bot_id, bot_self_id in rows:
+            if bot_self_id is not None:
+                exact.setdefault((user_id, bot_id, bot_self_id), []).append(row_id)
+            if not bot_self_id:
+                legacy.setdefault((user_id, bot_id), row_id)
+
+        touch_ids: List[int] = []
+        new_records = []
+        for user_id, bot_id, bot_self_id in keys:
+            ids = exact.get((user_id, bot_id, bot_self_id))
+            if ids:
+                touch_ids.extend(ids)
+                continue
+            legacy_id = legacy.pop((user_id, bot_self_id), None)
+            if legacy_id is not None:
+                await session.execute(
+                    update(cls)
+                    .where(col(cls.id) == legacy_id)
+                    .values(bot_id=bot_id, bot_self_id=bot_self_id, last_active_time=current_time)
+                )
+                continue
+            new_records.append(
+                cls(
+                    user_id=user_id,
+                    bot_id=bot_id,
+                    bot_self_id=bot_self_id,
+                    last_active_time=current_time,
+                )
+            )
+
+        for chunk in _chunks(touch_ids):
+            await session.execute(update(cls).where(col(cls.id).in_(chunk)).values(last_active_time=current_time))
+        if new_records:
+            session.add_all(new_records)
+        return len(keys)
+
     @classmethod
     @with_session
     async def get_user_last_active_time(
@@ -133,6 +212,62 @@ class WavesUserActivity(BaseBotIDModel, table=True):
         legacy = legacy_result.scalars().first()
         return legacy.last_active_time if legacy else None
 
+    @classmethod
+    @with_session
+    async def get_last_active_times(
+        cls: Type[T_WavesUserActivity],
+        session: AsyncSession,
+        pairs: Iterable[Tuple[str, str, str]],
+    ) -> Dict[Tuple[str, str, str], Optional[int]]:
+        """批量获取最后活跃时间, 语义同 get_user_last_active_time
+
+        按 user_id 分批 IN 查询, 同一 (user_id, bot_id, bot_self_id) 先取新格式记录, 无则取旧格式记录。
+
+        Args:
+            pairs: (user_id, bot_id, bot_self_id) 列表
+
+        Returns:
+            Dict: 每个 pair 的最后活跃时间, 无记录为 None
+        """
+        keys = {k for k in pairs if k[0]}
+        if not keys:
+            return {}
+
+        def _latest(a: Optional[int], b: Optional[int]) -> Optional[int]:
+            return b if a is None else a if b is None else max(a, b)
+
+        exact: Dict[Tuple[str, str, str], Optional[int]] = {}
+        # 兼容旧数据：bot_id 里存的是 bot_self_id，且 bot_self_id 为空
+        legacy: Dict[Tuple[str, str], Optional[int]] = {}
+        for chunk in _chunks(sorted({k[0] for k in keys})):
+            result = await session.execute(
+                select(cls.user_id, cls.bot_id, cls.bot_self_id, cls.last_active_time).where(
+                    col(cls.user_id).in_(chunk)
+                )
+            )
+            for user_id, bot_id, bot_self_id, last_active_time in result.all():
+                if bot_self_id is not None:
+                    key = (user_id, bot_id, bot_self_id)
+                    exact[key] = _latest(exact.get(key), last_active_time)
+                if not bot_self_id:
+                    key2 = (user_id, bot_id)
+                    legacy[key2] = _latest(legacy.get(key2), last_active_time)
+
+        return {k: exact[k] if k in exact else legacy.get((k[0], k[2])) for k in keys}
+
+    @classmethod
+    async def filter_active_pairs(
+        cls: Type[T_WavesUserActivity],
+        pairs: Iterable[Tuple[str, str, str]],
+        active_days: int,
+    ) -> Set[Tuple[str, str, str]]:
+        """返回 pairs 中 active_days 天内活跃的子集"""
+        import time
+
+        threshold_time = int(time.time()) - active_days * 24 * 60 * 60
+        times = await cls.get_last_active_times(pairs)
+        return {k for k, t in times.items() if t is not None and t >= threshold_time}
+
     @classmethod
     @with_session
     async def get_active_user_count(
@@ -59,12 +59,12 @@ async def get_waves_char_rank(uid, all_role_detail, need_expected_damage=False,
 
 
 def _compute_one_char_rank(role_detail, need_expected_damage=False, need_overall_score=False):
-    """单角色评分计算; role_detail 可为 dict 或 RoleDetailData。
+    """单角色评分计算; role_detail 可为 dict、RoleDetailData 或其 Struct 孪生。
 
     入参/返回值均可 pickle, 供 gsuid_core.pool.to_process 丢进程池并行调用。
     """
     from .calc import WuWaCalc
-    if not isinstance(role_detail, RoleDetailData):
+    if isinstance(role_detail, dict):
         role_detail = RoleDetailData(**role_detail)
 
     phantom_score = 0
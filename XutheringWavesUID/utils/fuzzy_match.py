@@ -1,13 +1,18 @@
 """基于拼音 + 字面相似度的"你可能想找"通用模糊匹配。
 
 pypinyin / rapidfuzz 都是可选依赖, 缺则降级。
+
+每张别名表首次查询时建一次 _FuzzyIndex: 每个名字预存小写串、拼音、排序拼音、拼音音节多重集,
+并建 gram 倒排 (小写单字 + 拼音二元组)。与 query 至少共享一个 gram 的名字精确打分;
+其余名字字面 ratio 必为 0, 拼音各路分数受拼音字母重合数所限, 只有上界够得到 min_score 的才补打分,
+所以结果与逐个打分一致。有 rapidfuzz 时两路 ratio 用 process.cdist 批量算; 近期查询结果另有 LRU。
 """
 
 from __future__ import annotations
 
 import difflib
-from collections import Counter
-from typing import Dict, List, Tuple, Iterable
+from collections import Counter, OrderedDict
+from typing import Dict, List, Tuple, Optional, Sequence
 
 from gsuid_core.logger import logger
 
@@ -25,21 +30,24 @@ def _import_pypinyin():
 
 def _import_rapidfuzz():
     try:
-        from rapidfuzz import fuzz  # type: ignore
-        return fuzz
+        from rapidfuzz import fuzz, process  # type: ignore
+        return fuzz, process
     except Exception:
         logger.warning("[鸣潮·模糊匹配] 未安装rapidfuzz，安装后模糊匹配更快, 且支持'近子串'容错加分。")
         logger.info("[鸣潮·模糊匹配] 安装方法 Linux/Mac: 在当前目录下执行 source .venv/bin/activate && uv pip install rapidfuzz")
         logger.info("[鸣潮·模糊匹配] 安装方法 Windows: 在当前目录下执行 .venv\\Scripts\\activate; uv pip install rapidfuzz")
-        return None
+        return None, None
 
 
 lazy_pinyin, Style = _import_pypinyin()
 _HAS_PYPINYIN = lazy_pinyin is not None
 
-_rf_fuzz = _import_rapidfuzz()
+_rf_fuzz, _rf_process = _import_rapidfuzz()
 _HAS_RAPIDFUZZ = _rf_fuzz is not None
 
+_INDEX_CACHE_SIZE = 8
+_QUERY_CACHE_SIZE = 256
+
 
 _pinyin_cache: Dict[str, str] = {}
 _pinyin_token_cache: Dict[str, str] = {}
@@ -92,18 +100,7 @@ def _reorder_ratio(query: str, name: str, query_py_sorted: str, name_py_sorted:
     return overlap / max(len(qt), len(nt))
 
 
-def _score_pair(query_norm: str, query_py: str, query_py_sorted: str, name: str) -> float:
-    """对比 query 和单个候选名，返回 [0,1] 分数。"""
-    n_lower = name.lower()
-    n_py = _to_pinyin(name)
-    n_py_sorted = "".join(sorted(n_py))
-
-    s = max(
-        _ratio(query_norm, n_lower),
-        _ratio(query_py, n_py),
-        _reorder_ratio(query_norm, name, query_py_sorted, n_py_sorted),
-    )
-
+def _substring_bonus(s: float, query_py: str, n_py: str) -> float:
     # 子串加分: 短拼音串 <3 字符时跳过, 避免短缩写产生大量噪声命中
     if query_py and n_py:
         short = min(len(query_py), len(n_py))
@@ -116,10 +113,175 @@ def _score_pair(query_norm: str, query_py: str, query_py_sorted: str, name: str)
                 pr = _rf_fuzz.partial_ratio(query_py, n_py) / 100.0
                 if pr >= 0.85:
                     s = max(s, pr * (0.6 + 0.4 * short / long_))
-
     return s
 
 
+def _score_pair(query_norm: str, query_py: str, query_py_sorted: str, name: str) -> float:
+    """对比 query 和单个候选名，返回 [0,1] 分数。"""
+    n_lower = name.lower()
+    n_py = _to_pinyin(name)
+    n_py_sorted = "".join(sorted(n_py))
+
+    s = max(
+        _ratio(query_norm, n_lower),
+        _ratio(query_py, n_py),
+        _reorder_ratio(query_norm, name, query_py_sorted, n_py_sorted),
+    )
+    return _substring_bonus(s, query_py, n_py)
+
+
+def _grams(lower: str, py: str) -> set:
+    grams = {f"c{ch}" for ch in lower}
+    if len(py) == 1:
+        grams.add(f"p{py}")
+    grams.update(f"p{py[i:i + 2]}" for i in range(len(py) - 1))
+    return grams
+
+
+class _FuzzyIndex:
+    """单张别名表的预计算索引; 表对象被替换 (重载别名) 后自动重建。"""
+
+    def __init__(self, candidates: Dict[str, List[str]]):
+        self.canonicals: List[str] = list(candidates)
+        # 名字按 (规范名顺序, 别名顺序) 展平, owner 为所属规范名下标
+        self.names: List[str] = []
+        self.owner: List[int] = []
+        for ci, (canonical, aliases) in enumerate(candidates.items()):
+            for name in (canonical, *aliases):
+                self.names.append(name)
+                self.owner.append(ci)
+        self.lower = [n.lower() for n in self.names]
+        self.py = [_to_pinyin(n) for n in self.names]
+        self.py_sorted = ["".join(sorted(p)) for p in self.py]
+        self.py_chars = [Counter(p) for p in self.py]
+        self.tokens = [Counter(_to_pinyin_tokens(n).split()) for n in self.names] if _HAS_PYPINYIN else []
+        self.postings: Dict[str, List[int]] = {}
+        for i, (lo, py) in enumerate(zip(self.lower, self.py)):
+            for g in _grams(lo, py):
+                self.postings.setdefault(g, []).append(i)
+        self.queries: "OrderedDict[Tuple[str, int, float], List[Tuple[str, float]]]" = OrderedDict()
+
+    def _candidates(self, q_lower: str, q_py: str) -> set:
+        hit: set = set()
+        for g in _grams(q_lower, q_py):
+            hit.update(self.postings.get(g, ()))
+        return hit
+
+    def _upper_bound(self, q_py: str, q_chars: Counter, q_reorder, i: int) -> float:
+        """不与 query 共享 gram 的名字的分数上界。
+
+        没有共同字 → 字面 ratio 为 0; 拼音 ratio / 排序拼音 ratio 的 LCS 不超过字母多重集重合数 ov;
+        没有共同拼音二元组 → 不可能是长度 >= 3 的子串, 只剩 partial_ratio 加分, 同样受 ov 所限。
+        """
+        n_len = len(self.py[i])
+        q_len = len(q_py)
+        if not q_len or not n_len:
+            return 0.0
+        ov = sum((q_chars & self.py_chars[i]).values())
+        bound = 2 * ov / (q_len + n_len)
+        if _HAS_PYPINYIN:
+            bound = max(bound, q_reorder(i))  # 单字母音节 (a/e/o) 可不共享 gram, 直接精确算
+        short, long_ = min(q_len, n_len), max(q_len, n_len)
+        if _HAS_RAPIDFUZZ and ov and short >= 3:
+            pr = 2 * ov / (short + ov)
+            if pr >= 0.85:
+                bound = max(bound, pr * (0.6 + 0.4 * short / long_))
+        return bound
+
+    def _batch_ratio(self, query: str, choices: Sequence[str]) -> List[float]:
+        if not query:
+            return [0.0] * len(choices)
+        if _HAS_RAPIDFUZZ and choices:
+            try:
+                row = _rf_process.cdist([query], choices, scorer=_rf_fuzz.ratio)[0]
+                # 与 _ratio 一致: 空串记 0
+                return [float(v) / 100.0 if c else 0.0 for v, c in zip(row, choices)]
+            except Exception:
+                pass
+        return [_ratio(query, c) for c in choices]
+
+    def _reorder(self, q_lower: str, q_py_sorted: str, q_tokens: Optional[Counter], i: int) -> float:
+        if not _HAS_PYPINYIN:
+            return _ratio(q_py_sorted, self.py_sorted[i])
+        nt = self.tokens[i]
+        if not q_tokens or not nt:
+            return 0.0
+        overlap = sum((q_tokens & nt).values())
+        return overlap / max(sum(q_tokens.values()), sum(nt.values()))
+
+    def scores(self, q_lower: str, q_py: str, min_score: float) -> Dict[int, float]:
+        """可能达到 min_score 的名字下标 → 分数 (与 _score_pair 相同)。"""
+        q_py_sorted = "".join(sorted(q_py))
+        q_tokens = Counter(_to_pinyin_tokens(q_lower).split()) if _HAS_PYPINYIN else None
+        hit = self._candidates(q_lower, q_py)
+        q_chars = Counter(q_py)
+
+        def q_reorder(i: int) -> float:
+            return self._reorder(q_lower, q_py_sorted, q_tokens, i)
+
+        idx = sorted(
+            hit.union(
+                i
+                for i in range(len(self.names))
+                if i not in hit and self._upper_bound(q_py, q_chars, q_reorder, i) >= min_score
+            )
+        )
+        if not idx:
+            return {}
+        r_lower = self._batch_ratio(q_lower, [self.lower[i] for i in idx])
+        r_py = self._batch_ratio(q_py, [self.py[i] for i in idx])
+        out = {}
+        for k, i in enumerate(idx):
+            s = max(r_lower[k], r_py[k], self._reorder(q_lower, q_py_sorted, q_tokens, i))
+            out[i] = _substring_bonus(s, q_py, self.py[i])
+        return out
+
+    def suggest(self, q: str, top_n: int, min_score: float) -> List[Tuple[str, float]]:
+        key = (q, top_n, min_score)
+        cached = self.queries.get(key)
+        if cached is not None:
+            self.queries.move_to_end(key)
+            return list(cached)
+
+        q_lower = q.lower()
+        per_name = self.scores(q_lower, _to_pinyin(q), min_score)
+        # 同一规范名按 (规范名, 别名...) 顺序取最高分, 到 0.99 即停 (与逐个打分时一致)
+        best: Dict[int, float] = {}
+        done: set = set()
+        for i in sorted(per_name):
+            ci = self.owner[i]
+            if ci in done:
+                continue
+            s = per_name[i]
+            if s > best.get(ci, 0.0):
+                best[ci] = s
+                if s >= 0.99:
+                    done.add(ci)
+        scores = {self.canonicals[ci]: s for ci, s in best.items() if s >= min_score}
+        result = sorted(scores.items(), key=lambda x: -x[1])[:top_n]
+
+        self.queries[key] = result
+        while len(self.queries) > _QUERY_CACHE_SIZE:
+            self.queries.popitem(last=False)
+        return list(result)
+
+
+# id(别名表) → (表对象, 条目数, 索引); 持有表引用, id 不会被复用
+_indexes: "OrderedDict[int, Tuple[Dict[str, List[str]], int, _FuzzyIndex]]" = OrderedDict()
+
+
+def get_fuzzy_index(candidates: Dict[str, List[str]]) -> _FuzzyIndex:
+    entry = _indexes.get(id(candidates))
+    if entry is not None and entry[0] is candidates and entry[1] == len(candidates):
+        _indexes.move_to_end(id(candidates))
+        return entry[2]
+    index = _FuzzyIndex(candidates)
+    _indexes[id(candidates)] = (candidates, len(candidates), index)
+    while len(_indexes) > _INDEX_CACHE_SIZE:
+        _indexes.popitem(last=False)
+    return index
+
+
 def fuzzy_suggest(
     query: str,
     candidates: Dict[str, List[str]],
@@ -141,29 +303,12 @@ def fuzzy_suggest(
     if not q or not candidates:
         return []
 
-    q_lower = q.lower()
-    q_py = _to_pinyin(q)
-    q_py_sorted = "".join(sorted(q_py))
-
-    scores: Dict[str, float] = {}
-    for canonical, aliases in candidates.items():
-        names: Iterable[str] = (canonical, *aliases)
-        best = 0.0
-        for name in names:
-            s = _score_pair(q_lower, q_py, q_py_sorted, name)
-            if s > best:
-                best = s
-                if best >= 0.99:
-                    break
-        if best >= min_score:
-            scores[canonical] = best
-
-    result = sorted(scores.items(), key=lambda x: -x[1])[:top_n]
+    result = get_fuzzy_index(candidates).suggest(q, top_n, min_score)
     if result:
         detail = ", ".join(f"{n}:{s:.3f}" for n, s in result)
-        logger.info(f"[鸣潮·fuzzy] {query!r} (py={q_py!r}) → {detail}")
+        logger.info(f"[鸣潮·fuzzy] {query!r} (py={_to_pinyin(q)!r}) → {detail}")
     else:
-        logger.info(f"[鸣潮·fuzzy] {query!r} (py={q_py!r}) → 无候选 (min_score={min_score})")
+        logger.info(f"[鸣潮·fuzzy] {query!r} (py={_to_pinyin(q)!r}) → 无候选 (min_score={min_score})")
     return result
 
 
@@ -0,0 +1,126 @@
+"""共享 httpx.AsyncClient 注册表。
+
+按 (scheme://host[:port], proxy, legacy_ssl) 复用同一个 client, 连接池保活, 排行/上传/出场率/外置渲染等
+对 wwapi 之类固定服务的请求不再每次新建 client 重走 TCP+TLS 握手。
+legacy_ssl=True 用放宽密码套件的 SSL 上下文 (QQ 图床等在 httpx>=0.28 默认套件下握手失败), 用于下载用户发来的图片。
+连接上限 HttpPoolMaxConnections / 保活上限 HttpPoolMaxKeepalive 在 client 创建时读取;
+装了 h2 时开启 HTTP/2。core 关闭时统一 aclose。
+
+用法:
+    client = get_client(GET_RANK_URL)
+    res = await client.post(GET_RANK_URL, json=..., timeout=httpx.Timeout(10))
+"""
+import ssl
+from typing import Any, Dict, Tuple, Optional
+from urllib.parse import urlsplit
+from collections import Counter
+
+import httpx
+
+from gsuid_core.logger import logger
+from gsuid_core.server import on_core_shutdown
+
+_DEFAULT_TIMEOUT = httpx.Timeout(10)
+
+_clients: Dict[Tuple[str, str, bool], httpx.AsyncClient] = {}
+_requests: Counter = Counter()
+_connections: Counter = Counter()
+
+
+def _has_h2() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _legacy_ssl_context() -> ssl.SSLContext:
+    ctx = ssl.create_default_context()
+    ctx.set_ciphers("DEFAULT")
+    return ctx
+
+
+def _limits() -> httpx.Limits:
+    from ..wutheringwaves_config import WutheringWavesConfig
+
+    max_conn = WutheringWavesConfig.get_config("HttpPoolMaxConnections").data or 64
+    keepalive = WutheringWavesConfig.get_config("HttpPoolMaxKeepalive").data or 16
+    return httpx.Limits(
+        max_connections=max_conn,
+        max_keepalive_connections=min(keepalive, max_conn),
+        keepalive_expiry=60,
+    )
+
+
+def _make_hooks(origin: str):
+    async def trace(event_name: str, info: Dict[str, Any]) -> None:
+        # 只有新建连接才会走 connect_tcp; 复用连接直接发请求
+        if event_name == "connection.connect_tcp.complete":
+            _connections[origin] += 1
+
+    async def on_request(request: httpx.Request) -> None:
+        _requests[origin] += 1
+        request.extensions["trace"] = trace
+
+    return {"request": [on_request]}
+
+
+def get_client(url: str, proxy: Optional[str] = None, legacy_ssl: bool = False) -> httpx.AsyncClient:
+    """取 url 所在源站的共享 client; 不要 async with / aclose 它 (被关掉时下次调用会重建)。"""
+    origin = _origin(url)
+    key = (origin, proxy or "", legacy_ssl)
+    client = _clients.get(key)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            proxy=proxy,
+            verify=_legacy_ssl_context() if legacy_ssl else True,
+            timeout=_DEFAULT_TIMEOUT,
+            limits=_limits(),
+            http2=_has_h2(),
+            event_hooks=_make_hooks(origin),
+        )
+        _clients[key] = client
+        logger.debug(f"[鸣潮·连接池] 新建 client: {origin} proxy={bool(proxy)}")
+    return client
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """各源站请求数 / 新建连接数 / 复用率。"""
+    per_origin = {}
+    for origin, n in _requests.items():
+        conns = _connections.get(origin, 0)
+        per_origin[origin] = {
+            "requests": n,
+            "connections": conns,
+            "reuse_rate": round(1 - conns / n, 3) if n else 0.0,
+        }
+    total = sum(_requests.values())
+    conns = sum(_connections.values())
+    return {
+        "clients": len(_clients),
+        "requests": total,
+        "connections": conns,
+        "reuse_rate": round(1 - conns / total, 3) if total else 0.0,
+        "origins": per_origin,
+    }
+
+
+async def close_all() -> None:
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.debug(f"[鸣潮·连接池] 关闭 client 失败: {e}")
+
+
+@on_core_shutdown
+async def _close_http_pool():
+    await close_all()
@@ -2,9 +2,11 @@ import os
 import random
 import base64
 import hashlib
+import threading
 from io import BytesIO
 from contextvars import ContextVar
-from typing import Tuple, Union, Literal, Optional
+from collections import OrderedDict
+from typing import Dict, Tuple, Union, Literal, Optional
 from pathlib import Path
 
 # 面板编辑器预览用: 强制本次渲染的立绘/背景图。
@@ -37,7 +39,7 @@ from .resource.RESOURCE_PATH import (
     CUSTOM_MR_BG_PATH,
     CUSTOM_MR_CARD_PATH,
 )
-from ..wutheringwaves_config.wutheringwaves_config import ShowConfig
+from ..wutheringwaves_config.wutheringwaves_config import ShowConfig, WutheringWavesConfig
 
 ICON = Path(__file__).parent.parent.parent / "ICON.png"
 TEXT_PATH = Path(__file__).parent / "texture2d"
@@ -530,6 +532,74 @@ async def get_role_pile_default(
     return Image.open(path).convert("RGBA"), path
 
 
+# 图标素材解码缓存: (路径, mtime, 目标尺寸, 模式) → 解码 (并缩放) 后的图, 按像素字节数 LRU 淘汰。
+# 排行卡逐行取同一批图标时每张只解码一次; 取出的都是 copy, 调用方随意 paste/resize 不影响缓存。
+_AssetKey = Tuple[str, int, Optional[Tuple[int, int]], str]
+_asset_cache: "OrderedDict[_AssetKey, Image.Image]" = OrderedDict()
+_asset_bytes = 0
+_asset_lock = threading.Lock()
+_asset_counters: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _asset_limit() -> int:
+    return (WutheringWavesConfig.get_config("ImageAssetCacheMB").data or 0) * 1024 * 1024
+
+
+def _image_bytes(img: Image.Image) -> int:
+    return img.width * img.height * len(img.getbands())
+
+
+def _asset_put(key: _AssetKey, img: Image.Image, limit: int) -> None:
+    global _asset_bytes
+    size = _image_bytes(img)
+    if size > limit:
+        return
+    with _asset_lock:
+        old = _asset_cache.pop(key, None)
+        if old is not None:
+            _asset_bytes -= _image_bytes(old)
+        _asset_cache[key] = img
+        _asset_bytes += size
+        while _asset_bytes > limit and _asset_cache:
+            _, evicted = _asset_cache.popitem(last=False)
+            _asset_bytes -= _image_bytes(evicted)
+            _asset_counters["evictions"] += 1
+
+
+def load_image_asset(
+    path: Union[str, Path],
+    size: Optional[Tuple[int, int]] = None,
+    mode: str = "RGBA",
+) -> Image.Image:
+    """读取静态素材图并转 mode, 可选缩放到 size (与 .resize(size) 结果一致), 走解码缓存。"""
+    path = str(path)
+    limit = _asset_limit()
+    if limit <= 0:
+        img = Image.open(path).convert(mode)
+        return img.resize(size) if size else img
+
+    key: _AssetKey = (path, os.stat(path).st_mtime_ns, tuple(size) if size else None, mode)
+    with _asset_lock:
+        img = _asset_cache.get(key)
+        if img is not None:
+            _asset_cache.move_to_end(key)
+            _asset_counters["hits"] += 1
+            return img.copy()
+        _asset_counters["misses"] += 1
+
+    if size:
+        img = load_image_asset(path, None, mode).resize(size)
+    else:
+        img = Image.open(path).convert(mode)
+    _asset_put(key, img, limit)
+    return img.copy()
+
+
+def asset_cache_stats() -> Dict[str, int]:
+    with _asset_lock:
+        return {**_asset_counters, "entries": len(_asset_cache), "bytes": _asset_bytes}
+
+
 def get_square_avatar_path(resource_id: Union[int, str]) -> Path:
     path = AVATAR_PATH / f"role_head_{resource_id}.png"
     if not path.exists():
@@ -537,8 +607,10 @@ def get_square_avatar_path(resource_id: Union[int, str]) -> Path:
     return path
 
 
-async def get_square_avatar(resource_id: Union[int, str]) -> Image.Image:
-    return Image.open(get_square_avatar_path(resource_id)).convert("RGBA")
+async def get_square_avatar(
+    resource_id: Union[int, str], size: Optional[Tuple[int, int]] = None
+) -> Image.Image:
+    return load_image_asset(get_square_avatar_path(resource_id), size)
 
 
 async def cropped_square_avatar(item_icon: Image.Image, size: int) -> Image.Image:
@@ -572,26 +644,30 @@ def get_square_weapon_path(resource_id: Union[int, str]) -> Path:
     return WEAPON_PATH / "weapon_21020012.png"
 
 
-async def get_square_weapon(resource_id: Union[int, str]) -> Image.Image:
-    return Image.open(get_square_weapon_path(resource_id)).convert("RGBA")
+async def get_square_weapon(
+    resource_id: Union[int, str], size: Optional[Tuple[int, int]] = None
+) -> Image.Image:
+    return load_image_asset(get_square_weapon_path(resource_id), size)
 
 
-async def get_attribute(name: str = "", is_simple: bool = False) -> Image.Image:
+async def get_attribute(
+    name: str = "", is_simple: bool = False, size: Optional[Tuple[int, int]] = None
+) -> Image.Image:
     if is_simple:
         name = f"attribute/attr_simple_{name}.png"
     else:
         name = f"attribute/attr_{name}.png"
     path = TEXT_PATH / name
     if not path.exists():
-        return Image.new("RGBA", (100, 100), (0, 0, 0, 0))
-    return Image.open(path).convert("RGBA")
+        return Image.new("RGBA", size or (100, 100), (0, 0, 0, 0))
+    return load_image_asset(path, size)
 
 
-async def get_attribute_prop(name: str = "") -> Image.Image:
+async def get_attribute_prop(name: str = "", size: Optional[Tuple[int, int]] = None) -> Image.Image:
     if (TEXT_PATH / "attribute_prop" / f"attr_prop_{name}.png").exists():
-        return Image.open(TEXT_PATH / "attribute_prop" / f"attr_prop_{name}.png").convert("RGBA")
+        return load_image_asset(TEXT_PATH / "attribute_prop" / f"attr_prop_{name}.png", size)
     else:
-        return Image.open(TEXT_PATH / "attribute_prop" / "attr_prop_攻击.png").convert("RGBA")
+        return load_image_asset(TEXT_PATH / "attribute_prop" / "attr_prop_攻击.png", size)
 
 async def get_attribute_skill(name: str = "", locale: Optional[str] = None) -> Image.Image:
     if not name:
@@ -675,11 +751,11 @@ def get_skill_branch_emblem_b64(
     return pil_to_b64(emblem) if emblem else ""
 
 
-async def get_attribute_effect(name: str = "") -> Image.Image:
+async def get_attribute_effect(name: str = "", size: Optional[Tuple[int, int]] = None) -> Image.Image:
     if (TEXT_PATH / "attribute_effect" / f"attr_{name}.png").exists():
-        return Image.open(TEXT_PATH / "attribute_effect" / f"attr_{name}.png").convert("RGBA")
+        return load_image_asset(TEXT_PATH / "attribute_effect" / f"attr_{name}.png", size)
     else:
-        return Image.open(TEXT_PATH / "attribute_effect" / "attr.png").convert("RGBA")
+        return load_image_asset(TEXT_PATH / "attribute_effect" / "attr.png", size)
 
 
 def get_sonata_label(sonata_name: str) -> str:
@@ -691,22 +767,21 @@ async def get_sonata_effect_image(sonata_name: str, size: int = 50) -> Image.Ima
     """取合鸣图标; 组合套装名(含 '|')时把 '|' 后各套装图标对角错位叠成一张。"""
     parts = sonata_name.split("|")
     names = parts[1:] if len(parts) > 1 else parts[:1]
-    icons = [await get_attribute_effect(n) for n in names]
-    if len(icons) <= 1:
-        return icons[0].resize((size, size))
+    if len(names) <= 1:
+        return await get_attribute_effect(names[0], (size, size))
     canvas = Image.new("RGBA", (size, size), (0, 0, 0, 0))
     sub = int(size * 0.66)
-    step = (size - sub) // (len(icons) - 1)
-    for i, icon in enumerate(icons):
-        canvas.alpha_composite(icon.resize((sub, sub)), (step * i, step * i))
+    step = (size - sub) // (len(names) - 1)
+    for i, n in enumerate(names):
+        canvas.alpha_composite(await get_attribute_effect(n, (sub, sub)), (step * i, step * i))
     return canvas
 
 
-async def get_weapon_type(name: str = "") -> Image.Image:  # 出新武器改这里
+async def get_weapon_type(name: str = "", size: Optional[Tuple[int, int]] = None) -> Image.Image:  # 出新武器改这里
     path = TEXT_PATH / f"weapon_type/weapon_type_{name}.png"
     if not path.exists():
-        return Image.new("RGBA", (100, 100), (0, 0, 0, 0))
-    return Image.open(path).convert("RGBA")
+        return Image.new("RGBA", size or (100, 100), (0, 0, 0, 0))
+    return load_image_asset(path, size)
 
 
 def get_waves_bg(w: int = 0, h: int = 0, bg: str = "bg", crop: bool = True) -> Image.Image:
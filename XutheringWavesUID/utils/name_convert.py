@@ -1,5 +1,7 @@
 import json
-from typing import Dict, List, Optional
+import time
+from bisect import bisect_right
+from typing import Dict, List, Tuple, Optional, Sequence
 
 from msgspec import json as msgjson
 
@@ -37,6 +39,108 @@ _echo_i18n_reverse: Dict[str, str] = {}
 
 _data_loaded = False
 
+# 自定义别名文件 mtime, 外部改动后下次调用时重载; 检查节流
+_CUSTOM_ALIAS_PATHS = (
+    CUSTOM_CHAR_ALIAS_PATH,
+    CUSTOM_SONATA_ALIAS_PATH,
+    CUSTOM_WEAPON_ALIAS_PATH,
+    CUSTOM_ECHO_ALIAS_PATH,
+)
+_ALIAS_CHECK_INTERVAL = 5.0
+_alias_mtimes: Tuple[int, ...] = ()
+_alias_checked_at = 0.0
+
+
+class _SubstringIndex:
+    """按组顺序 "第一个有成员包含 query 的组"。
+
+    所有成员以 NUL 分隔拼成一串, str.find 给出的首个命中位置即最靠前的组 (C 层扫描, 不逐个 in)。
+    """
+
+    _SEP = "\x00"
+
+    def __init__(self, groups: Sequence[Sequence[str]]):
+        parts: List[str] = []
+        ends: List[int] = []
+        pos = 0
+        for members in groups:
+            for m in members:
+                parts.append(m)
+                parts.append(self._SEP)
+                pos += len(m) + 1
+            ends.append(pos)
+        self._text = "".join(parts)
+        self._ends = ends
+
+    def first(self, query: str) -> Optional[int]:
+        if not self._ends:
+            return None
+        if not query:
+            return 0
+        if self._SEP in query:
+            return None
+        pos = self._text.find(query)
+        if pos < 0:
+            return None
+        return bisect_right(self._ends, pos)
+
+
+class _AliasIndex:
+    """别名解析索引, 由 load_alias_data 整体重建后一次性替换, 查找语义与原线性扫描一致。"""
+
+    def __init__(self):
+        # 角色: 先 名称/别名 精确, 再 名称 子串
+        self.char_keys: List[str] = list(char_alias_data)
+        self.char_exact: Dict[str, str] = {}
+        for key, aliases in char_alias_data.items():
+            self.char_exact.setdefault(key, key)
+            for alias in aliases:
+                self.char_exact.setdefault(alias, key)
+        self.char_names = frozenset(self.char_exact)
+        self.char_sub = _SubstringIndex([[k] for k in self.char_keys])
+
+        # 武器: 名称子串 或 别名精确, 取靠前的
+        self.weapon_keys: List[str] = list(weapon_alias_data)
+        self.weapon_alias_order: Dict[str, int] = {}
+        for order, aliases in enumerate(weapon_alias_data.values()):
+            for alias in aliases:
+                self.weapon_alias_order.setdefault(alias, order)
+        self.weapon_sub = _SubstringIndex([[k] for k in self.weapon_keys])
+
+        # 声骸: 名称 或 任一非空别名 的子串
+        self.echo_keys: List[str] = list(echo_alias_data)
+        self.echo_sub = _SubstringIndex([[k, *(a for a in v if a)] for k, v in echo_alias_data.items()])
+
+        # 合鸣: 去掉末尾 "套" 后的名称/别名子串
+        self.sonata_keys: List[str] = list(sonata_alias_data)
+        self.sonata_sub = _SubstringIndex(
+            [[k.rstrip("套"), *(a.rstrip("套") for a in v)] for k, v in sonata_alias_data.items()]
+        )
+
+    def char(self, name: str) -> Optional[str]:
+        key = self.char_exact.get(name)
+        if key is not None:
+            return key
+        order = self.char_sub.first(name)
+        return None if order is None else self.char_keys[order]
+
+    def weapon(self, name: str) -> Optional[str]:
+        orders = [o for o in (self.weapon_sub.first(name), self.weapon_alias_order.get(name)) if o is not None]
+        return self.weapon_keys[min(orders)] if orders else None
+
+    def echo(self, name: str) -> Optional[str]:
+        order = self.echo_sub.first(name)
+        return None if order is None else self.echo_keys[order]
+
+    def sonata(self, name: str) -> Optional[str]:
+        order = self.sonata_sub.first(name.rstrip("套"))
+        return None if order is None else self.sonata_keys[order]
+
+
+_alias_index = _AliasIndex()
+# id2name 反查 (同名取 id2name 中靠前的 id)
+_name2id: Dict[str, str] = {}
+
 
 def _normalize(name: str) -> str:
     """归一化名称: 小写并去除空格"""
@@ -146,6 +250,37 @@ def load_alias_data():
     with open(CUSTOM_ECHO_ALIAS_PATH, "w", encoding="UTF-8") as f:
         f.write(json.dumps(echo_alias_data, indent=2, ensure_ascii=False))
 
+    _rebuild_alias_index()
+
+
+def _custom_alias_mtimes() -> Tuple[int, ...]:
+    out = []
+    for path in _CUSTOM_ALIAS_PATHS:
+        try:
+            out.append(path.stat().st_mtime_ns)
+        except OSError:
+            out.append(0)
+    return tuple(out)
+
+
+def _rebuild_alias_index():
+    global _alias_index, _alias_mtimes, _alias_checked_at
+    _alias_index = _AliasIndex()
+    _alias_mtimes = _custom_alias_mtimes()
+    _alias_checked_at = time.monotonic()
+
+
+def _check_custom_alias_changed():
+    """自定义别名文件被外部改动时重载别名并重建索引 (每 _ALIAS_CHECK_INTERVAL 秒最多 stat 一次)。"""
+    global _alias_checked_at
+    now = time.monotonic()
+    if now - _alias_checked_at < _ALIAS_CHECK_INTERVAL:
+        return
+    _alias_checked_at = now
+    if _custom_alias_mtimes() != _alias_mtimes:
+        logger.info("[鸣潮·别名] 检测到自定义别名文件变动, 重新加载")
+        load_alias_data()
+
 
 def ensure_data_loaded(force: bool = False):
     """确保所有数据已加载
@@ -153,10 +288,11 @@ def ensure_data_loaded(force: bool = False):
     Args:
         force: 如果为 True，强制重新加载所有数据，即使已经加载过
     """
-    global _data_loaded, char_id_data, id2name
+    global _data_loaded, char_id_data, id2name, _name2id
     global _char_i18n_reverse, _weapon_i18n_reverse, _echo_i18n_reverse
 
     if _data_loaded and not force:
+        _check_custom_alias_changed()
         return
 
     load_alias_data()
@@ -228,6 +364,11 @@ def ensure_data_loaded(force: bool = False):
     with open(CUSTOM_ID2NAME_PATH, "w", encoding="UTF-8") as f:
         f.write(json.dumps(id2name, indent=2, ensure_ascii=False))
 
+    name2id: Dict[str, str] = {}
+    for _id, _name in id2name.items():
+        name2id.setdefault(_name, _id)
+    _name2id = name2id
+
     _data_loaded = True
 
 
@@ -237,19 +378,13 @@ def alias_to_char_name(char_name: str) -> str:
     chs = _i18n_to_chs(char_name, _char_i18n_reverse)
     if chs:
         char_name = chs
-    for key, aliases in char_alias_data.items():
-        if char_name == key or char_name in aliases:
-            return key
-    for i in char_alias_data:
-        if (char_name in i) or (char_name in char_alias_data[i]):
-            return i
-    return char_name
+    key = _alias_index.char(char_name)
+    return char_name if key is None else key
 
 
 def is_valid_char_name(char_name: str) -> bool:
     ensure_data_loaded()
-    all_names = set(char_alias_data.keys()) | {alias for aliases in char_alias_data.values() for alias in aliases}
-    return char_name in sorted(all_names, key=len, reverse=True)
+    return char_name in _alias_index.char_names
 
 
 def alias_to_char_name_optional(char_name: Optional[str]) -> Optional[str]:
@@ -260,13 +395,7 @@ def alias_to_char_name_optional(char_name: Optional[str]) -> Optional[str]:
     chs = _i18n_to_chs(char_name, _char_i18n_reverse)
     if chs:
         char_name = chs
-    for key, aliases in char_alias_data.items():
-        if char_name == key or char_name in aliases:
-            return key
-    for i in char_alias_data:
-        if (char_name in i) or (char_name in char_alias_data[i]):
-            return i
-    return None
+    return _alias_index.char(char_name)
 
 
 def alias_to_char_name_list(char_name: str) -> List[str]:
@@ -275,13 +404,8 @@ def alias_to_char_name_list(char_name: str) -> List[str]:
     chs = _i18n_to_chs(char_name, _char_i18n_reverse)
     if chs:
         char_name = chs
-    for key, aliases in char_alias_data.items():
-        if char_name == key or char_name in aliases:
-            return aliases
-    for i in char_alias_data:
-        if (char_name in i) or (char_name in char_alias_data[i]):
-            return char_alias_data[i]
-    return []
+    key = _alias_index.char(char_name)
+    return [] if key is None else char_alias_data.get(key, [])
 
 
 def char_id_to_char_name(char_id: str) -> Optional[str]:
@@ -296,13 +420,11 @@ def char_id_to_char_name(char_id: str) -> Optional[str]:
 def char_name_to_char_id(char_name: str) -> Optional[str]:
     ensure_data_loaded()
     char_name = alias_to_char_name(char_name)
-    for id, name in id2name.items():
-        if char_name == name:
-            from .resource.constant import SPECIAL_CHAR_RANK_MAP
-            mapped_id = SPECIAL_CHAR_RANK_MAP.get(id, id)
-            return mapped_id
-    else:
+    id = _name2id.get(char_name)
+    if id is None:
         return None
+    from .resource.constant import SPECIAL_CHAR_RANK_MAP
+    return SPECIAL_CHAR_RANK_MAP.get(id, id)
 
 
 def alias_to_weapon_name(weapon_name: str) -> str:
@@ -311,48 +433,31 @@ def alias_to_weapon_name(weapon_name: str) -> str:
     chs = _i18n_to_chs(weapon_name, _weapon_i18n_reverse)
     if chs:
         weapon_name = chs
-    for i in weapon_alias_data:
-        if (weapon_name in i) or (weapon_name in weapon_alias_data[i]):
-            return i
+    key = _alias_index.weapon(weapon_name)
+    if key is not None:
+        return key
 
     if "专武" in weapon_name:
         char_name = weapon_name.replace("专武", "")
         name = alias_to_char_name(char_name)
         weapon_name = f"{name}专武"
 
-    for i in weapon_alias_data:
-        if (weapon_name in i) or (weapon_name in weapon_alias_data[i]):
-            return i
-
-    return weapon_name
+    key = _alias_index.weapon(weapon_name)
+    return weapon_name if key is None else key
 
 
 def weapon_name_to_weapon_id(weapon_name: str) -> Optional[str]:
     ensure_data_loaded()
     weapon_name = alias_to_weapon_name(weapon_name)
-    for id, name in id2name.items():
-        if weapon_name == name:
-            return id
-    else:
-        return None
+    return _name2id.get(weapon_name)
 
 
 def alias_to_sonata_name(sonata_name: str | None) -> str | None:
     ensure_data_loaded()
     if sonata_name is None:
         return None
-    # Remove "套" character to make it optional
-    normalized_sonata_name = sonata_name.rstrip('套')
-    for i in sonata_alias_data:
-        # Check if normalized input matches the key (with "套" stripped)
-        normalized_key = i.rstrip('套')
-        if normalized_sonata_name in normalized_key:
-            return i
-        # Check if normalized input matches any alias (with "套" stripped)
-        for alias in sonata_alias_data[i]:
-            if normalized_sonata_name in alias.rstrip('套'):
-                return i
-    return None
+    # 末尾 "套" 可省略, 名称与别名均按去 "套" 后做子串匹配
+    return _alias_index.sonata(sonata_name)
 
 
 def alias_to_echo_name(echo_name: str) -> str:
@@ -361,27 +466,14 @@ def alias_to_echo_name(echo_name: str) -> str:
     chs = _i18n_to_chs(echo_name, _echo_i18n_reverse)
     if chs:
         echo_name = chs
-    for i, j in echo_alias_data.items():
-        if echo_name == i:
-            return i
-        if echo_name in j:
-            return i
-        for k in j:
-            if k and echo_name in k:
-                return i
-        if echo_name in i:
-            return i
-    return echo_name
+    key = _alias_index.echo(echo_name)
+    return echo_name if key is None else key
 
 
 def echo_name_to_echo_id(echo_name: str) -> Optional[str]:
     ensure_data_loaded()
     echo_name = alias_to_echo_name(echo_name)
-    for id, name in id2name.items():
-        if echo_name == name:
-            return id
-    else:
-        return None
+    return _name2id.get(echo_name)
 
 
 def easy_id_to_name(id: str, default: str = "") -> str:
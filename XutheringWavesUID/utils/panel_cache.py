@@ -0,0 +1,108 @@
+"""rawData.json / rover.json 解析结果的进程内缓存。
+
+按落盘路径缓存已校验的 RoleDetailData, 以文件指纹 (mtime/size/本进程写入代数) 判定失效;
+占用按解压后 JSON 字节数估算, 超过 PanelCacheSizeMB 按 LRU 淘汰。
+
+缓存对象被多处共享: 需要就地修改面板 (换声骸/换武器等) 的调用方必须先 copy.deepcopy。
+"""
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Tuple, Callable, Optional
+
+from gsuid_core.logger import logger
+
+from .player_store import PathLike, player_json_stamp, read_player_json_sized_sync
+
+_Stamp = Tuple[str, int, int, int]
+
+
+def _max_bytes() -> int:
+    from ..wutheringwaves_config import WutheringWavesConfig
+
+    mb = WutheringWavesConfig.get_config("PanelCacheSizeMB").data
+    return max(int(mb or 0), 0) * 1024 * 1024
+
+
+class ParsedPanelCache:
+    """路径 → (指纹, 解析结果, 估算字节数) 的 LRU。"""
+
+    def __init__(self, max_bytes: Callable[[], int] = _max_bytes):
+        self._data: "OrderedDict[str, Tuple[_Stamp, Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _pop(self, key: str) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[2]
+
+    def invalidate(self, path: PathLike) -> None:
+        with self._lock:
+            self._pop(str(path))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.total_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._data),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def get_or_load_sync(self, path: PathLike, parse: Callable[[Any], Any]) -> Any:
+        """命中且指纹一致直接返回; 否则读盘 + parse 后入缓存。文件缺失/为空返回 None。"""
+        key = str(path)
+        stamp = player_json_stamp(path)
+        if stamp is None:
+            self.invalidate(key)
+            return None
+
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        raw, nbytes = read_player_json_sized_sync(path)
+        if not raw:
+            self.invalidate(key)
+            return None
+        value = parse(raw)
+
+        limit = self._max_bytes()
+        with self._lock:
+            self._pop(key)
+            if nbytes > limit:
+                return value
+            self._data[key] = (stamp, value, nbytes)
+            self.total_bytes += nbytes
+            evicted = 0
+            while self.total_bytes > limit and self._data:
+                _, (_, _, size) = self._data.popitem(last=False)
+                self.total_bytes -= size
+                evicted += 1
+            self.evictions += evicted
+        if evicted:
+            logger.debug(
+                f"[鸣潮·面板缓存] 淘汰 {evicted} 条, entries={len(self._data)} "
+                f"~{self.total_bytes / 1024 / 1024:.1f}MB"
+            )
+        return value
+
+    async def get_or_load(self, path: PathLike, parse: Callable[[Any], Any]) -> Optional[Any]:
+        return await asyncio.to_thread(self.get_or_load_sync, path, parse)
+
+
+panel_cache = ParsedPanelCache()
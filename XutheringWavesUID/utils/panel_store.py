@@ -0,0 +1,172 @@
+"""多 worker 共享的面板 blob 存储 (sqlite, 可选, PanelSharedStore 开启)。
+
+rawData.json / rover.json 写盘时顺带写入 MAIN_PATH/panel_store.db:
+key = 逻辑路径 (不带 .gz), 行内带落盘文件的 (mtime_ns, size) 与解压后 JSON 字节数,
+数据用 msgspec/msgpack 编码 (都没装则 JSON), 比 gzip+json 解码快得多。
+
+- 读: 行内指纹与当前文件一致才用 blob, 否则回退读文件并回填; 文件始终是权威源,
+  外部改写文件、编码器不一致等情况都只会多读一次盘。
+- 版本: 每次 write_player_json 落盘后本路径 version +1 (同一事务内写 blob),
+  player_json_stamp 带上它, 其它 worker 的进程内解析缓存随之失效 (不依赖 mtime 粒度)。
+- 库开 mmap, 各 worker 读热数据走共享的页缓存。
+"""
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Tuple, Callable, Optional
+
+from gsuid_core.logger import logger
+
+from .resource.RESOURCE_PATH import MAIN_PATH
+
+STORE_PATH = MAIN_PATH / "panel_store.db"
+STORE_NAMES = {"rawData.json", "rover.json"}
+_MMAP_SIZE = 256 * 1024 * 1024
+
+_local = threading.local()
+_ready_lock = threading.Lock()
+_db_ready = False
+_failed = False
+
+_Codec = Tuple[str, Callable[[Any], bytes], Callable[[bytes], Any]]
+
+
+def _pick_codec() -> _Codec:
+    try:
+        import msgspec  # type: ignore
+
+        return "msgspec", msgspec.msgpack.encode, msgspec.msgpack.decode
+    except ImportError:
+        pass
+    try:
+        import msgpack  # type: ignore
+
+        return (
+            "msgpack",
+            lambda o: msgpack.packb(o, use_bin_type=True),
+            lambda b: msgpack.unpackb(b, raw=False, strict_map_key=False),
+        )
+    except ImportError:
+        pass
+    return (
+        "json",
+        lambda o: json.dumps(o, ensure_ascii=False).encode("utf-8"),
+        json.loads,
+    )
+
+
+_CODEC = _pick_codec()
+# msgspec 与 msgpack 产出同一格式, 可互读
+_COMPATIBLE = {"msgspec": {"msgspec", "msgpack"}, "msgpack": {"msgspec", "msgpack"}, "json": {"json"}}
+
+
+def is_enabled() -> bool:
+    if _failed:
+        return False
+    from ..wutheringwaves_config import WutheringWavesConfig
+
+    return bool(WutheringWavesConfig.get_config("PanelSharedStore").data)
+
+
+def handles(path) -> bool:
+    return Path(path).name in STORE_NAMES and is_enabled()
+
+
+def _conn() -> sqlite3.Connection:
+    global _db_ready
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        return conn
+    try:
+        with _ready_lock:
+            if not _db_ready:
+                STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
+                init = sqlite3.connect(str(STORE_PATH), timeout=5.0)
+                try:
+                    with init:
+                        init.execute("PRAGMA journal_mode=WAL")
+                        init.execute(
+                            "CREATE TABLE IF NOT EXISTS panel_store ("
+                            "key TEXT PRIMARY KEY, version INTEGER NOT NULL, "
+                            "mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, json_size INTEGER NOT NULL, "
+                            "codec TEXT NOT NULL, data BLOB NOT NULL)"
+                        )
+                finally:
+                    init.close()
+                _db_ready = True
+        # 每个线程一条长连接; 读写都在 to_thread 的工作线程里
+        conn = sqlite3.connect(str(STORE_PATH), timeout=5.0)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA mmap_size={_MMAP_SIZE}")
+    except (OSError, sqlite3.Error) as e:
+        _disable(e)
+        raise sqlite3.Error(str(e)) from e
+    _local.conn = conn
+    return conn
+
+
+def _disable(e: Exception) -> None:
+    """建库失败: 本进程不再尝试, 回退为直接读文件。单次读写失败 (如锁超时) 只跳过。"""
+    global _failed
+    _failed = True
+    logger.warning(f"[鸣潮·共享面板] 存储不可用, 本进程回退为直接读文件: {e}")
+
+
+def _key(path) -> str:
+    return str(Path(path))
+
+
+def version(path) -> int:
+    """本路径的跨进程写入版本; 没有记录为 0。"""
+    try:
+        row = _conn().execute("SELECT version FROM panel_store WHERE key = ?", (_key(path),)).fetchone()
+    except sqlite3.Error as e:
+        logger.debug(f"[鸣潮·共享面板] 读取版本失败 {path}: {e}")
+        return 0
+    return row[0] if row else 0
+
+
+def get(path, file_stamp: Tuple[int, int]) -> Optional[Tuple[Any, int]]:
+    """(数据, 解压后 JSON 字节数); 无记录 / 指纹不符 / 编码不兼容返回 None。"""
+    try:
+        row = _conn().execute(
+            "SELECT mtime_ns, size, json_size, codec, data FROM panel_store WHERE key = ?",
+            (_key(path),),
+        ).fetchone()
+    except sqlite3.Error as e:
+        logger.debug(f"[鸣潮·共享面板] 读取失败 {path}: {e}")
+        return None
+    if row is None or (row[0], row[1]) != tuple(file_stamp) or row[3] not in _COMPATIBLE[_CODEC[0]]:
+        return None
+    try:
+        return _CODEC[2](row[4]), row[2]
+    except Exception as e:
+        logger.debug(f"[鸣潮·共享面板] 解码失败 {path}: {e}")
+        return None
+
+
+def put(path, obj: Any, file_stamp: Tuple[int, int], json_size: int, bump: bool) -> None:
+    """写入/覆盖 blob; bump 为 True 时 version +1 (落盘写入), 读盘回填不加。"""
+    try:
+        data = _CODEC[1](obj)
+    except Exception as e:
+        logger.debug(f"[鸣潮·共享面板] 编码失败 {path}: {e}")
+        data = None
+    try:
+        conn = _conn()
+        with conn:
+            if data is None:
+                # 存不了新数据也要让其它 worker 知道文件变了; 旧 blob 指纹对不上不会被读到
+                if bump:
+                    conn.execute("UPDATE panel_store SET version = version + 1 WHERE key = ?", (_key(path),))
+                return
+            conn.execute(
+                "INSERT INTO panel_store (key, version, mtime_ns, size, json_size, codec, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET version = version + ?, mtime_ns = excluded.mtime_ns, "
+                "size = excluded.size, json_size = excluded.json_size, codec = excluded.codec, data = excluded.data",
+                (_key(path), int(bump), *file_stamp, json_size, _CODEC[0], data, int(bump)),
+            )
+    except sqlite3.Error as e:
+        logger.debug(f"[鸣潮·共享面板] 写入失败 {path}: {e}")
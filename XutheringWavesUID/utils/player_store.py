@@ -4,10 +4,12 @@ import json
 import asyncio
 import itertools
 from pathlib import Path
-from typing import Any, Optional, Union
+from typing import Any, Dict, Tuple, Optional, Union
 
 from gsuid_core.logger import logger
 
+from . import panel_store
+
 _GZIP_NAMES = {
     "rawData.json",
     "rover.json",
@@ -19,6 +21,9 @@ _GZIP_NAMES = {
 
 PathLike = Union[str, Path]
 _tmp_counter = itertools.count()
+# 本进程写入代数: write_player_json 每写一次 +1, 供解析缓存判定失效
+# (mtime 粒度粗的文件系统上同一秒内两次写入 mtime 可能不变)
+_write_gen: Dict[str, int] = {}
 
 
 def _is_gzip(name: str) -> bool:
@@ -31,11 +36,13 @@ def _load(p: Path) -> Any:
         return json.load(f)
 
 
-def _gzip_dump(path: Path, obj: Any, level: int = 6) -> None:
+def _gzip_dump(path: Path, obj: Any, level: int = 6) -> int:
+    """写 gz, 返回压缩前 JSON 字节数。"""
     data = json.dumps(obj, ensure_ascii=False).encode("utf-8")
     with open(path, "wb") as raw:
         with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=level, filename="", mtime=0) as f:
             f.write(data)
+    return len(data)
 
 
 def resolve_player_path(path: PathLike) -> Optional[Path]:
@@ -71,9 +78,34 @@ def resolve_readable_player_path(path: PathLike) -> Optional[Path]:
     return None
 
 
-def read_player_json_sync(path: PathLike) -> Any:
-    """读 json。.gz 优先, 读坏则回退明文; 都读不到返回 None。"""
+def _load_sized(p: Path) -> Tuple[Any, int]:
+    if p.suffix == ".gz":
+        with gzip.open(p, "rb") as f:
+            data = f.read()
+    else:
+        data = p.read_bytes()
+    return json.loads(data), len(data)
+
+
+def _file_stamp(p: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = p.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def read_player_json_sized_sync(path: PathLike) -> Tuple[Any, int]:
+    """同 read_player_json_sync, 额外返回解压后的 JSON 字节数 (读不到为 0)。"""
     p = Path(path)
+    shared = panel_store.handles(p)
+    if shared:
+        rp = resolve_player_path(p)
+        stamp = _file_stamp(rp) if rp is not None else None
+        if stamp is not None:
+            hit = panel_store.get(p, stamp)
+            if hit is not None:
+                return hit
     candidates = []
     if _is_gzip(p.name):
         gp = p.with_name(p.name + ".gz")
@@ -82,35 +114,82 @@ def read_player_json_sync(path: PathLike) -> Any:
     if p.exists():
         candidates.append(p)
     for c in candidates:
+        stamp = _file_stamp(c) if shared else None
         try:
-            return _load(c)
+            obj, nbytes = _load_sized(c)
         except Exception as e:
             logger.warning(f"[鸣潮·player_store] 读取失败 {c}: {e}")
-    return None
+            continue
+        if stamp is not None and c == resolve_player_path(p):
+            panel_store.put(p, obj, stamp, nbytes, bump=False)
+        return obj, nbytes
+    return None, 0
+
+
+def read_player_json_sync(path: PathLike) -> Any:
+    """读 json。.gz 优先, 读坏则回退明文; 都读不到返回 None。"""
+    return read_player_json_sized_sync(path)[0]
+
+
+def player_write_generation(path: PathLike) -> int:
+    """本进程写入代数; 开启共享面板存储时再加上跨进程写入版本 (两者都只增, 和也只增)。"""
+    gen = _write_gen.get(str(Path(path)), 0)
+    if panel_store.handles(path):
+        gen += panel_store.version(path)
+    return gen
+
+
+def player_json_stamp(path: PathLike) -> Optional[Tuple[str, int, int, int]]:
+    """落盘文件指纹 (实际路径, mtime_ns, size, 写入代数); 文件不存在返回 None。"""
+    rp = resolve_player_path(path)
+    if rp is None:
+        return None
+    try:
+        st = rp.stat()
+    except OSError:
+        return None
+    return str(rp), st.st_mtime_ns, st.st_size, player_write_generation(path)
 
 
 def write_player_json_sync(path: PathLike, obj: Any) -> None:
     p = Path(path)
+    try:
+        json_size = _write_player_json(p, obj)
+        if panel_store.handles(p):
+            rp = resolve_player_path(p)
+            stamp = _file_stamp(rp) if rp is not None else None
+            if stamp is not None:
+                panel_store.put(p, obj, stamp, json_size, bump=True)
+    finally:
+        # 落盘之后再 +1: 读方若在写入中途取了指纹, 下次读必然失效重载
+        key = str(p)
+        _write_gen[key] = _write_gen.get(key, 0) + 1
+
+
+def _write_player_json(p: Path, obj: Any) -> int:
+    """落盘, 返回 JSON 字节数。"""
     p.parent.mkdir(parents=True, exist_ok=True)
     uniq = f".{os.getpid()}.{next(_tmp_counter)}.tmp"
     if _is_gzip(p.name):
         gp = p.with_name(p.name + ".gz")
         tmp = p.with_name(p.name + ".gz" + uniq)
         try:
-            _gzip_dump(tmp, obj)
+            size = _gzip_dump(tmp, obj)
             tmp.replace(gp)
         finally:
             tmp.unlink(missing_ok=True)
         if p.exists():
             p.unlink()  # 删旧明文
-        return
+        return size
     tmp = p.with_name(p.name + uniq)
     try:
         with open(tmp, "w", encoding="utf-8") as f:
             json.dump(obj, f, ensure_ascii=False)
+        size = tmp.stat().st_size
         tmp.replace(p)
     finally:
         tmp.unlink(missing_ok=True)
+    return size
 
 
 async def read_player_json(path: PathLike) -> Any:
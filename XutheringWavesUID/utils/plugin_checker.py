@@ -1,7 +1,83 @@
+import sys
 import inspect
+import functools
 from typing import Optional
+from contextvars import ContextVar
+
 from gsuid_core.logger import logger
 
+# 入口 (命令处理函数 / 定时任务 / 队列与推送循环 / 启动钩子) 置位的插件名;
+# 入口内 await 的一切 (含其创建的子任务) 都能读到, 没有标记即不是本插件发起的
+CURRENT_PLUGIN: ContextVar[Optional[str]] = ContextVar("waves_current_plugin", default=None)
+
+WAVES_PLUGIN = "XutheringWavesUID"
+_MARK_ATTR = "_waves_plugin_marker"
+
+
+def _wrap_handler(func, plugin_name: str):
+    if getattr(func, _MARK_ATTR, None) == plugin_name:
+        return func
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = CURRENT_PLUGIN.set(plugin_name)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            CURRENT_PLUGIN.reset(token)
+
+    setattr(wrapper, _MARK_ATTR, plugin_name)
+    return wrapper
+
+
+def waves_entry(func):
+    """标记本插件的非命令入口 (后台循环、启动钩子等): 执行期间置位 CURRENT_PLUGIN。"""
+    return _wrap_handler(func, WAVES_PLUGIN)
+
+
+def _is_plugin_module(func, plugin_name: str) -> bool:
+    return plugin_name in (getattr(func, "__module__", None) or "").split(".")
+
+
+def _mark_scheduler_jobs(plugin_name: str) -> int:
+    """本插件模块里定义的协程定时任务换成置位标记的包装; 同步任务在线程池跑, 不发消息, 不处理。"""
+    from gsuid_core.aps import scheduler
+
+    count = 0
+    for job in scheduler.get_jobs():
+        func = job.func
+        if not inspect.iscoroutinefunction(func) or not _is_plugin_module(func, plugin_name):
+            continue
+        if getattr(func, _MARK_ATTR, None) != plugin_name:
+            job.modify(func=_wrap_handler(func, plugin_name))
+        count += 1
+    return count
+
+
+def install_plugin_markers(plugin_name: str = WAVES_PLUGIN) -> int:
+    """给插件下所有 SV 的触发器与定时任务包一层, 进入时置位 CURRENT_PLUGIN。
+
+    需在插件各模块注册完 SV / 定时任务之后调用 (on_core_start), 重复调用幂等。
+    其余入口 (后台循环、启动钩子) 用 waves_entry 自行标记。返回标记的入口数。
+    """
+    from gsuid_core.sv import SL
+
+    count = 0
+    for sv in list(SL.lst.values()):
+        plugins = getattr(sv, "plugins", None)
+        if getattr(plugins, "name", None) != plugin_name:
+            continue
+        for triggers in getattr(sv, "TL", {}).values():
+            for trigger in triggers.values():
+                func = getattr(trigger, "func", None)
+                if func is None:
+                    continue
+                trigger.func = _wrap_handler(func, plugin_name)
+                count += 1
+    jobs = _mark_scheduler_jobs(plugin_name)
+    logger.debug(f"[鸣潮·插件检查] {plugin_name} 已标记 {count} 个触发器, {jobs} 个定时任务")
+    return count + jobs
+
 
 def is_from_plugin(plugin_name: str = "XutheringWavesUID") -> bool:
     """检查调用是否来自指定插件"""
@@ -14,54 +90,48 @@ def is_from_plugin(plugin_name: str = "XutheringWavesUID") -> bool:
     return result
 
 
-def get_current_plugin() -> Optional[str]:
-    """获取当前执行的插件名称"""
-    frame = inspect.currentframe()
+def _stack_fallback_enabled() -> bool:
+    from ..wutheringwaves_config import WutheringWavesConfig
 
-    skip_files = ["plugin_checker.py", "bot_send_hook.py"]
-    all_plugins = []  # 记录所有遇到的插件
+    return bool(WutheringWavesConfig.get_config("PluginCheckStackFallback").data)
 
-    try:
-        frame = frame.f_back
 
+def get_current_plugin() -> Optional[str]:
+    """获取当前执行的插件名称: 读入口置位的上下文标记, 没有标记视为非本插件发起 (返回 None)。
+
+    仅当开启 PluginCheckStackFallback (排查漏标的入口用) 时, 无标记的调用才回退扫描调用栈。
+    """
+    marked = CURRENT_PLUGIN.get()
+    if marked is not None or not _stack_fallback_enabled():
+        return marked
+    plugin = _plugin_from_stack()
+    if plugin is not None:
+        logger.debug(f"[鸣潮·插件检查] 未标记的入口, 调用栈判断为 {plugin}")
+    return plugin
+
+
+def _plugin_from_stack() -> Optional[str]:
+    """沿调用栈找离调用方最近的 plugins/ 下文件; 只读 co_filename, 不查源码行"""
+    skip_files = ("plugin_checker.py", "bot_send_hook.py")
+    frame = sys._getframe(1)
+    result = None
+    try:
         while frame:
-            frame_info = inspect.getframeinfo(frame)
-            file_path = frame_info.filename
-
-            # 记录调用栈（只记录插件相关的）
-            if "/plugins/" in file_path or "\\plugins\\" in file_path:
-                all_plugins.append(f"  -> {file_path}:{frame_info.lineno}")
-
-            # 检查是否在 plugins 目录中
-            if "/plugins/" in file_path:
-                parts = file_path.split("/plugins/")
-                if len(parts) >= 2:
-                    plugin_path = parts[1]
-                    plugin_name = plugin_path.split("/")[0]
-                    # 只记录非工具文件的插件
-                    if not any(skip_file in file_path for skip_file in skip_files):
-                        all_plugins.append(plugin_name)
-            elif "\\plugins\\" in file_path:
-                parts = file_path.split("\\plugins\\")
-                if len(parts) >= 2:
-                    plugin_path = parts[1]
-                    plugin_name = plugin_path.split("\\")[0]
-                    if not any(skip_file in file_path for skip_file in skip_files):
-                        all_plugins.append(plugin_name)
-
+            file_path = frame.f_code.co_filename
+            for sep in ("/plugins/", "\\plugins\\"):
+                if sep in file_path:
+                    if not file_path.endswith(skip_files):
+                        # 最外层的插件帧, 与旧实现取列表最后一个一致
+                        result = file_path.split(sep)[1].split(sep[-1])[0]
+                    break
             frame = frame.f_back
     finally:
         del frame
 
-    plugin_names = [p for p in all_plugins if not p.startswith("  ->")]
-    if plugin_names:
-        result = plugin_names[-1]  # 最后一个就是离 hook 调用最近的
-        logger.debug(f"[鸣潮·插件检查] 找到的插件列表: {plugin_names}, 返回: {result}")
-        return result
-
-    logger.debug(f"[鸣潮·插件检查] 未找到插件来源")
-    return None
+    if result is None:
+        logger.debug("[鸣潮·插件检查] 未找到插件来源")
+    return result
 
 
 def is_from_waves_plugin() -> bool:
-    return is_from_plugin("XutheringWavesUID")
+    return is_from_plugin(WAVES_PLUGIN)
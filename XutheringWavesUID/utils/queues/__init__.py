@@ -1,10 +1,13 @@
-from typing import Any
+from typing import Any, Dict
 
 import httpx
 
 from gsuid_core.logger import logger
+from gsuid_core.server import on_core_shutdown
 
+from ..http_pool import get_client
 from .const import QUEUE_SCORE_RANK, QUEUE_ABYSS_RECORD, QUEUE_SLASH_RECORD, QUEUE_MATRIX_RECORD
+from .spool import SEND_OK, SEND_DROP, SEND_RETRY, spool_worker
 from .queues import event_handler, start_dispatcher
 from ..api.wwapi import (
     UPLOAD_URL,
@@ -21,45 +24,66 @@ _UPLOAD_JOBS = [
     (QUEUE_SLASH_RECORD, UPLOAD_SLASH_RECORD_URL, "冥海"),
     (QUEUE_MATRIX_RECORD, UPLOAD_MATRIX_RECORD_URL, "矩阵"),
 ]
+_UPLOAD_TARGETS = {queue: (url, label) for queue, url, label in _UPLOAD_JOBS}
 
 
-async def _post_upload(item: Any, url: str, label: str) -> None:
-    if not item or not isinstance(item, dict):
-        return
-
+def _get_token() -> str:
     from ...wutheringwaves_config import WutheringWavesConfig
-    WavesToken = WutheringWavesConfig.get_config("WavesToken").data
-    if not WavesToken:
-        return
 
-    res = None
+    return WutheringWavesConfig.get_config("WavesToken").data
+
+
+async def _post_upload(queue: str, item: Dict[str, Any]) -> str:
+    """发送一条上传记录, 返回 SEND_OK / SEND_RETRY / SEND_DROP 供缓冲决定删除或退避。"""
+    target = _UPLOAD_TARGETS.get(queue)
+    WavesToken = _get_token()
+    if target is None or not WavesToken:
+        return SEND_DROP
+    url, label = target
+
     try:
-        async with httpx.AsyncClient() as client:
-            res = await client.post(
-                url,
-                json=item,
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-        logger.info(f"[鸣潮·队列] 上传{label}结果: {res.status_code} - {res.text}")
+        client = get_client(url)
+        res = await client.post(
+            url,
+            json=item,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {WavesToken}",
+            },
+            timeout=httpx.Timeout(10),
+        )
     except Exception as e:
-        logger.exception(f"[鸣潮·队列] 上传{label}失败: {res.text if res else ''} {e}")
+        logger.warning(f"[鸣潮·队列] 上传{label}失败, 稍后重试: {e}")
+        return SEND_RETRY
 
+    logger.info(f"[鸣潮·队列] 上传{label}结果: {res.status_code} - {res.text}")
+    if res.status_code == 429 or res.status_code >= 500:
+        return SEND_RETRY
+    return SEND_OK if res.status_code < 400 else SEND_DROP
 
-def _make_handler(queue: str, url: str, label: str):
+
+def _make_handler(queue: str):
     async def _handler(item: Any):
-        await _post_upload(item, url, label)
+        if not item or not isinstance(item, dict) or not _get_token():
+            return
+        # init_queues 可能在事件循环外调用, 首条记录时补启动
+        spool_worker.start(_post_upload)
+        await spool_worker.enqueue(queue, item)
     _handler.__name__ = f"send_{queue.removeprefix('waves_')}"
     return _handler
 
 
 for _queue, _url, _label in _UPLOAD_JOBS:
-    event_handler(_queue)(_make_handler(_queue, _url, _label))
+    event_handler(_queue)(_make_handler(_queue))
 
 
 def init_queues():
     # 启动任务分发器
     start_dispatcher(daemon=True)
+    # 启动上传缓冲的发送循环 (重启前未发出的记录随之续发)
+    spool_worker.start(_post_upload)
+
+
+@on_core_shutdown
+async def _stop_upload_spool():
+    spool_worker.stop()
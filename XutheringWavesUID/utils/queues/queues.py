@@ -4,6 +4,11 @@ from typing import Any, Dict, List, Tuple, Union, Callable, Coroutine, Optional
 
 from gsuid_core.logger import logger
 
+from ..plugin_checker import waves_entry
+
+# 同时执行的处理器任务上限; 超出时 worker 暂停取队列, 积压留在队列里
+_MAX_INFLIGHT = 32
+
 
 class TaskDispatcher:
     def __init__(self):
@@ -13,6 +18,7 @@ class TaskDispatcher:
         self._loop: Optional[asyncio.AbstractEventLoop] = None
         self._worker: Optional[asyncio.Task] = None
         self._tasks: set = set()
+        self._slots: Optional[asyncio.Semaphore] = None
 
     def register_handler(
         self,
@@ -57,6 +63,7 @@ class TaskDispatcher:
 
         self._loop = loop
         self.running = True
+        self._slots = asyncio.Semaphore(_MAX_INFLIGHT)
         self._worker = loop.create_task(
             self._process(),
             name="waves-task-dispatcher",
@@ -116,18 +123,22 @@ class TaskDispatcher:
         except Exception as e:
             logger.exception(f"[鸣潮·队列] 任务入队异常: {e}")
 
+    @waves_entry
     async def _process(self) -> None:
         worker = asyncio.current_task()
+        slots = self._slots or asyncio.Semaphore(_MAX_INFLIGHT)
         try:
             while self.running:
                 task_type, data = await self.queue.get()
                 try:
                     handlers = list(self.handlers.get(task_type, []))
                     for handler in handlers:
+                        await slots.acquire()
                         # task retention: keep strong ref + auto-cleanup on done
                         task = asyncio.create_task(self._run_task(handler, data, task_type))
                         self._tasks.add(task)
                         task.add_done_callback(self._tasks.discard)
+                        task.add_done_callback(lambda _t: slots.release())
                 except Exception as e:
                     logger.exception(f"[鸣潮·队列] 任务处理异常: {e}")
                 finally:
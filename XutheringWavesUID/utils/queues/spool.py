@@ -0,0 +1,274 @@
+"""上传队列的落盘缓冲 (sqlite WAL, MAIN_PATH/upload_spool.db)。
+
+面板/深渊/冥海/矩阵记录不再每条各起一个任务直接上传, 而是:
+- 入队: 按 (队列, 合并键) 写一行; 还没发出的同键旧记录被新记录覆盖, 只发最新一份。
+  合并键为 uid, 冥海/矩阵再带上 challengeId/modeId, 单角色面板再带上角色 id (各自互不覆盖)。
+- 发送: 单个 drain 循环每轮领取一批到期记录 (带租约 leased_until, 多 worker 不会重复领取;
+  发送中被同键新记录覆盖时租约不变, 旧记录发完 ack/backoff 释放租约后新记录立即到期),
+  以 UploadConcurrency 为上限并发 POST (wwapi 上传接口只收单条, 批量体现在领取与连接复用上)。
+- 失败: 网络错误/429/5xx 指数退避重试, 超过 _MAX_ATTEMPTS 次丢弃; 其余 4xx 直接丢弃。
+- 重启/上游故障期间的记录留在库里, 恢复后继续发送; backlog() 给状态页看积压。
+"""
+import json
+import time
+import uuid
+import random
+import sqlite3
+import asyncio
+from contextlib import closing
+from typing import Any, Dict, List, Tuple, Callable, Optional, Awaitable
+
+from gsuid_core.logger import logger
+
+from .const import QUEUE_SCORE_RANK, QUEUE_SLASH_RECORD, QUEUE_MATRIX_RECORD
+from ..plugin_checker import waves_entry
+from ..resource.RESOURCE_PATH import MAIN_PATH
+
+SPOOL_PATH = MAIN_PATH / "upload_spool.db"
+
+_BATCH = 50  # 每轮领取条数
+_LEASE = 120.0  # 领取后多久未确认视为丢失, 可被再次领取 (秒)
+_BACKOFF_BASE = 2.0
+_BACKOFF_MAX = 600.0
+_MAX_ATTEMPTS = 10
+_IDLE_WAIT = 30.0  # 没有到期记录时最长休眠, 兜底其它 worker 写入的记录
+
+# 发送结果
+SEND_OK = "ok"
+SEND_RETRY = "retry"
+SEND_DROP = "drop"
+
+Sender = Callable[[str, Dict[str, Any]], Awaitable[str]]
+_Row = Tuple[str, str, int, str, int]  # queue, key, gen, payload, attempts
+
+
+def _connect() -> sqlite3.Connection:
+    return sqlite3.connect(str(SPOOL_PATH), timeout=5.0)
+
+
+def _init_db() -> None:
+    SPOOL_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with closing(_connect()) as conn:
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS upload_spool ("
+                "queue TEXT NOT NULL, key TEXT NOT NULL, gen INTEGER NOT NULL, "
+                "payload TEXT NOT NULL, attempts INTEGER NOT NULL, next_at REAL NOT NULL, "
+                "created REAL NOT NULL, leased_until REAL NOT NULL DEFAULT 0, PRIMARY KEY (queue, key))"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(upload_spool)")}
+            if "leased_until" not in columns:
+                conn.execute("ALTER TABLE upload_spool ADD COLUMN leased_until REAL NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_upload_spool_next ON upload_spool (next_at)")
+
+
+def coalesce_key(queue: str, item: Dict[str, Any]) -> str:
+    """同键记录只保留最新; 取不到 uid 的记录不合并。"""
+    uid = item.get("waves_id") or item.get("wavesId")
+    if not uid:
+        return f"_{uuid.uuid4().hex}"
+    if queue == QUEUE_SLASH_RECORD:
+        return f"{uid}:{item.get('challengeId')}"
+    if queue == QUEUE_MATRIX_RECORD:
+        return f"{uid}:{item.get('modeId')}"
+    if queue == QUEUE_SCORE_RANK and item.get("single_refresh"):
+        # 单角色刷新只带该角色, 不能被另一个角色的单刷覆盖
+        chars = sorted(str(c.get("char_id")) for c in item.get("char_info") or [] if isinstance(c, dict))
+        return f"{uid}:{','.join(chars)}"
+    return str(uid)
+
+
+def put(queue: str, item: Dict[str, Any]) -> None:
+    """写入/覆盖同键记录; 覆盖正在发送 (租约中) 的行时不动租约, 避免别的 worker 同时发新记录。"""
+    now = time.time()
+    payload = json.dumps(item, ensure_ascii=False, default=str)
+    with closing(_connect()) as conn:
+        with conn:
+            conn.execute(
+                "INSERT INTO upload_spool (queue, key, gen, payload, attempts, next_at, created) "
+                "VALUES (?, ?, 1, ?, 0, ?, ?) "
+                "ON CONFLICT(queue, key) DO UPDATE SET gen = gen + 1, payload = excluded.payload, "
+                "attempts = 0, next_at = excluded.next_at",
+                (queue, coalesce_key(queue, item), payload, now, now),
+            )
+
+
+def claim(limit: int = _BATCH) -> List[_Row]:
+    """领取到期记录并续租; 同一事务内完成, 多 worker 不会领到同一行。"""
+    now = time.time()
+    with closing(_connect()) as conn:
+        conn.isolation_level = None
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT queue, key, gen, payload, attempts FROM upload_spool "
+                "WHERE next_at <= ? AND leased_until <= ? ORDER BY next_at LIMIT ?",
+                (now, now, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE upload_spool SET leased_until = ? WHERE queue = ? AND key = ?",
+                [(now + _LEASE, r[0], r[1]) for r in rows],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    return rows
+
+
+def ack(queue: str, key: str, gen: int) -> None:
+    """发送成功/放弃: 删除; 发送期间被新记录覆盖 (gen 变了) 的保留待发, 释放租约后立即到期。"""
+    with closing(_connect()) as conn:
+        with conn:
+            conn.execute(
+                "DELETE FROM upload_spool WHERE queue = ? AND key = ? AND gen = ?",
+                (queue, key, gen),
+            )
+            conn.execute(
+                "UPDATE upload_spool SET leased_until = 0 WHERE queue = ? AND key = ?",
+                (queue, key),
+            )
+
+
+def backoff(queue: str, key: str, gen: int, attempts: int) -> bool:
+    """安排重试; 次数用尽则删除并返回 False。"""
+    attempts += 1
+    if attempts >= _MAX_ATTEMPTS:
+        ack(queue, key, gen)
+        return False
+    delay = min(_BACKOFF_MAX, _BACKOFF_BASE * (2 ** attempts)) * random.uniform(0.8, 1.2)
+    with closing(_connect()) as conn:
+        with conn:
+            conn.execute(
+                "UPDATE upload_spool SET attempts = ?, next_at = ? WHERE queue = ? AND key = ? AND gen = ?",
+                (attempts, time.time() + delay, queue, key, gen),
+            )
+            # 释放租约; gen 变了 (发送中被新记录覆盖) 时新记录不退避, 立即到期
+            conn.execute(
+                "UPDATE upload_spool SET leased_until = 0 WHERE queue = ? AND key = ?",
+                (queue, key),
+            )
+    return True
+
+
+def next_due() -> Optional[float]:
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT MIN(MAX(next_at, leased_until)) FROM upload_spool").fetchone()
+    return row[0] if row else None
+
+
+def backlog() -> Dict[str, int]:
+    """各队列未发出条数 (含退避中的)。"""
+    with closing(_connect()) as conn:
+        return dict(conn.execute("SELECT queue, COUNT(*) FROM upload_spool GROUP BY queue").fetchall())
+
+
+class SpoolWorker:
+    def __init__(self):
+        self._sender: Optional[Sender] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._ready = False
+
+    def _ensure_db(self) -> bool:
+        if not self._ready:
+            try:
+                _init_db()
+                self._ready = True
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"[鸣潮·上传缓冲] 建库失败: {e}")
+        return self._ready
+
+    def start(self, sender: Sender) -> None:
+        self._sender = sender
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.warning("[鸣潮·上传缓冲] 启动失败: 当前无运行中的事件循环")
+            return
+        self._wake = asyncio.Event()
+        self._task = loop.create_task(self._run(), name="waves-upload-spool")
+        logger.info("[鸣潮·上传缓冲] 上传循环已启动")
+
+    def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    async def enqueue(self, queue: str, item: Dict[str, Any]) -> None:
+        if not self._ensure_db():
+            # 库不可用时退回直接发送一次
+            if self._sender is not None:
+                await self._sender(queue, item)
+            return
+        try:
+            await asyncio.to_thread(put, queue, item)
+        except sqlite3.Error as e:
+            logger.warning(f"[鸣潮·上传缓冲] 写入失败 {queue}: {e}")
+            return
+        if self._wake is not None:
+            self._wake.set()
+
+    async def backlog(self) -> Dict[str, int]:
+        if not self._ensure_db():
+            return {}
+        try:
+            return await asyncio.to_thread(backlog)
+        except sqlite3.Error:
+            return {}
+
+    @waves_entry
+    async def _run(self) -> None:
+        from ...wutheringwaves_config import WutheringWavesConfig
+
+        while not self._ensure_db():
+            await asyncio.sleep(_IDLE_WAIT)
+        while True:
+            try:
+                rows = await asyncio.to_thread(claim)
+            except sqlite3.Error as e:
+                logger.warning(f"[鸣潮·上传缓冲] 领取失败: {e}")
+                rows = []
+            if rows:
+                limit = max(1, WutheringWavesConfig.get_config("UploadConcurrency").data or 1)
+                sem = asyncio.Semaphore(limit)
+                await asyncio.gather(*(self._send(sem, row) for row in rows))
+                continue
+            await self._sleep()
+
+    async def _sleep(self) -> None:
+        assert self._wake is not None
+        try:
+            due = await asyncio.to_thread(next_due)
+        except sqlite3.Error:
+            due = None
+        wait = _IDLE_WAIT if due is None else min(_IDLE_WAIT, max(0.0, due - time.time()))
+        self._wake.clear()
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=wait)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _send(self, sem: asyncio.Semaphore, row: _Row) -> None:
+        queue, key, gen, payload, attempts = row
+        async with sem:
+            try:
+                result = await self._sender(queue, json.loads(payload)) if self._sender else SEND_RETRY
+            except Exception as e:
+                logger.exception(f"[鸣潮·上传缓冲] 发送异常 {queue}: {e}")
+                result = SEND_RETRY
+        try:
+            if result == SEND_RETRY:
+                if not await asyncio.to_thread(backoff, queue, key, gen, attempts):
+                    logger.warning(f"[鸣潮·上传缓冲] {queue} {key} 重试 {_MAX_ATTEMPTS} 次仍失败, 丢弃")
+            else:
+                await asyncio.to_thread(ack, queue, key, gen)
+        except sqlite3.Error as e:
+            # 租约到期后会被重新领取
+            logger.warning(f"[鸣潮·上传缓冲] 更新状态失败 {queue} {key}: {e}")
+
+
+spool_worker = SpoolWorker()
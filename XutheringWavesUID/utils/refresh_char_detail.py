@@ -2,7 +2,7 @@ import re
 import json
 import asyncio
 import contextlib
-from typing import Dict, List, Union, Optional
+from typing import Any, Dict, List, Union, Callable, Optional
 
 import aiofiles
 
@@ -13,7 +13,9 @@ from .hint import error_reply
 from .at_help import safe_sender_avatar
 from .util import get_version, hide_uid, resolve_hide_uid
 from .api.model import RoleList, AccountBaseInfo, OwnedRoleInfoResponse
+from .api.response_cache import response_cache
 from .waves_api import waves_api
+from .refresh_scheduler import refresh_scheduler
 from .resource.constant import SPECIAL_CHAR_INT_ALL, SPECIAL_CHAR_RANK_MAP
 from .error_reply import WAVES_CODE_101, WAVES_CODE_102
 from .queues.const import QUEUE_SCORE_RANK
@@ -67,7 +69,10 @@ def schedule_silent_diff_refresh(
 
 
 async def save_base_info_cache(uid: str, account_info: _AccountBaseInfo):
-    """将账户基本信息（世界等级等）缓存到文件"""
+    """将账户基本信息（世界等级等）缓存到文件, 同时写入内存层"""
+    from ..wutheringwaves_charinfo import base_info_cache
+
+    base_info_cache.set(uid, account_info)
     _dir = PLAYER_PATH / uid
     _dir.mkdir(parents=True, exist_ok=True)
     path = _dir / "baseInfo.json"
@@ -79,52 +84,24 @@ async def save_base_info_cache(uid: str, account_info: _AccountBaseInfo):
 
 
 async def load_base_info_cache(uid: str) -> Optional[_AccountBaseInfo]:
-    """从缓存文件读取账户基本信息"""
+    """读取账户基本信息: 内存层命中直接返回, 否则读缓存文件并回填内存层"""
+    from ..wutheringwaves_charinfo import base_info_cache
+
+    info = base_info_cache.get(uid)
+    if info is not None:
+        return info
     path = PLAYER_PATH / uid / "baseInfo.json"
     if not path.exists():
         return None
     try:
         async with aiofiles.open(path, "r", encoding="utf-8") as f:
             data = json.loads(await f.read())
-        return _AccountBaseInfo.model_validate(data)
+        info = _AccountBaseInfo.model_validate(data)
     except Exception as e:
         logger.exception(f"[鸣潮·角色状态] load_base_info_cache failed {path}:", e)
         return None
-
-
-def is_use_global_semaphore() -> bool:
-    return WutheringWavesConfig.get_config("UseGlobalSemaphore").data or False
-
-
-def get_refresh_card_concurrency() -> int:
-    return WutheringWavesConfig.get_config("RefreshCardConcurrency").data or 2
-
-
-class SemaphoreManager:
-    def __init__(self):
-        self._last_config: int = get_refresh_card_concurrency()
-        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(value=self._last_config)
-        self._semaphore_lock = asyncio.Lock()
-
-    async def get_semaphore(self) -> asyncio.Semaphore:
-        current_config = get_refresh_card_concurrency()
-
-        if is_use_global_semaphore():
-            return await self._get_semaphore(current_config)  # 全局模式
-        else:
-            return asyncio.Semaphore(value=current_config)  # 独立模式
-
-    async def _get_semaphore(self, current_config: int) -> asyncio.Semaphore:
-        if self._last_config != current_config:
-            async with self._semaphore_lock:
-                if self._last_config != current_config:
-                    self._semaphore = asyncio.Semaphore(value=current_config)
-                    self._last_config = current_config
-
-        return self._semaphore
-
-
-semaphore_manager = SemaphoreManager()
+    base_info_cache.set(uid, info)
+    return info
 
 
 def remove_urls_from_data(data):
@@ -242,6 +219,9 @@ async def save_card_info(
     _dir.mkdir(parents=True, exist_ok=True)
     path = _dir / "rawData.json"
 
+    from ..wutheringwaves_rank import rank_index
+
+    rank_stamp_before = await asyncio.to_thread(rank_index.panel_stamp, uid)
     old_data = {}
     old = await read_player_json(path)
     rawdata_corrupt = old is None and player_json_exists(path)
@@ -310,6 +290,13 @@ async def save_card_info(
             except Exception as e:
                 logger.exception("[鸣潮·角色状态] save rover.json failed:", e)
 
+        # 群排行索引: 未变动角色顺延, 变动角色后台重算
+        task = asyncio.create_task(
+            rank_index.update_rank_index(uid, rank_stamp_before, list(refresh_update.keys()))
+        )
+        _BG_TASKS.add(task)
+        task.add_done_callback(_BG_TASKS.discard)
+
     # 保存charListData.json（角色评分缓存）—— 只算本次变更的角色, 未变更角色 score 不变
     waves_char_rank = await get_waves_char_rank(uid, list(refresh_update.values()), True)
 
@@ -423,6 +410,16 @@ async def save_char_list_cache(uid: str, waves_char_rank: Optional[List[WavesCha
         logger.debug(f"[鸣潮·角色状态] 保存charListData.json失败 uid={uid}: {e}")
 
 
+def log_refresh_progress(uid: str, steps: int = 4) -> Callable[[int, int], None]:
+    """refresh_char 的 on_progress: 每完成约 1/steps 的角色记一条 info 日志。"""
+
+    def _log(done: int, total: int) -> None:
+        if done == total or done * steps // total != (done - 1) * steps // total:
+            logger.info(f"[鸣潮·刷新面板] uid={uid} 角色详情 {done}/{total}")
+
+    return _log
+
+
 async def refresh_char(
     ev: Event,
     uid: str,
@@ -433,12 +430,15 @@ async def refresh_char(
     refresh_type: Union[str, List[str]] = "all",
     is_self: bool = True,
     is_silent_diff: bool = False,
+    on_progress: Optional[Callable[[int, int], Any]] = None,
 ) -> Union[str, List]:
     waves_datas = []
     if not ck:
         is_self_ck, ck = await waves_api.get_ck_result(uid, user_id, ev.bot_id)
     if not ck:
         return error_reply(WAVES_CODE_102)
+    # 刷新要拿最新数据, 丢掉该 uid 短缓存的读接口响应
+    response_cache.invalidate(uid)
     # 共鸣者信息
     role_info = await waves_api.get_role_info(uid, ck)
     if not role_info.success:
@@ -485,32 +485,26 @@ async def refresh_char(
                     )
                 return error_reply(code=-110, msg="未拥有该角色，无法刷新面板")
 
-    semaphore = await semaphore_manager.get_semaphore()
-
-    async def limited_get_role_detail_info(role_id, uid, ck):
-        async with semaphore:
-            return await waves_api.get_role_detail_info(role_id, uid, ck)
-
     if is_self_ck:
-        tasks = [
-            limited_get_role_detail_info(f"{r.roleId}", uid, ck)
+        role_ids = [
+            f"{r.roleId}"
             for r in role_info.roleList
             if refresh_type == "all" or (isinstance(refresh_type, list) and f"{r.roleId}" in refresh_type)
         ]
     else:
         if role_info.showRoleIdList:
-            tasks = [
-                limited_get_role_detail_info(f"{r}", uid, ck)
+            role_ids = [
+                f"{r}"
                 for r in role_info.showRoleIdList
                 if refresh_type == "all" or (isinstance(refresh_type, list) and f"{r}" in refresh_type)
             ]
         else:
-            tasks = [
-                limited_get_role_detail_info(f"{r.roleId}", uid, ck)
+            role_ids = [
+                f"{r.roleId}"
                 for r in role_info.roleList
                 if refresh_type == "all" or (isinstance(refresh_type, list) and f"{r.roleId}" in refresh_type)
             ]
-    results = await asyncio.gather(*tasks)
+    results = await refresh_scheduler.fetch_role_details(role_ids, uid, ck, on_progress=on_progress)
 
     charId2chainNum: Dict[int, int] = {
         r.roleId: r.chainUnlockNum for r in role_info.roleList if isinstance(r.chainUnlockNum, int)
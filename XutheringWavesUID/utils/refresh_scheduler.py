@@ -0,0 +1,236 @@
+"""刷新面板的上游请求调度。
+
+- 令牌桶: 每个上游 host 共享, 每秒最多 RefreshCardRate 个请求 (允许同量突发), 独立/全局模式都生效。
+- AIMD 并发窗口: 从 RefreshCardConcurrency 的一半起步, 成功一次窗口 +1/窗口 (约每轮 +1),
+  遇到库街区限流 (验证码 / 风险环境 / "频繁" 类提示 / 请求异常) 减半, 上限 RefreshCardConcurrency。
+  UseGlobalSemaphore 开启时同 host 共享一个窗口, 否则每次刷新各自一个窗口。
+- 去重: 同一 (uid, 角色) 正在请求时后来者直接等同一结果; 结果失败且 token 不同时再用自己的 token 请求。
+"""
+import time
+import asyncio
+import inspect
+import contextlib
+from typing import Any, Dict, List, Tuple, Callable, Iterable, Optional
+from urllib.parse import urlparse
+
+from gsuid_core.logger import logger
+
+from .waves_api import waves_api
+from .api.api import ROLE_DETAIL_URL
+from .error_reply import WAVES_CODE_104
+from .api.request_util import RespCode
+from ..wutheringwaves_config import WutheringWavesConfig
+
+_THROTTLE_HINTS = ("频繁", "太快", "过快", "繁忙", "稍后再试")
+_THROTTLE_RETRIES = 2
+_THROTTLE_BACKOFF = 1.0  # 秒, 指数退避基数
+_DECREASE_INTERVAL = 1.0  # 同一窗口 1 秒内只减半一次, 避免一批并发失败把窗口打到底
+
+
+def is_use_global_semaphore() -> bool:
+    return WutheringWavesConfig.get_config("UseGlobalSemaphore").data or False
+
+
+def get_refresh_card_concurrency() -> int:
+    return WutheringWavesConfig.get_config("RefreshCardConcurrency").data or 2
+
+
+def get_refresh_card_rate() -> int:
+    return WutheringWavesConfig.get_config("RefreshCardRate").data or 0
+
+
+def is_throttled(resp) -> bool:
+    if resp.code in (WAVES_CODE_104, RespCode.DANGER_ENV.value):
+        return True
+    msg = resp.msg if isinstance(resp.msg, str) else ""
+    return not resp.success and any(h in msg for h in _THROTTLE_HINTS)
+
+
+class TokenBucket:
+    def __init__(self):
+        self._tokens: Optional[float] = None
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        # 排队拿令牌, 先到先得
+        async with self._lock:
+            while True:
+                rate = get_refresh_card_rate()
+                if rate <= 0:
+                    return
+                now = time.monotonic()
+                if self._tokens is None:
+                    self._tokens = float(rate)
+                self._tokens = min(float(rate), self._tokens + (now - self._last) * rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / rate)
+
+
+class AimdLimiter:
+    def __init__(self):
+        self.limit = max(1.0, get_refresh_card_concurrency() / 2)
+        self.active = 0
+        self.throttled = 0
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    @property
+    def window(self) -> int:
+        return max(1, min(int(self.limit), get_refresh_card_concurrency()))
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.active < self.window)
+            self.active += 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self.active -= 1
+                self._cond.notify_all()
+
+    def on_success(self) -> None:
+        cap = get_refresh_card_concurrency()
+        self.limit = min(float(cap), self.limit + 1 / self.limit)
+
+    def on_throttle(self) -> None:
+        self.throttled += 1
+        now = time.monotonic()
+        if now - self._last_decrease < _DECREASE_INTERVAL:
+            return
+        self._last_decrease = now
+        self.limit = max(1.0, self.limit / 2)
+        logger.debug(f"[鸣潮·刷新调度] 触发限流, 并发窗口降至 {self.window}")
+
+
+class RefreshScheduler:
+    def __init__(self):
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._limiters: Dict[str, AimdLimiter] = {}
+        self._inflight: Dict[Tuple[str, str], Tuple[str, asyncio.Task]] = {}
+        self.requests = 0
+        self.deduped = 0
+
+    @staticmethod
+    def host() -> str:
+        return urlparse(ROLE_DETAIL_URL).netloc
+
+    def limiter(self, host: str) -> AimdLimiter:
+        if not is_use_global_semaphore():
+            return AimdLimiter()  # 独立模式
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = self._limiters[host] = AimdLimiter()
+        return limiter
+
+    async def _request(self, host: str, limiter: AimdLimiter, role_id: str, uid: str, ck: str):
+        bucket = self._buckets.setdefault(host, TokenBucket())
+        resp = None
+        for attempt in range(_THROTTLE_RETRIES + 1):
+            async with limiter.slot():
+                await bucket.acquire()
+                self.requests += 1
+                try:
+                    resp = await waves_api.get_role_detail_info(role_id, uid, ck)
+                except Exception:
+                    limiter.on_throttle()
+                    raise
+            if not is_throttled(resp):
+                if resp.success:
+                    limiter.on_success()
+                return resp
+            limiter.on_throttle()
+            if resp.code in (WAVES_CODE_104, RespCode.DANGER_ENV.value):
+                # 验证码/风险环境重试无意义
+                return resp
+            if attempt < _THROTTLE_RETRIES:
+                await asyncio.sleep(_THROTTLE_BACKOFF * 2**attempt)
+        return resp
+
+    def _forget(self, key: Tuple[str, str], task: asyncio.Task) -> None:
+        shared = self._inflight.get(key)
+        if shared is not None and shared[1] is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # 调用方都已取消时避免 "never retrieved" 告警
+
+    async def fetch_role_detail(
+        self,
+        role_id: str,
+        uid: str,
+        ck: str,
+        host: Optional[str] = None,
+        limiter: Optional[AimdLimiter] = None,
+    ):
+        host = host or self.host()
+        limiter = limiter or self.limiter(host)
+        key = (uid, str(role_id))
+        shared = self._inflight.get(key)
+        if shared is not None:
+            shared_ck, task = shared
+            self.deduped += 1
+            resp = await asyncio.shield(task)
+            if resp.success or shared_ck == ck:
+                return resp
+            return await self._request(host, limiter, str(role_id), uid, ck)
+
+        task = asyncio.create_task(self._request(host, limiter, str(role_id), uid, ck))
+        self._inflight[key] = (ck, task)
+        task.add_done_callback(lambda t: self._forget(key, t))
+        # shield: 某个调用方被取消不影响共享同一请求的其他调用方
+        return await asyncio.shield(task)
+
+    async def fetch_role_details(
+        self,
+        role_ids: Iterable[str],
+        uid: str,
+        ck: str,
+        on_progress: Optional[Callable[[int, int], Any]] = None,
+    ) -> List:
+        """批量拉取角色详情, 结果顺序与 role_ids 一致。
+
+        每完成一个角色调用一次 on_progress(已完成, 总数), 可为协程函数; 回调异常只记日志。
+        """
+        role_ids = list(role_ids)
+        host = self.host()
+        limiter = self.limiter(host)
+        total = len(role_ids)
+        t0 = time.perf_counter()
+        tasks = [asyncio.ensure_future(self.fetch_role_detail(r, uid, ck, host, limiter)) for r in role_ids]
+        try:
+            for done, fut in enumerate(asyncio.as_completed(tasks), 1):
+                await fut
+                if on_progress is not None:
+                    try:
+                        ret = on_progress(done, total)
+                        if inspect.isawaitable(ret):
+                            await ret
+                    except Exception as e:
+                        logger.debug(f"[鸣潮·刷新调度] 进度回调失败: {e}")
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        results = [task.result() for task in tasks]
+        if total > 1:
+            logger.debug(
+                f"[鸣潮·刷新调度] uid={uid} {total}个角色 用时{time.perf_counter() - t0:.2f}s "
+                f"并发窗口{limiter.window} 限流{limiter.throttled}次"
+            )
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "deduped": self.deduped,
+            "inflight": len(self._inflight),
+            "windows": {host: limiter.window for host, limiter in self._limiters.items()},
+        }
+
+
+refresh_scheduler = RefreshScheduler()
@@ -0,0 +1,233 @@
+"""render_html 输出缓存: 模板名 + 模板依赖指纹 + 上下文规范序列化 → sha256。
+
+- 依赖指纹: 模板加载目录整棵树 (被 include/extends/import 的子模板、css、图片字体等静态资源) 的
+  文件数/总大小/最大 mtime (_DEPS_TTL 秒内复用), 加上上下文里引用的本地文件 (绝对路径 / file:// URL)
+  各自的 mtime 与大小; 改动任一依赖 key 都会变, 不会命中旧图。
+- 内存热层 (OrderedDict, RenderCacheMemMB) + 磁盘层 (OTHER_PATH/render_cache, RenderCacheSizeMB),
+  均按字节数 LRU 淘汰。
+- ttl 为 None 时内容寻址即可保证一致 (上下文或依赖一变 key 就变); 依赖用户数据的卡片应传 ttl,
+  过期以落盘 mtime 判定。
+"""
+import os
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from typing import Any, Dict, Tuple, Iterable, Optional
+from pathlib import Path
+from collections import OrderedDict
+from urllib.parse import unquote, urlparse
+
+from gsuid_core.logger import logger
+
+from ..version import XutheringWavesUID_version
+from .resource.RESOURCE_PATH import OTHER_PATH
+
+RENDER_CACHE_PATH = OTHER_PATH / "render_cache"
+
+
+def _cfg_bytes(name: str) -> int:
+    from ..wutheringwaves_config import WutheringWavesConfig
+
+    return max(int(WutheringWavesConfig.get_config(name).data or 0), 0) * 1024 * 1024
+
+
+_DEPS_TTL = 5.0
+_tree_stamps: Dict[str, Tuple[float, str]] = {}
+
+
+def _tree_stamp(root: str) -> str:
+    """目录树下全部文件的 数量:总大小:最大 mtime; 只 stat 不读文件。"""
+    now = time.monotonic()
+    cached = _tree_stamps.get(root)
+    if cached is not None and now - cached[0] < _DEPS_TTL:
+        return cached[1]
+    count = size = latest = 0
+    for dirpath, _, files in os.walk(root):
+        for name in files:
+            try:
+                st = os.stat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            count += 1
+            size += st.st_size
+            latest = max(latest, st.st_mtime_ns)
+    stamp = f"{count}:{size}:{latest}"
+    _tree_stamps[root] = (now, stamp)
+    return stamp
+
+
+def _asset_path(value: str) -> Optional[str]:
+    if value.startswith("file://"):
+        return unquote(urlparse(value).path)
+    if len(value) < 1024 and os.path.isabs(value):
+        return value
+    return None
+
+
+def _asset_stamps(obj: Any, out: Dict[str, str]) -> Dict[str, str]:
+    """上下文里引用的本地文件 → mtime:size (不存在的忽略)。"""
+    if isinstance(obj, dict):
+        for v in obj.values():
+            _asset_stamps(v, out)
+    elif isinstance(obj, (list, tuple)):
+        for v in obj:
+            _asset_stamps(v, out)
+    elif isinstance(obj, (str, Path)):
+        path = _asset_path(str(obj))
+        if path is not None and path not in out:
+            try:
+                st = os.stat(path)
+            except (OSError, ValueError):
+                return out
+            out[path] = f"{st.st_mtime_ns}:{st.st_size}"
+    return out
+
+
+def render_digest(
+    template_name: str,
+    template_file: Optional[str],
+    context: Dict[str, Any],
+    search_paths: Iterable[str] = (),
+) -> str:
+    """search_paths 为模板加载目录 (FileSystemLoader.searchpath); 为空时取模板文件所在目录。"""
+    roots = list(search_paths) or ([os.path.dirname(template_file)] if template_file else [])
+    deps = {root: _tree_stamp(root) for root in roots}
+    payload = json.dumps(
+        {
+            "v": XutheringWavesUID_version,
+            "t": template_name,
+            "d": deps,
+            "a": _asset_stamps(context, {}),
+            "c": context,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    def __init__(self, root: Path = RENDER_CACHE_PATH):
+        self.root = root
+        self._lock = threading.Lock()
+        self._mem: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()  # digest → (写入时间, 图)
+        self._mem_bytes = 0
+        # 磁盘索引 digest → (大小, 最近访问), 首次使用时扫目录建立
+        self._disk: "Optional[OrderedDict[str, int]]" = None
+        self._disk_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, digest: str) -> Path:
+        return self.root / f"{digest}.img"
+
+    def _load_disk_index(self) -> "OrderedDict[str, int]":
+        if self._disk is None:
+            entries = []
+            self.root.mkdir(parents=True, exist_ok=True)
+            for entry in os.scandir(self.root):
+                if entry.name.endswith(".img"):
+                    st = entry.stat()
+                    entries.append((st.st_atime, entry.name[:-4], st.st_size))
+            entries.sort()
+            self._disk = OrderedDict((d, size) for _, d, size in entries)
+            self._disk_bytes = sum(size for _, _, size in entries)
+        return self._disk
+
+    def _mem_put(self, digest: str, created: float, data: bytes) -> None:
+        limit = _cfg_bytes("RenderCacheMemMB")
+        if len(data) > limit:
+            return
+        old = self._mem.pop(digest, None)
+        if old is not None:
+            self._mem_bytes -= len(old[1])
+        self._mem[digest] = (created, data)
+        self._mem_bytes += len(data)
+        while self._mem_bytes > limit and self._mem:
+            _, (_, evicted) = self._mem.popitem(last=False)
+            self._mem_bytes -= len(evicted)
+
+    def _drop_disk(self, digest: str) -> None:
+        size = self._load_disk_index().pop(digest, None)
+        if size is not None:
+            self._disk_bytes -= size
+        self._path(digest).unlink(missing_ok=True)
+
+    def get_sync(self, digest: str, ttl: Optional[int] = None) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            hot = self._mem.get(digest)
+            if hot is not None:
+                if ttl is None or now - hot[0] < ttl:
+                    self._mem.move_to_end(digest)
+                    self.hits += 1
+                    return hot[1]
+                self._mem_bytes -= len(self._mem.pop(digest)[1])
+
+            disk = self._load_disk_index()
+            if digest not in disk:
+                self.misses += 1
+                return None
+            path = self._path(digest)
+            try:
+                created = path.stat().st_mtime
+                if ttl is not None and now - created >= ttl:
+                    self._drop_disk(digest)
+                    self.misses += 1
+                    return None
+                data = path.read_bytes()
+            except OSError:
+                self._drop_disk(digest)
+                self.misses += 1
+                return None
+            disk.move_to_end(digest)
+            self._mem_put(digest, created, data)
+            self.hits += 1
+            return data
+
+    def put_sync(self, digest: str, data: bytes) -> None:
+        limit = _cfg_bytes("RenderCacheSizeMB")
+        with self._lock:
+            self._mem_put(digest, time.time(), data)
+            if not limit or len(data) > limit:
+                return
+            disk = self._load_disk_index()
+            path = self._path(digest)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            try:
+                tmp.write_bytes(data)
+                tmp.replace(path)
+            except OSError as e:
+                tmp.unlink(missing_ok=True)
+                logger.debug(f"[鸣潮·渲染缓存] 写入失败 {path}: {e}")
+                return
+            self._disk_bytes -= disk.pop(digest, 0)
+            disk[digest] = len(data)
+            self._disk_bytes += len(data)
+            while self._disk_bytes > limit and disk:
+                old, size = disk.popitem(last=False)
+                self._disk_bytes -= size
+                self._path(old).unlink(missing_ok=True)
+
+    async def get(self, digest: str, ttl: Optional[int] = None) -> Optional[bytes]:
+        return await asyncio.to_thread(self.get_sync, digest, ttl)
+
+    async def put(self, digest: str, data: bytes) -> None:
+        await asyncio.to_thread(self.put_sync, digest, data)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "mem_entries": len(self._mem),
+            "mem_bytes": self._mem_bytes,
+            "disk_entries": len(self._disk or {}),
+            "disk_bytes": self._disk_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+render_cache = RenderCache()
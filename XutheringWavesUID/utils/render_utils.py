@@ -1,9 +1,12 @@
+import time
+import heapq
 import base64
 import asyncio
-import time
 import logging
-from typing import Union, Optional
+import itertools
+from typing import Dict, List, Tuple, Union, Optional
 from pathlib import Path
+from collections import deque
 
 import httpx
 
@@ -12,6 +15,8 @@ from gsuid_core.logger import logger
 from gsuid_core.config import core_config, CONFIG_DEFAULT
 from gsuid_core.app_life import app as fastapi_app
 from fastapi.staticfiles import StaticFiles
+from .http_pool import get_client
+from .render_cache import render_cache, render_digest
 from .resource.RESOURCE_PATH import TEMP_PATH
 from ..wutheringwaves_config.wutheringwaves_config import WutheringWavesConfig
 from ..wutheringwaves_config.config_default import CONFIG_DEFAULT as WW_CONFIG_DEFAULT
@@ -56,8 +61,9 @@ _active_renders = 0
 _MAX_BROWSER_USES = 1000
 _BROWSER_IDLE_TTL = 3600
 
-# Page pool for reuse (avoids context/page creation overhead per render)
-_page_pool: asyncio.Queue = asyncio.Queue()
+# Page pool for reuse, keyed by the template a page last rendered (avoids
+# context/page creation overhead per render; same-template pages keep warm caches)
+_idle_pages: Dict[str, List[Tuple[object, int]]] = {}
 _pool_ctx = None
 _pool_generation = 0  # Incremented on browser restart to invalidate stale pages
 
@@ -138,11 +144,7 @@ async def _ensure_browser():
             _pool_ctx = None
             _pool_generation += 1
             # Drain stale pages
-            while not _page_pool.empty():
-                try:
-                    _page_pool.get_nowait()
-                except asyncio.QueueEmpty:
-                    break
+            _idle_pages.clear()
 
             if _playwright is None:
                 _playwright = await async_playwright().start()
@@ -156,11 +158,112 @@ async def _ensure_browser():
         return _browser
 
 
+def _max_pages() -> int:
+    return max(1, int(WutheringWavesConfig.get_config("RenderMaxPages").data or 1))
+
+
+def _queue_timeout() -> float:
+    return float(WutheringWavesConfig.get_config("RenderQueueTimeout").data or 30)
+
+
+def _percentile(samples, q: float) -> float:
+    if not samples:
+        return 0.0
+    data = sorted(samples)
+    return data[min(len(data) - 1, int(len(data) * q))]
+
+
+class RenderScheduler:
+    """本地渲染并发闸门: 同时渲染的页面数不超过 RenderMaxPages。
+
+    超出的请求进等待队列, 按 (priority, 到达顺序) 出队 (priority 越小越先),
+    等待超过 RenderQueueTimeout 秒放弃。释放时槽位直接转交队首, 不会被插队。
+    """
+
+    def __init__(self):
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self.active = 0
+        self.timeouts = 0
+        self.wait_ms: deque = deque(maxlen=500)
+        self.render_ms: deque = deque(maxlen=500)
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for *_, fut in self._waiters if not fut.done())
+
+    async def acquire(self, priority: int = 0, timeout: Optional[float] = None) -> None:
+        t0 = time.perf_counter()
+        if self.active < _max_pages() and not self.queue_depth:
+            self.active += 1
+            self.wait_ms.append(0.0)
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        try:
+            await asyncio.wait_for(fut, timeout)
+        except BaseException as e:
+            if fut.done() and not fut.cancelled():
+                self.release()  # 槽位已转交过来, 归还
+            if not fut.done():
+                fut.cancel()
+            self._waiters = [w for w in self._waiters if not w[2].done()]
+            heapq.heapify(self._waiters)
+            if isinstance(e, asyncio.TimeoutError):
+                self.timeouts += 1
+            raise
+        self.wait_ms.append((time.perf_counter() - t0) * 1000)
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(True)  # active 不变, 直接转交
+                return
+        self.active = max(0, self.active - 1)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "active": self.active,
+            "queue": self.queue_depth,
+            "idle_pages": sum(len(v) for v in _idle_pages.values()),
+            "timeouts": self.timeouts,
+            "wait_p50_ms": _percentile(self.wait_ms, 0.5),
+            "wait_p95_ms": _percentile(self.wait_ms, 0.95),
+            "render_p50_ms": _percentile(self.render_ms, 0.5),
+            "render_p95_ms": _percentile(self.render_ms, 0.95),
+        }
+
+
+render_scheduler = RenderScheduler()
+
+
+def get_render_stats() -> Dict[str, float]:
+    return render_scheduler.stats()
+
+
 _pool_lock = asyncio.Lock()
 
 
-async def _acquire_page():
-    """Get a reusable page from the pool, or create a new one."""
+async def _warm_page(page) -> None:
+    """新页面先加载一次字体 CSS, 后续 set_content 走内存缓存。"""
+    try:
+        font_css_path = _FONTS_DIR / _FONT_CSS_NAME
+        if font_css_path.exists():
+            css_url = f"{_get_local_base_url()}/waves/fonts/{_FONT_CSS_NAME}"
+        else:
+            css_url = _get_font_css_url()
+        await page.set_content(
+            f'<html><head><link rel="stylesheet" href="{css_url}"></head><body></body></html>',
+            wait_until="load",
+            timeout=5000,
+        )
+    except Exception as e:
+        logger.debug(f"[鸣潮·渲染工具] 页面预热失败: {e}")
+
+
+async def _acquire_page(template_name: str = ""):
+    """取一个空闲页 (优先上次渲染同模板的), 没有则新建。调用方须已持有调度槽位。"""
     global _pool_ctx, _active_renders
 
     browser = await _ensure_browser()
@@ -170,15 +273,19 @@ async def _acquire_page():
     async with _pool_lock:
         gen = _pool_generation
 
-        # Try to reuse a pooled page
-        while not _page_pool.empty():
-            try:
-                page, page_gen = _page_pool.get_nowait()
+        # 同模板优先, 其次任意空闲页
+        buckets = [template_name] + [k for k in _idle_pages if k != template_name]
+        for key in buckets:
+            pages = _idle_pages.get(key)
+            while pages:
+                page, page_gen = pages.pop()
                 if page_gen == gen and not page.is_closed():
                     _active_renders += 1
                     return page, gen
-            except asyncio.QueueEmpty:
-                break
+                try:
+                    await page.close()
+                except Exception:
+                    pass
 
         # Create shared context if needed (rare, only first time)
         ctx_closed = _pool_ctx is None
@@ -193,22 +300,24 @@ async def _acquire_page():
                 viewport={"width": 1200, "height": 1000}
             )
 
-    # Create page outside lock — allows parallel page creation
+    # 页数已由调度器限住, 锁外创建即可
     page = await _pool_ctx.new_page()
+    await _warm_page(page)
     _active_renders += 1
-    return page, _pool_generation
+    return page, gen
 
 
-async def _release_page(page, gen: int):
-    """Return a page to the pool for reuse, or discard if stale."""
+async def _release_page(page, gen: int, template_name: str = ""):
+    """Return a page to the pool for reuse, or discard if stale / pool is full."""
     global _active_renders, _browser_uses, _last_used
 
     _active_renders = max(0, _active_renders - 1)
     _browser_uses += 1
     _last_used = time.monotonic()
 
-    if gen == _pool_generation and not page.is_closed():
-        await _page_pool.put((page, gen))
+    idle = sum(len(v) for v in _idle_pages.values())
+    if gen == _pool_generation and not page.is_closed() and idle < _max_pages():
+        _idle_pages.setdefault(template_name, []).append((page, gen))
     else:
         try:
             await page.close()
@@ -222,22 +331,23 @@ async def _render_via_remote(html_content: str, remote_url: str) -> Optional[byt
     try:
         logger.debug(f"[鸣潮·渲染工具] 尝试使用外置渲染服务: {remote_url}")
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                remote_url,
-                json={"html": html_content},
-                headers={"Content-Type": "application/json"}
-            )
+        client = get_client(remote_url)
+        response = await client.post(
+            remote_url,
+            json={"html": html_content},
+            headers={"Content-Type": "application/json"},
+            timeout=60.0,
+        )
 
-            if response.status_code == 200:
-                image_data = response.content
-                elapsed_time = time.time() - start_time
-                html_kb = len(html_content) / 1024
-                logger.info(f"[鸣潮·渲染工具] 外置渲染成功，耗时: {elapsed_time:.2f}s，HTML大小: {html_kb:.1f}KB，图片大小: {len(image_data)} bytes")
-                return image_data
-            else:
-                logger.warning(f"[鸣潮·渲染工具] 外置渲染失败，状态码: {response.status_code}, 错误: {response.text}")
-                return None
+        if response.status_code == 200:
+            image_data = response.content
+            elapsed_time = time.time() - start_time
+            html_kb = len(html_content) / 1024
+            logger.info(f"[鸣潮·渲染工具] 外置渲染成功，耗时: {elapsed_time:.2f}s，HTML大小: {html_kb:.1f}KB，图片大小: {len(image_data)} bytes")
+            return image_data
+        else:
+            logger.warning(f"[鸣潮·渲染工具] 外置渲染失败，状态码: {response.status_code}, 错误: {response.text}")
+            return None
     except httpx.TimeoutException:
         elapsed_time = time.time() - start_time
         logger.warning(f"[鸣潮·渲染工具] 外置渲染超时 ({elapsed_time:.2f}s)，将回退到本地渲染")
@@ -248,7 +358,40 @@ async def _render_via_remote(html_content: str, remote_url: str) -> Optional[byt
         return None
 
 
-async def render_html(waves_templates, template_name: str, context: dict) -> Optional[bytes]:
+async def render_html(
+    waves_templates,
+    template_name: str,
+    context: dict,
+    priority: int = 0,
+    cache: Union[bool, int] = False,
+) -> Optional[bytes]:
+    """cache: False 不走输出缓存; True 按模板+上下文内容寻址缓存; int 为 TTL 秒 (用户数据卡片)。"""
+    if not cache:
+        return await _render_html(waves_templates, template_name, context, priority)
+
+    try:
+        template = waves_templates.get_template(template_name)
+        search_paths = getattr(waves_templates.loader, "searchpath", None) or ()
+        digest = render_digest(template_name, template.filename, context, search_paths)
+    except Exception as e:
+        logger.warning(f"[鸣潮·渲染工具] 渲染缓存 key 计算失败 {template_name}: {e}")
+        return await _render_html(waves_templates, template_name, context, priority)
+
+    ttl = None if cache is True else int(cache)
+    hit = await render_cache.get(digest, ttl)
+    if hit is not None:
+        logger.debug(f"[鸣潮·渲染工具] 渲染缓存命中: {template_name} {digest[:12]}")
+        return hit
+
+    res = await _render_html(waves_templates, template_name, context, priority)
+    if res:
+        await render_cache.put(digest, res)
+    return res
+
+
+async def _render_html(
+    waves_templates, template_name: str, context: dict, priority: int = 0
+) -> Optional[bytes]:
 
     try:
         logger.debug(f"[鸣潮·渲染工具] HTML渲染开始: {template_name}")
@@ -295,11 +438,19 @@ async def render_html(waves_templates, template_name: str, context: dict) -> Opt
 
         logger.debug(f"[鸣潮·渲染工具] 使用本地 Playwright 渲染")
 
+        try:
+            await render_scheduler.acquire(priority, _queue_timeout())
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"[鸣潮·渲染工具] 渲染排队超时: {template_name} | {render_scheduler.stats()}"
+            )
+            return None
+
         local_start_time = time.time()
         page, gen = None, -1
         try:
             t0 = time.perf_counter()
-            page, gen = await _acquire_page()
+            page, gen = await _acquire_page(template_name)
             if page is None:
                 return None
             t_acquire = time.perf_counter() - t0
@@ -334,12 +485,16 @@ async def render_html(waves_templates, template_name: str, context: dict) -> Opt
             t_screenshot = time.perf_counter() - t0
 
             render_time = time.time() - local_start_time
+            render_scheduler.render_ms.append(render_time * 1000)
             html_mb = len(html_content) / 1024 / 1024
             reused = "复用" if t_acquire < 0.01 else "新建"
+            stats = render_scheduler.stats()
             logger.info(
                 f"[鸣潮·渲染工具] 渲染完成({reused}) {render_time:.2f}s | "
                 f"传输HTML({html_mb:.1f}MB)={t_content*1000:.0f}ms "
-                f"布局={t_layout*1000:.0f}ms 截图={t_screenshot*1000:.0f}ms"
+                f"布局={t_layout*1000:.0f}ms 截图={t_screenshot*1000:.0f}ms | "
+                f"排队={stats['queue']} 等待p95={stats['wait_p95_ms']:.0f}ms "
+                f"渲染p50/p95={stats['render_p50_ms']:.0f}/{stats['render_p95_ms']:.0f}ms"
             )
             return screenshot
         except Exception as e:
@@ -352,8 +507,11 @@ async def render_html(waves_templates, template_name: str, context: dict) -> Opt
                 page = None
             raise e
         finally:
-            if page is not None:
-                await _release_page(page, gen)
+            try:
+                if page is not None:
+                    await _release_page(page, gen, template_name)
+            finally:
+                render_scheduler.release()
 
     except Exception as e:
         logger.error(f"[鸣潮·渲染工具] HTML渲染失败: {e}")
@@ -246,6 +246,7 @@ async def reload_all_modules():
     from ..calc import reload_wuwacalc_module
     from ..damage.damage import reload_damage_module
     from ...wutheringwaves_wiki.char_wiki_render import clear_wiki_cache
+    from ...wutheringwaves_rank.rank_index import reset_calc_version
 
     # 在下载完成后强制加载所有数据
     ensure_name_convert_loaded(force=True)
@@ -257,6 +258,7 @@ async def reload_all_modules():
     reload_wuwacalc_module()
     reload_damage_module()
     reload_all_register()
+    reset_calc_version()
     clear_wiki_cache()
     card_list = await load_limit_user_card()
     if card_list:
@@ -10,11 +10,11 @@ from pathlib import Path
 from typing import Any, Dict, List, TypeVar, Callable, Optional, Coroutine, overload
 from functools import wraps
 
-import httpx
-
 from gsuid_core.logger import logger
 from gsuid_core.subscribe import gs_subscribe
 
+from .http_pool import get_client
+
 
 def timed_async_cache(expiration, condition=lambda x: True, key=None):
     def decorator(func):
@@ -144,31 +144,18 @@ def async_func_lock(
 # 使用示例
 @timed_async_cache(86400)
 async def get_public_ip(host="127.127.127.127"):
-    try:
-        async with httpx.AsyncClient() as client:
-            r = await client.get("https://event.kurobbs.com/event/ip", timeout=4)
-            ip = r.text
-            return ip
-    except Exception:
-        pass
-
-    # 尝试从 ipify 获取 IP 地址
-    try:
-        async with httpx.AsyncClient() as client:
-            r = await client.get("https://api.ipify.org/?format=json", timeout=4)
-            ip = r.json()["ip"]
-            return ip
-    except Exception:
-        pass
-
-    # 尝试从 httpbin.org 获取 IP 地址
-    try:
-        async with httpx.AsyncClient() as client:
-            r = await client.get("https://httpbin.org/ip", timeout=4)
-            ip = r.json()["origin"]
-            return ip
-    except Exception:
-        pass
+    # 依次尝试库街区 / ipify / httpbin, 走共享连接池
+    sources = (
+        ("https://event.kurobbs.com/event/ip", lambda r: r.text),
+        ("https://api.ipify.org/?format=json", lambda r: r.json()["ip"]),
+        ("https://httpbin.org/ip", lambda r: r.json()["origin"]),
+    )
+    for url, parse in sources:
+        try:
+            r = await get_client(url).get(url, timeout=4)
+            return parse(r)
+        except Exception:
+            pass
 
     return host
 
@@ -1,23 +1,34 @@
 import json
 import re
+import asyncio
+import hashlib
+import threading
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from gsuid_core.aps import scheduler
 from gsuid_core.logger import logger
+from gsuid_core.server import on_core_start
 from gsuid_core.ai_core.models import ImageEntity, KnowledgePoint
 from gsuid_core.ai_core.register import ai_alias, ai_entity, ai_image
 
 from ..utils.resource.RESOURCE_PATH import (
     GUIDE_PATH,
+    MAIN_PATH,
     MAP_PATH,
     MAP_DETAIL_PATH,
     MAP_CHALLENGE_PATH,
 )
 from ..utils.resource.constant import ATTRIBUTE_ID_MAP, WEAPON_TYPE_ID_MAP
 from ..utils.util import format_with_defaults
+from ..utils.plugin_checker import waves_entry
 
 HELP_JSON_PATH = Path(__file__).parent.parent / "wutheringwaves_help" / "help.json"
+# 上次注册的 KP/图片/别名快照 + 上次确认写进向量库的内容哈希与库状态;
+# 启动时先用快照恢复注册, 重建后据哈希与库状态判断是否需要同步
+MANIFEST_PATH = MAIN_PATH / "ai_rag_manifest.json"
+STORE_READY = "ready"  # 向量库里能检索到本插件条目
+STORE_EMPTY = "empty"  # 新库 / 被清空 / 刚启用 AI
 
 # 这些 section 下的命令带副作用，KP 里追加"AI 不可代为执行"提示
 _WRITE_HELP_SECTIONS = {
@@ -57,10 +68,51 @@ def _strip(s: Any) -> str:
     return _HTML_RE.sub("", str(s)).strip()
 
 
+def _content_hash(obj: Any) -> str:
+    raw = json.dumps(obj, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class _Staged:
+    """工作线程重建时暂存的注册项; 回到事件循环后由 _apply 一次性装入 core 的全局注册表。"""
+
+    def __init__(self):
+        self.entities: List[KnowledgePoint] = []
+        self.images: List[ImageEntity] = []
+        self.aliases: List[Tuple[str, List[str]]] = []
+
+
+_staging = threading.local()
+
+
+def _entity(kp: KnowledgePoint):
+    staged = getattr(_staging, "build", None)
+    if staged is None:
+        ai_entity(kp)
+    else:
+        staged.entities.append(kp)
+
+
+def _image(img: ImageEntity):
+    staged = getattr(_staging, "build", None)
+    if staged is None:
+        ai_image(img)
+    else:
+        staged.images.append(img)
+
+
+def _alias(main: str, rest: List[str]):
+    staged = getattr(_staging, "build", None)
+    if staged is None:
+        ai_alias(main, rest)
+    else:
+        staged.aliases.append((main, rest))
+
+
 def _kp(eid: str, title: str, content: str, tags: List[str]) -> KnowledgePoint:
     return KnowledgePoint(
         id=eid, plugin=PLUGIN, title=title, content=content,
-        tags=tags, source="plugin", _hash="",
+        tags=tags, source="plugin", _hash=_content_hash([title, content, tags]),
     )
 
 
@@ -180,7 +232,7 @@ def _register_chars(aliases: Dict[str, List[str]]) -> List[Tuple]:
             for k in _sorted_keys(chains):
                 c = chains[k]
                 profile.append(f"- 第{k}链 {c.get('name', '?')}: {_strip(c.get('desc'))}")
-        ai_entity(_kp(f"ww_char_{cid}_profile", f"{name} 角色档案",
+        _entity(_kp(f"ww_char_{cid}_profile", f"{name} 角色档案",
                       "\n".join(profile), tags + ["共鸣链", "档案", "玩法定位", "机制"]))
 
         skill_lines = [f"# {name} 技能与天赋"]
@@ -190,7 +242,7 @@ def _register_chars(aliases: Dict[str, List[str]]) -> List[Tuple]:
             if not sk_name and not sk_desc:
                 continue
             skill_lines.append(f"\n## [{sk_type or '技能'}] {sk_name or '?'}\n{sk_desc}")
-        ai_entity(_kp(f"ww_char_{cid}_skill", f"{name} 技能与天赋",
+        _entity(_kp(f"ww_char_{cid}_skill", f"{name} 技能与天赋",
                       "\n".join(skill_lines), tags + ["技能", "天赋"]))
 
         summary.append((cid, name, star, attr, wt))
@@ -233,7 +285,7 @@ def _register_weapons(aliases: Dict[str, List[str]]) -> List[Tuple]:
                 if isinstance(row, list) and row:
                     parts.append(f"- 参数{i}: {' / '.join(str(x) for x in row)}")
 
-        ai_entity(_kp(f"ww_weapon_{wid}", f"{name} 武器", "\n".join(parts),
+        _entity(_kp(f"ww_weapon_{wid}", f"{name} 武器", "\n".join(parts),
                       tags + ["谐振", "数值表"]))
         summary.append((wid, name, star, wtype))
     return summary
@@ -280,7 +332,7 @@ def _register_echoes(aliases: Dict[str, List[str]]):
         if cost is not None:
             tags.extend([f"cost{cost}", f"{cost}费"])
 
-        ai_entity(_kp(f"ww_echo_{eid}", f"{name} 声骸", "\n".join(lines), tags))
+        _entity(_kp(f"ww_echo_{eid}", f"{name} 声骸", "\n".join(lines), tags))
 
 
 def _register_sonatas(aliases: Dict[str, List[str]]):
@@ -294,7 +346,7 @@ def _register_sonatas(aliases: Dict[str, List[str]]):
             lines.append(f"- 别名：{', '.join(alias_list)}")
         for k in _sorted_keys(sets):
             lines.append(f"\n## {k}件套\n{_strip(sets[k])}")
-        ai_entity(_kp(f"ww_sonata_{sid}", f"{name} 合鸣套装", "\n".join(lines), tags))
+        _entity(_kp(f"ww_sonata_{sid}", f"{name} 合鸣套装", "\n".join(lines), tags))
 
 
 def _period_label(num: int, current: int) -> Tuple[str, List[str]]:
@@ -360,7 +412,7 @@ def _register_tower(monster_index: Dict[str, List[str]]):
                     for m in ms.values():
                         n = m.get("Name", "?")
                         monster_index.setdefault(n, []).append(f"深塔第{tid}期-区域{area_k}-第{fk}层")
-        ai_entity(_kp(f"ww_tower_{tid}", f"鸣潮逆境深塔 第{tid}期", "\n".join(lines),
+        _entity(_kp(f"ww_tower_{tid}", f"鸣潮逆境深塔 第{tid}期", "\n".join(lines),
                       ["深塔", "逆境深塔", "Tower of Adversity",
                        "鸣潮", "高难度", "爬塔",
                        f"第{tid}期", tid, *extra_tags]))
@@ -392,7 +444,7 @@ def _register_slash():
             if not isinstance(it, dict):
                 continue
             lines.append(f"- {it.get('Name', '?')}: {_strip(it.get('Desc'))}")
-        ai_entity(_kp(f"ww_slash_{sid}", f"冥歌海墟 第{sid}期", "\n".join(lines),
+        _entity(_kp(f"ww_slash_{sid}", f"冥歌海墟 第{sid}期", "\n".join(lines),
                       ["海墟", "冥歌海墟", f"第{sid}期", sid, *extra_tags]))
 
 
@@ -504,7 +556,7 @@ def _register_matrix(monster_index: Dict[str, List[str]]):
         tags.extend(level_names)
         tags.extend(monster_names)
 
-        ai_entity(_kp(
+        _entity(_kp(
             f"ww_matrix_{mid}",
             f"鸣潮全息矩阵 第{mid}期 {name}",
             "\n".join(lines),
@@ -517,19 +569,19 @@ def _register_summary(chars: List[Tuple], weapons: List[Tuple], monsters: Dict[s
         lines = ["# 鸣潮全角色一览", "", "| ID | 名字 | 星级 | 属性 | 武器 |", "|---|---|---|---|---|"]
         for cid, name, star, attr, wt in chars:
             lines.append(f"| {cid} | {name} | {star}★ | {attr} | {wt} |")
-        ai_entity(_kp("ww_summary_chars", "鸣潮全角色一览", "\n".join(lines),
+        _entity(_kp("ww_summary_chars", "鸣潮全角色一览", "\n".join(lines),
                       ["角色", "汇总", "统计", "全角色"]))
     if weapons:
         lines = ["# 鸣潮全武器一览", "", "| ID | 名字 | 星级 | 类型 |", "|---|---|---|---|"]
         for wid, name, star, wt in weapons:
             lines.append(f"| {wid} | {name} | {star}★ | {wt} |")
-        ai_entity(_kp("ww_summary_weapons", "鸣潮全武器一览", "\n".join(lines),
+        _entity(_kp("ww_summary_weapons", "鸣潮全武器一览", "\n".join(lines),
                       ["武器", "汇总", "统计", "全武器"]))
     if monsters:
         lines = ["# 鸣潮怪物索引（出场记录）", ""]
         for n in sorted(monsters):
             lines.append(f"- **{n}**: " + "; ".join(monsters[n]))
-        ai_entity(_kp("ww_summary_monsters", "鸣潮怪物索引", "\n".join(lines),
+        _entity(_kp("ww_summary_monsters", "鸣潮怪物索引", "\n".join(lines),
                       ["敌人", "怪物", "汇总", "索引"]))
 
 
@@ -537,7 +589,7 @@ def _register_aliases(d: Dict[str, List[str]]):
     for main, lst in d.items():
         rest = [a for a in (lst or []) if a and a != main]
         if rest:
-            ai_alias(main, rest)
+            _alias(main, rest)
 
 
 def _register_period_indexes() -> int:
@@ -565,7 +617,7 @@ def _register_period_indexes() -> int:
         ]
         for e in tower:
             lines.append(f"| {e['period']} | {e['begin'] or '-'} | {e['end'] or '-'} |")
-        ai_entity(_kp(
+        _entity(_kp(
             "ww_period_index_tower",
             "鸣潮深塔期数-日期索引表",
             "\n".join(lines),
@@ -588,7 +640,7 @@ def _register_period_indexes() -> int:
         ]
         for e in slash:
             lines.append(f"| {e['period']} | {e['begin'] or '-'} | {e['end'] or '-'} |")
-        ai_entity(_kp(
+        _entity(_kp(
             "ww_period_index_slash",
             "鸣潮海墟期数-日期索引表",
             "\n".join(lines),
@@ -614,7 +666,7 @@ def _register_period_indexes() -> int:
                 f"| {e['period']} | {e['name'] or '-'} | "
                 f"{e['season_name'] or '-'} | {e['end_version'] or '-'} |"
             )
-        ai_entity(_kp(
+        _entity(_kp(
             "ww_period_index_matrix",
             "鸣潮矩阵期数-版本索引表",
             "\n".join(lines),
@@ -684,7 +736,7 @@ def _register_help_commands() -> int:
             if is_write:
                 tags.append("副作用")
 
-            ai_entity(_kp(
+            _entity(_kp(
                 f"ww_help_{section}_{cmd_name}",
                 f"鸣潮命令: {cmd_name}",
                 "\n".join(content_lines),
@@ -739,7 +791,7 @@ def _register_guides(char_meta: Dict[str, Dict]) -> int:
                 f"{char_name} 的「{author_zh}」攻略图。"
                 "通常包含推荐声骸 / 武器 / 共鸣链优先级 / 技能加点 / 伤害分析 / 配队思路等内容。"
             )
-            ai_image(ImageEntity(
+            _image(ImageEntity(
                 id=f"ww_guide_{author_dir.name}_{char_name}",
                 plugin=PLUGIN,
                 path=str(img),
@@ -751,12 +803,39 @@ def _register_guides(char_meta: Dict[str, Dict]) -> int:
     return count
 
 
-def register_all():
-    # 先清旧实体: 即便资源缺失也得把上一次留下的 KP/Image 清掉, 避免向量库残留过期条目。
+def register_all() -> Dict[str, Dict[str, List[str]]]:
+    """从资源重建本插件全部 KP/攻略图/别名, 返回注册的别名表 (写入快照用)。"""
+    staged, aliases = _build_all()
+    _apply(staged)
+    return aliases
+
+
+def _build_all() -> Tuple[_Staged, Dict[str, Dict[str, List[str]]]]:
+    """读资源构建全部注册项, 只写入暂存, 不碰 core 的全局注册表, 可在工作线程执行。"""
+    staged = _Staged()
+    _staging.build = staged
+    try:
+        return staged, _build_entries()
+    finally:
+        _staging.build = None
+
+
+def _apply(staged: _Staged):
+    """在事件循环线程调用: 清掉本插件旧条目再装入新条目, 期间没有 await, 处理函数看不到半成品。
+    即便资源缺失 (暂存为空) 也会清掉上一次留下的 KP/Image, 避免向量库残留过期条目。"""
     _clear_self_entries()
+    for kp in staged.entities:
+        ai_entity(kp)
+    for img in staged.images:
+        ai_image(img)
+    for main, rest in staged.aliases:
+        ai_alias(main, rest)
+
+
+def _build_entries() -> Dict[str, Dict[str, List[str]]]:
     if not MAP_DETAIL_PATH.exists():
         logger.warning(f"[鸣潮·AI-RAG] {MAP_DETAIL_PATH} 不存在，跳过 wiki 注册")
-        return
+        return {}
     aliases = {
         "char": _load_alias("char_alias.json"),
         "weapon": _load_alias("weapon_alias.json"),
@@ -789,30 +868,169 @@ def register_all():
         f"| 怪物索引 {len(monsters)} | 攻略图 {guide_count} 张 "
         f"| 帮助命令 {help_count} 条 | 期数索引 {period_count} 条"
     )
+    return aliases
 
 
-async def reload_ai_rag():
-    """资源下载后调用：重新注册 + 推送向量库同步。AI 未启用时自动 no-op。
-    register_all 中途失败时回滚到旧实体状态, 避免内存里残留半成品。
-    sync_knowledge 单独 try/except, 失败不影响 in-memory 已注册的新实体。"""
+def _own_entries() -> Tuple[List[Dict], List[Dict]]:
     from gsuid_core.ai_core.register import _ENTITIES, _IMAGE_ENTITIES
-    own_entities_backup = [e for e in _ENTITIES if e.get("plugin") == PLUGIN]
-    own_images_backup = [e for e in _IMAGE_ENTITIES if e.get("plugin") == PLUGIN]
+    return (
+        [dict(e) for e in _ENTITIES if e.get("plugin") == PLUGIN],
+        [dict(e) for e in _IMAGE_ENTITIES if e.get("plugin") == PLUGIN],
+    )
+
+
+def _image_hash(img: Dict) -> str:
+    # 同路径换图也要重新同步: 带上文件 mtime
     try:
-        register_all()
+        mtime = Path(img.get("path", "")).stat().st_mtime_ns
+    except OSError:
+        mtime = 0
+    return _content_hash([img, mtime])
+
+
+def _entry_hashes(entities: List[Dict], images: List[Dict], aliases: Dict) -> Dict[str, str]:
+    hashes = {f"kp:{e.get('id')}": e.get("_hash") or _content_hash(e) for e in entities}
+    hashes.update({f"img:{e.get('id')}": _image_hash(e) for e in images})
+    hashes["alias"] = _content_hash(aliases)
+    return hashes
+
+
+def _load_manifest() -> Optional[Dict[str, Any]]:
+    if not MANIFEST_PATH.exists():
+        return None
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
     except Exception as e:
-        _clear_self_entries()
-        _ENTITIES.extend(own_entities_backup)
-        _IMAGE_ENTITIES.extend(own_images_backup)
-        logger.warning(f"[鸣潮·AI-RAG] register_all 失败, 已回滚到旧实体状态: {e}")
-        return
+        logger.warning(f"[鸣潮·AI-RAG] 同步清单读取失败, 将全量同步: {e}")
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _save_manifest(
+    entities: List[Dict],
+    images: List[Dict],
+    aliases: Dict,
+    hashes: Dict[str, str],
+    store: Optional[str],
+):
+    """hashes/store 只记确认写进向量库的状态; 没同步成时传上一份清单里的值。"""
+    tmp = MANIFEST_PATH.with_name(MANIFEST_PATH.name + ".tmp")
     try:
-        from . import tools as _tools  # noqa: F401
-        _tools.invalidate_caches()
-        from gsuid_core.ai_core.rag.knowledge import sync_knowledge
-        await sync_knowledge()
+        MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {"hashes": hashes, "store": store, "entities": entities, "images": images, "aliases": aliases},
+                f, ensure_ascii=False, default=str,
+            )
+        tmp.replace(MANIFEST_PATH)
     except Exception as e:
-        logger.warning(f"[鸣潮·AI-RAG] 缓存失效/向量同步失败 (in-memory 已生效): {e}")
+        logger.warning(f"[鸣潮·AI-RAG] 同步清单写入失败: {e}")
+        tmp.unlink(missing_ok=True)
+
+
+def _diff_hashes(old: Dict[str, str], new: Dict[str, str]) -> Tuple[List[str], List[str], List[str]]:
+    added = [k for k in new if k not in old]
+    changed = [k for k in new if k in old and old[k] != new[k]]
+    removed = [k for k in old if k not in new]
+    return added, changed, removed
+
+
+def _restore_from_manifest() -> bool:
+    """导入时用上次快照恢复注册 (只读一个 JSON), 资源重建放到后台任务。"""
+    manifest = _load_manifest()
+    if not manifest or not manifest.get("entities"):
+        return False
+    from gsuid_core.ai_core.register import _ENTITIES, _IMAGE_ENTITIES
+    _clear_self_entries()
+    _ENTITIES.extend(manifest.get("entities", []))
+    _IMAGE_ENTITIES.extend(manifest.get("images", []))
+    for a in (manifest.get("aliases") or {}).values():
+        _register_aliases(a)
+    return True
+
+
+async def _store_state(entities: List[Dict]) -> Optional[str]:
+    """用本插件一条 KP 的标题检索向量库, 判断库里是否已有本插件条目。
+    rag 模块不可用或检索出错 (AI 未启用 / 向量库未就绪) 返回 None, 此时不同步也不记清单。"""
+    try:
+        from gsuid_core.ai_core.rag import query_knowledge
+    except ImportError:
+        return None
+    query = next((e.get("title") for e in entities if e.get("title")), PLUGIN)
+    try:
+        points = await query_knowledge(query=query, limit=1, plugin_filter=[PLUGIN])
+    except Exception as e:
+        logger.debug(f"[鸣潮·AI-RAG] 向量库检索失败, 视为 AI 未就绪: {e}")
+        return None
+    return STORE_READY if points else STORE_EMPTY
+
+
+_reload_lock = asyncio.Lock()
+
+
+async def reload_ai_rag():
+    """重新注册 + 按内容哈希增量推送向量库。
+    读资源构建注册项在工作线程执行 (只写暂存), 回到事件循环再替换进 core 的全局注册表;
+    构建失败时全局注册表不受影响, 替换中途失败则回滚到旧实体状态。
+    同步前先探测向量库 (_store_state): AI 未就绪则不同步; 库里没有本插件条目 (新库/清空/刚启用 AI)
+    则不论哈希全量同步; 否则与清单比对, 没有新增/变更/删除就跳过。
+    清单的哈希只在同步后复查到库里有本插件条目时才更新, 快照 (实体/图片/别名) 每次注册后都写。
+    sync_knowledge 单独 try/except, 失败不影响 in-memory 已注册的新实体。"""
+    from gsuid_core.ai_core.register import _ENTITIES, _IMAGE_ENTITIES
+    async with _reload_lock:
+        try:
+            staged, aliases = await asyncio.to_thread(_build_all)
+        except Exception as e:
+            logger.warning(f"[鸣潮·AI-RAG] 重建注册项失败, 保留旧实体: {e}")
+            return
+        own_entities_backup = [e for e in _ENTITIES if e.get("plugin") == PLUGIN]
+        own_images_backup = [e for e in _IMAGE_ENTITIES if e.get("plugin") == PLUGIN]
+        try:
+            _apply(staged)
+        except Exception as e:
+            _clear_self_entries()
+            _ENTITIES.extend(own_entities_backup)
+            _IMAGE_ENTITIES.extend(own_images_backup)
+            logger.warning(f"[鸣潮·AI-RAG] 注册失败, 已回滚到旧实体状态: {e}")
+            return
+
+        entities, images = _own_entries()
+        hashes = await asyncio.to_thread(_entry_hashes, entities, images, aliases)
+        manifest = _load_manifest() or {}
+        synced_hashes = manifest.get("hashes") or {}
+        synced_store = manifest.get("store")
+        added, changed, removed = _diff_hashes(synced_hashes, hashes)
+        try:
+            from . import tools as _tools  # noqa: F401
+            _tools.invalidate_caches()
+        except Exception as e:
+            logger.warning(f"[鸣潮·AI-RAG] 工具缓存失效失败: {e}")
+
+        store = await _store_state(entities)
+        if store is None:
+            logger.info("[鸣潮·AI-RAG] AI 未启用或向量库未就绪, 跳过向量同步")
+        elif store == STORE_READY and synced_store == STORE_READY and not (added or changed or removed):
+            logger.info("[鸣潮·AI-RAG] 知识内容无变化, 跳过向量同步")
+            return
+        else:
+            if store == STORE_EMPTY:
+                logger.info(f"[鸣潮·AI-RAG] 向量库中没有本插件条目, 全量同步 {len(hashes)} 项")
+            else:
+                logger.info(
+                    f"[鸣潮·AI-RAG] 增量同步: 新增 {len(added)} | 变更 {len(changed)} | 删除 {len(removed)}"
+                )
+            try:
+                from gsuid_core.ai_core.rag.knowledge import sync_knowledge
+                await sync_knowledge()
+            except Exception as e:
+                logger.warning(f"[鸣潮·AI-RAG] 向量同步失败 (in-memory 已生效): {e}")
+            else:
+                if await _store_state(entities) == STORE_READY:
+                    synced_hashes, synced_store = hashes, STORE_READY
+                else:
+                    logger.warning("[鸣潮·AI-RAG] 同步后向量库仍检索不到本插件条目, 下次重注册再试")
+        await asyncio.to_thread(_save_manifest, entities, images, aliases, synced_hashes, synced_store)
 
 
 @scheduler.scheduled_job(
@@ -827,7 +1045,21 @@ async def waves_rag_periodic_reload():
     await reload_ai_rag()
 
 
-register_all()
+# 导入时只恢复上次快照, 资源重建与向量同步放到 core 启动后的后台任务
+try:
+    _restore_from_manifest()
+except Exception as _e:
+    logger.warning(f"[鸣潮·AI-RAG] 快照恢复失败, 等待后台重建: {_e}")
+
+_startup_task: Optional[asyncio.Task] = None
+
+
+@on_core_start
+@waves_entry
+async def _start_ai_rag_register():
+    global _startup_task
+    _startup_task = asyncio.create_task(reload_ai_rag())
+
 
 # 触发 tools.py 里的 @ai_tools 装饰器（必须在 register_all 之后，确保 AI 已就绪）
 from . import tools as _tools_module  # noqa: F401, E402
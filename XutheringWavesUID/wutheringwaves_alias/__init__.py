@@ -125,7 +125,7 @@ async def handle_all_char_alias(bot: Bot, ev: Event):
                 "footer_b64": footer_b64,
             }
 
-            img_bytes = await render_html(waves_templates, "alias_all.html", context)
+            img_bytes = await render_html(waves_templates, "alias_all.html", context, cache=True)
             if img_bytes:
                 return await bot.send(img_bytes)
             logger.warning("[鸣潮·别名] 全角色别名HTML渲染返回空，回退到PIL")
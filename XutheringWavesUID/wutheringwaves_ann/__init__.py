@@ -17,6 +17,7 @@ from ..utils.single_flight import SingleFlightLock
 from ..utils.waves_api import waves_api
 from ..utils.hint import error_reply
 from ..utils.at_help import ruser_id
+from ..utils.plugin_checker import waves_entry
 from ..utils.error_reply import WAVES_CODE_102
 from ..utils.constants import WAVES_GAME_ID
 from ..utils.database.models import WavesBind, WavesUser
@@ -491,6 +492,7 @@ async def waves_auto_clean_cache_daily():
 
 
 @on_core_start
+@waves_entry
 async def waves_clean_cache_on_startup():
     """启动时清理一次缓存"""
     await asyncio.sleep(5)
@@ -1,14 +1,29 @@
-"""charinfo 私有的 24h 内存 baseinfo 缓存。"""
+"""charinfo 私有的 baseinfo 内存缓存: 24h TTL + 有界 LRU。
+
+条目数上限 BaseInfoCacheMaxEntries、估算字节上限 BaseInfoCacheMaxMB, 超限从最久未用端淘汰。
+单条字节数只在写入时估算一次, 总量随插入/淘汰增量维护; 过期在读取时惰性剔除,
+另每 _SWEEP_INTERVAL 秒顺带整体扫一遍。
+与 refresh_char_detail.load_base_info_cache / save_base_info_cache (baseInfo.json) 组成两级缓存:
+读先内存后落盘 (落盘命中回填内存), 写同时写两层。
+"""
 import sys
 import time
-from typing import Dict, Optional, Tuple
+from typing import Dict, Tuple, Optional
+from collections import OrderedDict
 
 from gsuid_core.logger import logger
 
 from ..utils.api.model import AccountBaseInfo
+from ..wutheringwaves_config import WutheringWavesConfig
 
 _TTL = 24 * 3600
-_cache: Dict[str, Tuple[float, AccountBaseInfo]] = {}
+_SWEEP_INTERVAL = 600
+
+# uid -> (写入时间, info, 估算字节)
+_cache: "OrderedDict[str, Tuple[float, AccountBaseInfo, int]]" = OrderedDict()
+_total_bytes = 0
+_last_sweep = 0.0
+_counters: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
 
 
 def _entry_bytes(uid: str, info: AccountBaseInfo) -> int:
@@ -28,41 +43,88 @@ def _fmt_bytes(n: int) -> str:
     return f"{n / 1024 / 1024:.2f}MB"
 
 
+def _limits() -> Tuple[int, int]:
+    max_entries = WutheringWavesConfig.get_config("BaseInfoCacheMaxEntries").data or 0
+    max_mb = WutheringWavesConfig.get_config("BaseInfoCacheMaxMB").data or 0
+    return max_entries, max_mb * 1024 * 1024
+
+
+def _drop(uid: str, reason: str) -> None:
+    global _total_bytes
+    entry = _cache.pop(uid, None)
+    if entry is None:
+        return
+    _total_bytes -= entry[2]
+    if reason in _counters:
+        _counters[reason] += 1
+
+
+def _sweep(now: float) -> None:
+    global _last_sweep
+    _last_sweep = now
+    expired = [uid for uid, (ts, _, _) in _cache.items() if now - ts > _TTL]
+    for uid in expired:
+        _drop(uid, "expirations")
+    if expired:
+        logger.debug(f"[鸣潮·角色基础信息缓存] sweep 过期 {len(expired)} 条, entries={len(_cache)} ~{_fmt_bytes(_total_bytes)}")
+
+
+def _maybe_sweep(now: float) -> None:
+    if now - _last_sweep >= _SWEEP_INTERVAL:
+        _sweep(now)
+
+
 def stats() -> Tuple[int, int]:
-    """返回 (条目数, 估算总字节数)。"""
-    total = 0
-    for uid, (_, info) in _cache.items():
-        total += _entry_bytes(uid, info)
-    return len(_cache), total
+    """返回 (条目数, 估算总字节数)。O(1)。"""
+    return len(_cache), _total_bytes
 
 
-def _log_stats(action: str, uid: str) -> None:
-    count, total = stats()
-    logger.debug(
-        f"[鸣潮·角色基础信息缓存] {action} uid={uid} entries={count} ~{_fmt_bytes(total)}"
-    )
+def counters() -> Dict[str, int]:
+    """命中/未命中/淘汰/过期计数 + 当前条目与字节。"""
+    return {**_counters, "entries": len(_cache), "bytes": _total_bytes}
 
 
 def get(uid: str) -> Optional[AccountBaseInfo]:
+    now = time.time()
+    _maybe_sweep(now)
     entry = _cache.get(uid)
     if not entry:
+        _counters["misses"] += 1
         return None
-    ts, info = entry
-    if time.time() - ts > _TTL:
-        _cache.pop(uid, None)
-        _log_stats("expire", uid)
+    ts, info, _ = entry
+    if now - ts > _TTL:
+        _drop(uid, "expirations")
+        _counters["misses"] += 1
         return None
+    _cache.move_to_end(uid)
+    _counters["hits"] += 1
     return info
 
 
 def set(uid: str, info: AccountBaseInfo) -> None:
-    _cache[uid] = (time.time(), info)
-    _log_stats("set", uid)
+    global _total_bytes
+    now = time.time()
+    _maybe_sweep(now)
+    _drop(uid, "")
+    nbytes = _entry_bytes(uid, info)
+    _cache[uid] = (now, info, nbytes)
+    _total_bytes += nbytes
+
+    max_entries, max_bytes = _limits()
+    evicted = 0
+    while len(_cache) > 1 and (
+        (max_entries and len(_cache) > max_entries) or (max_bytes and _total_bytes > max_bytes)
+    ):
+        _drop(next(iter(_cache)), "evictions")
+        evicted += 1
+    if evicted:
+        logger.debug(
+            f"[鸣潮·角色基础信息缓存] 淘汰 {evicted} 条, entries={len(_cache)} ~{_fmt_bytes(_total_bytes)}"
+        )
 
 
 def invalidate(uid: str) -> None:
-    if _cache.pop(uid, None) is not None:
-        _log_stats("invalidate", uid)
+    _drop(uid, "")
 
 
 async def get_or_fetch_account_info(
@@ -78,11 +140,7 @@ async def get_or_fetch_account_info(
     from ..utils.refresh_char_detail import load_base_info_cache, save_base_info_cache
 
     if use_cache and not require_fresh:
-        info = get(target_uid)
-        if info is None:
-            info = await load_base_info_cache(target_uid)
-            if info is not None:
-                set(target_uid, info)
+        info = await load_base_info_cache(target_uid)
         if info is not None:
             return info
 
@@ -93,7 +151,6 @@ async def get_or_fetch_account_info(
         return f"用户未展示数据, 请尝试【{PREFIX}登录】"
     info = AccountBaseInfo.model_validate(api_result.data)
     await save_base_info_cache(target_uid, info)
-    set(target_uid, info)
     return info
 
 
@@ -118,11 +175,7 @@ async def load_account_context(
     from ..utils.refresh_char_detail import load_base_info_cache
 
     if use_cache and not require_fresh and not force_ck:
-        info = get(target_uid)
-        if info is None:
-            info = await load_base_info_cache(target_uid)
-            if info is not None:
-                set(target_uid, info)
+        info = await load_base_info_cache(target_uid)
         if info is not None:
             return info, "", False
 
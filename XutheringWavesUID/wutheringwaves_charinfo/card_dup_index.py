@@ -0,0 +1,328 @@
+"""自定义图查重的感知索引。
+
+每张图一份紧凑描述, 全部存进 CUSTOM_ORB_PATH/dup_index.json:
+  - phash:   ORB 同款预处理后的 64 位 DCT 感知哈希
+  - orbhash: ORB 描述子按固定比特采样成 256 个视觉词, 词频直方图的 64 位 SimHash
+
+条目按 (type, char_id) 分目录, 键为 card_hash_index.compute_hash(文件名), 带 mtime/size, 变动即重算。
+每个目录对两种签名各建一棵 BK-tree, 任一签名汉明距离在半径内的图才进入 ORB 精确比对,
+全库查重 / 上传查重从目录内两两比对降为近邻查询 + 少量校验。
+
+面板编辑器入库/删除经 _index_add/_index_remove 同步; 其它改盘路径在下次查询该目录时按清单自愈。
+改动只标脏, 由 _SAVE_DELAY 秒后的定时器统一落盘 (批量上传/删除合并成一次写文件), 关闭时 flush;
+未落盘就被强杀也无妨, 下次查询按目录清单补算。
+"""
+
+from __future__ import annotations
+
+import os
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple, Optional
+
+from gsuid_core.logger import logger
+from gsuid_core.server import on_core_shutdown
+
+from . import card_hash_index
+from ..utils.resource.RESOURCE_PATH import IMAGE_EXTS, CUSTOM_ORB_PATH
+
+INDEX_VERSION = 1
+INDEX_PATH = CUSTOM_ORB_PATH / "dup_index.json"
+
+# 候选半径 (64 位中的汉明距离); 宁宽勿严, 误入候选只多一次 ORB 校验。
+# 实测 (插件自带 19 张背景图 × 缩放/裁边 ≤15%/调亮度/调色/旋转 ≤6°/加边/加横幅 及组合, JPEG 45~90):
+# ORB 判为重复的同源图对 217 对, 20/14 漏 2 对 (orbhash 距离 15/16), 20/18 全部召回;
+# 非同源图对进入候选的比例 11%, 约为两两比对 ORB 次数的 1/9。
+# 局限: 两种签名都是整图特征, 一张图只是另一张的一小块 (如竖图截出的横幅) 时会漏, 需要时 exhaustive=True。
+PHASH_RADIUS = 20
+ORBHASH_RADIUS = 18
+
+_WORD_BITS = (3, 37, 71, 105, 139, 173, 207, 241)  # 从 256 位描述子里采样 8 位成词
+_SEED = 20240601
+
+_lock = threading.RLock()
+_dirs: Optional[Dict[str, Dict[str, dict]]] = None  # "type/char_id" -> {hash: entry}
+_trees: Dict[str, Tuple["_BKTree", "_BKTree"]] = {}
+_dirty = False
+_save_timer: Optional[threading.Timer] = None
+_SAVE_DELAY = 2.0
+_projection = None
+
+
+class _BKTree:
+    """汉明距离 BK-tree, 节点 [value, [keys], {距离: 子节点}]。"""
+
+    def __init__(self) -> None:
+        self.root: Optional[list] = None
+
+    def add(self, value: int, key: str) -> None:
+        if self.root is None:
+            self.root = [value, [key], {}]
+            return
+        node = self.root
+        while True:
+            d = bin(node[0] ^ value).count("1")
+            if d == 0:
+                node[1].append(key)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [value, [key], {}]
+                return
+            node = child
+
+    def query(self, value: int, radius: int) -> List[str]:
+        out: List[str] = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            d = bin(node[0] ^ value).count("1")
+            if d <= radius:
+                out.extend(node[1])
+            for dist, child in node[2].items():
+                if d - radius <= dist <= d + radius:
+                    stack.append(child)
+        return out
+
+
+def _np():
+    from .card_utils import np
+
+    return np
+
+
+def _dir_key(t: str, char_id: str) -> str:
+    return f"{t}/{char_id}"
+
+
+def _locate(dir_path: Path) -> Optional[Tuple[str, str]]:
+    """目录 → (type, char_id); 不是某个自定义图角色目录返回 None。"""
+    t = card_hash_index.detect_type(dir_path)
+    if t is None:
+        return None
+    rel = dir_path.relative_to(card_hash_index.TYPE_BASES[t])
+    if len(rel.parts) != 1:
+        return None
+    return t, rel.parts[0]
+
+
+def _phash(gray) -> int:
+    from .card_utils import cv2
+
+    np = _np()
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].flatten()
+    bits = low > np.median(low[1:])
+    return int("".join("1" if b else "0" for b in bits), 2)
+
+
+def _orbhash(des) -> int:
+    global _projection
+    np = _np()
+    if _projection is None:
+        _projection = np.random.RandomState(_SEED).standard_normal((64, 256)).astype(np.float32)
+    bits = np.unpackbits(des, axis=1)[:, list(_WORD_BITS)]
+    words = bits.dot(1 << np.arange(len(_WORD_BITS) - 1, -1, -1))
+    hist = np.bincount(words, minlength=256).astype(np.float32)
+    hist = hist / max(float(hist.sum()), 1.0) - 1.0 / 256
+    signs = (_projection @ hist) > 0
+    return int("".join("1" if b else "0" for b in signs), 2)
+
+
+def compute_descriptor(image_path: Path, t: Optional[str] = None) -> Optional[Tuple[int, int]]:
+    """(phash, orbhash); cv2/numpy 缺失或读图失败返回 None。"""
+    from .card_utils import cv2, get_orb_features, load_gray_for_orb
+
+    if cv2 is None or _np() is None:
+        return None
+    feat = get_orb_features(image_path, t)
+    gray = load_gray_for_orb(image_path, t)
+    if feat is None or gray is None:
+        return None
+    return _phash(gray), _orbhash(feat[1])
+
+
+def _load() -> Dict[str, Dict[str, dict]]:
+    global _dirs
+    if _dirs is None:
+        _dirs = {}
+        try:
+            data = json.loads(INDEX_PATH.read_text(encoding="utf-8"))
+            if data.get("version") == INDEX_VERSION:
+                _dirs = data.get("dirs", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"[鸣潮·查重索引] 索引文件损坏, 重建: {e}")
+    return _dirs
+
+
+def _save() -> None:
+    global _dirty
+    if not _dirty or _dirs is None:
+        return
+    INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = INDEX_PATH.with_name(f"{INDEX_PATH.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_text(json.dumps({"version": INDEX_VERSION, "dirs": _dirs}), encoding="utf-8")
+        tmp.replace(INDEX_PATH)
+        _dirty = False
+    except OSError as e:
+        tmp.unlink(missing_ok=True)
+        logger.warning(f"[鸣潮·查重索引] 写入失败: {e}")
+
+
+def _mark_dirty() -> None:
+    """标脏并安排延迟落盘; 需持有 _lock。"""
+    global _dirty, _save_timer
+    _dirty = True
+    if _save_timer is None:
+        _save_timer = threading.Timer(_SAVE_DELAY, flush)
+        _save_timer.daemon = True
+        _save_timer.start()
+
+
+def flush() -> None:
+    """立即把未落盘的改动写入索引文件。"""
+    global _save_timer
+    with _lock:
+        if _save_timer is not None:
+            _save_timer.cancel()
+            _save_timer = None
+        _save()
+
+
+@on_core_shutdown
+async def _flush_on_shutdown():
+    flush()
+
+
+def _stat_of(p: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = p.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _entry(p: Path, t: str) -> Optional[dict]:
+    stat = _stat_of(p)
+    if stat is None:
+        return None
+    desc = compute_descriptor(p, t)
+    if desc is None:
+        return None
+    return {"name": p.name, "mtime": stat[0], "size": stat[1], "phash": desc[0], "orbhash": desc[1]}
+
+
+def _sync_dir(t: str, char_id: str, dir_path: Path) -> Dict[str, dict]:
+    """按目录清单校正条目: 新增/改动的重算, 已删除的丢弃。描述在锁外计算, 多目录可并行。"""
+    key = _dir_key(t, char_id)
+    listing = {
+        card_hash_index.compute_hash(p.name): (p, _stat_of(p))
+        for p in dir_path.iterdir()
+        if p.is_file() and p.suffix.lower() in IMAGE_EXTS
+    }
+    with _lock:
+        bucket = dict(_load().get(key, {}))
+    stale = [
+        p
+        for h, (p, stat) in listing.items()
+        if not (h in bucket and bucket[h]["name"] == p.name and stat == (bucket[h]["mtime"], bucket[h]["size"]))
+    ]
+    fresh = {card_hash_index.compute_hash(p.name): _entry(p, t) for p in stale}
+    with _lock:
+        bucket = _load().setdefault(key, {})
+        changed = False
+        for h in [h for h in bucket if h not in listing]:
+            del bucket[h]
+            changed = True
+        for h, entry in fresh.items():
+            bucket.pop(h, None)
+            if entry is not None:
+                bucket[h] = entry
+            changed = True
+        if changed:
+            _trees.pop(key, None)
+            _mark_dirty()
+        return bucket
+
+
+def _trees_for(key: str, bucket: Dict[str, dict]) -> Tuple[_BKTree, _BKTree]:
+    trees = _trees.get(key)
+    if trees is None:
+        trees = (_BKTree(), _BKTree())
+        for h, entry in bucket.items():
+            trees[0].add(entry["phash"], h)
+            trees[1].add(entry["orbhash"], h)
+        _trees[key] = trees
+    return trees
+
+
+def _neighbours(trees: Tuple[_BKTree, _BKTree], desc: Tuple[int, int]) -> set:
+    return set(trees[0].query(desc[0], PHASH_RADIUS)) | set(trees[1].query(desc[1], ORBHASH_RADIUS))
+
+
+def candidate_pairs(dir_path: Path) -> Optional[List[Tuple[Path, Path]]]:
+    """目录内可能重复的图对; 非自定义图目录或依赖缺失返回 None (调用方回退两两比对)。"""
+    loc = _locate(dir_path)
+    if loc is None or _np() is None:
+        return None
+    t, char_id = loc
+    bucket = _sync_dir(t, char_id, dir_path)
+    with _lock:
+        trees = _trees_for(_dir_key(t, char_id), bucket)
+        pairs = set()
+        for h, entry in bucket.items():
+            for other in _neighbours(trees, (entry["phash"], entry["orbhash"])):
+                if other != h:
+                    pairs.add((min(h, other), max(h, other)))
+        names = {h: e["name"] for h, e in bucket.items()}
+    return [(dir_path / names[a], dir_path / names[b]) for a, b in sorted(pairs)]
+
+
+def candidates_for(dir_path: Path, image_path: Path, as_type: Optional[str] = None) -> Optional[List[Path]]:
+    """与 image_path 可能重复的目录内已有图; 非自定义图目录或依赖缺失返回 None。"""
+    loc = _locate(dir_path)
+    if loc is None or _np() is None:
+        return None
+    desc = compute_descriptor(image_path, as_type)
+    if desc is None:
+        return None
+    t, char_id = loc
+    bucket = _sync_dir(t, char_id, dir_path)
+    with _lock:
+        trees = _trees_for(_dir_key(t, char_id), bucket)
+        hits = _neighbours(trees, desc)
+        names = [bucket[h]["name"] for h in hits]
+    return [dir_path / n for n in names if dir_path / n != image_path]
+
+
+def add(t: str, char_id: str, path: Path) -> None:
+    """新增/覆盖一张图的描述。"""
+    entry = _entry(path, t)
+    if entry is None:
+        return
+    with _lock:
+        key = _dir_key(t, char_id)
+        _load().setdefault(key, {})[card_hash_index.compute_hash(path.name)] = entry
+        _trees.pop(key, None)
+        _mark_dirty()
+
+
+def remove(t: str, char_id: str, path: Path) -> None:
+    with _lock:
+        key = _dir_key(t, char_id)
+        bucket = _load().get(key)
+        if bucket and bucket.pop(card_hash_index.compute_hash(path.name), None) is not None:
+            _trees.pop(key, None)
+            _mark_dirty()
+
+
+def clear_dir(t: str, char_id: str) -> None:
+    with _lock:
+        key = _dir_key(t, char_id)
+        if _load().pop(key, None) is not None:
+            _trees.pop(key, None)
+            _mark_dirty()
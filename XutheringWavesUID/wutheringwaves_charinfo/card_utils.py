@@ -1,5 +1,4 @@
 import os
-import ssl
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
@@ -10,7 +9,7 @@ from PIL import Image, ImageChops
 from gsuid_core.logger import logger
 from gsuid_core.pool import to_thread
 
-from . import card_hash_index
+from . import card_dup_index, card_hash_index
 from .card_hash_index import compute_hash as get_hash_id  # 对外别名, 旧 import 不破
 
 
@@ -35,12 +34,11 @@ def _import_np():
 cv2 = _import_cv2()
 np = _import_np()
 
-import httpx
-
 from gsuid_core.bot import Bot
 from gsuid_core.models import Event
 from gsuid_core.utils.image.convert import convert_img
 
+from ..utils.http_pool import get_client
 from ..utils.name_convert import alias_to_char_name, char_name_to_char_id, easy_id_to_name
 from ..utils.resource.constant import SPECIAL_CHAR, SPECIAL_CHAR_ID
 from ..utils.resource.RESOURCE_PATH import (
@@ -129,14 +127,7 @@ async def get_image(ev: Event) -> List[str]:
 
 async def _fetch_image_bytes(url: str) -> Optional[bytes]:
     try:
-        if httpx.__version__ >= "0.28.0":
-            ssl_context = ssl.create_default_context()
-            ssl_context.set_ciphers("DEFAULT")
-            async with httpx.AsyncClient(verify=ssl_context) as client:
-                res = await client.get(url)
-        else:
-            async with httpx.AsyncClient() as client:
-                res = await client.get(url)
+        res = await get_client(url, legacy_ssl=True).get(url)
         if res.status_code != 200:
             return None
         return res.content
@@ -400,7 +391,8 @@ def delete_orb_cache(image_path: Path) -> None:
             logger.warning(f"[鸣潮·卡片工具] 删除ORB缓存失败: {cache_path}")
 
 
-def _compute_orb_features(image_path: Path, t: Optional[str] = None):
+def load_gray_for_orb(image_path: Path, t: Optional[str] = None):
+    """按类型做 ORB 预处理后的灰度图 (card 只取面板可见区); 读取失败返回 None。"""
     if cv2 is None:
         return None
     if t is None:
@@ -413,11 +405,14 @@ def _compute_orb_features(image_path: Path, t: Optional[str] = None):
         except Exception:
             return None
         rgb = np.array(prepared)
-        gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
-    else:
-        gray = cv2.imread(str(image_path), cv2.IMREAD_GRAYSCALE)
-        if gray is None:
-            return None
+        return cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+    return cv2.imread(str(image_path), cv2.IMREAD_GRAYSCALE)
+
+
+def _compute_orb_features(image_path: Path, t: Optional[str] = None):
+    gray = load_gray_for_orb(image_path, t)
+    if gray is None:
+        return None
     orb = cv2.ORB_create(nfeatures=ORB_FEATURES)
     keypoints, descriptors = orb.detectAndCompute(gray, None)
     if descriptors is None or not keypoints:
@@ -540,26 +535,34 @@ def find_duplicate_pairs_in_dir(
 def find_duplicate_groups_in_dir(
     dir_path: Path,
     threshold: float = ORB_THRESHOLD,
+    exhaustive: bool = False,
 ) -> List[Tuple[List[Path], Dict[Tuple[Path, Path], float]]]:
+    """目录内分组查重。默认只对感知索引 (card_dup_index) 给出的候选对做 ORB 校验;
+    exhaustive=True 或目录不在索引范围内时两两比对。"""
     images = list(_iter_images(dir_path))
     if len(images) < 2:
         return []
-    features = []
-    for img_path in images:
-        feat = get_orb_features(img_path)
-        if feat is not None:
-            features.append((img_path, feat))
+    candidates = None if exhaustive else card_dup_index.candidate_pairs(dir_path)
+    if candidates is None:
+        candidates = [(images[i], images[j]) for i in range(len(images)) for j in range(i + 1, len(images))]
 
-    uf = UnionFind([p for p, _ in features])
+    features: Dict[Path, object] = {}
+
+    def _feat(p: Path):
+        if p not in features:
+            features[p] = get_orb_features(p)
+        return features[p]
+
+    uf = UnionFind(images)
     sim_map: Dict[Tuple[Path, Path], float] = {}
-    for i in range(len(features)):
-        p1, f1 = features[i]
-        for j in range(i + 1, len(features)):
-            p2, f2 = features[j]
-            sim = _orb_similarity(f1, f2)
-            if sim is not None and sim >= threshold:
-                uf.union(p1, p2)
-                sim_map[(p1, p2)] = sim
+    for p1, p2 in candidates:
+        f1, f2 = _feat(p1), _feat(p2)
+        if f1 is None or f2 is None:
+            continue
+        sim = _orb_similarity(f1, f2)
+        if sim is not None and sim >= threshold:
+            uf.union(p1, p2)
+            sim_map[(p1, p2)] = sim
 
     groups = [g for g in uf.groups() if len(g) >= 2]
     return [(g, sim_map) for g in groups]
@@ -572,19 +575,29 @@ def find_duplicates_for_new_images(
     as_type: Optional[str] = None,
 ) -> Dict[Path, List[Tuple[Path, float]]]:
     existing = [p for p in _iter_images(dir_path) if p not in new_images]
-    existing_feats = {}
-    for p in existing:
-        feat = get_orb_features(p, as_type)
-        if feat is not None:
-            existing_feats[p] = feat
+    existing_feats: Dict[Path, object] = {}
+
+    def _feat_old(p: Path):
+        if p not in existing_feats:
+            existing_feats[p] = get_orb_features(p, as_type)
+        return existing_feats[p]
 
     result: Dict[Path, List[Tuple[Path, float]]] = {}
     for new_path in new_images:
         feat_new = get_orb_features(new_path, as_type)
         if feat_new is None:
             continue
+        # 自定义图目录先用感知索引缩小比对范围, 其余目录 (如待审核区) 全量比对
+        candidates = card_dup_index.candidates_for(dir_path, new_path, as_type)
+        if candidates is None:
+            candidates = existing
+        else:
+            candidates = [p for p in candidates if p not in new_images]
         dup_list: List[Tuple[Path, float]] = []
-        for old_path, feat_old in existing_feats.items():
+        for old_path in candidates:
+            feat_old = _feat_old(old_path)
+            if feat_old is None:
+                continue
             sim = _orb_similarity(feat_new, feat_old)
             if sim is not None and sim >= threshold:
                 dup_list.append((old_path, sim))
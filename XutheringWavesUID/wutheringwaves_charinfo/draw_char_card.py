@@ -11,6 +11,7 @@ from PIL import Image, ImageDraw, ImageEnhance
 from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.image.image_tools import crop_center_img
 
+from ..utils.http_pool import get_client
 from ..utils import hint
 from ..utils.util import hide_uid, get_hide_uid_pref
 from ..utils.localization import t
@@ -199,22 +200,22 @@ async def get_one_rank(item: OneRankRequest) -> Optional[OneRankResponse]:
     if not WavesToken:
         return
 
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.post(
-                ONE_RANK_URL,
-                json=item.model_dump(),
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            logger.debug(f"[鸣潮·角色面板渲染] 获取排行: {res.text}")
-            if res.status_code == 200:
-                return OneRankResponse.model_validate(res.json())
-        except Exception as e:
-            logger.exception(f"[鸣潮·角色面板渲染] 获取排行失败: {e}")
+    client = get_client(ONE_RANK_URL)
+    try:
+        res = await client.post(
+            ONE_RANK_URL,
+            json=item.model_dump(),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {WavesToken}",
+            },
+            timeout=httpx.Timeout(10),
+        )
+        logger.debug(f"[鸣潮·角色面板渲染] 获取排行: {res.text}")
+        if res.status_code == 200:
+            return OneRankResponse.model_validate(res.json())
+    except Exception as e:
+        logger.exception(f"[鸣潮·角色面板渲染] 获取排行失败: {e}")
 
 
 def parse_text_and_number(text):
@@ -284,8 +285,7 @@ async def ph_card_draw(
                 sh_temp.alpha_composite(sh_title, dest=(0, 0))
 
                 phantom_icon = await get_phantom_img(_phantom.phantomProp.phantomId, _phantom.phantomProp.iconUrl)
-                fetter_icon = await get_attribute_effect(_phantom.fetterDetail.name)
-                fetter_icon = fetter_icon.resize((50, 50))
+                fetter_icon = await get_attribute_effect(_phantom.fetterDetail.name, size=(50, 50))
                 phantom_icon.alpha_composite(fetter_icon, dest=(205, 0))
                 phantom_icon = phantom_icon.resize((100, 100))
                 sh_temp.alpha_composite(phantom_icon, dest=(20, 20))
@@ -315,8 +315,7 @@ async def ph_card_draw(
 
                 for index, _prop in enumerate(props):
                     oset = 55
-                    prop_img = await get_attribute_prop(_prop.attributeName)
-                    prop_img = prop_img.resize((40, 40))
+                    prop_img = await get_attribute_prop(_prop.attributeName, size=(40, 40))
                     sh_temp.alpha_composite(prop_img, (15, 167 + index * oset))
                     sh_temp_draw = ImageDraw.Draw(sh_temp)
                     name_color = "white"
@@ -558,11 +557,9 @@ async def draw_fixed_img(img, avatar, account_info, role_detail, locale="", uid=
     char_mask = Image.open(TEXT_PATH / "char_mask.png")
     char_fg = Image.open(TEXT_PATH / "char_fg.png")
 
-    role_attribute = await get_attribute(role_detail.role.attributeName)
-    role_attribute = role_attribute.resize((50, 50)).convert("RGBA")
+    role_attribute = await get_attribute(role_detail.role.attributeName, size=(50, 50))
     char_fg.paste(role_attribute, (434, 112), role_attribute)
-    weapon_type = await get_weapon_type(role_detail.role.weaponTypeName)
-    weapon_type = weapon_type.resize((40, 40)).convert("RGBA")
+    weapon_type = await get_weapon_type(role_detail.role.weaponTypeName, size=(40, 40))
     char_fg.paste(weapon_type, (439, 182), weapon_type)
 
     char_fg_image = ImageDraw.Draw(char_fg)
@@ -730,17 +727,18 @@ async def draw_char_detail_img(
     oneRank: Optional[OneRankResponse] = None
     enemy_detail: Optional[EnemyDetailData] = EnemyDetailData()
     if change_list_regex:
-        temp = copy.deepcopy(role_detail)
+        # 在副本上改: role_detail 可能是 panel_cache 的共享对象
+        origin = role_detail
         try:
             role_detail, change_command = await change_role_detail(
-                uid, ck, role_detail, enemy_detail, change_list_regex,
+                uid, ck, copy.deepcopy(origin), enemy_detail, change_list_regex,
                 user_id=str(user_id), bot_id=ev.bot_id,
             )
             if change_command and change_command.startswith("[鸣潮]"):
                 return change_command
         except Exception as e:
             logger.exception("[鸣潮·角色面板渲染] 角色数据转换错误", e)
-            role_detail = temp
+            role_detail = origin
 
     from .role_info_change import is_phantom_dirty
 
@@ -934,11 +932,9 @@ async def draw_char_detail_img(
         weaponData.breach,
         weaponData.resonLevel,
     )
-    stats_main = await get_attribute_prop(weapon_detail.stats[0]["name"])
-    stats_main = stats_main.resize((40, 40))
+    stats_main = await get_attribute_prop(weapon_detail.stats[0]["name"], size=(40, 40))
     weapon_bg_temp.alpha_composite(stats_main, (65, weapon_bg_y + 187))
-    stats_sub = await get_attribute_prop(weapon_detail.stats[1]["name"])
-    stats_sub = stats_sub.resize((40, 40))
+    stats_sub = await get_attribute_prop(weapon_detail.stats[1]["name"], size=(40, 40))
     weapon_bg_temp.alpha_composite(stats_sub, (65, weapon_bg_y + 237))
 
     _ws0_name = t(weapon_detail.stats[0]['name'], locale, partial=True)
@@ -1290,8 +1286,7 @@ async def draw_char_score_img(ev: Event, uid: str, char: str, user_id: str, wave
                 sh_temp.alpha_composite(sh_title, dest=(0, 0))
 
                 phantom_icon = await get_phantom_img(_phantom.phantomProp.phantomId, _phantom.phantomProp.iconUrl)
-                fetter_icon = await get_attribute_effect(_phantom.fetterDetail.name)
-                fetter_icon = fetter_icon.resize((50, 50))
+                fetter_icon = await get_attribute_effect(_phantom.fetterDetail.name, size=(50, 50))
                 phantom_icon.alpha_composite(fetter_icon, dest=(205, 0))
                 phantom_icon = phantom_icon.resize((100, 100))
                 sh_temp.alpha_composite(phantom_icon, dest=(20, 20))
@@ -1321,8 +1316,7 @@ async def draw_char_score_img(ev: Event, uid: str, char: str, user_id: str, wave
 
                 for index, _prop in enumerate(props):
                     oset = 55
-                    prop_img = await get_attribute_prop(_prop.attributeName)
-                    prop_img = prop_img.resize((40, 40))
+                    prop_img = await get_attribute_prop(_prop.attributeName, size=(40, 40))
                     # sh_temp.alpha_composite(prop_img, (15, 167 + index * oset))
                     sh_temp_draw = ImageDraw.Draw(sh_temp)
                     name_color = "white"
@@ -1608,8 +1602,7 @@ async def ph_card_draw_optimal(
             phantom_icon = await get_phantom_img(
                 real_phantom.phantomProp.phantomId, real_phantom.phantomProp.iconUrl
             )
-            fetter_icon = await get_attribute_effect(real_phantom.fetterDetail.name)
-            fetter_icon = fetter_icon.resize((50, 50))
+            fetter_icon = await get_attribute_effect(real_phantom.fetterDetail.name, size=(50, 50))
             phantom_icon.alpha_composite(fetter_icon, dest=(205, 0))
             phantom_icon = phantom_icon.resize((100, 100))
             sh_temp.alpha_composite(phantom_icon, dest=(20, 20))
@@ -1640,8 +1633,7 @@ async def ph_card_draw_optimal(
 
         for index, (prop_attr_name, prop_val_str) in enumerate(props_display[:7]):
             oset = 55
-            prop_img = await get_attribute_prop(prop_attr_name)
-            prop_img = prop_img.resize((40, 40))
+            prop_img = await get_attribute_prop(prop_attr_name, size=(40, 40))
             sh_temp.alpha_composite(prop_img, (15, 167 + index * oset))
             sh_temp_draw = ImageDraw.Draw(sh_temp)
             name_color = "white"
@@ -1794,17 +1786,17 @@ async def draw_char_optimize_img(ev: Event, uid: str, char: str, user_id: str, w
     # ── 替换指令 (换角色X链 / 换声骸… → 改写 role_detail, 优化基于替换后配置) ──
     change_command = ""
     if change_list_regex:
-        _temp = copy.deepcopy(role_detail)
+        _origin = role_detail
         try:
             role_detail, change_command = await change_role_detail(
-                uid, ck, role_detail, enemy_detail, change_list_regex,
+                uid, ck, copy.deepcopy(_origin), enemy_detail, change_list_regex,
                 user_id=str(user_id), bot_id=ev.bot_id,
             )
             if change_command and change_command.startswith("[鸣潮]"):
                 return change_command
         except Exception as e:
             logger.exception("[鸣潮·角色面板渲染] 角色数据转换错误", e)
-            role_detail = _temp
+            role_detail = _origin
 
     pd = role_detail.phantomData
     eq_list = pd.equipPhantomList if pd else None
@@ -1948,11 +1940,9 @@ async def draw_char_optimize_img(ev: Event, uid: str, char: str, user_id: str, w
         weaponData.breach,
         weaponData.resonLevel,
     )
-    stats_main = await get_attribute_prop(weapon_detail.stats[0]["name"])
-    stats_main = stats_main.resize((40, 40))
+    stats_main = await get_attribute_prop(weapon_detail.stats[0]["name"], size=(40, 40))
     weapon_bg_temp.alpha_composite(stats_main, (65, weapon_bg_y + 187))
-    stats_sub = await get_attribute_prop(weapon_detail.stats[1]["name"])
-    stats_sub = stats_sub.resize((40, 40))
+    stats_sub = await get_attribute_prop(weapon_detail.stats[1]["name"], size=(40, 40))
     weapon_bg_temp.alpha_composite(stats_sub, (65, weapon_bg_y + 237))
 
     _ws0_name = t(weapon_detail.stats[0]["name"], locale, partial=True)
@@ -2120,7 +2110,7 @@ async def draw_char_optimize_img(ev: Event, uid: str, char: str, user_id: str, w
 
     for idx, row in enumerate(rows[:8]):
         y = 40 + idx * 55
-        prop_img = (await get_attribute_prop(row["key"])).resize((40, 40))
+        prop_img = await get_attribute_prop(row["key"], size=(40, 40))
         sh_bg.alpha_composite(prop_img, (65, y))
         val_text = f"{row['current']} → {row['best']}"
         name_text = row["name"]
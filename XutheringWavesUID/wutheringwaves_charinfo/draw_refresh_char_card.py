@@ -38,7 +38,7 @@ from ..utils.fonts.waves_fonts import (
     waves_font_60,
 )
 from ..utils.resource.constant import NAME_ALIAS, SPECIAL_CHAR_NAME
-from ..utils.refresh_char_detail import refresh_char, refresh_lock
+from ..utils.refresh_char_detail import refresh_char, refresh_lock, log_refresh_progress
 from . import base_info_cache
 
 TEXT_PATH = Path(__file__).parent / "texture2d"
@@ -285,6 +285,7 @@ async def _draw_refresh_char_detail_img(
             is_self_ck=self_ck,
             refresh_type=refresh_type,
             is_self=user_id == ev.user_id,
+            on_progress=log_refresh_progress(uid),
         )
         if isinstance(waves_datas, str):
             return waves_datas, 0, None
@@ -1,4 +1,5 @@
 import re
+import copy
 from typing import Any, Dict, List, Optional
 
 from gsuid_core.logger import logger
@@ -41,6 +42,9 @@ async def get_remote_role_detail_info(find_char_id: List[str], waves_id, ck) ->
             (role for role in gen_temp if str(role.role.roleId) in find_char_id),
             None,
         )
+        if role_detail_info:
+            # panel_cache 共享对象, 声骸会被挪到别的面板上再改主词条
+            role_detail_info = copy.deepcopy(role_detail_info)
 
     if not role_detail_info:
         for char_id in find_char_id:
@@ -1,5 +1,4 @@
 import os
-import ssl
 import time
 import shutil
 import asyncio
@@ -7,7 +6,6 @@ from pathlib import Path
 from typing import List, Optional, Set, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import httpx
 from PIL import Image
 
 from gsuid_core.bot import Bot
@@ -17,10 +15,11 @@ from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.download_resource.download_file import download
 
 from ..utils.image import compress_to_webp
+from ..utils.http_pool import get_client
 from ..wutheringwaves_config import WutheringWavesConfig
 from ..utils.name_convert import easy_id_to_name
 from ..utils.resource.RESOURCE_PATH import CUSTOM_CARD_PATH, CUSTOM_ORB_PATH
-from . import card_hash_index
+from . import card_dup_index, card_hash_index
 from .card_hash_index import compute_hash as get_hash_id
 from .card_utils import (
     CUSTOM_PATH_MAP,
@@ -101,17 +100,7 @@ async def upload_custom_card(
         temp_path = temp_dir / name
 
         if not temp_path.exists():
-            try:
-                if httpx.__version__ >= "0.28.0":
-                    ssl_context = ssl.create_default_context()
-                    # ssl_context.set_ciphers("AES128-GCM-SHA256")
-                    ssl_context.set_ciphers("DEFAULT")
-                    sess = httpx.AsyncClient(verify=ssl_context)
-                else:
-                    sess = httpx.AsyncClient()
-            except Exception as e:
-                logger.exception(f"[鸣潮·卡片上传] {httpx.__version__} - {e}")
-                sess = None
+            sess = get_client(upload_image, legacy_ssl=True)
             code = await download(upload_image, temp_dir, name, tag="[鸣潮]", sess=sess)
             if not isinstance(code, int) or code != 200:
                 # 成功
@@ -145,6 +134,7 @@ async def upload_custom_card(
                     except Exception:
                         pass
                     delete_orb_cache(img_path)
+                    card_dup_index.remove(target_type, char_id, img_path)
                 block_text = "；".join(block_msgs)
                 msg = f"{msg} 疑似重复: {block_text}，请使用强制上传继续上传"
 
@@ -223,6 +213,7 @@ async def delete_custom_card(bot: Bot, ev: Event, char: str, hash_id: str, targe
                 target_file.unlink()
                 delete_orb_cache(target_file)
                 card_hash_index.remove(target_type, char_id, target_file)
+                card_dup_index.remove(target_type, char_id, target_file)
                 deleted_ids.append(single_hash_id)
             except Exception as e:
                 logger.exception(f"[鸣潮·卡片上传] 删除文件失败: {target_file} - {e}")
@@ -272,6 +263,7 @@ async def delete_all_custom_card(bot: Bot, ev: Event, char: str, target_type: st
     except Exception:
         pass
     card_hash_index.clear_dir(target_type, char_id)
+    card_dup_index.clear_dir(target_type, char_id)
 
     msg = f"[鸣潮] 删除角色【{char}】的所有{type_label}图成功！"
     return await bot.send((" " if at_sender else "") + msg, at_sender)
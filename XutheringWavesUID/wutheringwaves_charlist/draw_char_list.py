@@ -174,7 +174,7 @@ async def draw_char_list_img(
 
     ensure_data_loaded()
     all_up_num = 0
-    for char_id, char_data in char_id_data.items():
+    for char_id, char_data in char_id_data.summaries().items():
         if (
             char_data.get("starLevel") == 5
             and int(char_id) not in NORMAL_LIST_IDS
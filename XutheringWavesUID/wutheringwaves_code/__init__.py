@@ -10,6 +10,7 @@ from gsuid_core.bot import Bot
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
 
+from ..utils.http_pool import get_client
 from ..utils.api.api import get_local_proxy_url
 from ..utils.api.wwapi import GET_CODE_URL
 
@@ -94,13 +95,13 @@ async def get_code_list():
         from ..wutheringwaves_config import WutheringWavesConfig
 
         waves_token = WutheringWavesConfig.get_config("WavesToken").data
-        async with httpx.AsyncClient(timeout=None) as client:
-            res = await client.get(
-                GET_CODE_URL,
-                headers={"Authorization": f"Bearer {waves_token}"},
-                timeout=10,
-            )
-            return res.json()["data"]
+        client = get_client(GET_CODE_URL)
+        res = await client.get(
+            GET_CODE_URL,
+            headers={"Authorization": f"Bearer {waves_token}"},
+            timeout=10,
+        )
+        return res.json()["data"]
     except Exception as e:
         logger.warning(f"[鸣潮·获取兑换码] 备用接口失败: {e}")
     return
@@ -177,15 +177,79 @@ CONFIG_DEFAULT: Dict[str, GSC] = {
     ),
     "RefreshCardConcurrency": GsIntConfig(
         "刷新角色面板并发数",
-        "刷新角色面板并发数",
+        "刷新角色面板并发上限; 实际并发自适应, 成功时逐步升至此值, 遇到限流减半",
         10,
         50,
     ),
+    "PluginCheckStackFallback": GsBoolConfig(
+        "消息来源判断回退调用栈",
+        "发送消息时没有入口标记的调用改为扫描调用栈判断是否本插件发起 (较慢, 仅排查活跃度统计遗漏时开启)",
+        False,
+    ),
     "UseGlobalSemaphore": GsBoolConfig(
         "开启后刷新角色面板并发数为全局共享",
         "开启后刷新角色面板并发数为全局共享",
         True,
     ),
+    "ApiCacheTTL": GsListStrConfig(
+        "库街区读接口短缓存（接口名:秒）",
+        "同一 uid+token 的读接口在该秒数内复用上次成功结果, 并发请求始终合并为一次; 未列出或为 0 的接口只合并不缓存",
+        [
+            "get_base_info:10",
+            "get_role_info:10",
+            "get_calabash_data:30",
+            "get_explore_data:30",
+            "get_challenge_data:30",
+            "get_abyss_data:30",
+            "get_abyss_index:30",
+            "get_slash_index:30",
+            "get_slash_detail:30",
+            "get_matrix_index:30",
+            "get_matrix_detail:30",
+        ],
+    ),
+    "RefreshCardRate": GsIntConfig(
+        "刷新角色面板每秒请求数",
+        "同一上游域名每秒最多发出的角色详情请求数 (全局共享), 0 为不限",
+        10,
+        100,
+    ),
+    "BaseInfoCacheMaxEntries": GsIntConfig(
+        "账号基础信息内存缓存条目上限",
+        "超出后淘汰最久未使用的条目 (落盘缓存不受影响), 0 为不限",
+        20000,
+        1000000,
+    ),
+    "BaseInfoCacheMaxMB": GsIntConfig(
+        "账号基础信息内存缓存大小上限（MB）",
+        "按序列化大小估算, 超出后淘汰最久未使用的条目, 0 为不限",
+        64,
+        4096,
+    ),
+    "HttpPoolMaxConnections": GsIntConfig(
+        "共享HTTP连接池最大连接数",
+        "排行/上传/出场率/外置渲染等服务请求共用连接池, 每个源站的最大并发连接数 (重启生效)",
+        64,
+        1024,
+    ),
+    "HttpPoolMaxKeepalive": GsIntConfig(
+        "共享HTTP连接池保活连接数",
+        "每个源站空闲时保留的长连接数 (重启生效)",
+        16,
+        256,
+    ),
+    "UploadConcurrency": GsIntConfig(
+        "记录上传并发数",
+        "面板/深渊/冥海/矩阵记录先落盘缓冲再上传, 同时在途的上传请求数上限; 失败会退避重试, 重启后继续发送",
+        4,
+        64,
+    ),
+    "ImageAssetCacheMB": GsIntConfig(
+        "图标素材解码缓存大小上限（MB）",
+        "头像/武器/属性等图标解码后常驻内存 (含常用缩放尺寸), 按像素字节数淘汰最久未用, 0 为关闭",
+        64,
+        1024,
+    ),
     "CaptchaProvider": GsStrConfig(
         "验证码提供方（暂时无用）",
         "验证码提供方",
@@ -225,6 +289,11 @@ CONFIG_DEFAULT: Dict[str, GSC] = {
         "开启后, 转交主人审核的图片会在本地储存一份(位于 panel_edit_tmp/pending), 可在网页面板图编辑器的【待审核】中查看/裁剪上传/删除。注意会占用本地磁盘空间, 并且存在恶意上传风险, 建议磁盘空间充足再开启",
         False,
     ),
+    "StaminaPushEngine": GsBoolConfig(
+        "内置体力推送调度",
+        "按上次查询的体力与回复速度推算越过阈值的时间, 到点才复核一次并推送 (同群合并为一条), 使用体力记录里的推送开关/阈值; 已装外置体力推送插件时勿重复开启 (重启生效)",
+        False,
+    ),
     "AutoSendCharAfterRefresh": GsBoolConfig(
         "刷新面板时自动发送角色面板",
         "全量刷新面板后，自动猜测用户可能想查看的角色面板",
@@ -254,9 +323,25 @@ CONFIG_DEFAULT: Dict[str, GSC] = {
         45,
         3650,
     ),
+    "PanelCacheSizeMB": GsIntConfig(
+        "面板解析缓存上限(MB)",
+        "缓存已解析的角色面板(rawData), 排行/面板/练度重复读取同一用户时免去解压与校验; 按解压后JSON大小估算, 0 为关闭",
+        128,
+        4096,
+    ),
+    "PanelSharedStore": GsBoolConfig(
+        "多worker共享面板存储",
+        "rawData/rover 写盘时同时写入共享 sqlite (msgpack 编码), 多个 worker 读同一面板免去各自解压解析, 并据写入版本让其它 worker 的面板缓存即时失效; 单进程部署无需开启",
+        False,
+    ),
+    "PanelStructDecode": GsBoolConfig(
+        "面板msgspec解码",
+        "rawData/rover 面板解析为 msgspec Struct 而非 pydantic 模型, 解析快数倍、占用更小; 需重启或面板文件更新后生效",
+        False,
+    ),
     "RankActiveFilterGroup": GsBoolConfig(
         "群排行仅活跃用户",
-        "群排行（角色/练度/抽卡）是否仅统计活跃账号",
+        "群排行（角色/练度/抽卡/无尽/矩阵）是否仅统计活跃账号",
         True,
     ),
     "UseHtmlRender": GsBoolConfig(
@@ -264,6 +349,30 @@ CONFIG_DEFAULT: Dict[str, GSC] = {
         "开启后将使用HTML渲染公告卡片，关闭后将回退到PIL",
         True,
     ),
+    "RenderMaxPages": GsIntConfig(
+        "本地渲染最大并发页面数",
+        "Playwright 同时渲染的页面数上限, 超出的请求排队等待; 低配机器建议 2~4",
+        4,
+        32,
+    ),
+    "RenderQueueTimeout": GsIntConfig(
+        "本地渲染排队超时（单位秒）",
+        "渲染请求排队超过此时间则放弃 HTML 渲染（有 PIL 回退的功能会回退）",
+        30,
+        300,
+    ),
+    "RenderCacheSizeMB": GsIntConfig(
+        "HTML渲染结果磁盘缓存上限(MB)",
+        "wiki、深塔/冥歌海墟/矩阵期数卡等相同内容的渲染结果直接复用, 0 为不落盘",
+        256,
+        10240,
+    ),
+    "RenderCacheMemMB": GsIntConfig(
+        "HTML渲染结果内存缓存上限(MB)",
+        "渲染结果热数据内存缓存上限, 0 为不占内存",
+        32,
+        1024,
+    ),
     "RemoteRenderEnable": GsBoolConfig(
         "外置渲染开关",
         "开启后将使用外置渲染服务进行HTML渲染，失败时自动回退到本地渲染",
@@ -185,7 +185,7 @@ async def draw_explore_img(ev: Event, uid: str, user_id: str):
         }
 
         logger.debug("[鸣潮·探索卡片] 准备通过HTML渲染探索卡片")
-        img_bytes = await render_html(waves_templates, "explore_card.html", context)
+        img_bytes = await render_html(waves_templates, "explore_card.html", context, cache=600)
         if img_bytes:
             return img_bytes
         else:
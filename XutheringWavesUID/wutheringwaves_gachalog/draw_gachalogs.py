@@ -1,11 +1,9 @@
 import os
-import json
 import random
 import warnings
 from typing import Dict, List
 from pathlib import Path
 
-import aiofiles
 from PIL import Image, ImageDraw, ImageFilter
 
 # 忽略PIL解压缩炸弹警告
@@ -18,7 +16,7 @@ from gsuid_core.utils.image.image_tools import crop_center_img
 
 from ..utils import hint
 from ..utils.util import hide_uid, get_hide_uid_pref
-from ..utils.player_store import read_player_json, player_json_exists
+from ..utils.player_store import read_player_json
 from ..utils.imagetool import draw_base_info_bg
 from ..utils.image import (
     GOLD,
@@ -45,6 +43,7 @@ from ..utils.fonts.waves_fonts import (
 )
 from ..utils.resource.constant import NORMAL_LIST
 from ..utils.resource.RESOURCE_PATH import CARD_POLYGON_PATH, PLAYER_PATH
+from .gacha_stats import pool_level, load_state, save_state, build_state
 from .get_gachalogs import gacha_type_meta_data
 
 TEXT_PATH = Path(__file__).parent / "texture2d"
@@ -86,19 +85,6 @@ def get_num_h(num: int, column: int):
     return row
 
 
-def get_level_from_list(ast: int, lst: List) -> int:
-    if ast == 0:
-        return 2
-
-    for num_index, num in enumerate(lst):
-        if ast <= num:
-            level = 4 - num_index
-            break
-    else:
-        level = 0
-    return level
-
-
 async def draw_card_help():
     text = "\n".join(
         [
@@ -220,95 +206,11 @@ def _compute_pool_stats(gachalogs: Dict) -> Dict:
             _u = sum(current_data["r_num"]) / len(current_data["up_list"])
             current_data["avg_up"] = float("{:.2f}".format(_u))
 
-        current_data["level"] = 2
-        if current_data["avg_up"] or current_data["avg"]:
-            if gacha_name == "角色精准调谐":
-                if current_data["avg_up"]:
-                    current_data["level"] = get_level_from_list(current_data["avg_up"], [68, 81, 93, 99, 114])
-                elif current_data["avg"]:
-                    current_data["level"] = get_level_from_list(current_data["avg"], [47, 54, 62, 67, 69])
-            elif gacha_name in [
-                "武器精准调谐",
-                "角色调谐（常驻池）",
-                "武器调谐（常驻池）",
-                "新手自选唤取",
-            ]:
-                if current_data["avg"]:
-                    current_data["level"] = get_level_from_list(current_data["avg"], [45, 52, 59, 65, 70])
-            elif gacha_name == "新手调谐":
-                if current_data["avg"]:
-                    current_data["level"] = get_level_from_list(current_data["avg"], [10, 20, 30, 40, 45])
+        current_data["level"] = pool_level(gacha_name, current_data["avg"], current_data["avg_up"])
 
     return total_data
 
 
-async def get_gacha_stats(uid: str) -> Dict:
-    """获取抽卡统计信息，优先从缓存读取，否则从原始数据计算"""
-    _dir = PLAYER_PATH / str(uid)
-    _dir.mkdir(parents=True, exist_ok=True)
-
-    gacha_log_path = _dir / "gacha_logs.json"
-    stats_path = _dir / "gachaStats.json"
-    if player_json_exists(gacha_log_path) and stats_path.exists():
-        try:
-            async with aiofiles.open(stats_path, "r", encoding="utf-8") as f:
-                cached = json.loads(await f.read())
-            if all(
-                isinstance(v.get("avg"), (int, float))
-                and isinstance(v.get("avg_up"), (int, float))
-                for v in cached.values()
-                if isinstance(v, dict)
-            ):
-                return cached
-        except Exception:
-            pass
-
-    raw_data = await read_player_json(gacha_log_path)
-    if raw_data is None:
-        return {}
-
-    try:
-        total_data = _compute_pool_stats(raw_data.get("data", {}))
-        stats_data = _total_to_stats(total_data)
-        await save_gacha_stats(uid, total_data)
-        return stats_data
-    except Exception:
-        return {}
-
-
-def _total_to_stats(total_data: Dict) -> Dict:
-    stats_data = {}
-    for gacha_name, data in total_data.items():
-        combined_avg = data["avg_up"] or data["avg"] or 0
-        stats_data[gacha_name] = {
-            "total": data["total"],
-            "avg": data["avg"],
-            "avg_up": data["avg_up"],
-            "combined_avg": combined_avg,
-            "remain": data["remain"],
-            "r_num": data["r_num"],
-            "up_count": len(data["up_list"]),
-            "rank_s_count": len(data["rank_s_list"]),
-            "level": data["level"],
-            "char_gold": len(data["rank_s_list"]) if gacha_name == "角色精准调谐" else 0,
-            "weapon_gold": len(data["rank_s_list"]) if gacha_name == "武器精准调谐" else 0,
-        }
-    return stats_data
-
-
-async def save_gacha_stats(uid: str, total_data: Dict):
-    """保存抽卡统计信息到本地文件"""
-    try:
-        _dir = PLAYER_PATH / str(uid)
-        _dir.mkdir(parents=True, exist_ok=True)
-        path = _dir / "gachaStats.json"
-        stats_data = _total_to_stats(total_data)
-        async with aiofiles.open(path, "w", encoding="utf-8") as file:
-            await file.write(json.dumps(stats_data, ensure_ascii=False))
-    except Exception:
-        pass
-
-
 async def draw_card(uid: str, ev: Event):
     # 获取数据
     gacha_log_path = PLAYER_PATH / str(uid) / "gacha_logs.json"
@@ -320,9 +222,8 @@ async def draw_card(uid: str, ev: Event):
     title_num = len([1 for i in gachalogs.keys() if "新手" not in i])
 
     total_data = _compute_pool_stats(gachalogs)
-    stats_path = PLAYER_PATH / str(uid) / "gachaStats.json"
-    if not stats_path.exists():
-        await save_gacha_stats(uid, total_data)
+    if await load_state(uid) is None:
+        await save_state(uid, build_state(gachalogs))
 
     # 预加载所有抽卡物品的图标
     item_icon_cache: Dict[str, Image.Image] = {}
@@ -0,0 +1,142 @@
+"""抽卡记录合并: 基于 match_key() 的最长公共子串 + 递归合并。
+
+find_longest_common_subarray_indices 用滚动哈希 + 二分长度实现, 期望 O((n+m)·log)
+时间、O(n+m) 内存; 命中均按原序列逐项校验, 并保持旧 DP 的选取规则
+(同长度取 a 起点最大者, 再取 b 起点最大者), 输出与 DP 版逐项一致。
+DP 对拍见 tests/test_gacha_merge.py, 基准对比见 tests/bench_gacha_merge.py。
+"""
+import random
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional
+from datetime import datetime
+from collections import Counter
+
+if TYPE_CHECKING:
+    from ..utils.api.model import GachaLog
+
+_MOD = (1 << 61) - 1
+_BASE = random.randrange(1 << 20, _MOD - 1)
+
+CommonIndices = Tuple[Tuple[int, int], Tuple[int, int]]
+
+
+def _key_ids(a: "List[GachaLog]", b: "List[GachaLog]") -> Tuple[List[int], List[int]]:
+    """match_key 映射为整数, 后续哈希与校验都只比较 int。"""
+    ids: Dict[tuple, int] = {}
+    ka = [ids.setdefault(log.match_key(), len(ids) + 1) for log in a]
+    kb = [ids.setdefault(log.match_key(), len(ids) + 1) for log in b]
+    return ka, kb
+
+
+def _prefix_hash(seq: List[int]) -> List[int]:
+    h = [0] * (len(seq) + 1)
+    acc = 0
+    for i, x in enumerate(seq):
+        acc = (acc * _BASE + x) % _MOD
+        h[i + 1] = acc
+    return h
+
+
+def _windows(h: List[int], length: int, pw: int) -> List[int]:
+    """所有长度为 length 的窗口哈希, 下标即窗口起点。"""
+    return [(h[i + length] - h[i] * pw) % _MOD for i in range(len(h) - length)]
+
+
+def _has_common(ka, kb, ha, hb, length: int) -> bool:
+    pw = pow(_BASE, length, _MOD)
+    seen: Dict[int, List[int]] = {}
+    for j, v in enumerate(_windows(hb, length, pw)):
+        seen.setdefault(v, []).append(j)
+    for i, v in enumerate(_windows(ha, length, pw)):
+        starts = seen.get(v)
+        if starts is None:
+            continue
+        window = ka[i : i + length]
+        if any(kb[j : j + length] == window for j in starts):
+            return True
+    return False
+
+
+def _pick(ka, kb, ha, hb, length: int) -> Optional[Tuple[int, int]]:
+    """长度 length 的公共子串中 a 起点最大、其次 b 起点最大的一对 (与 DP 遍历顺序一致)。"""
+    pw = pow(_BASE, length, _MOD)
+    seen: Dict[int, List[int]] = {}
+    for j, v in enumerate(_windows(hb, length, pw)):
+        seen.setdefault(v, []).append(j)
+    wa = _windows(ha, length, pw)
+    for i in range(len(wa) - 1, -1, -1):
+        starts = seen.get(wa[i])
+        if starts is None:
+            continue
+        window = ka[i : i + length]
+        for j in reversed(starts):
+            if kb[j : j + length] == window:
+                return i, j
+    return None
+
+
+# 找到两个数组中最长公共子串的下标（忽略resourceType字段差异）
+def find_longest_common_subarray_indices(
+    a: "List[GachaLog]", b: "List[GachaLog]"
+) -> Optional[CommonIndices]:
+    if not a or not b:
+        return None
+    ka, kb = _key_ids(a, b)
+    if not set(ka).intersection(kb):
+        return None
+    ha, hb = _prefix_hash(ka), _prefix_hash(kb)
+
+    # 存在长度 L 的公共子串则必存在 L-1 的, 二分求最大 L
+    lo, hi = 1, min(len(ka), len(kb))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if _has_common(ka, kb, ha, hb, mid):
+            lo = mid
+        else:
+            hi = mid - 1
+
+    picked = _pick(ka, kb, ha, hb, lo)
+    if picked is None:
+        return None
+    i, j = picked
+    return (i, i + lo - 1), (j, j + lo - 1)
+
+
+def _merge_without_common(a: "List[GachaLog]", b: "List[GachaLog]") -> "List[GachaLog]":
+    # 无公共子串：保留单侧内部的重复抽数，只合并两侧之间的重叠记录。
+    target_counts = Counter(log.match_key() for log in a) | Counter(log.match_key() for log in b)
+    used_counts = Counter()
+    merged = []
+    for log in a + b:
+        key = log.match_key()
+        if used_counts[key] >= target_counts[key]:
+            continue
+        used_counts[key] += 1
+        merged.append(log)
+    return sorted(
+        merged,
+        key=lambda log: datetime.strptime(log.time, "%Y-%m-%d %H:%M:%S"),
+        reverse=True,
+    )
+
+
+# 根据最长公共子串递归合并两个GachaLog列表，按time排序
+def merge_gacha_logs_by_common_subarray(a: "List[GachaLog]", b: "List[GachaLog]") -> "List[GachaLog]":
+    # 显式栈代替递归: 长记录切出很多段时不会触到递归深度上限
+    out: "List[GachaLog]" = []
+    stack: list = [(a, b)]
+    while stack:
+        item = stack.pop()
+        if not isinstance(item, tuple):
+            out.extend(item)
+            continue
+        x, y = item
+        common_indices = find_longest_common_subarray_indices(x, y)
+        if not common_indices:
+            out.extend(_merge_without_common(x, y))
+            continue
+        (a_start, a_end), (b_start, b_end) = common_indices
+        # 后进先出: 依次产出 prefix, common, suffix
+        stack.append((x[a_end + 1 :], y[b_end + 1 :]))
+        stack.append(x[a_start : a_end + 1])
+        stack.append((x[:a_start], y[:b_start]))
+    return out
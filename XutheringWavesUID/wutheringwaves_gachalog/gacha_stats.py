@@ -0,0 +1,226 @@
+"""抽卡统计增量引擎: gachaStats.json 保存每个卡池的运行状态, 追加抽卡时只处理新增记录。
+
+状态 (按时间从旧到新累计):
+    total        总抽数
+    pity         距上一个五星已垫抽数 (即 remain)
+    r_num        每个五星出货时的抽数, r_sum 为其累计和
+    up_count     UP 五星数
+    digest       全部记录 match 键从旧到新的链式哈希
+
+total + digest 即水位线: 合并后的新列表去掉头部 len - total 条后, 剩余部分的链式哈希与 digest 相同,
+才认定头部是新增部分, 只累加这些 (并沿链续算 digest); 十连内 match 键重复、中间补洞等任何不符
+都回退该卡池全量重算。校验只算哈希, 不保存也不逐条比对旧列表。
+文件带 gacha_logs 落盘指纹 (mtime_ns, size), 抽卡记录被外部改写后指纹不符即整体重算。
+"""
+import json
+import hashlib
+from typing import Any, Dict, List, Optional
+
+import aiofiles
+
+from gsuid_core.logger import logger
+
+from ..utils.player_store import player_json_stamp, read_player_json
+from ..utils.resource.constant import NORMAL_LIST
+from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
+from .get_gachalogs import gacha_type_meta_data
+
+STATS_VERSION = 4
+
+
+def get_level_from_list(ast: int, lst: List) -> int:
+    if ast == 0:
+        return 2
+
+    for num_index, num in enumerate(lst):
+        if ast <= num:
+            level = 4 - num_index
+            break
+    else:
+        level = 0
+    return level
+
+
+def pool_level(gacha_name: str, avg: float, avg_up: float) -> int:
+    if not (avg_up or avg):
+        return 2
+    if gacha_name == "角色精准调谐":
+        if avg_up:
+            return get_level_from_list(avg_up, [68, 81, 93, 99, 114])
+        return get_level_from_list(avg, [47, 54, 62, 67, 69])
+    if gacha_name in [
+        "武器精准调谐",
+        "角色调谐（常驻池）",
+        "武器调谐（常驻池）",
+        "新手自选唤取",
+    ]:
+        if avg:
+            return get_level_from_list(avg, [45, 52, 59, 65, 70])
+    elif gacha_name == "新手调谐":
+        if avg:
+            return get_level_from_list(avg, [10, 20, 30, 40, 45])
+    return 2
+
+
+def _match_key(log: Dict) -> List:
+    return [log["cardPoolType"], log["resourceId"], log["qualityLevel"], log["name"], log["count"], log["time"]]
+
+
+def _empty_pool() -> Dict[str, Any]:
+    return {"total": 0, "pity": 0, "r_num": [], "r_sum": 0, "up_count": 0, "digest": ""}
+
+
+def _chain(digest: str, logs_newest_first: List[Dict]) -> str:
+    """从 digest 接着按时间从旧到新链入记录的 match 键。"""
+    for log in reversed(logs_newest_first):
+        key = json.dumps(_match_key(log), ensure_ascii=False)
+        digest = hashlib.sha1(f"{digest}|{key}".encode("utf-8")).hexdigest()
+    return digest
+
+
+def _apply(state: Dict[str, Any], logs_newest_first: List[Dict]) -> None:
+    """把按时间倒序排列的新增记录累加进状态。"""
+    if not logs_newest_first:
+        return
+    for log in reversed(logs_newest_first):
+        state["total"] += 1
+        if log["qualityLevel"] == 5:
+            num = state["pity"] + 1
+            state["r_num"].append(num)
+            state["r_sum"] += num
+            if log["name"] not in NORMAL_LIST:
+                state["up_count"] += 1
+            state["pity"] = 0
+        else:
+            state["pity"] += 1
+    state["digest"] = _chain(state["digest"], logs_newest_first)
+
+
+def _ordered(names) -> List[str]:
+    return [n for n in gacha_type_meta_data if n in names] + [n for n in names if n not in gacha_type_meta_data]
+
+
+def build_state(gachalogs: Dict[str, List[Dict]]) -> Dict[str, Dict[str, Any]]:
+    pools = {}
+    for gacha_name in _ordered(gachalogs):
+        pools[gacha_name] = _empty_pool()
+        _apply(pools[gacha_name], gachalogs[gacha_name])
+    return pools
+
+
+def state_to_stats(pools: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """运行状态 → 对外统计 (与原 _total_to_stats 字段一致)。"""
+    stats_data = {}
+    for gacha_name, state in pools.items():
+        rank_s_count = len(state["r_num"])
+        avg = float("{:.2f}".format(state["r_sum"] / rank_s_count)) if rank_s_count else 0
+        avg_up = float("{:.2f}".format(state["r_sum"] / state["up_count"])) if state["up_count"] else 0
+        stats_data[gacha_name] = {
+            "total": state["total"],
+            "avg": avg,
+            "avg_up": avg_up,
+            "combined_avg": avg_up or avg or 0,
+            "remain": state["pity"],
+            "r_num": list(state["r_num"]),
+            "up_count": state["up_count"],
+            "rank_s_count": rank_s_count,
+            "level": pool_level(gacha_name, avg, avg_up),
+            "char_gold": rank_s_count if gacha_name == "角色精准调谐" else 0,
+            "weapon_gold": rank_s_count if gacha_name == "武器精准调谐" else 0,
+        }
+    return stats_data
+
+
+def log_stamp(uid: str) -> Optional[List[int]]:
+    stamp = player_json_stamp(PLAYER_PATH / str(uid) / "gacha_logs.json")
+    if stamp is None:
+        return None
+    return [stamp[1], stamp[2]]
+
+
+async def load_state(uid: str, stamp: Optional[List[int]] = None) -> Optional[Dict[str, Any]]:
+    """读取状态文件; 版本或落盘指纹 (默认取当前 gacha_logs) 不符时返回 None。"""
+    if stamp is None:
+        stamp = log_stamp(uid)
+    path = PLAYER_PATH / str(uid) / "gachaStats.json"
+    if stamp is None or not path.exists():
+        return None
+    try:
+        async with aiofiles.open(path, "r", encoding="utf-8") as f:
+            cached = json.loads(await f.read())
+    except Exception:
+        return None
+    if not isinstance(cached, dict) or cached.get("version") != STATS_VERSION or cached.get("stamp") != stamp:
+        return None
+    return cached
+
+
+async def save_state(uid: str, pools: Dict[str, Dict[str, Any]]) -> None:
+    try:
+        _dir = PLAYER_PATH / str(uid)
+        _dir.mkdir(parents=True, exist_ok=True)
+        content = {"version": STATS_VERSION, "stamp": log_stamp(uid), "pools": pools}
+        async with aiofiles.open(_dir / "gachaStats.json", "w", encoding="utf-8") as file:
+            await file.write(json.dumps(content, ensure_ascii=False))
+    except Exception as e:
+        logger.debug(f"[鸣潮·抽卡统计] 保存失败 uid={uid}: {e}")
+
+
+async def get_gacha_stats(uid: str) -> Dict:
+    """获取抽卡统计信息，优先读状态文件，否则从原始数据全量计算"""
+    cached = await load_state(uid)
+    if cached is not None:
+        return state_to_stats(cached["pools"])
+
+    raw_data = await read_player_json(PLAYER_PATH / str(uid) / "gacha_logs.json")
+    if raw_data is None:
+        return {}
+
+    try:
+        pools = build_state(raw_data.get("data", {}))
+        await save_state(uid, pools)
+        return state_to_stats(pools)
+    except Exception:
+        return {}
+
+
+def _added_count(state: Optional[Dict[str, Any]], logs: List[Dict]) -> Optional[int]:
+    """按水位线求头部新增条数; 不是 "新增 + 原列表" 时返回 None。"""
+    if state is None:
+        return None
+    added = len(logs) - state["total"]
+    if added < 0:
+        return None
+    if _chain("", logs[added:]) != state["digest"]:
+        return None
+    return added
+
+
+async def update_gacha_stats(
+    uid: str,
+    old_stamp: Optional[List[int]],
+    new_data: Dict[str, List[Dict]],
+) -> None:
+    """save_gachalogs 落盘后调用: 按水位线只累加各卡池头部的新增记录。
+
+    old_stamp 为落盘前 gacha_logs 的指纹, 状态文件需与之对应才可增量。
+    """
+    cached = await load_state(uid, old_stamp) if old_stamp else None
+    old_pools: Dict[str, Dict[str, Any]] = cached["pools"] if cached else {}
+    pools = {}
+    rebuilt = []
+    for gacha_name in _ordered(new_data):
+        new_logs = new_data[gacha_name]
+        state = old_pools.get(gacha_name)
+        added = _added_count(state, new_logs)
+        if state is not None and added is not None:
+            _apply(state, new_logs[:added])
+        else:
+            state = _empty_pool()
+            _apply(state, new_logs)
+            rebuilt.append(gacha_name)
+        pools[gacha_name] = state
+    if rebuilt and cached:
+        logger.debug(f"[鸣潮·抽卡统计] uid={uid} 卡池非追加合并, 全量重算: {rebuilt}")
+    await save_state(uid, pools)
+
@@ -3,7 +3,7 @@ import json
 import base64
 import asyncio
 from collections import Counter
-from typing import Dict, List, Tuple, Union, Optional
+from typing import Dict, List, Union, Optional
 from pathlib import Path
 from datetime import datetime
 
@@ -15,6 +15,7 @@ from gsuid_core.logger import logger
 from gsuid_core.models import Event
 
 from .model import WWUIDGacha
+from .gacha_merge import merge_gacha_logs_by_common_subarray, find_longest_common_subarray_indices
 from ..version import XutheringWavesUID_version
 from ..utils.api.model import GachaLog
 from ..utils.util import get_hide_uid_pref, hide_uid
@@ -62,64 +63,6 @@ gachalogs_history_meta = {
 ERROR_MSG_INVALID_LINK = "当前抽卡链接已经失效，请重新导入抽卡链接"
 
 
-# 找到两个数组中最长公共子串的下标（忽略resourceType字段差异）
-def find_longest_common_subarray_indices(
-    a: List[GachaLog], b: List[GachaLog]
-) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
-    n, m = len(a), len(b)
-    dp = [[0] * (m + 1) for _ in range(n + 1)]
-    length = 0
-    a_end = b_end = 0
-
-    for i in range(n - 1, -1, -1):
-        for j in range(m - 1, -1, -1):
-            # 使用 match_key() 比较，忽略 resourceType 差异
-            if a[i].match_key() == b[j].match_key():
-                dp[i][j] = dp[i + 1][j + 1] + 1
-                if dp[i][j] > length:
-                    length = dp[i][j]
-                    a_end = i + length - 1
-                    b_end = j + length - 1
-            else:
-                dp[i][j] = 0
-
-    if length == 0:
-        return None
-
-    return (a_end - length + 1, a_end), (b_end - length + 1, b_end)
-
-
-# 根据最长公共子串递归合并两个GachaLog列表，按time排序
-def merge_gacha_logs_by_common_subarray(a: List[GachaLog], b: List[GachaLog]) -> List[GachaLog]:
-    common_indices = find_longest_common_subarray_indices(a, b)
-    if not common_indices:
-        # 无公共子串：保留单侧内部的重复抽数，只合并两侧之间的重叠记录。
-        target_counts = Counter(log.match_key() for log in a) | Counter(
-            log.match_key() for log in b
-        )
-        used_counts = Counter()
-        merged = []
-        for log in a + b:
-            key = log.match_key()
-            if used_counts[key] >= target_counts[key]:
-                continue
-            used_counts[key] += 1
-            merged.append(log)
-        return sorted(
-            merged,
-            key=lambda log: datetime.strptime(log.time, "%Y-%m-%d %H:%M:%S"),
-            reverse=True,
-        )
-
-    (a_start, a_end), (b_start, b_end) = common_indices
-
-    prefix = merge_gacha_logs_by_common_subarray(a[:a_start], b[:b_start])
-    common_subarray = a[a_start : a_end + 1]
-    suffix = merge_gacha_logs_by_common_subarray(a[a_end + 1 :], b[b_end + 1 :])
-
-    return prefix + common_subarray + suffix
-
-
 async def get_new_gachalog(
     uid: str, record_id: str, full_data: Dict[str, List[GachaLog]], is_force: bool
 ) -> tuple[Union[str, None], Dict[str, List[GachaLog]], Dict[str, int], Dict[str, List[GachaLog]]]:
@@ -352,11 +295,14 @@ async def save_gachalogs(
         for gacha_name in gacha_type_meta_data.keys()
     }
 
+    from .gacha_stats import log_stamp, update_gacha_stats
+
+    stats_stamp_before = log_stamp(uid)
     vo = msgspec.to_builtins(result)
     await write_player_json(gachalogs_path, vo)
 
-    # 失效 stats 缓存：下次抽卡记录/抽卡排行查询时 lazy 重建
-    (path / "gachaStats.json").unlink(missing_ok=True)
+    # 只在头部追加的卡池增量更新统计, 其余卡池全量重算
+    await update_gacha_stats(uid, stats_stamp_before, vo["data"])
 
     # 计算数据
     all_add = sum(gachalogs_count_add.values())
@@ -4,7 +4,6 @@ import asyncio
 from typing import Dict, Union
 from pathlib import Path
 
-import httpx
 from PIL import Image, ImageDraw
 
 from gsuid_core.pool import to_thread
@@ -12,6 +11,7 @@ from gsuid_core.logger import logger
 from gsuid_core.models import Event
 from gsuid_core.utils.image.convert import convert_img
 
+from ..utils.http_pool import get_client
 from ..utils.util import timed_async_cache
 from ..utils.image import (
     GOLD,
@@ -284,11 +284,11 @@ def _build_avatar(pic: Image.Image) -> Image.Image:
 async def get_char_hold_rate_data() -> Dict:
     """获取角色持有率数据"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(GET_HOLD_RATE_URL, timeout=10)
-            response.raise_for_status()
-            if response.status_code == 200:
-                return response.json().get("data", {})
+        client = get_client(GET_HOLD_RATE_URL)
+        response = await client.get(GET_HOLD_RATE_URL, timeout=10)
+        response.raise_for_status()
+        if response.status_code == 200:
+            return response.json().get("data", {})
     except Exception as e:
         logger.error(f"[鸣潮·角色持有率] 获取角色持有率数据失败: {e}")
 
@@ -11,6 +11,7 @@ from gsuid_core.logger import logger
 from gsuid_core.models import Event
 from gsuid_core.utils.image.convert import convert_img
 
+from ..utils.http_pool import get_client
 from ..utils.util import timed_async_cache
 from ..utils.image import GREY, get_ICON, add_footer, get_waves_bg
 from ..utils.image import get_square_avatar
@@ -66,18 +67,18 @@ FOOTER_H = 50
 
 @timed_async_cache(expiration=600, condition=lambda x: isinstance(x, dict))
 async def get_matrix_appear_rate_data(char_id: int = 0) -> Union[Dict, None]:
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.get(
-                GET_MATRIX_APPEAR_RATE,
-                params={"char_id": char_id},
-                headers={"Content-Type": "application/json"},
-                timeout=httpx.Timeout(15),
-            )
-            if res.status_code == 200:
-                return res.json().get("data")
-        except Exception as e:
-            logger.exception(f"[鸣潮·矩阵出场率] 获取矩阵出场率数据失败: {e}")
+    client = get_client(GET_MATRIX_APPEAR_RATE)
+    try:
+        res = await client.get(
+            GET_MATRIX_APPEAR_RATE,
+            params={"char_id": char_id},
+            headers={"Content-Type": "application/json"},
+            timeout=httpx.Timeout(15),
+        )
+        if res.status_code == 200:
+            return res.json().get("data")
+    except Exception as e:
+        logger.exception(f"[鸣潮·矩阵出场率] 获取矩阵出场率数据失败: {e}")
     return None
 
 
@@ -10,6 +10,7 @@ from gsuid_core.logger import logger
 from gsuid_core.models import Event
 from gsuid_core.utils.image.convert import convert_img
 
+from ..utils.http_pool import get_client
 from ..utils.util import timed_async_cache
 from ..utils.image import GREY, get_ICON, add_footer, get_waves_bg, get_square_avatar
 from ..utils.api.wwapi import GET_TOWER_APPEAR_RATE, ABYSS_TYPE_MAP_REVERSE
@@ -29,19 +30,19 @@ TEXT_PATH = Path(__file__).parent / "texture2d"
 
 @timed_async_cache(expiration=3600, condition=lambda x: isinstance(x, dict))
 async def get_tower_appear_rate_data() -> Union[Dict, None]:
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.get(
-                GET_TOWER_APPEAR_RATE,
-                headers={
-                    "Content-Type": "application/json",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            if res.status_code == 200:
-                return res.json().get("data", [])
-        except Exception as e:
-            logger.exception(f"[鸣潮·深塔出场率] 获取深塔出场率数据失败: {e}")
+    client = get_client(GET_TOWER_APPEAR_RATE)
+    try:
+        res = await client.get(
+            GET_TOWER_APPEAR_RATE,
+            headers={
+                "Content-Type": "application/json",
+            },
+            timeout=httpx.Timeout(10),
+        )
+        if res.status_code == 200:
+            return res.json().get("data", [])
+    except Exception as e:
+        logger.exception(f"[鸣潮·深塔出场率] 获取深塔出场率数据失败: {e}")
 
 
 async def draw_tower_use_rate(ev: Event):
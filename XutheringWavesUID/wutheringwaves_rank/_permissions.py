@@ -1,9 +1,8 @@
 """rank 公共：token 限制配置 + 活跃用户过滤。
 
 原本在 darw_rank_card / draw_rank_list_card / draw_gacha_rank_card 各复制一份。
+活跃过滤整群一次批量查询 (WavesUserActivity.filter_active_pairs), 练度/角色/抽卡/无尽/矩阵排行共用。
 """
-import time
-import asyncio
 from typing import Dict, List, Optional, Tuple
 
 from ..utils.database.models import WavesBind, WavesUser, WavesUserActivity
@@ -54,23 +53,9 @@ async def filter_active_group_users(
     if not user_pairs:
         return []
 
-    semaphore = asyncio.Semaphore(50)
-
-    async def check(user_id: str, platform: str, check_bot_self_id: str):
-        async with semaphore:
-            try:
-                last_active_time = await WavesUserActivity.get_user_last_active_time(
-                    user_id, platform, check_bot_self_id
-                )
-                current_time = int(time.time())
-                threshold_time = current_time - (active_days * 24 * 60 * 60)
-                is_active = last_active_time is not None and last_active_time >= threshold_time
-            except Exception:
-                is_active = False
-            return user_id, is_active
-
-    results = await asyncio.gather(
-        *(check(uid, plat, sid) for uid, plat, sid in user_pairs)
-    )
-    active_user_ids = {uid for uid, is_active in results if is_active}
+    try:
+        active_pairs = await WavesUserActivity.filter_active_pairs(user_pairs, active_days)
+    except Exception:
+        active_pairs = set()
+    active_user_ids = {uid for uid, _, _ in active_pairs}
     return [user for user in users if user.user_id in active_user_ids]
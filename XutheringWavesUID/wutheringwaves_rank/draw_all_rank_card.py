@@ -1,16 +1,18 @@
 import time
 import asyncio
-from typing import Union, Optional
+from typing import Dict, List, Tuple, Union, Callable, Optional
 from pathlib import Path
 
 import httpx
 from PIL import Image, ImageDraw
 
 from gsuid_core.bot import Bot
+from gsuid_core.pool import to_thread
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
 from gsuid_core.utils.image.convert import convert_img
 
+from ..utils.http_pool import get_client
 from .rank_avatar import get_avatar
 from .rank_badge import draw_bot_name_badge, draw_rank_badge
 from ..utils.util import get_version, hide_uid, build_uid_masker
@@ -81,49 +83,48 @@ async def get_rank(item: RankItem) -> Optional[RankInfoResponse]:
     if not WavesToken:
         return
 
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.post(
-                GET_RANK_URL,
-                json=item.model_dump(),
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            if res.status_code == 200:
-                return RankInfoResponse.model_validate(res.json())
-            else:
-                logger.warning(f"[鸣潮·练度排行] 获取远端排行失败: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"[鸣潮·练度排行] 获取远端排行失败: {e}")
+    client = get_client(GET_RANK_URL)
+    try:
+        res = await client.post(
+            GET_RANK_URL,
+            json=item.model_dump(),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {WavesToken}",
+            },
+            timeout=httpx.Timeout(10),
+        )
+        if res.status_code == 200:
+            return RankInfoResponse.model_validate(res.json())
+        else:
+            logger.warning(f"[鸣潮·练度排行] 获取远端排行失败: {res.status_code} - {res.text}")
+    except Exception as e:
+        logger.exception(f"[鸣潮·练度排行] 获取远端排行失败: {e}")
 
 
 async def get_cards_rank(item: CardsRankRequest) -> Optional[CardsRankResponse]:
     WavesToken = WutheringWavesConfig.get_config("WavesToken").data
     if not WavesToken:
         return
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.post(
-                GET_CARDS_RANK_URL,
-                json=item.model_dump(),
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(20),
-            )
-            if res.status_code == 200:
-                return CardsRankResponse.model_validate(res.json())
-            else:
-                logger.warning(f"[鸣潮·练度排行] 获取群卡片排行失败: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"[鸣潮·练度排行] 获取群卡片排行失败: {e}")
+    client = get_client(GET_CARDS_RANK_URL)
+    try:
+        res = await client.post(
+            GET_CARDS_RANK_URL,
+            json=item.model_dump(),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {WavesToken}",
+            },
+            timeout=httpx.Timeout(20),
+        )
+        if res.status_code == 200:
+            return CardsRankResponse.model_validate(res.json())
+        else:
+            logger.warning(f"[鸣潮·练度排行] 获取群卡片排行失败: {res.status_code} - {res.text}")
+    except Exception as e:
+        logger.exception(f"[鸣潮·练度排行] 获取群卡片排行失败: {e}")
 
 
-# TODO: PIL 卸到线程池 (loop 内 await get_attribute / get_attribute_effect / get_square_weapon 多处, 需要批量预取重构)
 async def draw_all_rank_card(bot: Bot, ev: Event, char: str, rank_type: str, pages: int, modal: str = "", group_uids: Optional[list] = None) -> Union[str, bytes]:
     is_self_ck = False
     self_uid = ""
@@ -195,7 +196,77 @@ async def draw_all_rank_card(bot: Bot, ev: Event, char: str, rank_type: str, pag
             return "获取排行失败"
         details = rankInfoList.data.details
 
-    totalNum = len([rank for rank in details if rank.rank > 0])
+    # 阶段一: 异步预取所有素材, 之后的合成全是同步 PIL
+    fetch_start = time.perf_counter()
+    results = await asyncio.gather(
+        *(get_avatar(rank.user_id, getattr(rank, "sender_avatar", ""), char_id=rank.char_id) for rank in details)
+    )
+
+    _mask_uid = None
+    if is_group:
+        _mask_uid = await build_uid_masker([(d.waves_id, d.user_id) for d in details], ev.bot_id)
+
+    valid_pairs = [(rank, avatar) for rank, avatar in zip(details, results) if rank.rank > 0]
+    sonata_names = list(dict.fromkeys(rank.sonata_name for rank, _ in valid_pairs if rank.sonata_name))
+    weapon_ids = list(dict.fromkeys(rank.weapon_id for rank, _ in valid_pairs))
+    role_attribute, (pile, _), sonata_images, weapon_icons = await asyncio.gather(
+        get_attribute(attribute_name, is_simple=True, size=(40, 40)),
+        get_role_pile_default(char_id, custom=True),
+        asyncio.gather(*(get_sonata_effect_image(name, 50) for name in sonata_names)),
+        asyncio.gather(*(get_square_weapon(weapon_id) for weapon_id in weapon_ids)),
+    )
+    fetch_ms = (time.perf_counter() - fetch_start) * 1000
+
+    # 阶段二: 线程池内合成
+    compose_start = time.perf_counter()
+    card_img = await _compose_all_rank_card(
+        valid_pairs=valid_pairs,
+        char=char,
+        char_id=char_id,
+        char_name=char_name,
+        rank_type=rank_type,
+        modal=modal,
+        pages=pages,
+        page_num=page_num,
+        is_group=is_group,
+        is_self_ck=is_self_ck,
+        self_uid=self_uid,
+        mask_uid=_mask_uid,
+        role_attribute=role_attribute,
+        pile=pile,
+        sonata_images=dict(zip(sonata_names, sonata_images)),
+        weapon_icons=dict(zip(weapon_ids, weapon_icons)),
+    )
+    compose_ms = (time.perf_counter() - compose_start) * 1000
+    card_img = await convert_img(card_img)
+
+    logger.info(
+        f"[鸣潮·练度排行] get_rank_info_for_user end: {time.time() - start_time} "
+        f"(预取 {fetch_ms:.0f}ms, 合成 {compose_ms:.0f}ms, {len(valid_pairs)}行)"
+    )
+    return card_img
+
+
+@to_thread
+def _compose_all_rank_card(
+    valid_pairs: List[Tuple[RankDetail, Image.Image]],
+    char: str,
+    char_id: str,
+    char_name: str,
+    rank_type: str,
+    modal: str,
+    pages: int,
+    page_num: int,
+    is_group: bool,
+    is_self_ck: bool,
+    self_uid: str,
+    mask_uid: Optional[Callable[[str, str], str]],
+    role_attribute: Image.Image,
+    pile: Image.Image,
+    sonata_images: Dict[str, Image.Image],
+    weapon_icons: Dict[int, Image.Image],
+) -> Image.Image:
+    totalNum = len(valid_pairs)
     title_h = 500
     bar_star_h = 110
     modal_options = get_modal_options(int(char_id))
@@ -241,19 +312,8 @@ async def draw_all_rank_card(bot: Bot, ev: Event, char: str, rank_type: str, pag
     total_score = 0
     total_damage = 0
 
-    tasks = [
-        get_avatar(rank.user_id, getattr(rank, "sender_avatar", ""), char_id=rank.char_id)
-        for rank in details
-    ]
-    results = await asyncio.gather(*tasks)
-
-    _mask_uid = None
-    if is_group:
-        _mask_uid = await build_uid_masker([(d.waves_id, d.user_id) for d in details], ev.bot_id)
-
     avg_num = 0
     damage_name = ""
-    valid_pairs = [(rank, avatar) for rank, avatar in zip(details, results) if rank.rank > 0]
     for index, temp in enumerate(valid_pairs):
         rank: RankDetail = temp[0]
         damage_name = rank.expected_name
@@ -262,8 +322,6 @@ async def draw_all_rank_card(bot: Bot, ev: Event, char: str, rank_type: str, pag
         bar_star_draw = ImageDraw.Draw(bar_bg)
         bar_bg.paste(role_avatar, (100, 0), role_avatar)
 
-        role_attribute = await get_attribute(attribute_name, is_simple=True)
-        role_attribute = role_attribute.resize((40, 40)).convert("RGBA")
         bar_bg.alpha_composite(role_attribute, (300, 20))
 
         # 命座
@@ -299,8 +357,7 @@ async def draw_all_rank_card(bot: Bot, ev: Event, char: str, rank_type: str, pag
 
         # 合鸣效果
         if rank.sonata_name:
-            effect_image = await get_sonata_effect_image(rank.sonata_name, 50)
-            bar_bg.alpha_composite(effect_image, (790, 15))
+            bar_bg.alpha_composite(sonata_images[rank.sonata_name], (790, 15))
             sonata_name = get_sonata_label(rank.sonata_name)
         else:
             sonata_name = "合鸣效果"
@@ -318,8 +375,7 @@ async def draw_all_rank_card(bot: Bot, ev: Event, char: str, rank_type: str, pag
             logger.warning(f"[鸣潮·练度排行] 武器无法找到, 可能暂未适配, 请先检查输入是否正确")
             continue
 
-        weapon_icon = await get_square_weapon(rank.weapon_id)
-        weapon_icon = crop_center_img(weapon_icon, 110, 110)
+        weapon_icon = crop_center_img(weapon_icons[rank.weapon_id], 110, 110)
         weapon_icon_bg = get_weapon_icon_bg(weapon_model.starLevel, TEXT_PATH)
         weapon_icon_bg.paste(weapon_icon, (10, 20), weapon_icon)
 
@@ -367,7 +423,7 @@ async def draw_all_rank_card(bot: Bot, ev: Event, char: str, rank_type: str, pag
         if is_self_ck and self_uid == rank.waves_id:
             uid_color = RED
         if is_group:
-            _uid_text = _mask_uid(rank.waves_id, rank.user_id)
+            _uid_text = mask_uid(rank.waves_id, rank.user_id)
         else:
             _uid_text = hide_uid(rank.waves_id, user_pref="on" if rank.hide_uid else "")
         bar_star_draw.text((350, 40), f"特征码: {_uid_text}", uid_color, waves_font_20, "lm")
@@ -422,18 +478,13 @@ async def draw_all_rank_card(bot: Bot, ev: Event, char: str, rank_type: str, pag
     img_temp = Image.new("RGBA", char_mask2.size)
     img_temp.alpha_composite(title, (-300, 0))
     # 人物bg
-    pile, _ = await get_role_pile_default(char_id, custom=True)
     img_temp.alpha_composite(pile, (600, -120))
 
     img_temp2 = Image.new("RGBA", char_mask2.size)
     img_temp2.paste(img_temp, (0, 0), char_mask2.copy())
 
     card_img.alpha_composite(img_temp2, (0, 0))
-    card_img = add_footer(card_img)
-    card_img = await convert_img(card_img)
-
-    logger.info(f"[鸣潮·练度排行] get_rank_info_for_user end: {time.time() - start_time}")
-    return card_img
+    return add_footer(card_img)
 
 
 def get_chain_name(n: int) -> str:
@@ -32,7 +32,7 @@ from ..utils.fonts.waves_fonts import (
     waves_font_34,
     waves_font_58,
 )
-from ..wutheringwaves_gachalog.draw_gachalogs import get_gacha_stats
+from ..wutheringwaves_gachalog.gacha_stats import get_gacha_stats
 
 TEXT_PATH = Path(__file__).parent / "texture2d"
 GACHA_GREEN = (90, 220, 120)
@@ -1,17 +1,19 @@
 import time
 import asyncio
-from typing import List, Union, Optional
+from typing import Dict, List, Tuple, Union, Callable, Optional
 from pathlib import Path
 
 from PIL import Image, ImageDraw
 from pydantic import BaseModel
 
 from gsuid_core.bot import Bot
+from gsuid_core.pool import to_thread
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
 from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.image.image_tools import crop_center_img
 
+from . import rank_index
 from .rank_avatar import get_avatar
 from .rank_badge import draw_rank_badge
 from ._permissions import get_rank_token_condition, filter_active_group_users
@@ -38,6 +40,7 @@ from ..utils.calculate import (
     get_total_score_bg,
 )
 from ..utils.name_convert import alias_to_char_name, char_name_to_char_id
+from ..utils.damage.modal import get_role_modal
 from ..utils.ascension.sonata import detect_combo_sonata
 from ..utils.char_info_utils import get_all_role_detail_info_list, get_rover_detail_map
 from ..utils.damage.abstract import DamageRankRegister
@@ -70,7 +73,7 @@ logo_img = Image.open(TEXT_PATH / "logo_small_2.png")
 
 
 class RankInfo(BaseModel):
-    roleDetail: RoleDetailData  # 角色明细
+    roleDetail: Optional[RoleDetailData] = None  # 角色明细 (仅上榜行回填)
     qid: str  # qq id
     uid: str  # uid
     level: int  # 角色等级
@@ -83,9 +86,14 @@ class RankInfo(BaseModel):
     sonata_name: str  # 合鸣效果
 
 
-async def get_one_rank_info(user_id, uid, role_detail, rankDetail):
+def compute_rank_row(role_detail: Optional[RoleDetailData], char_id: str) -> Optional[Dict]:
+    """单角色排行行 (写入 rank_index); 无声骸或评分为 0 返回 None。纯同步, 可丢线程。"""
     from ..utils.calc import WuWaCalc
+
+    if not role_detail or not role_detail.phantomData or not role_detail.phantomData.equipPhantomList:
+        return None
     equipPhantomList = role_detail.phantomData.equipPhantomList
+    rankDetail = DamageRankRegister.find_class(char_id)
 
     calc: WuWaCalc = WuWaCalc(role_detail)
     calc.phantom_pre = calc.prepare_phantom()
@@ -98,7 +106,6 @@ async def get_one_rank_info(user_id, uid, role_detail, rankDetail):
 
     # 评分
     phantom_score = 0
-    # calc_temp = get_calc_map(phantom_sum_value, role_detail.role.roleName)
     for i, _phantom in enumerate(equipPhantomList):
         if _phantom and _phantom.phantomProp:
             props = _phantom.get_props()
@@ -106,7 +113,7 @@ async def get_one_rank_info(user_id, uid, role_detail, rankDetail):
             phantom_score += _score
 
     if phantom_score == 0:
-        return
+        return None
 
     phantom_score = round(phantom_score, 2)
     phantom_bg = get_total_score_bg(role_detail.role.roleName, phantom_score, calc.calc_temp)
@@ -149,22 +156,34 @@ async def get_one_rank_info(user_id, uid, role_detail, rankDetail):
                 except ValueError:
                     expected_damage_int = 0
 
-    rankInfo = RankInfo(
-        **{
-            "roleDetail": role_detail,
-            "qid": user_id,
-            "uid": uid,
-            "level": role_detail.role.level,
-            "chain": role_detail.get_chain_num(),
-            "chainName": role_detail.get_chain_name(),
-            "score": round(int(phantom_score * 100) / 100, ndigits=2),
-            "score_bg": phantom_bg,
-            "expected_damage": expected_damage,
-            "expected_damage_int": expected_damage_int,
-            "sonata_name": sonata_name,
-        }
+    return {
+        "role_id": role_detail.role.roleId,
+        "modal": get_role_modal(role_detail),
+        "level": role_detail.role.level,
+        "chain": role_detail.get_chain_num(),
+        "chain_name": role_detail.get_chain_name(),
+        "score": round(int(phantom_score * 100) / 100, ndigits=2),
+        "score_bg": phantom_bg,
+        "expected_damage": str(expected_damage),
+        "expected_damage_int": expected_damage_int,
+        "weapon_id": role_detail.weaponData.weapon.weaponId,
+        "sonata_name": sonata_name,
+    }
+
+
+def _rank_info_from_row(user_id: str, uid: str, row: Dict) -> RankInfo:
+    return RankInfo(
+        qid=user_id,
+        uid=uid,
+        level=row["level"],
+        chain=row["chain"],
+        chainName=row["chain_name"],
+        score=row["score"],
+        score_bg=row["score_bg"],
+        expected_damage=row["expected_damage"],
+        expected_damage_int=row["expected_damage_int"],
+        sonata_name=row["sonata_name"] or "",
     )
-    return rankInfo
 
 
 async def find_role_detail(uid: str, char_id: Union[int, str, List[str], List[int]]) -> Optional[RoleDetailData]:
@@ -183,74 +202,48 @@ async def find_role_detail(uid: str, char_id: Union[int, str, List[str], List[in
     return next((role for role in role_details if str(role.role.roleId) in char_id_list), None)
 
 
-async def get_rank_info_for_user(
-    user: WavesBind,
-    char_id,
-    find_char_id,
-    rankDetail,
-    tokenLimitFlag,
-    wavesTokenUsersMap,
-):
-    rankInfoList = []
-    if not user.uid:
-        return rankInfoList
-
-    tasks = [find_role_detail(uid, find_char_id) for uid in user.uid.split("_")]
-    role_details = await asyncio.gather(*tasks)
-
-    for uid, role_detail in zip(user.uid.split("_"), role_details):
-        if (
-            tokenLimitFlag
-            and (
-                user.user_id,
-                uid,
-            )
-            not in wavesTokenUsersMap
-        ):
-            continue
-        if not role_detail:
-            continue
-        if not role_detail.phantomData or not role_detail.phantomData.equipPhantomList:
-            continue
+async def _reindex_uids(uids: List[str], char_id, find_char_id) -> Dict[str, Dict]:
+    """索引缺失/过期的 uid 现算并回填, 返回有评分的行。"""
+    key = rank_index.rank_key(char_id)
+    semaphore = asyncio.Semaphore(50)
 
-        rankInfo = await get_one_rank_info(user.user_id, uid, role_detail, rankDetail)
-        if not rankInfo:
-            continue
-        rankInfoList.append(rankInfo)
+    async def _one(uid: str):
+        async with semaphore:
+            stamp = await asyncio.to_thread(rank_index.panel_stamp, uid)
+            role_detail = await find_role_detail(uid, find_char_id)
+            row = await asyncio.to_thread(compute_rank_row, role_detail, key)
+            await rank_index.upsert_rows(uid, stamp, {key: row})
+            return uid, row
 
-    return rankInfoList
+    results = await asyncio.gather(*(_one(uid) for uid in uids))
+    return {uid: row for uid, row in results if row}
 
 
 async def get_all_rank_info(
     users: List[WavesBind],
     char_id,
     find_char_id,
-    rankDetail,
     tokenLimitFlag,
     wavesTokenUsersMap,
-):
-    semaphore = asyncio.Semaphore(50)
-
-    async def process_user(user):
-        async with semaphore:
-            return await get_rank_info_for_user(
-                user,
-                char_id,
-                find_char_id,
-                rankDetail,
-                tokenLimitFlag,
-                wavesTokenUsersMap,
-            )
+) -> List[RankInfo]:
+    """群内 (user_id, uid) 的排行行; 先查 rank_index, 仅缺失/过期的 uid 读面板现算。"""
+    pairs: List[Tuple[str, str]] = []
+    for user in users:
+        if not user.uid:
+            continue
+        for uid in user.uid.split("_"):
+            if tokenLimitFlag and (user.user_id, uid) not in wavesTokenUsersMap:
+                continue
+            pairs.append((user.user_id, uid))
 
-    tasks = [process_user(user) for user in users]
-    results = await asyncio.gather(*tasks)
+    rows, stale = await rank_index.query(char_id, (uid for _, uid in pairs))
+    if stale:
+        rows.update(await _reindex_uids(stale, char_id, find_char_id))
+        logger.debug(f"[鸣潮·排行索引] {char_id} 命中 {len(pairs) - len(stale)} 现算 {len(stale)}")
 
-    # Flatten the results list
-    rankInfoList = [rank_info for result in results for rank_info in result]
-    return rankInfoList
+    return [_rank_info_from_row(user_id, uid, rows[uid]) for user_id, uid in pairs if uid in rows]
 
 
-# TODO: PIL 卸到线程池 (loop body 多处 await get_attribute / get_square_weapon / get_attribute_effect, 重构成本大)
 async def draw_rank_img(bot: Bot, ev: Event, char: str, rank_type: str) -> Union[str, bytes]:
     char_id = char_name_to_char_id(char)
     if not char_id:
@@ -311,7 +304,6 @@ async def draw_rank_img(bot: Bot, ev: Event, char: str, rank_type: str) -> Union
         list(users),
         char_id,
         find_char_id,
-        rankDetail,
         tokenLimitFlag,
         wavesTokenUsersMap,
     )
@@ -352,7 +344,76 @@ async def draw_rank_img(bot: Bot, ev: Event, char: str, rank_type: str) -> Union
     if rankId and rankInfo and rankId > rank_length:
         rankInfoList.append(rankInfo)
 
-    totalNum = len(rankInfoList)
+    # 只给上榜行读面板 (头像/属性/武器绘制要用)
+    details = await asyncio.gather(*(find_role_detail(r.uid, find_char_id) for r in rankInfoList))
+    for rank, detail in zip(rankInfoList, details):
+        rank.roleDetail = detail
+    rankInfoList = [r for r in rankInfoList if r.roleDetail is not None]
+
+    # 阶段一: 异步预取所有素材, 之后的合成全是同步 PIL
+    fetch_start = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            get_avatar(rank.qid, getattr(rank, "sender_avatar", ""), char_id=rank.roleDetail.role.roleId)
+            for rank in rankInfoList
+        )
+    )
+
+    _mask_uid = await build_uid_masker([(r.uid, r.qid) for r in rankInfoList], ev.bot_id)
+
+    attribute_names = list(dict.fromkeys(r.roleDetail.role.attributeName or "导电" for r in rankInfoList))
+    sonata_names = list(dict.fromkeys(r.sonata_name for r in rankInfoList if r.sonata_name))
+    weapon_ids = list(dict.fromkeys(r.roleDetail.weaponData.weapon.weaponId for r in rankInfoList))
+    attribute_images, sonata_images, weapon_icons, (pile, _) = await asyncio.gather(
+        asyncio.gather(*(get_attribute(name, is_simple=True, size=(40, 40)) for name in attribute_names)),
+        asyncio.gather(*(get_sonata_effect_image(name, 50) for name in sonata_names)),
+        asyncio.gather(*(get_square_weapon(weapon_id) for weapon_id in weapon_ids)),
+        get_role_pile_default(char_id, custom=True),
+    )
+    fetch_ms = (time.perf_counter() - fetch_start) * 1000
+
+    # 阶段二: 线程池内合成
+    compose_start = time.perf_counter()
+    card_img = await _compose_rank_img(
+        rank_pairs=list(zip(rankInfoList, results)),
+        rankId=rankId,
+        char_id=char_id,
+        char_name=char_name,
+        rank_type=rank_type,
+        damage_title=damage_title,
+        tokenLimitFlag=tokenLimitFlag,
+        mask_uid=_mask_uid,
+        pile=pile,
+        attribute_images=dict(zip(attribute_names, attribute_images)),
+        sonata_images=dict(zip(sonata_names, sonata_images)),
+        weapon_icons=dict(zip(weapon_ids, weapon_icons)),
+    )
+    compose_ms = (time.perf_counter() - compose_start) * 1000
+    card_img = await convert_img(card_img)
+
+    logger.info(
+        f"[鸣潮·练度排行] get_rank_info_for_user end: {time.time() - start_time} "
+        f"(预取 {fetch_ms:.0f}ms, 合成 {compose_ms:.0f}ms, {len(rankInfoList)}行)"
+    )
+    return card_img
+
+
+@to_thread
+def _compose_rank_img(
+    rank_pairs: List[Tuple[RankInfo, Image.Image]],
+    rankId: Optional[int],
+    char_id: str,
+    char_name: str,
+    rank_type: str,
+    damage_title: str,
+    tokenLimitFlag: bool,
+    mask_uid: Callable[[str, str], str],
+    pile: Image.Image,
+    attribute_images: Dict[str, Image.Image],
+    sonata_images: Dict[str, Image.Image],
+    weapon_icons: Dict[int, Image.Image],
+) -> Image.Image:
+    totalNum = len(rank_pairs)
     title_h = 500
     bar_star_h = 110
     h = title_h + totalNum * bar_star_h + 80
@@ -363,15 +424,7 @@ async def draw_rank_img(bot: Bot, ev: Event, char: str, rank_type: str) -> Union
     total_score = 0
     total_damage = 0
 
-    tasks = [
-        get_avatar(rank.qid, getattr(rank, "sender_avatar", ""), char_id=rank.roleDetail.role.roleId)
-        for rank in rankInfoList
-    ]
-    results = await asyncio.gather(*tasks)
-
-    _mask_uid = await build_uid_masker([(r.uid, r.qid) for r in rankInfoList], ev.bot_id)
-
-    for index, temp in enumerate(zip(rankInfoList, results)):
+    for index, temp in enumerate(rank_pairs):
         rank, role_avatar = temp
         rank: RankInfo
         rank_role_detail: RoleDetailData = rank.roleDetail
@@ -379,8 +432,7 @@ async def draw_rank_img(bot: Bot, ev: Event, char: str, rank_type: str) -> Union
         bar_star_draw = ImageDraw.Draw(bar_bg)
         bar_bg.paste(role_avatar, (100, 0), role_avatar)
 
-        role_attribute = await get_attribute(rank_role_detail.role.attributeName or "导电", is_simple=True)
-        role_attribute = role_attribute.resize((40, 40)).convert("RGBA")
+        role_attribute = attribute_images[rank_role_detail.role.attributeName or "导电"]
         bar_bg.alpha_composite(role_attribute, (300, 20))
 
         # 命座
@@ -413,8 +465,7 @@ async def draw_rank_img(bot: Bot, ev: Event, char: str, rank_type: str) -> Union
 
         # 合鸣效果
         if rank.sonata_name:
-            effect_image = await get_sonata_effect_image(rank.sonata_name, 50)
-            bar_bg.alpha_composite(effect_image, (533, 15))
+            bar_bg.alpha_composite(sonata_images[rank.sonata_name], (533, 15))
             sonata_name = get_sonata_label(rank.sonata_name)
         else:
             sonata_name = "合鸣效果"
@@ -428,8 +479,7 @@ async def draw_rank_img(bot: Bot, ev: Event, char: str, rank_type: str) -> Union
         weapon_bg_temp = Image.new("RGBA", (600, 300))
 
         weaponData: WeaponData = rank_role_detail.weaponData
-        weapon_icon = await get_square_weapon(weaponData.weapon.weaponId)
-        weapon_icon = crop_center_img(weapon_icon, 110, 110)
+        weapon_icon = crop_center_img(weapon_icons[weaponData.weapon.weaponId], 110, 110)
         weapon_icon_bg = get_weapon_icon_bg(weaponData.weapon.weaponStarLevel)
         weapon_icon_bg.paste(weapon_icon, (10, 20), weapon_icon)
 
@@ -470,7 +520,7 @@ async def draw_rank_img(bot: Bot, ev: Event, char: str, rank_type: str) -> Union
         uid_color = "white"
         if rankId is not None and rankId == rank_id:
             uid_color = RED
-        bar_star_draw.text((210, 75), f"{_mask_uid(rank.uid, rank.qid)}", uid_color, waves_font_20, "lm")
+        bar_star_draw.text((210, 75), f"{mask_uid(rank.uid, rank.qid)}", uid_color, waves_font_20, "lm")
 
         # 贴到背景
         card_img.paste(bar_bg, (0, title_h + index * bar_star_h), bar_bg)
@@ -491,7 +541,6 @@ async def draw_rank_img(bot: Bot, ev: Event, char: str, rank_type: str) -> Union
     title.alpha_composite(logo_img.copy(), dest=(50, 65))
 
     # 人物bg
-    pile, _ = await get_role_pile_default(char_id, custom=True)
     title.paste(pile, (450, -120), pile)
     title_draw.text((200, 335), f"{avg_score}", "white", waves_font_44, "mm")
     title_draw.text((200, 375), "平均声骸分数", SPECIAL_GOLD, waves_font_20, "mm")
@@ -528,11 +577,7 @@ async def draw_rank_img(bot: Bot, ev: Event, char: str, rank_type: str) -> Union
     img_temp = Image.new("RGBA", char_mask.size)
     img_temp.paste(title, (0, 0), char_mask.copy())
     card_img.alpha_composite(img_temp, (0, 0))
-    card_img = add_footer(card_img)
-    card_img = await convert_img(card_img)
-
-    logger.info(f"[鸣潮·练度排行] get_rank_info_for_user end: {time.time() - start_time}")
-    return card_img
+    return add_footer(card_img)
 
 
 def get_weapon_icon_bg(star: int = 3) -> Image.Image:
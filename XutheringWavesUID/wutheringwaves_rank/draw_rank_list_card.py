@@ -1,6 +1,6 @@
 import time
 import asyncio
-from typing import Dict, List, Tuple, Union, Optional
+from typing import Any, Dict, List, Tuple, Union, Optional
 from pathlib import Path
 
 from PIL import Image, ImageDraw
@@ -115,7 +115,7 @@ class PracticeRankInfo(BaseModel):
     uid: str  # uid
     kuro_name: str  # 玩家名字
     total_score: float  # 总声骸分数
-    role_details: List[RoleDetailData]  # 角色详情列表
+    role_details: List[Any]  # 角色详情列表 (RoleDetailData 或其 Struct 孪生)
 
 
 async def _build_practice_rank_for_uid(
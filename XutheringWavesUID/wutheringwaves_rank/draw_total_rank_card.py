@@ -12,6 +12,7 @@ from gsuid_core.models import Event
 from gsuid_core.pool import to_thread
 from gsuid_core.utils.image.convert import convert_img
 
+from ..utils.http_pool import get_client
 from .rank_avatar import get_avatar
 from .rank_badge import draw_bot_name_badge, draw_rank_badge
 from ..utils.util import get_version, hide_uid
@@ -53,23 +54,23 @@ async def get_rank(item: TotalRankRequest) -> Optional[TotalRankResponse]:
     if not WavesToken:
         return
 
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.post(
-                GET_TOTAL_RANK_URL,
-                json=item.model_dump(),
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            if res.status_code == 200:
-                return TotalRankResponse.model_validate(res.json())
-            else:
-                logger.warning(f"[鸣潮·练度排行] 获取远端排行失败: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"[鸣潮·练度排行] 获取远端排行失败: {e}")
+    client = get_client(GET_TOTAL_RANK_URL)
+    try:
+        res = await client.post(
+            GET_TOTAL_RANK_URL,
+            json=item.model_dump(),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {WavesToken}",
+            },
+            timeout=httpx.Timeout(10),
+        )
+        if res.status_code == 200:
+            return TotalRankResponse.model_validate(res.json())
+        else:
+            logger.warning(f"[鸣潮·练度排行] 获取远端排行失败: {res.status_code} - {res.text}")
+    except Exception as e:
+        logger.exception(f"[鸣潮·练度排行] 获取远端排行失败: {e}")
 
 
 async def draw_total_rank(bot: Bot, ev: Event, pages: int) -> Union[str, bytes]:
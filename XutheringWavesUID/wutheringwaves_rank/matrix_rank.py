@@ -14,6 +14,7 @@ from gsuid_core.logger import logger
 from gsuid_core.models import Event
 from gsuid_core.utils.image.convert import convert_img
 
+from ..utils.http_pool import get_client
 from ..utils.util import get_version, hide_uid, build_uid_masker
 from ..utils.player_store import read_player_json
 from ..utils.image import (
@@ -41,6 +42,7 @@ from ..utils.ascension.char import get_char_model
 from ..utils.database.models import WavesBind, WavesUser
 from ..utils.resource.constant import randomize_special_char_id
 from ..wutheringwaves_config import PREFIX, WutheringWavesConfig
+from ._permissions import filter_active_group_users
 from ..utils.fonts.waves_fonts import (
     waves_font_12,
     waves_font_18,
@@ -76,23 +78,23 @@ async def get_rank(item: MatrixRankItem) -> Optional[MatrixRankRes]:
     if not WavesToken:
         return
 
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.post(
-                GET_MATRIX_RANK_URL,
-                json=item.model_dump(),
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            if res.status_code == 200:
-                return MatrixRankRes.model_validate(res.json())
-            else:
-                logger.warning(f"[鸣潮·矩阵排行] 获取远端排行失败: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"[鸣潮·矩阵排行] 获取远端排行失败: {e}")
+    client = get_client(GET_MATRIX_RANK_URL)
+    try:
+        res = await client.post(
+            GET_MATRIX_RANK_URL,
+            json=item.model_dump(),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {WavesToken}",
+            },
+            timeout=httpx.Timeout(10),
+        )
+        if res.status_code == 200:
+            return MatrixRankRes.model_validate(res.json())
+        else:
+            logger.warning(f"[鸣潮·矩阵排行] 获取远端排行失败: {res.status_code} - {res.text}")
+    except Exception as e:
+        logger.exception(f"[鸣潮·矩阵排行] 获取远端排行失败: {e}")
 
 
 # TODO: PIL 卸到线程池 (loop 内 await get_square_avatar / pic_download_from_url 频繁, 需要批量预取重构)
@@ -249,8 +251,7 @@ async def draw_all_matrix_rank_card(bot: Bot, ev: Event):
                 char_model = get_char_model(char_id)
                 if char_model is None:
                     continue
-                char_avatar = await get_square_avatar(char_id)
-                char_avatar = char_avatar.resize((45, 45))
+                char_avatar = await get_square_avatar(char_id, (45, 45))
 
                 if char_chain != -1:
                     info_block = Image.new("RGBA", (20, 20), color=(255, 255, 255, 0))
@@ -491,6 +492,8 @@ async def draw_matrix_rank_list(bot: Bot, ev: Event):
 
     # 获取群里的所有用户
     users = await WavesBind.get_group_all_uid(ev.group_id)
+    if WutheringWavesConfig.get_config("RankActiveFilterGroup").data:
+        users = await filter_active_group_users(list(users), ev.bot_id, ev.bot_self_id)
     if not users:
         msg = []
         msg.append(f"[鸣潮] 群【{ev.group_id}】暂无矩阵排行数据")
@@ -0,0 +1,208 @@
+"""群角色排行索引 (sqlite): (char_id, uid) → 排行行所需的评分/期望伤害/链/武器/合鸣。
+
+- char_id 为排行键: 漂泊者各属性折叠到 SPECIAL_CHAR_RANK_MAP 的 canonical id。
+- 每行带 stamp = 计算版本 + rawData/rover 落盘指纹; 查询时 stamp 不符视为过期,
+  由调用方回退读面板现算并回填, 所以外部改写面板文件也不会读到旧值。
+- save_card_info 落盘后调 update_rank_index: 未变动角色的行把 stamp 顺延到新指纹,
+  变动角色重算, 群排行查询因此基本只剩一次索引查询。
+"""
+import os
+import time
+import asyncio
+import sqlite3
+from typing import Dict, List, Tuple, Iterable, Optional
+from contextlib import closing
+
+from gsuid_core.logger import logger
+
+from ..version import XutheringWavesUID_version
+from ..utils.player_store import resolve_player_path
+from ..utils.resource.constant import SPECIAL_CHAR, SPECIAL_CHAR_RANK_MAP
+from ..utils.resource.RESOURCE_PATH import MAIN_PATH, BUILD_PATH, PLAYER_PATH, MAP_BUILD_PATH
+
+INDEX_PATH = MAIN_PATH / "rank_index.db"
+_IN_CHUNK = 500  # sqlite 变量上限保守取值
+
+_COLUMNS = (
+    "role_id",
+    "modal",
+    "level",
+    "chain",
+    "chain_name",
+    "score",
+    "score_bg",
+    "expected_damage",
+    "expected_damage_int",
+    "weapon_id",
+    "sonata_name",
+)
+
+_db_ready = False
+_calc_version: Optional[str] = None
+_calc_checked_at = 0.0
+_CALC_VER_TTL = 60.0  # 其它 worker 更新资源时本进程收不到重载通知, 隔这么久重扫一次
+
+
+def rank_key(char_id) -> str:
+    cid = str(char_id)
+    return SPECIAL_CHAR_RANK_MAP.get(cid, cid)
+
+
+def _calc_ver() -> str:
+    """插件版本 + 评分/伤害计算模块的最新 mtime; 资源更新后旧行整体失效。
+
+    结果按 _CALC_VER_TTL 缓存, 资源重载 (reload_all_modules) 时由 reset_calc_version 立即作废。
+    """
+    global _calc_version, _calc_checked_at
+    now = time.monotonic()
+    if _calc_version is None or now - _calc_checked_at > _CALC_VER_TTL:
+        latest = 0
+        for root in (BUILD_PATH, MAP_BUILD_PATH):
+            try:
+                for entry in os.scandir(root):
+                    latest = max(latest, entry.stat().st_mtime_ns)
+            except OSError:
+                continue
+        _calc_version = f"{XutheringWavesUID_version}:{latest}"
+        _calc_checked_at = now
+    return _calc_version
+
+
+def reset_calc_version() -> None:
+    """资源/计算模块重载后调用, 下次取 stamp 时重新计算版本。"""
+    global _calc_version
+    _calc_version = None
+
+
+def _file_stamp(path) -> str:
+    rp = resolve_player_path(path)
+    if rp is None:
+        return "-"
+    try:
+        st = rp.stat()
+    except OSError:
+        return "-"
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def panel_stamp(uid: str) -> str:
+    """uid 面板文件指纹 (rawData + rover)。"""
+    _dir = PLAYER_PATH / uid
+    return f"{_calc_ver()}|{_file_stamp(_dir / 'rawData.json')}|{_file_stamp(_dir / 'rover.json')}"
+
+
+def _connect() -> sqlite3.Connection:
+    return sqlite3.connect(str(INDEX_PATH), timeout=5.0)
+
+
+def _ensure_db() -> None:
+    global _db_ready
+    if _db_ready:
+        return
+    INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with closing(_connect()) as conn:
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rank_index ("
+                "char_id TEXT NOT NULL, uid TEXT NOT NULL, stamp TEXT NOT NULL, "
+                "present INTEGER NOT NULL, role_id INTEGER, modal TEXT, level INTEGER, "
+                "chain INTEGER, chain_name TEXT, score REAL, score_bg TEXT, "
+                "expected_damage TEXT, expected_damage_int INTEGER, weapon_id INTEGER, "
+                "sonata_name TEXT, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (char_id, uid))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_rank_index_uid ON rank_index (uid)")
+    _db_ready = True
+
+
+def _row_values(row: Optional[Dict]) -> Tuple:
+    if row is None:
+        return (0,) + (None,) * len(_COLUMNS)
+    return (1,) + tuple(row.get(c) for c in _COLUMNS)
+
+
+def upsert_rows_sync(uid: str, stamp: str, rows: Dict[str, Optional[Dict]]) -> None:
+    """rows: {rank_key: 行 dict 或 None(未拥有/无评分)}。"""
+    if not rows:
+        return
+    _ensure_db()
+    now = time.time()
+    params = [(k, uid, stamp, *_row_values(v), now) for k, v in rows.items()]
+    placeholders = ", ".join("?" * (5 + len(_COLUMNS)))
+    with closing(_connect()) as conn:
+        with conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO rank_index (char_id, uid, stamp, present, "
+                f"{', '.join(_COLUMNS)}, updated_at) VALUES ({placeholders})",
+                params,
+            )
+
+
+def carry_forward_sync(uid: str, old_stamp: str, new_stamp: str) -> int:
+    """旧指纹下仍有效的行顺延到新指纹, 返回顺延行数。"""
+    _ensure_db()
+    with closing(_connect()) as conn:
+        with conn:
+            cur = conn.execute(
+                "UPDATE rank_index SET stamp = ? WHERE uid = ? AND stamp = ?",
+                (new_stamp, uid, old_stamp),
+            )
+            return cur.rowcount
+
+
+def query_sync(char_id, uids: Iterable[str]) -> Tuple[Dict[str, Dict], List[str]]:
+    """按群 uid 集合查一个角色的索引。
+
+    返回 (命中行 {uid: row}, 过期/缺失需现算的 uid 列表); 已确认未拥有的 uid 两边都不出现。
+    """
+    key = rank_key(char_id)
+    uid_list = list(dict.fromkeys(uids))
+    stamps = {uid: panel_stamp(uid) for uid in uid_list}
+    _ensure_db()
+    found: Dict[str, Dict] = {}
+    fresh = set()
+    with closing(_connect()) as conn:
+        conn.row_factory = sqlite3.Row
+        for i in range(0, len(uid_list), _IN_CHUNK):
+            chunk = uid_list[i : i + _IN_CHUNK]
+            rows = conn.execute(
+                f"SELECT * FROM rank_index WHERE char_id = ? AND uid IN ({', '.join('?' * len(chunk))})",
+                (key, *chunk),
+            ).fetchall()
+            for r in rows:
+                if r["stamp"] != stamps[r["uid"]]:
+                    continue
+                fresh.add(r["uid"])
+                if r["present"]:
+                    found[r["uid"]] = {c: r[c] for c in _COLUMNS}
+    stale = [uid for uid in uid_list if uid not in fresh]
+    return found, stale
+
+
+async def query(char_id, uids: Iterable[str]) -> Tuple[Dict[str, Dict], List[str]]:
+    return await asyncio.to_thread(query_sync, char_id, list(uids))
+
+
+async def upsert_rows(uid: str, stamp: str, rows: Dict[str, Optional[Dict]]) -> None:
+    await asyncio.to_thread(upsert_rows_sync, uid, stamp, rows)
+
+
+async def update_rank_index(uid: str, old_stamp: str, changed_role_ids: Iterable[int]) -> None:
+    """save_card_info 落盘后调用: 顺延未变动角色, 重算变动角色。"""
+    from .draw_rank_card import find_role_detail, compute_rank_row
+
+    keys = {rank_key(rid) for rid in changed_role_ids}
+    if any(k in SPECIAL_CHAR for k in keys):
+        # 漂泊者换属性会改 rawData 里其它属性的去留, 全部 canonical 一并重算
+        keys |= set(SPECIAL_CHAR_RANK_MAP.values())
+    try:
+        new_stamp = await asyncio.to_thread(panel_stamp, uid)
+        await asyncio.to_thread(carry_forward_sync, uid, old_stamp, new_stamp)
+        rows: Dict[str, Optional[Dict]] = {}
+        for key in keys:
+            role_detail = await find_role_detail(uid, SPECIAL_CHAR.get(key, key))
+            rows[key] = await asyncio.to_thread(compute_rank_row, role_detail, key)
+        await upsert_rows(uid, new_stamp, rows)
+    except Exception as e:
+        logger.warning(f"[鸣潮·排行索引] 更新失败 uid={uid}: {e}")
@@ -13,6 +13,7 @@ from gsuid_core.logger import logger
 from gsuid_core.models import Event
 from gsuid_core.utils.image.convert import convert_img
 
+from ..utils.http_pool import get_client
 from ..utils.util import get_version, hide_uid, build_uid_masker
 from ..utils.player_store import read_player_json
 from ..utils.image import (
@@ -37,6 +38,7 @@ from ..utils.ascension.char import get_char_model
 from ..utils.database.models import WavesBind, WavesUser
 from ..utils.resource.constant import SPECIAL_CHAR_INT_ALL, NORMAL_LIST_IDS, randomize_special_char_id
 from ..wutheringwaves_config import PREFIX, WutheringWavesConfig
+from ._permissions import filter_active_group_users
 from ..utils.fonts.waves_fonts import (
     waves_font_12,
     waves_font_18,
@@ -93,23 +95,23 @@ async def get_rank(item: SlashRankItem) -> Optional[SlashRankRes]:
     if not WavesToken:
         return
 
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.post(
-                GET_SLASH_RANK_URL,
-                json=item.model_dump(),
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            if res.status_code == 200:
-                return SlashRankRes.model_validate(res.json())
-            else:
-                logger.warning(f"[鸣潮·冥海排行] 获取远端排行失败: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"[鸣潮·冥海排行] 获取远端排行失败: {e}")
+    client = get_client(GET_SLASH_RANK_URL)
+    try:
+        res = await client.post(
+            GET_SLASH_RANK_URL,
+            json=item.model_dump(),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {WavesToken}",
+            },
+            timeout=httpx.Timeout(10),
+        )
+        if res.status_code == 200:
+            return SlashRankRes.model_validate(res.json())
+        else:
+            logger.warning(f"[鸣潮·冥海排行] 获取远端排行失败: {res.status_code} - {res.text}")
+    except Exception as e:
+        logger.exception(f"[鸣潮·冥海排行] 获取远端排行失败: {e}")
 
 
 def is_limited_5star(char_id: int) -> bool:
@@ -264,8 +266,7 @@ async def draw_all_slash_rank_card(bot: Bot, ev: Event):
                 char_model = get_char_model(char_id)
                 if char_model is None:
                     continue
-                char_avatar = await get_square_avatar(char_id)
-                char_avatar = char_avatar.resize((45, 45))
+                char_avatar = await get_square_avatar(char_id, (45, 45))
 
                 if char_chain != -1:
                     info_block = Image.new("RGBA", (20, 20), color=(255, 255, 255, 0))
@@ -459,6 +460,8 @@ async def draw_slash_rank_list(bot: Bot, ev: Event):
 
     # 获取群里的所有用户
     users = await WavesBind.get_group_all_uid(ev.group_id)
+    if WutheringWavesConfig.get_config("RankActiveFilterGroup").data:
+        users = await filter_active_group_users(list(users), ev.bot_id, ev.bot_self_id)
     if not users:
         msg = []
         msg.append(f"[鸣潮] 群【{ev.group_id}】暂无无尽排行数据")
@@ -619,8 +622,7 @@ async def draw_slash_rank_list(bot: Bot, ev: Event):
                         # 绘制角色信息
                         for role_index, slash_role in enumerate(slash_half.roleList):
                             try:
-                                char_avatar = await get_square_avatar(slash_role.roleId)
-                                char_avatar = char_avatar.resize((45, 45))
+                                char_avatar = await get_square_avatar(slash_role.roleId, (45, 45))
 
                                 # 获取角色共鸣链
                                 chain_count = await get_role_chain_count(rankInfo.uid, slash_role.roleId)
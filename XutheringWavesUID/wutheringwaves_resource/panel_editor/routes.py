@@ -55,16 +55,18 @@ def _try_delete_orb_cache(p: Path) -> None:
 
 def _index_add(t: str, char_id: str, p: Path) -> None:
     try:
-        from ...wutheringwaves_charinfo import card_hash_index
+        from ...wutheringwaves_charinfo import card_dup_index, card_hash_index
         card_hash_index.add(t, char_id, p)
+        card_dup_index.add(t, char_id, p)
     except Exception as e:
         logger.debug(f"[鸣潮·面板编辑] hash 索引 add 跳过: {e}")
 
 
 def _index_remove(t: str, char_id: str, p: Path) -> None:
     try:
-        from ...wutheringwaves_charinfo import card_hash_index
+        from ...wutheringwaves_charinfo import card_dup_index, card_hash_index
         card_hash_index.remove(t, char_id, p)
+        card_dup_index.remove(t, char_id, p)
     except Exception as e:
         logger.debug(f"[鸣潮·面板编辑] hash 索引 remove 跳过: {e}")
 
@@ -643,8 +645,9 @@ async def api_delete(payload: dict, _: None = Depends(require_auth)):
 _dup_scan_lock = asyncio.Lock()
 
 
-def _scan_all_duplicates(threshold: float) -> List[dict]:
-    """遍历所有自定义图角色目录, 各目录内分组查重 (复用 find_duplicate_groups_in_dir)。"""
+def _scan_all_duplicates(threshold: float, exhaustive: bool = False) -> List[dict]:
+    """遍历所有自定义图角色目录, 各目录内分组查重 (复用 find_duplicate_groups_in_dir)。
+    默认只校验感知索引给出的候选对, exhaustive 时两两比对。"""
     from ...utils.name_convert import easy_id_to_name
     from ...wutheringwaves_charinfo.card_hash_index import compute_hash
     from ...wutheringwaves_charinfo.card_utils import find_duplicate_groups_in_dir
@@ -657,7 +660,7 @@ def _scan_all_duplicates(threshold: float) -> List[dict]:
     use_cores = max((os.cpu_count() or 1) - 2, 1)
     out: List[dict] = []
     with ThreadPoolExecutor(max_workers=use_cores) as ex:
-        futs = {ex.submit(find_duplicate_groups_in_dir, d, threshold): (t, d) for t, d in char_dirs}
+        futs = {ex.submit(find_duplicate_groups_in_dir, d, threshold, exhaustive): (t, d) for t, d in char_dirs}
         for fut in as_completed(futs):
             t, d = futs[fut]
             char_id = d.name
@@ -684,7 +687,11 @@ def _scan_all_duplicates(threshold: float) -> List[dict]:
 
 
 @app.get("/waves/panel-edit/api/duplicates")
-async def api_duplicates(threshold: float = 0.7, _: None = Depends(require_auth)):
+async def api_duplicates(
+    threshold: float = 0.7,
+    exhaustive: bool = False,
+    _: None = Depends(require_auth),
+):
     try:
         from ...wutheringwaves_charinfo.card_utils import cv2
     except Exception:
@@ -696,8 +703,8 @@ async def api_duplicates(threshold: float = 0.7, _: None = Depends(require_auth)
     if _dup_scan_lock.locked():
         raise HTTPException(429, "查重进行中, 请稍候")
     async with _dup_scan_lock:
-        groups = await asyncio.to_thread(_scan_all_duplicates, threshold)
-    return {"threshold": threshold, "groups": groups}
+        groups = await asyncio.to_thread(_scan_all_duplicates, threshold, exhaustive)
+    return {"threshold": threshold, "exhaustive": exhaustive, "groups": groups}
 
 
 # ------------------------- 待审核储存 -------------------------
@@ -209,7 +209,7 @@ async def draw_role_img(uid: str, ck: str, ev: Event):
         }
 
         logger.debug("[鸣潮·角色信息] 准备通过HTML渲染角色卡片")
-        img_bytes = await render_html(waves_templates, "roleinfo/role_card.html", context)
+        img_bytes = await render_html(waves_templates, "roleinfo/role_card.html", context, cache=600)
         if img_bytes:
             return img_bytes
         else:
@@ -63,6 +63,7 @@ from ..wutheringwaves_config.wutheringwaves_config import ShowConfig, WutheringW
 import io
 import base64
 from ..utils.render_utils import render_html, PLAYWRIGHT_AVAILABLE
+from .stamina_push import stamina_push
 from ..utils.resource.RESOURCE_PATH import waves_templates
 
 
@@ -130,15 +131,17 @@ async def process_uid(uid, ev):
 
     try:
         mr_value = daily_info.energyData.cur if daily_info.energyData else None
+        query_time = int(time.time())
         await WavesStaminaRecord.upsert_stamina_query(
             user_id=ruser_id(ev),
             bot_id=ev.bot_id,
             bot_self_id=ev.bot_self_id or "",
             uid=uid,
-            mr_query_time=int(time.time()),
+            mr_query_time=query_time,
             mr_value=mr_value,
             is_ck_valid=True,
         )
+        stamina_push.on_stamina_query(ruser_id(ev), ev.bot_id, uid, mr_value, query_time)
     except Exception:
         logger.exception("[鸣潮·每日信息] 体力查询记录写入失败")
 
@@ -184,15 +187,18 @@ async def _process_uid_launcher(uid, ev):
     )
 
     try:
+        mr_value = panel.energy.cur if panel.energy else None
+        query_time = int(time.time())
         await WavesStaminaRecord.upsert_stamina_query(
             user_id=user_id,
             bot_id=bot_id,
             bot_self_id=ev.bot_self_id or "",
             uid=uid,
-            mr_query_time=int(time.time()),
-            mr_value=panel.energy.cur if panel.energy else None,
+            mr_query_time=query_time,
+            mr_value=mr_value,
             is_ck_valid=True,
         )
+        stamina_push.on_stamina_query(user_id, bot_id, uid, mr_value, query_time)
     except Exception:
         logger.exception("[鸣潮·每日信息] launcher 体力记录写入失败")
 
@@ -0,0 +1,347 @@
+"""结晶波片推送调度 (StaminaPushEngine 开启)。
+
+不轮询每个订阅账号, 而是按上次查询的 (mr_value, mr_query_time) 与回复速度 (6 分钟 1 点)
+推算越过阈值的时刻, 全部订阅放进一个最小堆:
+- 查询时不足 1 点的回复进度未知, 推算值是最晚越线时刻 (实际在其前 6 分钟内);
+  堆顶到期才调一次 get_daily_info 复核, 正常情况下每次越线只请求一次;
+  已越线则推送, 未越线 (期间被消耗) 用新值重新推算入堆。每次复核结果同时写回体力记录。
+- 订阅变更靠定时重扫 WavesStaminaRecord (只读库, 不调接口) 与体力查询时的 on_stamina_query,
+  堆中旧条目按版本号惰性作废。
+- 同一轮到期的推送按 (bot, 群/私聊) 合并成一条消息。
+- 越线推送一次后不再重复, 直到观察到体力回落到阈值以下。回落主要靠体力查询 (on_stamina_query)
+  与重扫读到的新记录发现; 用户没再查询、直接在游戏里消耗的, 推送后从 _REARM_CHECK 起复核,
+  每次复核仍在阈值之上间隔翻倍 (4h → 8h → 16h, 上限 _REARM_MAX), 长期不上线的账号不会一直被轮询。
+
+stamina_push_switch: "off" 关闭, "on" 私聊, 其它值视为推送群号。
+"""
+import time
+import heapq
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, List, Tuple, Optional
+
+from gsuid_core.gss import gss
+from gsuid_core.logger import logger
+from gsuid_core.server import on_core_start, on_core_shutdown
+from gsuid_core.segment import MessageSegment
+
+from ..utils.util import hide_uid
+from ..utils.plugin_checker import waves_entry
+from ..utils.waves_api import waves_api
+from ..utils.api.model import DailyData
+from ..utils.api.launcher_chain import fetch_launcher_panel
+from ..utils.database.models import WavesStaminaRecord
+
+STAMINA_REGEN_SECONDS = 360  # 每点回复耗时
+STAMINA_MAX = 240
+
+_RETRY_DELAY = 1800  # 复核失败 (网络/维护) 后多久再试
+_RESCAN_INTERVAL = 600
+_BATCH_WINDOW = 30  # 这么近的到期一并处理, 便于合并推送
+_VERIFY_CONCURRENCY = 4
+# 已越线 (已推送) 的账号隔多久复核一次是否被消耗: 一次常见消耗 40 点, 回复这些要 4 小时,
+# 按此间隔复核, 消耗后的下一次越线不会错过
+_REARM_CHECK = 40 * STAMINA_REGEN_SECONDS
+_REARM_MAX = 24 * 3600  # 复核仍未消耗时间隔翻倍, 到此为止
+
+_Key = Tuple[str, str, str]  # user_id, bot_id, uid
+
+
+@dataclass
+class _Sub:
+    user_id: str
+    bot_id: str
+    bot_self_id: str
+    uid: str
+    switch: str
+    threshold: int
+    mr_value: int
+    mr_query_time: int
+    armed: bool  # 已观察到低于阈值, 越线时可推送
+    version: int = 0
+    rearm_checks: int = 0  # 推送后连续复核仍在阈值之上的次数, 决定下次复核间隔
+
+
+def rearm_delay(checks: int) -> int:
+    """已越线账号第 checks 次复核前的等待秒数: _REARM_CHECK 起翻倍, 上限 _REARM_MAX。"""
+    return min(_REARM_CHECK << min(checks, 16), _REARM_MAX)
+
+
+def project_cross_time(mr_value: int, mr_query_time: int, threshold: int) -> int:
+    """按回复速度推算体力达到 threshold 的时间戳; 已达到返回 mr_query_time。"""
+    if mr_value >= threshold:
+        return mr_query_time
+    return mr_query_time + (threshold - mr_value) * STAMINA_REGEN_SECONDS
+
+
+def _threshold(value: Optional[int]) -> int:
+    if not value or value <= 0:
+        return STAMINA_MAX
+    return min(int(value), STAMINA_MAX)
+
+
+class StaminaPushEngine:
+    def __init__(self):
+        self._subs: Dict[_Key, _Sub] = {}
+        self._heap: List[Tuple[float, int, _Key, int]] = []
+        self._seq = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._next_rescan = 0.0
+        self.api_calls = 0
+        self.pushed = 0
+
+    # ---- 调度 ----
+
+    def _schedule(self, sub: _Sub, due: float) -> None:
+        sub.version += 1
+        self._seq += 1
+        heapq.heappush(self._heap, (due, self._seq, (sub.user_id, sub.bot_id, sub.uid), sub.version))
+        if self._wake is not None and self._heap[0][1] == self._seq:
+            self._wake.set()
+
+    def _reproject(self, sub: _Sub) -> None:
+        if not sub.armed:
+            # 已越线: 退避复核是否被消耗
+            self._schedule(sub, max(time.time(), sub.mr_query_time + rearm_delay(sub.rearm_checks)))
+            return
+        cross = project_cross_time(sub.mr_value, sub.mr_query_time, sub.threshold)
+        self._schedule(sub, max(time.time(), cross))
+
+    def _upsert(
+        self,
+        user_id: str,
+        bot_id: str,
+        bot_self_id: str,
+        uid: str,
+        switch: str,
+        threshold: Optional[int],
+        mr_value: Optional[int],
+        mr_query_time: Optional[int],
+    ) -> None:
+        key = (user_id, bot_id, uid)
+        if switch == "off" or mr_value is None or not mr_query_time:
+            old = self._subs.pop(key, None)
+            if old is not None:
+                old.version += 1
+            return
+        limit = _threshold(threshold)
+        sub = self._subs.get(key)
+        if sub is None:
+            sub = self._subs[key] = _Sub(
+                user_id, bot_id, bot_self_id, uid, switch, limit, mr_value, mr_query_time,
+                armed=mr_value < limit,
+            )
+            self._reproject(sub)
+            return
+        if (sub.switch, sub.threshold, sub.mr_value, sub.mr_query_time) == (switch, limit, mr_value, mr_query_time):
+            return
+        sub.bot_self_id = bot_self_id or sub.bot_self_id
+        sub.switch = switch
+        if mr_query_time >= sub.mr_query_time:
+            sub.mr_value, sub.mr_query_time = mr_value, mr_query_time
+        if sub.mr_value < limit:
+            sub.armed = True
+            sub.rearm_checks = 0
+        sub.threshold = limit
+        self._reproject(sub)
+
+    async def _rescan(self) -> None:
+        try:
+            records = await WavesStaminaRecord.get_push_subscribers()
+        except Exception as e:
+            logger.warning(f"[鸣潮·体力推送] 读取订阅失败: {e}")
+            return
+        seen = set()
+        for r in records:
+            seen.add((r.user_id, r.bot_id, r.uid))
+            self._upsert(
+                r.user_id, r.bot_id, r.bot_self_id, r.uid, r.stamina_push_switch,
+                r.stamina_threshold, r.mr_value, r.mr_query_time,
+            )
+        for key in [k for k in self._subs if k not in seen]:
+            self._subs.pop(key).version += 1
+
+    def on_stamina_query(self, user_id: str, bot_id: str, uid: str, mr_value: Optional[int], mr_query_time: int) -> None:
+        """体力查询后调用: 已订阅的账号用新值重新推算, 不必等下次重扫。"""
+        sub = self._subs.get((user_id, bot_id, uid))
+        if sub is None or mr_value is None:
+            return
+        self._upsert(
+            user_id, bot_id, sub.bot_self_id, uid, sub.switch, sub.threshold, mr_value, mr_query_time,
+        )
+
+    # ---- 主循环 ----
+
+    def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._wake = asyncio.Event()
+        self._next_rescan = 0.0
+        self._task = asyncio.create_task(self._run(), name="waves-stamina-push")
+        logger.info("[鸣潮·体力推送] 调度已启动")
+
+    def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    def _pop_due(self, now: float) -> List[_Sub]:
+        due: List[_Sub] = []
+        while self._heap and self._heap[0][0] <= now + _BATCH_WINDOW:
+            _, _, key, version = heapq.heappop(self._heap)
+            sub = self._subs.get(key)
+            if sub is not None and sub.version == version:
+                due.append(sub)
+        return due
+
+    @waves_entry
+    async def _run(self) -> None:
+        assert self._wake is not None
+        while True:
+            try:
+                now = time.time()
+                if now >= self._next_rescan:
+                    await self._rescan()
+                    self._next_rescan = now + _RESCAN_INTERVAL
+                due = self._pop_due(now)
+                if due:
+                    await self._process(due)
+                    continue
+                wait = self._next_rescan - time.time()
+                if self._heap:
+                    wait = min(wait, self._heap[0][0] - time.time())
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=max(1.0, wait))
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"[鸣潮·体力推送] 调度异常: {e}")
+                await asyncio.sleep(60)
+
+    async def _fetch_energy(self, sub: _Sub) -> Optional[Tuple[int, int]]:
+        """(当前值, 上限); 取不到返回 None。"""
+        self.api_calls += 1
+        if waves_api.is_net(sub.uid):
+            panel = await fetch_launcher_panel(sub.user_id, sub.bot_id, sub.uid)
+            energy = panel.energy if panel else None
+        else:
+            ck = await waves_api.get_self_waves_ck(sub.uid, sub.user_id, sub.bot_id)
+            if not ck:
+                return None
+            res = await waves_api.get_daily_info(sub.uid, ck)
+            if not res.success:
+                return None
+            energy = DailyData.model_validate(res.data).energyData
+        if energy is None:
+            return None
+        return energy.cur, energy.total
+
+    async def _verify(self, sem: asyncio.Semaphore, sub: _Sub) -> Optional[Tuple[_Sub, int, int]]:
+        version = sub.version
+        async with sem:
+            try:
+                energy = await self._fetch_energy(sub)
+            except Exception as e:
+                logger.warning(f"[鸣潮·体力推送] 复核失败 uid={sub.uid}: {e}")
+                energy = None
+        if sub.version != version or self._subs.get((sub.user_id, sub.bot_id, sub.uid)) is not sub:
+            return None  # 复核期间订阅被改/取消
+        if energy is None:
+            self._schedule(sub, time.time() + _RETRY_DELAY)
+            return None
+        cur, total = energy
+        now = int(time.time())
+        sub.mr_value, sub.mr_query_time = cur, now
+        try:
+            await WavesStaminaRecord.upsert_stamina_query(
+                user_id=sub.user_id,
+                bot_id=sub.bot_id,
+                bot_self_id=sub.bot_self_id,
+                uid=sub.uid,
+                mr_query_time=now,
+                mr_value=cur,
+                is_ck_valid=True,
+            )
+        except Exception:
+            logger.exception("[鸣潮·体力推送] 体力记录写入失败")
+        limit = min(sub.threshold, total)
+        if cur >= limit:
+            # 布防中越线则推送; 未布防的是退避复核, 仍在阈值之上说明没被消耗, 不重复推送且间隔翻倍
+            push = sub.armed
+            sub.armed = False
+            sub.rearm_checks = 0 if push else sub.rearm_checks + 1
+            self._schedule(sub, now + rearm_delay(sub.rearm_checks))
+            return (sub, cur, total) if push else None
+        sub.armed = True
+        sub.rearm_checks = 0
+        self._schedule(sub, project_cross_time(cur, now, limit))
+        return None
+
+    async def _process(self, due: List[_Sub]) -> None:
+        sem = asyncio.Semaphore(_VERIFY_CONCURRENCY)
+        results = await asyncio.gather(*(self._verify(sem, sub) for sub in due))
+        batches: Dict[Tuple[str, str, str, str], List[Tuple[_Sub, int, int]]] = {}
+        for r in results:
+            if r is None:
+                continue
+            sub = r[0]
+            if sub.switch == "on":
+                target = (sub.bot_id, sub.bot_self_id, "direct", sub.user_id)
+            else:
+                target = (sub.bot_id, sub.bot_self_id, "group", sub.switch)
+            batches.setdefault(target, []).append(r)
+        for target, items in batches.items():
+            await self._send(target, items)
+
+    async def _send(self, target: Tuple[str, str, str, str], items: List[Tuple[_Sub, int, int]]) -> None:
+        bot_id, bot_self_id, target_type, target_id = target
+        if target_type == "direct":
+            lines = [f"[鸣潮] UID {hide_uid(sub.uid)} 结晶波片已回复至 {cur}/{total}" for sub, cur, total in items]
+            messages = "\n".join(lines)
+        else:
+            messages = [MessageSegment.text("[鸣潮] 结晶波片提醒\n")]
+            for sub, cur, total in items:
+                messages.append(MessageSegment.at(sub.user_id))
+                messages.append(MessageSegment.text(f" UID {hide_uid(sub.uid)}: {cur}/{total}\n"))
+        # 优先用对应该 bot_id 的连接; 对不上时同 waves_send_msg 逐个连接发送, 由各连接按 bot_id 路由
+        bots = [
+            bot for key, bot in gss.active_bot.items()
+            if bot_id in (key, getattr(bot, "bot_id", None))
+        ] or list(gss.active_bot.values())
+        sent = False
+        for bot in bots:
+            try:
+                await bot.target_send(messages, target_type, target_id, bot_id, bot_self_id, "")
+                sent = True
+            except Exception as e:
+                logger.warning(f"[鸣潮·体力推送] 推送失败 {target_type}:{target_id}: {e}")
+        if sent:
+            self.pushed += len(items)
+
+    def stats(self) -> Dict[str, int]:
+        return {"subscribers": len(self._subs), "api_calls": self.api_calls, "pushed": self.pushed}
+
+
+stamina_push = StaminaPushEngine()
+
+
+def is_enabled() -> bool:
+    from ..wutheringwaves_config import WutheringWavesConfig
+
+    return bool(WutheringWavesConfig.get_config("StaminaPushEngine").data)
+
+
+@on_core_start
+@waves_entry
+async def _start_stamina_push():
+    if is_enabled():
+        stamina_push.start()
+
+
+@on_core_shutdown
+async def _stop_stamina_push():
+    stamina_push.stop()
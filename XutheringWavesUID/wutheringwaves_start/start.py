@@ -2,9 +2,11 @@ from gsuid_core.logger import logger
 from gsuid_core.server import on_core_start
 
 from ..wutheringwaves_resource import startup
+from ..utils.plugin_checker import waves_entry
 
 
 @on_core_start
+@waves_entry
 async def all_start():
     logger.info("[鸣潮·启动] 启动中...")
     try:
@@ -1,6 +1,10 @@
 from gsuid_core.status.plugin_status import register_status
 
 from ..utils.image import get_ICON
+from ..utils.http_pool import get_pool_stats
+from ..utils.render_utils import get_render_stats
+from ..utils.queues.spool import spool_worker
+from ..utils.api.response_cache import response_cache
 from ..utils.database.models import WavesBind, WavesUser
 from ..wutheringwaves_config import WutheringWavesConfig
 
@@ -22,6 +26,35 @@ async def get_active_user_num():
     return count
 
 
+async def get_render_queue():
+    return get_render_stats()["queue"]
+
+
+async def get_render_p95():
+    return int(get_render_stats()["render_p95_ms"])
+
+
+async def get_api_cache_hits():
+    stats = response_cache.stats()
+    return sum(stats["hits"].values()) + sum(stats["shared"].values())
+
+
+async def get_base_info_hit_rate():
+    from ..wutheringwaves_charinfo import base_info_cache
+
+    c = base_info_cache.counters()
+    total = c["hits"] + c["misses"]
+    return c["hits"] * 100 // total if total else 0
+
+
+async def get_http_reuse_rate():
+    return int(get_pool_stats()["reuse_rate"] * 100)
+
+
+async def get_upload_backlog():
+    return sum((await spool_worker.backlog()).values())
+
+
 register_status(
     get_ICON(),
     "XutheringWavesUID",
@@ -29,5 +62,11 @@ register_status(
         "绑定UID": get_add_num,
         "登录账号": get_user_num,
         "活跃账号数": get_active_user_num,
+        "渲染排队数": get_render_queue,
+        "渲染P95(ms)": get_render_p95,
+        "API合并/缓存命中": get_api_cache_hits,
+        "基础信息缓存命中率(%)": get_base_info_hit_rate,
+        "HTTP连接复用率(%)": get_http_reuse_rate,
+        "上传积压数": get_upload_backlog,
     },
 )
@@ -10,6 +10,7 @@ from gsuid_core.pool import to_thread
 from gsuid_core.logger import logger
 from gsuid_core.utils.image.convert import convert_img
 
+from ..utils.http_pool import get_client
 from .model import WavesPool
 from ..utils.util import timed_async_cache
 from ..utils.image import (
@@ -40,19 +41,19 @@ _avatar_circle = avatar_mask.crop(avatar_mask.split()[-1].getbbox())
 
 @timed_async_cache(expiration=3600, condition=lambda x: isinstance(x, list))
 async def get_pool_data() -> Union[List, None]:
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.get(
-                GET_POOL_LIST,
-                headers={
-                    "Content-Type": "application/json",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            if res.status_code == 200:
-                return res.json().get("data", [])
-        except Exception as e:
-            logger.exception(f"[鸣潮·卡池] 获取卡池数据失败: {e}")
+    client = get_client(GET_POOL_LIST)
+    try:
+        res = await client.get(
+            GET_POOL_LIST,
+            headers={
+                "Content-Type": "application/json",
+            },
+            timeout=httpx.Timeout(10),
+        )
+        if res.status_code == 200:
+            return res.json().get("data", [])
+    except Exception as e:
+        logger.exception(f"[鸣潮·卡池] 获取卡池数据失败: {e}")
 
 
 async def clean_pool_data():
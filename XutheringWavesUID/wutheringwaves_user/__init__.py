@@ -12,6 +12,7 @@ from gsuid_core.models import Event
 from .deal import add_cookie, get_cookie, refresh_bind, delete_cookie
 from ..utils.util import get_hide_uid_pref, hide_uid
 from ..utils.button import WavesButton
+from ..utils.api.response_cache import response_cache
 from ..utils.constants import WAVES_GAME_ID
 from ..utils.database.models import WavesBind, WavesUser, WavesStaminaRecord
 from ..utils.database.waves_user_activity import WavesUserActivity
@@ -210,13 +211,14 @@ async def waves_delete_inactive_group_members(bot: Bot, ev: Event):
     if not uid_to_user_pairs:
         return await bot.send(f"[鸣潮] 群【{ev.group_id}】暂无绑定记录")
 
+    last_times = await WavesUserActivity.get_last_active_times(
+        {(user_id, platform, bot_self_id) for pairs in uid_to_user_pairs.values() for user_id, platform in pairs}
+    )
     inactive_uids: set[str] = set()
     for uid, user_pairs in uid_to_user_pairs.items():
         latest_time = None
         for user_id, platform in user_pairs:
-            last_active_time = await WavesUserActivity.get_user_last_active_time(
-                user_id, platform, bot_self_id
-            )
+            last_active_time = last_times.get((user_id, platform, bot_self_id))
             if last_active_time is not None:
                 if latest_time is None or last_active_time > latest_time:
                     latest_time = last_active_time
@@ -321,6 +323,7 @@ async def send_waves_bind_uid_msg(bot: Bot, ev: Event):
         code = await WavesBind.insert_waves_uid(qid, ev.bot_id, uid, ev.group_id, lenth_limit=9)
         if code == 0 or code == -2:
             retcode = await WavesBind.switch_uid_by_game(qid, ev.bot_id, uid)
+            response_cache.invalidate(uid)
         return await send_diff_msg(
             bot,
             code,
@@ -359,12 +362,15 @@ async def send_waves_bind_uid_msg(bot: Bot, ev: Event):
             msg = "[鸣潮] 尚未绑定任何特征码"
             return await bot.send((" " if at_sender else "") + msg, at_sender)
     elif "删除全部" in ev.command:
+        uid_list = await WavesBind.get_uid_list_by_game(qid, ev.bot_id)
         retcode = await WavesBind.update_data(
             user_id=qid,
             bot_id=ev.bot_id,
             **{WavesBind.get_gameid_name(None): None},
         )
         if retcode == 0:
+            for _uid in uid_list or []:
+                response_cache.invalidate(_uid)
             try:
                 await WavesStaminaRecord.delete_by_user(qid, ev.bot_id)
             except Exception:
@@ -383,6 +389,8 @@ async def send_waves_bind_uid_msg(bot: Bot, ev: Event):
             )
         user_pref = await get_hide_uid_pref(uid, qid, ev.bot_id)
         data = await WavesBind.delete_uid(qid, ev.bot_id, uid)
+        if data == 0:
+            response_cache.invalidate(uid)
         return await send_diff_msg(
             bot,
             data,
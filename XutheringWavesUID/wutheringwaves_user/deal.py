@@ -10,6 +10,7 @@ from ..utils.waves_api import waves_api
 from ..utils.error_reply import ERROR_CODE, WAVES_CODE_103
 from ..utils.database.models import WavesBind, WavesUser
 from ..utils.api.request_util import PLATFORM_SOURCE
+from ..utils.api.response_cache import response_cache
 
 
 async def _fetch_roles_by_game(ck: str, did: str, game_id: int):
@@ -104,6 +105,7 @@ async def add_cookie(ev: Event, ck: str, did: str, is_login: bool = False) -> st
             res = await WavesBind.insert_waves_uid(ev.user_id, ev.bot_id, data.roleId, ev.group_id, lenth_limit=9)
             if res == 0 or res == -2:
                 await WavesBind.switch_uid_by_game(ev.user_id, ev.bot_id, data.roleId)
+                response_cache.invalidate(data.roleId)
 
             role_list.append(
                 {
@@ -213,6 +215,7 @@ async def refresh_bind(ev: Event) -> str:
                 res = await WavesBind.insert_waves_uid(ev.user_id, ev.bot_id, data.roleId, ev.group_id, lenth_limit=9)
                 if res == 0 or res == -2:
                     await WavesBind.switch_uid_by_game(ev.user_id, ev.bot_id, data.roleId)
+                    response_cache.invalidate(data.roleId)
                 if data.roleId not in seen_waves:
                     seen_waves.add(data.roleId)
                     waves_msg.append(f"[鸣潮]已刷新特征码【{hide_uid(data.roleId)}】")
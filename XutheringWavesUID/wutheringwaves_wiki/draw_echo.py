@@ -54,8 +54,7 @@ async def parse_echo_base_content(echo_id, echo_model: EchoModel, image, card_im
     # 合鸣效果
     group_name = echo_model.get_group_name()
     for index, name in enumerate(group_name):
-        effect_image = await get_attribute_effect(name)
-        effect_image = effect_image.resize((30, 30))
+        effect_image = await get_attribute_effect(name, size=(30, 30))
         card_img.alpha_composite(effect_image, (echo_name_width + index * 35, 40))
 
 
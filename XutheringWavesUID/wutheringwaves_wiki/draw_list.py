@@ -135,7 +135,7 @@ async def _draw_weapon_list_pil(weapon_type: str):
     target_type = reverse_type_map.get(weapon_type)
     logger.debug(f"[鸣潮·百科列表] 成功处理：{target_type}")
 
-    for weapon_id, data in weapon_id_data.items():
+    for weapon_id, data in weapon_id_data.summaries().items():
         name = data.get("name", "未知武器")
         star_level = data.get("starLevel", 0)
         w_type = data.get("type", 0)  # 注意：避免与参数同名冲突
@@ -300,7 +300,7 @@ async def _draw_sonata_list_pil(version: str = ""):
         version = version.split(".")[0] + ".0"
 
     sonata_groups = defaultdict(list)
-    for data in sonata_id_data.values():
+    for data in sonata_id_data.summaries().values():
         name = data.get("name", "未知套装")
         set_list = data.get("set", {})
         from_version = data.get("version", "10.0")
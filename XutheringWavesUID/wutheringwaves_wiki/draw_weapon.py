@@ -59,8 +59,7 @@ async def parse_weapon_base_content(weapon_id, weapon_model: WeaponModel, image,
 
     image.alpha_composite(weapon_pic_bg, (50, 20))
 
-    weapon_type = await get_weapon_type(weapon_type)
-    weapon_type = weapon_type.resize((80, 80)).convert("RGBA")
+    weapon_type = await get_weapon_type(weapon_type, size=(80, 80))
     card_img_draw = ImageDraw.Draw(card_img)
     card_img_draw.text((420, 100), f"{weapon_name}", SPECIAL_GOLD, waves_font_40, "lm")
     card_img.alpha_composite(rarity_pic, (400, 20))
@@ -74,8 +73,7 @@ async def parse_weapon_statistic_content(weapon_model: WeaponModel, weapon_image
     weapon_bg_temp.alpha_composite(weapon_bg, dest=(0, 0))
     weapon_bg_temp_draw = ImageDraw.Draw(weapon_bg_temp)
     for index, row in enumerate(rows):
-        stats_main = await get_attribute_prop(row[0])
-        stats_main = stats_main.resize((40, 40))
+        stats_main = await get_attribute_prop(row[0], size=(40, 40))
         weapon_bg_temp.alpha_composite(stats_main, (65, 187 + index * 50))
         weapon_bg_temp_draw.text((130, 207 + index * 50), f"{row[0]}", "white", waves_font_30, "lm")
         weapon_bg_temp_draw.text((500, 207 + index * 50), f"{row[1]}", "white", waves_font_30, "rm")
@@ -51,7 +51,7 @@ async def draw_weapon_wiki_render(weapon_name: str) -> Optional[bytes]:
         return None
 
     context = await _prepare_weapon_context(weapon_id, weapon_model)
-    return await render_html(waves_templates, "wiki/item_wiki.html", context)
+    return await render_html(waves_templates, "wiki/item_wiki.html", context, cache=True)
 
 
 async def _prepare_weapon_context(weapon_id: str, weapon_model: WeaponModel) -> Dict[str, Any]:
@@ -117,7 +117,7 @@ async def draw_echo_wiki_render(echo_name: str) -> Optional[bytes]:
         return None
 
     context = await _prepare_echo_context(echo_id, echo_model)
-    return await render_html(waves_templates, "wiki/item_wiki.html", context)
+    return await render_html(waves_templates, "wiki/item_wiki.html", context, cache=True)
 
 
 async def _prepare_echo_context(echo_id: str, echo_model: EchoModel) -> Dict[str, Any]:
@@ -178,7 +178,7 @@ async def draw_weapon_list_render(weapon_type: str = "") -> Optional[bytes]:
 
     # 按武器类型分组收集数据
     weapon_groups = defaultdict(list)
-    for wid, data in weapon_id_data.items():
+    for wid, data in weapon_id_data.summaries().items():
         name = data.get("name", "未知武器")
         star_level = data.get("starLevel", 0)
         w_type = data.get("type", 0)
@@ -234,7 +234,7 @@ async def draw_weapon_list_render(weapon_type: str = "") -> Optional[bytes]:
         "footer_url": image_to_base64(TEXTURE2D_PATH / "footer_white.png"),
     }
 
-    return await render_html(waves_templates, "wiki/list_wiki.html", context)
+    return await render_html(waves_templates, "wiki/list_wiki.html", context, cache=True)
 
 
 async def draw_sonata_list_render(version: str = "") -> Optional[bytes]:
@@ -252,7 +252,7 @@ async def draw_sonata_list_render(version: str = "") -> Optional[bytes]:
 
     # 按版本分组
     sonata_groups = defaultdict(list)
-    for data in sonata_id_data.values():
+    for data in sonata_id_data.summaries().values():
         name = data.get("name", "未知套装")
         set_list = data.get("set", {})
         from_version = data.get("version", "10.0")
@@ -306,4 +306,4 @@ async def draw_sonata_list_render(version: str = "") -> Optional[bytes]:
         "footer_url": image_to_base64(TEXTURE2D_PATH / "footer_white.png"),
     }
 
-    return await render_html(waves_templates, "wiki/list_wiki.html", context)
+    return await render_html(waves_templates, "wiki/list_wiki.html", context, cache=True)
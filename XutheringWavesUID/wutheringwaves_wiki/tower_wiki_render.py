@@ -192,7 +192,7 @@ async def draw_tower_wiki_render(period: Optional[int] = None) -> Optional[bytes
         "footer_url": image_to_base64(TEXTURE2D_PATH / "footer_white.png")
     }
 
-    return await render_html(waves_templates, "wiki/challenge_card.html", context)
+    return await render_html(waves_templates, "wiki/challenge_card.html", context, cache=True)
 
 
 async def draw_matrix_wiki_render(season: Optional[int] = None) -> Optional[bytes]:
@@ -321,7 +321,7 @@ async def draw_matrix_wiki_render(season: Optional[int] = None) -> Optional[byte
         "footer_url": image_to_base64(TEXTURE2D_PATH / "footer_white.png"),
     }
 
-    return await render_html(waves_templates, "wiki/matrix_card.html", context)
+    return await render_html(waves_templates, "wiki/matrix_card.html", context, cache=True)
 
 
 async def draw_slash_wiki_render(period: Optional[int] = None) -> Optional[bytes]:
@@ -437,4 +437,4 @@ async def draw_slash_wiki_render(period: Optional[int] = None) -> Optional[bytes
         "footer_url": image_to_base64(TEXTURE2D_PATH / "footer_white.png")
     }
 
-    return await render_html(waves_templates, "wiki/slash_card.html", context)
+    return await render_html(waves_templates, "wiki/slash_card.html", context, cache=True)
@@ -0,0 +1,41 @@
+"""抽卡记录合并基准: 滚动哈希版 vs 原 DP。
+
+    python tests/bench_gacha_merge.py [1000 5000 10000 20000]
+"""
+
+import sys
+import time
+
+import conftest  # noqa: F401  跳过插件 __init__
+from test_gacha_merge import make_logs, find_longest_common_subarray_indices_dp
+
+from XutheringWavesUID.wutheringwaves_gachalog import gacha_merge
+
+
+def _merge(a, b, find=None):
+    original = gacha_merge.find_longest_common_subarray_indices
+    if find is not None:
+        gacha_merge.find_longest_common_subarray_indices = find
+    try:
+        t0 = time.perf_counter()
+        return gacha_merge.merge_gacha_logs_by_common_subarray(a, b), time.perf_counter() - t0
+    finally:
+        gacha_merge.find_longest_common_subarray_indices = original
+
+
+def benchmark(sizes=(1000, 5000, 10000, 20000), dp_limit: int = 5000) -> None:
+    for n in sizes:
+        a, b = make_logs(n, seed=n)
+        fast, t_fast = _merge(a, b)
+        line = f"n={n:>6} hash={t_fast * 1000:9.1f}ms"
+        if n <= dp_limit:
+            slow, t_slow = _merge(a, b, find_longest_common_subarray_indices_dp)
+            same = [id(x) for x in fast] == [id(x) for x in slow]
+            line += f" dp={t_slow * 1000:9.1f}ms same={same}"
+        else:
+            line += " dp=skipped (O(n·m) 内存)"
+        print(line)
+
+
+if __name__ == "__main__":
+    benchmark(tuple(int(x) for x in sys.argv[1:]) or (1000, 5000, 10000, 20000))
@@ -0,0 +1,28 @@
+"""测试直接加载插件子模块。
+
+XutheringWavesUID/__init__.py 会注册插件、拷贝构建产物、挂载所有命令, 各 wutheringwaves_* 包的
+__init__.py 则注册各自的命令; 单测不需要这些, 这里先放只带 __path__ 的空包,
+之后 `import XutheringWavesUID.xxx.yyy` 只执行目标模块本身。
+wutheringwaves_config 的 __init__ 就是配置本体, 照常导入。
+各测试模块按需 importorskip 自己用到的依赖 (gsuid_core 等)。
+"""
+
+import sys
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PACKAGE = ROOT / "XutheringWavesUID"
+
+
+def _shim(name: str, path: Path) -> None:
+    if name not in sys.modules:
+        pkg = types.ModuleType(name)
+        pkg.__path__ = [str(path)]  # type: ignore[attr-defined]
+        sys.modules[name] = pkg
+
+
+_shim("XutheringWavesUID", PACKAGE)
+for _sub in sorted(PACKAGE.glob("wutheringwaves_*/__init__.py")):
+    if _sub.parent.name != "wutheringwaves_config":
+        _shim(f"XutheringWavesUID.{_sub.parent.name}", _sub.parent)
@@ -0,0 +1,153 @@
+"""编译数据包: 按 id 解码、整表遍历、名称索引与摘要都与原始 JSON 一致。"""
+
+import os
+import json
+
+import pytest
+
+pytest.importorskip("gsuid_core")
+
+from XutheringWavesUID.utils.ascension import bundle as bundle_mod  # noqa: E402
+from XutheringWavesUID.utils.ascension.bundle import AscensionBundle  # noqa: E402
+
+ENTRIES = {
+    "1102": {"name": "散华", "starLevel": 4, "alias": ["sanhua"], "stats": [1, 2, 3]},
+    "1304": {"name": "今汐", "starLevel": 5, "alias": ["汐汐", "龙女"], "skills": {"a": {"b": [1.5, None]}}},
+    "1505": {"name": "守岸人", "starLevel": 5, "type": 4, "desc": "含中文\n与转义\"字符"},
+    "21020026": {"name": "时和岁稔", "starLevel": 5, "type": 2, "effectName": "岁稔"},
+    "9001": {"starLevel": 3},
+    "9002": [1, 2, 3],
+}
+
+
+def _write(directory, fid, data):
+    sub = directory / ("nested" if fid.startswith("2") else "")
+    sub.mkdir(parents=True, exist_ok=True)
+    path = sub / f"{fid}.json"
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    monkeypatch.setattr(bundle_mod, "BUNDLE_DIR", tmp_path / "bundles")
+    directory = tmp_path / "detail_json"
+    for fid, data in ENTRIES.items():
+        _write(directory, fid, data)
+    (directory / "broken.json").write_text("{not json", encoding="utf-8")
+    return directory
+
+
+def _bundle(directory, cache_size=2):
+    return AscensionBundle(
+        "test", directory, cache_size=cache_size, log_tag="test", summary_fields=("starLevel", "type", "effectName")
+    )
+
+
+def test_getitem_matches_raw_json(source):
+    b = _bundle(source)
+    assert len(b) == len(ENTRIES)
+    assert set(b) == set(ENTRIES)
+    for fid, data in ENTRIES.items():
+        assert fid in b
+        assert b[fid] == data
+    assert "broken" not in b
+    with pytest.raises(KeyError):
+        b["missing"]
+    assert b.get("missing") is None
+
+
+def test_items_values_match_raw_json(source):
+    b = _bundle(source)
+    b["1304"]  # 部分条目已在 LRU
+    assert dict(b.items()) == ENTRIES
+    assert sorted(map(json.dumps, b.values())) == sorted(map(json.dumps, ENTRIES.values()))
+    # 整表遍历不写 LRU
+    assert b.stats() == {"entries": len(ENTRIES), "cached": 1}
+
+
+def test_lru_is_bounded(source):
+    b = _bundle(source, cache_size=2)
+    for fid in ENTRIES:
+        b[fid]
+    assert b.stats()["cached"] == 2
+
+
+def test_lru_sized_from_bundle(source):
+    b = _bundle(source, cache_size=None)
+    for _ in range(2):
+        for fid in ENTRIES:
+            b[fid]
+    assert b.stats() == {"entries": len(ENTRIES), "cached": len(ENTRIES)}
+
+    # 换包后按新条目数定容
+    _write(source, "1606", {"name": "新角色", "starLevel": 5})
+    b.load(force=True)
+    for fid in b:
+        b[fid]
+    assert b.stats() == {"entries": len(ENTRIES) + 1, "cached": len(ENTRIES) + 1}
+
+
+def test_name_alias_and_summaries(source):
+    b = _bundle(source)
+    assert b.get_name("1304") == "今汐"
+    assert b.id_by_name("守岸人") == "1505"
+    assert b.id_by_alias("龙女") == "1304"
+    assert b.id_by_name("不存在") is None
+    assert b.names()["9001"] == ""
+    assert b.summaries() == {
+        fid: {k: data[k] for k in ("starLevel", "type", "effectName") if k in data}
+        for fid, data in ENTRIES.items()
+        if isinstance(data, dict)
+    }
+    # 只查索引, 一个条目都不解码
+    assert b.stats()["cached"] == 0
+
+
+def test_reopen_existing_bundle_without_rebuild(source):
+    first = _bundle(source)
+    first.load()
+    (path,) = bundle_mod.BUNDLE_DIR.glob("test-*.bin")
+    mtime = path.stat().st_mtime_ns
+
+    second = _bundle(source)
+    assert dict(second.items()) == ENTRIES
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_source_change_rebuilds_and_bumps_generation(source):
+    b = _bundle(source)
+    assert b["1304"]["starLevel"] == 5
+    generation = b.generation
+
+    path = _write(source, "1304", dict(ENTRIES["1304"], starLevel=4, extra="新字段"))
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    b.load(force=True)
+
+    assert b.generation == generation + 1
+    assert b["1304"]["starLevel"] == 4
+    assert b.summaries()["1304"] == {"starLevel": 4}
+    # 旧包被清理
+    assert len(list(bundle_mod.BUNDLE_DIR.glob("test-*.bin"))) == 1
+
+    b.load(force=True)
+    assert b.generation == generation + 1
+
+
+def test_corrupt_bundle_is_rebuilt(source):
+    _bundle(source).load()
+    (path,) = bundle_mod.BUNDLE_DIR.glob("test-*.bin")
+    path.write_bytes(b"garbage")
+
+    b = _bundle(source)
+    assert dict(b.items()) == ENTRIES
+    assert path.read_bytes().startswith(bundle_mod.MAGIC)
+
+
+def test_missing_directory_is_empty(tmp_path, monkeypatch):
+    monkeypatch.setattr(bundle_mod, "BUNDLE_DIR", tmp_path / "bundles")
+    b = _bundle(tmp_path / "nope")
+    assert len(b) == 0
+    assert dict(b.items()) == {}
+    assert b.summaries() == {}
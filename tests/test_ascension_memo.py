@@ -0,0 +1,150 @@
+"""详情缓存: 共享结果只读, thaw/copy 得到可写副本, 数据包换代后缓存失效。"""
+
+import copy
+import json
+import pickle
+
+import pytest
+
+pytest.importorskip("gsuid_core")
+
+from XutheringWavesUID.utils.ascension import bundle as bundle_mod  # noqa: E402
+from XutheringWavesUID.utils.ascension.memo import (  # noqa: E402
+    thaw,
+    freeze,
+    memoize,
+    FrozenDict,
+    FrozenResult,
+)
+from XutheringWavesUID.utils.ascension.bundle import AscensionBundle  # noqa: E402
+
+
+class _Detail(FrozenResult):
+    def __init__(self):
+        self.name = ""
+        self.stats = {}
+        self.skills = []
+
+
+@pytest.fixture
+def detail_bundle(tmp_path, monkeypatch):
+    monkeypatch.setattr(bundle_mod, "BUNDLE_DIR", tmp_path / "bundles")
+    directory = tmp_path / "detail_json"
+    directory.mkdir()
+    (directory / "1304.json").write_text(
+        json.dumps({"name": "今汐", "stats": {"atk": 100, "hp": [1, 2]}, "skills": [{"lv": 1}]}),
+        encoding="utf-8",
+    )
+    return AscensionBundle("memo", directory, cache_size=4, log_tag="test")
+
+
+@pytest.fixture
+def detail(detail_bundle):
+    calls = []
+
+    @memoize(detail_bundle, maxsize=8)
+    def _detail(char_id: str, level: int) -> _Detail:
+        calls.append((char_id, level))
+        data = detail_bundle[char_id]
+        result = _Detail()
+        result.name = data["name"]
+        result.stats = dict(data["stats"], level=level)
+        result.skills = data["skills"]
+        return result.freeze()
+
+    return _detail, calls
+
+
+def test_results_are_shared_and_cached(detail):
+    get, calls = detail
+    a = get("1304", 90)
+    b = get("1304", 90)
+    assert a is b
+    assert calls == [("1304", 90)]
+    assert get("1304", 80) is not a
+    assert get.cache_info().hits == 1
+
+
+@pytest.mark.parametrize(
+    "mutate",
+    [
+        lambda r: setattr(r, "name", "x"),
+        lambda r: delattr(r, "name"),
+        lambda r: r.stats.__setitem__("atk", 1),
+        lambda r: r.stats.__delitem__("atk"),
+        lambda r: r.stats.update(atk=1),
+        lambda r: r.stats.pop("atk"),
+        lambda r: r.stats.popitem(),
+        lambda r: r.stats.setdefault("crit", 1),
+        lambda r: r.stats.clear(),
+        lambda r: r.skills[0].__setitem__("lv", 2),
+    ],
+)
+def test_cached_result_is_read_only(detail, mutate):
+    get, _ = detail
+    result = get("1304", 90)
+    with pytest.raises(TypeError):
+        mutate(result)
+    assert get("1304", 90).name == "今汐"
+    assert get("1304", 90).stats["atk"] == 100
+
+
+def test_nested_containers_are_frozen(detail):
+    get, _ = detail
+    result = get("1304", 90)
+    assert isinstance(result.stats, FrozenDict) and isinstance(result.stats, dict)
+    assert result.stats["hp"] == (1, 2)
+    assert isinstance(result.skills, tuple)
+    with pytest.raises(AttributeError):
+        result.skills.append({})
+    assert json.loads(json.dumps(result.stats)) == {"atk": 100, "hp": [1, 2], "level": 90}
+
+
+def test_cached_result_does_not_alias_bundle_lru(detail, detail_bundle):
+    get, _ = detail
+    result = get("1304", 90)
+    detail_bundle["1304"]["skills"][0]["lv"] = 99
+    assert result.skills[0]["lv"] == 1
+
+
+@pytest.mark.parametrize("copier", [lambda r: r.thaw(), thaw, copy.copy, copy.deepcopy])
+def test_thaw_gives_writable_copy(detail, copier):
+    get, _ = detail
+    shared = get("1304", 90)
+    own = copier(shared)
+    assert type(own) is _Detail and own is not shared
+    own.name = "改"
+    own.stats["atk"] = 1
+    own.stats["hp"].append(3)
+    own.skills.append({"lv": 2})
+    assert type(own.stats) is dict and type(own.skills) is list
+    assert shared.name == "今汐"
+    assert shared.stats["atk"] == 100 and shared.stats["hp"] == (1, 2)
+    assert len(shared.skills) == 1
+
+
+def test_frozen_dict_copy_and_pickle():
+    frozen = freeze({"a": {"b": [1]}})
+    writable = copy.copy(frozen)
+    writable["a"]["b"].append(2)
+    assert frozen["a"]["b"] == (1,)
+    restored = pickle.loads(pickle.dumps(frozen))
+    assert isinstance(restored, FrozenDict) and restored == frozen
+    assert freeze(frozen) is frozen
+
+
+def test_generation_change_invalidates(detail, detail_bundle):
+    get, calls = detail
+    first = get("1304", 90)
+    path = detail_bundle.directory / "1304.json"
+    path.write_text(
+        json.dumps({"name": "今汐·改", "stats": {"atk": 120, "hp": [1, 2]}, "skills": []}),
+        encoding="utf-8",
+    )
+    detail_bundle.load(force=True)
+
+    second = get("1304", 90)
+    assert second is not first
+    assert second.name == "今汐·改" and second.stats["atk"] == 120
+    assert first.name == "今汐"  # 旧结果仍完整可读
+    assert calls == [("1304", 90), ("1304", 90)]
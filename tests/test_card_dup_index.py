@@ -0,0 +1,109 @@
+"""感知索引预筛: 常见改动 (缩放/裁边/重压缩/调色/小角度旋转/加边/加字) 下分组与两两比对一致。"""
+
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("gsuid_core")
+pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from PIL import Image, ImageDraw, ImageEnhance  # noqa: E402
+
+from XutheringWavesUID.wutheringwaves_charinfo import (  # noqa: E402
+    card_utils,
+    card_dup_index,
+    card_hash_index,
+)
+
+PACKAGE = Path(__file__).resolve().parent.parent / "XutheringWavesUID"
+SOURCES = [
+    PACKAGE / "wutheringwaves_rank/texture2d/slash.jpg",
+    PACKAGE / "wutheringwaves_calendar/texture2d/bg2.jpg",
+    PACKAGE / "utils/texture2d/bg4.jpg",
+    PACKAGE / "utils/texture2d/bg13.jpg",
+]
+
+
+def _scale(im):
+    return im.resize((im.width * 3 // 5, im.height * 3 // 5))
+
+
+def _crop(im):
+    return im.crop((im.width // 10, im.height // 20, im.width - im.width // 20, im.height - im.height // 10))
+
+
+def _recolor(im):
+    return ImageEnhance.Brightness(ImageEnhance.Color(im).enhance(0.3)).enhance(1.3)
+
+
+def _rotate(im):
+    return im.rotate(3)
+
+
+def _pad(im):
+    out = Image.new("RGB", (im.width * 6 // 5, im.height), (20, 20, 20))
+    out.paste(im, (im.width // 10, 0))
+    return out
+
+
+def _banner(im):
+    draw = ImageDraw.Draw(im)
+    draw.rectangle((0, im.height - 80, im.width, im.height), fill=(0, 0, 0))
+    draw.text((20, im.height - 60), "watermark", fill=(255, 255, 255))
+    return im
+
+
+VARIANTS = [(_scale, _crop), (_recolor, _rotate), (_pad, _scale), (_banner, _crop)]
+
+
+@pytest.fixture
+def char_dir(tmp_path, monkeypatch):
+    base = tmp_path / "bg"
+    monkeypatch.setattr(card_hash_index, "TYPE_BASES", {"bg": base})
+    monkeypatch.setattr(card_utils, "CUSTOM_ORB_PATH", tmp_path / "orb")
+    monkeypatch.setattr(card_dup_index, "INDEX_PATH", tmp_path / "dup_index.json")
+    monkeypatch.setattr(card_dup_index, "_dirs", None)
+    monkeypatch.setattr(card_dup_index, "_trees", {})
+    directory = base / "1102"
+    directory.mkdir(parents=True)
+    for i, (source, ops) in enumerate(zip(SOURCES, VARIANTS)):
+        with Image.open(source) as im:
+            im = im.convert("RGB")
+        im = im.crop((0, 0, im.width, min(im.height, im.width * 7 // 5)))
+        im.save(directory / f"{i}.jpg", quality=90)
+        for j, op in enumerate(ops):
+            op(im.copy()).save(directory / f"{i}_{j}.jpg", quality=55)
+    yield directory
+    card_dup_index.flush()
+
+
+def _names(groups):
+    return sorted(sorted(p.name for p in group) for group, _ in groups)
+
+
+GROUPS = [[f"{i}.jpg", f"{i}_0.jpg", f"{i}_1.jpg"] for i in range(len(SOURCES))]
+
+
+def test_index_groups_match_exhaustive(char_dir):
+    exhaustive = _names(card_utils.find_duplicate_groups_in_dir(char_dir, exhaustive=True))
+    # 每张原图与自己的两个改动版本各成一组
+    assert exhaustive == GROUPS
+    assert _names(card_utils.find_duplicate_groups_in_dir(char_dir)) == exhaustive
+
+
+def test_candidates_cover_every_same_source_pair(char_dir):
+    # 分组一致还可能靠传递连通; 这里要求同源的每一对 (含两个改动版本之间) 都直接进候选
+    pairs = {tuple(sorted((a.name, b.name))) for a, b in card_dup_index.candidate_pairs(char_dir)}
+    related = {(a, b) for group in GROUPS for a in group for b in group if a < b}
+    assert related <= pairs
+    n = sum(map(len, GROUPS))
+    assert len(pairs) < n * (n - 1) // 2 // 2
+
+
+def test_new_image_candidates(char_dir):
+    upload = char_dir.parent / "upload.jpg"
+    with Image.open(char_dir / "1.jpg") as im:
+        _recolor(_scale(im.convert("RGB"))).save(upload, quality=60)
+    found = card_utils.duplicates_for_single(char_dir, upload, as_type="bg")
+    assert {p.name for p, _ in found} == set(GROUPS[1])
@@ -0,0 +1,98 @@
+"""fuzzy_suggest 的 gram 倒排索引与逐个打分 (_score_pair 线性扫描) 结果一致。"""
+
+import pytest
+
+pytest.importorskip("gsuid_core")
+
+from XutheringWavesUID.utils import fuzzy_match  # noqa: E402
+
+ALIASES = {
+    "今汐": ["汐汐", "龙女", "jinhsi"],
+    "长离": ["离离", "changli"],
+    "椿": ["春", "camellya"],
+    "卡卡罗": ["卡卡", "calcharo"],
+    "忌炎": ["将军", "jiyan"],
+    "守岸人": ["岸宝", "shorekeeper"],
+    "珂莱塔": ["珂莱", "cartethyia"],
+    "漂泊者·湮灭": ["暗主", "湮灭主"],
+    "漂泊者·衍射": ["光主", "衍射主"],
+    "漂泊者·气动": ["风主", "气动主"],
+    "吟霖": ["yinlin"],
+    "相里要": ["要哥"],
+    "散华": ["sanhua"],
+    "白芷": ["baizhi"],
+    "秧秧": ["yangyang"],
+}
+
+QUERIES = [
+    "今汐",
+    "今夕",
+    "金汐",
+    "长里",
+    "常离",
+    "离长",
+    "卡卡洛",
+    "将君",
+    "守岸",
+    "岸人守",
+    "漂泊者湮灭",
+    "风主",
+    "吟林",
+    "yinlin",
+    "yinling",
+    "JIYAN",
+    "shore",
+    "白纸",
+    "秧",
+    "不存在的角色",
+    "x",
+]
+
+
+def _linear_suggest(query, candidates, top_n, min_score):
+    """建索引前的实现: 每个规范名逐个别名打分, 到 0.99 即停。"""
+    q = query.strip()
+    q_lower = q.lower()
+    q_py = fuzzy_match._to_pinyin(q)
+    q_py_sorted = "".join(sorted(q_py))
+    scores = {}
+    for canonical, aliases in candidates.items():
+        best = 0.0
+        for name in (canonical, *aliases):
+            s = fuzzy_match._score_pair(q_lower, q_py, q_py_sorted, name)
+            if s > best:
+                best = s
+                if best >= 0.99:
+                    break
+        if best >= min_score:
+            scores[canonical] = best
+    return sorted(scores.items(), key=lambda x: -x[1])[:top_n]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+@pytest.mark.parametrize("top_n,min_score", [(1, 0.7), (3, 0.5)])
+def test_index_matches_linear_scan(query, top_n, min_score):
+    candidates = dict(ALIASES)
+    got = fuzzy_match.fuzzy_suggest(query, candidates, top_n=top_n, min_score=min_score)
+    expected = _linear_suggest(query, candidates, top_n, min_score)
+    assert [name for name, _ in got] == [name for name, _ in expected]
+    assert [s for _, s in got] == pytest.approx([s for _, s in expected])
+
+
+def test_query_cache_returns_copies():
+    candidates = dict(ALIASES)
+    first = fuzzy_match.fuzzy_suggest("今夕", candidates, top_n=3, min_score=0.5)
+    first.clear()
+    assert fuzzy_match.fuzzy_suggest("今夕", candidates, top_n=3, min_score=0.5)
+
+
+def test_index_rebuilt_when_table_grows():
+    candidates = dict(ALIASES)
+    assert fuzzy_match.fuzzy_suggest("弗洛洛", candidates) == []
+    candidates["弗洛洛"] = ["phrolova"]
+    assert fuzzy_match.fuzzy_suggest("弗洛洛", candidates)[0][0] == "弗洛洛"
+
+
+def test_empty_inputs():
+    assert fuzzy_match.fuzzy_suggest("  ", dict(ALIASES)) == []
+    assert fuzzy_match.fuzzy_suggest("今汐", {}) == []
@@ -0,0 +1,99 @@
+"""抽卡记录合并: 滚动哈希版最长公共子串与原 O(n·m) DP 逐项一致, 合并结果也一致。"""
+
+import random
+from datetime import datetime
+
+import pytest
+
+from XutheringWavesUID.wutheringwaves_gachalog import gacha_merge
+
+
+class Log:
+    __slots__ = ("cardPoolType", "resourceId", "qualityLevel", "name", "count", "time")
+
+    def __init__(self, rid: int, ts: int):
+        self.cardPoolType = "1"
+        self.resourceId = rid
+        self.qualityLevel = 5 if rid % 80 == 0 else 4 if rid % 10 == 0 else 3
+        self.name = f"item{rid}"
+        self.count = 1
+        self.time = datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+
+    def match_key(self):
+        return (self.cardPoolType, self.resourceId, self.qualityLevel, self.name, self.count, self.time)
+
+
+def make_logs(n: int, seed: int, kinds: int = 120):
+    """模拟本地记录 vs 导入记录: 导入比本地新若干抽, 并缺失尾部较早的一段; 十连同秒, 大量重复时间。"""
+    rnd = random.Random(seed)
+    ts = 1_700_000_000
+    full = []
+    for _ in range(n):
+        ts -= rnd.choice((0, 0, 0, 1, 60))
+        full.append(Log(rnd.randrange(1, kinds), ts))
+    newer = max(n // 10, 1)
+    return full[newer:], full[: n - n // 4]
+
+
+def find_longest_common_subarray_indices_dp(a, b):
+    """原 O(n·m) DP 实现, 作对拍基准。"""
+    n, m = len(a), len(b)
+    dp = [[0] * (m + 1) for _ in range(n + 1)]
+    length = 0
+    a_end = b_end = 0
+
+    for i in range(n - 1, -1, -1):
+        for j in range(m - 1, -1, -1):
+            if a[i].match_key() == b[j].match_key():
+                dp[i][j] = dp[i + 1][j + 1] + 1
+                if dp[i][j] > length:
+                    length = dp[i][j]
+                    a_end = i + length - 1
+                    b_end = j + length - 1
+            else:
+                dp[i][j] = 0
+
+    if length == 0:
+        return None
+
+    return (a_end - length + 1, a_end), (b_end - length + 1, b_end)
+
+
+def _shuffled_pairs():
+    rnd = random.Random(0)
+    for seed in range(60):
+        n = rnd.randrange(0, 40)
+        a, b = make_logs(n, seed, kinds=rnd.choice((2, 4, 30)))
+        if seed % 3 == 0:
+            b = [x for x in b if rnd.random() > 0.2]  # 中间缺失
+        yield a, b
+
+
+@pytest.mark.parametrize("a,b", list(_shuffled_pairs()))
+def test_find_matches_dp(a, b):
+    assert gacha_merge.find_longest_common_subarray_indices(a, b) == find_longest_common_subarray_indices_dp(a, b)
+
+
+def test_find_edge_cases():
+    a, _ = make_logs(10, 1)
+    last = len(a) - 1
+    assert gacha_merge.find_longest_common_subarray_indices([], a) is None
+    assert gacha_merge.find_longest_common_subarray_indices(a, []) is None
+    assert gacha_merge.find_longest_common_subarray_indices(a, a) == ((0, last), (0, last))
+    assert gacha_merge.find_longest_common_subarray_indices(a[:3], a[5:]) is None
+
+
+@pytest.mark.parametrize("n", [50, 300])
+def test_merge_matches_dp_merge(monkeypatch, n):
+    a, b = make_logs(n, seed=n)
+    fast = gacha_merge.merge_gacha_logs_by_common_subarray(a, b)
+    monkeypatch.setattr(gacha_merge, "find_longest_common_subarray_indices", find_longest_common_subarray_indices_dp)
+    slow = gacha_merge.merge_gacha_logs_by_common_subarray(a, b)
+    assert [id(x) for x in fast] == [id(x) for x in slow]
+    # 本地缺的新记录与导入缺的旧记录都补齐, 不重复
+    assert len(fast) == len({id(x) for x in a} | {id(x) for x in b})
+
+
+def test_merge_long_input_does_not_recurse():
+    a, b = make_logs(20000, seed=7, kinds=3)
+    assert len(gacha_merge.merge_gacha_logs_by_common_subarray(a, b)) >= len(b)
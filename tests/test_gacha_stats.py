@@ -0,0 +1,91 @@
+"""抽卡统计增量更新: 头部追加只累加新增, 其余合并结果 (含十连内重复键的中间补洞) 全量重算。"""
+
+import copy
+
+import pytest
+
+pytest.importorskip("gsuid_core")
+
+from XutheringWavesUID.wutheringwaves_gachalog import gacha_stats  # noqa: E402
+
+POOL = "角色精准调谐"
+
+
+def _log(name, quality=3, time="2025-01-01 00:00:00", resource_id=None):
+    return {
+        "cardPoolType": POOL,
+        "resourceId": resource_id or abs(hash(name)) % 100000,
+        "qualityLevel": quality,
+        "name": name,
+        "count": 1,
+        "time": time,
+    }
+
+
+def _ten_pull(time, names_qualities):
+    return [_log(name, quality, time) for name, quality in names_qualities]
+
+
+# 按时间倒序, 同一十连内 match 键大量重复
+OLD = (
+    _ten_pull("2025-01-03 00:00:00", [("源能臂铠·测肃", 3)] * 2 + [("今汐", 5)] + [("源能臂铠·测肃", 3)] * 7)
+    + _ten_pull("2025-01-02 00:00:00", [("远行者长刃·辟路", 3)] * 9 + [("散华", 4)])
+    + [_log("鉴心", 5, "2025-01-01 00:00:00")]
+    + [_log("远行者长刃·辟路", 3, "2024-12-31 00:00:00")] * 20
+)
+
+
+def _state(logs):
+    return gacha_stats.build_state({POOL: copy.deepcopy(logs)})[POOL]
+
+
+def test_build_state_counts():
+    state = _state(OLD)
+    assert state["total"] == len(OLD)
+    assert state["pity"] == 2
+    assert state["r_num"] == [21, 10 + 7 + 1]
+
+
+def test_prepend_is_incremental_and_matches_full():
+    state = _state(OLD)
+    new = _ten_pull("2025-01-04 00:00:00", [("源能臂铠·测肃", 3)] * 10) + OLD
+    assert gacha_stats._added_count(state, new) == 10
+    gacha_stats._apply(state, new[:10])
+    assert state == _state(new)
+
+
+def test_no_change_adds_nothing():
+    state = _state(OLD)
+    assert gacha_stats._added_count(state, copy.deepcopy(OLD)) == 0
+
+
+def test_gap_fill_inside_ten_pull_with_duplicate_keys_recomputes():
+    state = _state(OLD)
+    # 旧的十连只拉到 9 条, 合并时在其中间补上缺的一条: 新列表第 added 条仍与原最新一条同键, 末条也不变
+    new = OLD[:3] + [_log("散华", 4, "2025-01-03 00:00:00")] + OLD[3:]
+    assert gacha_stats._match_key(new[1]) == gacha_stats._match_key(OLD[0])
+    assert gacha_stats._added_count(state, new) is None
+
+    # 同时在头部追加新记录也一样回退
+    newer = [_log("源能臂铠·测肃", 3, "2025-01-04 00:00:00")] + new
+    assert gacha_stats._added_count(state, newer) is None
+
+
+def test_middle_removal_or_tail_change_recomputes():
+    state = _state(OLD)
+    assert gacha_stats._added_count(state, OLD[:5] + OLD[6:] + [OLD[-1]]) is None
+    assert gacha_stats._added_count(state, OLD[:-1]) is None
+    assert gacha_stats._added_count(None, OLD) is None
+
+
+def test_empty_state_accepts_everything():
+    assert gacha_stats._added_count(gacha_stats._empty_pool(), OLD) == len(OLD)
+
+
+def test_state_to_stats():
+    stats = gacha_stats.state_to_stats({POOL: _state(OLD)})[POOL]
+    assert stats["total"] == len(OLD)
+    assert stats["remain"] == 2
+    assert stats["rank_s_count"] == 2
+    assert stats["avg"] == pytest.approx((21 + 18) / 2)
+    assert stats["char_gold"] == 2
@@ -0,0 +1,103 @@
+"""插件来源判断: 入口标记置位/复位, 子任务继承, 无标记即非本插件。"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("gsuid_core")
+
+from XutheringWavesUID.utils import plugin_checker  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def no_stack_fallback(monkeypatch):
+    monkeypatch.setattr(plugin_checker, "_stack_fallback_enabled", lambda: False)
+
+
+def test_unmarked_call_is_not_waves():
+    assert plugin_checker.get_current_plugin() is None
+    assert not plugin_checker.is_from_waves_plugin()
+
+
+def test_waves_entry_marks_and_resets():
+    seen = []
+
+    @plugin_checker.waves_entry
+    async def entry():
+        seen.append(plugin_checker.is_from_waves_plugin())
+
+        async def child():
+            seen.append(plugin_checker.get_current_plugin())
+
+        await asyncio.create_task(child())
+
+    asyncio.run(entry())
+    assert seen == [True, plugin_checker.WAVES_PLUGIN]
+    assert plugin_checker.get_current_plugin() is None
+
+
+def test_wrap_is_idempotent_and_keeps_metadata():
+    async def handler(bot, ev):
+        return plugin_checker.get_current_plugin(), bot, ev
+
+    wrapped = plugin_checker.waves_entry(handler)
+    assert plugin_checker.waves_entry(wrapped) is wrapped
+    assert wrapped.__name__ == "handler"
+    assert asyncio.run(wrapped("bot", ev="ev")) == (plugin_checker.WAVES_PLUGIN, "bot", "ev")
+
+
+def test_other_plugin_marker_is_not_waves():
+    async def check():
+        return plugin_checker.get_current_plugin(), plugin_checker.is_from_waves_plugin()
+
+    other = plugin_checker._wrap_handler(check, "OtherUID")
+    assert asyncio.run(other()) == ("OtherUID", False)
+    # 本插件入口内调用其它插件的处理函数时, 以最内层入口为准
+    nested = plugin_checker.waves_entry(other)
+    assert asyncio.run(nested()) == ("OtherUID", False)
+
+
+def test_stack_fallback_is_opt_in(monkeypatch):
+    monkeypatch.setattr(plugin_checker, "_plugin_from_stack", lambda: "XutheringWavesUID")
+    assert plugin_checker.get_current_plugin() is None
+    monkeypatch.setattr(plugin_checker, "_stack_fallback_enabled", lambda: True)
+    assert plugin_checker.get_current_plugin() == "XutheringWavesUID"
+
+
+class _Job:
+    def __init__(self, func):
+        self.func = func
+
+    def modify(self, func):
+        self.func = func
+
+
+def test_scheduler_jobs_of_this_plugin_are_marked(monkeypatch):
+    aps = pytest.importorskip("gsuid_core.aps")
+
+    async def ours():
+        return plugin_checker.get_current_plugin()
+
+    async def theirs():
+        return plugin_checker.get_current_plugin()
+
+    def sync_job():
+        return None
+
+    ours.__module__ = "gsuid_core.plugins.XutheringWavesUID.XutheringWavesUID.wutheringwaves_ann"
+    theirs.__module__ = "gsuid_core.plugins.OtherUID.OtherUID"
+    sync_job.__module__ = ours.__module__
+    jobs = [_Job(ours), _Job(theirs), _Job(sync_job)]
+
+    class _Scheduler:
+        def get_jobs(self):
+            return jobs
+
+    monkeypatch.setattr(aps, "scheduler", _Scheduler())
+    assert plugin_checker._mark_scheduler_jobs(plugin_checker.WAVES_PLUGIN) == 1
+    assert asyncio.run(jobs[0].func()) == plugin_checker.WAVES_PLUGIN
+    assert jobs[1].func is theirs and jobs[2].func is sync_job
+
+    wrapped = jobs[0].func
+    assert plugin_checker._mark_scheduler_jobs(plugin_checker.WAVES_PLUGIN) == 1
+    assert jobs[0].func is wrapped
@@ -0,0 +1,61 @@
+"""批量拉取角色详情: 每完成一个角色回调一次进度, 结果顺序与入参一致。"""
+
+import random
+import asyncio
+
+import pytest
+
+pytest.importorskip("gsuid_core")
+
+from XutheringWavesUID.utils import refresh_scheduler as rs  # noqa: E402
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    monkeypatch.setattr(rs, "is_use_global_semaphore", lambda: False)
+    monkeypatch.setattr(rs, "get_refresh_card_concurrency", lambda: 4)
+    sched = rs.RefreshScheduler()
+
+    async def fetch(role_id, uid, ck, host=None, limiter=None):
+        await asyncio.sleep(random.random() / 100)
+        return f"detail-{role_id}"
+
+    monkeypatch.setattr(sched, "fetch_role_detail", fetch)
+    return sched
+
+
+ROLE_IDS = [str(1100 + i) for i in range(12)]
+
+
+def test_progress_fires_once_per_role_and_keeps_order(scheduler):
+    calls = []
+    results = asyncio.run(
+        scheduler.fetch_role_details(ROLE_IDS, "100", "ck", on_progress=lambda d, t: calls.append((d, t)))
+    )
+    assert results == [f"detail-{r}" for r in ROLE_IDS]
+    assert calls == [(i, len(ROLE_IDS)) for i in range(1, len(ROLE_IDS) + 1)]
+
+
+def test_async_progress_callback(scheduler):
+    calls = []
+
+    async def on_progress(done, total):
+        await asyncio.sleep(0)
+        calls.append(done)
+
+    asyncio.run(scheduler.fetch_role_details(ROLE_IDS, "100", "ck", on_progress=on_progress))
+    assert calls == list(range(1, len(ROLE_IDS) + 1))
+
+
+def test_failing_progress_callback_does_not_abort(scheduler):
+    def on_progress(done, total):
+        raise RuntimeError("boom")
+
+    results = asyncio.run(scheduler.fetch_role_details(ROLE_IDS, "100", "ck", on_progress=on_progress))
+    assert len(results) == len(ROLE_IDS)
+
+
+def test_no_roles(scheduler):
+    calls = []
+    assert asyncio.run(scheduler.fetch_role_details([], "100", "ck", on_progress=lambda d, t: calls.append(d))) == []
+    assert calls == []
@@ -0,0 +1,197 @@
+"""上传缓冲: 同键合并、领取租约、确认与退避重试。"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("gsuid_core")
+
+from XutheringWavesUID.utils.queues import spool  # noqa: E402
+from XutheringWavesUID.utils.queues.const import QUEUE_SCORE_RANK, QUEUE_SLASH_RECORD  # noqa: E402
+
+
+class _Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(tmp_path, monkeypatch):
+    monkeypatch.setattr(spool, "SPOOL_PATH", tmp_path / "upload_spool.db")
+    monkeypatch.setattr(spool.random, "uniform", lambda a, b: 1.0)
+    clock = _Clock()
+    monkeypatch.setattr(spool, "time", clock)
+    spool._init_db()
+    return clock
+
+
+def _rows():
+    with spool.closing(spool._connect()) as conn:
+        return conn.execute("SELECT queue, key, gen, payload, attempts, next_at FROM upload_spool").fetchall()
+
+
+def test_coalesce_key():
+    assert spool.coalesce_key(QUEUE_SCORE_RANK, {"waves_id": "100"}) == "100"
+    assert spool.coalesce_key(QUEUE_SLASH_RECORD, {"wavesId": "100", "challengeId": 3}) == "100:3"
+    single = {"waves_id": "100", "single_refresh": True, "char_info": [{"char_id": 1304}, {"char_id": 1102}]}
+    assert spool.coalesce_key(QUEUE_SCORE_RANK, single) == "100:1102,1304"
+    # 没有 uid 的记录各自独立
+    assert spool.coalesce_key(QUEUE_SCORE_RANK, {}) != spool.coalesce_key(QUEUE_SCORE_RANK, {})
+
+
+def test_put_coalesces_same_key(clock):
+    spool.put(QUEUE_SCORE_RANK, {"waves_id": "100", "v": 1})
+    spool.put(QUEUE_SCORE_RANK, {"waves_id": "100", "v": 2})
+    spool.put(QUEUE_SCORE_RANK, {"waves_id": "200", "v": 1})
+    rows = {r[1]: r for r in _rows()}
+    assert set(rows) == {"100", "200"}
+    assert rows["100"][2] == 2 and '"v": 2' in rows["100"][3]
+    assert spool.backlog() == {QUEUE_SCORE_RANK: 2}
+
+
+def test_claim_leases_rows(clock):
+    spool.put(QUEUE_SCORE_RANK, {"waves_id": "100"})
+    spool.put(QUEUE_SCORE_RANK, {"waves_id": "200"})
+
+    first = spool.claim()
+    assert sorted(r[1] for r in first) == ["100", "200"]
+    # 租约内不会被再次领取
+    assert spool.claim() == []
+    assert spool.next_due() == pytest.approx(clock.now + spool._LEASE)
+
+    clock.now += spool._LEASE + 1
+    assert sorted(r[1] for r in spool.claim()) == ["100", "200"]
+
+
+def test_claim_respects_limit(clock):
+    for uid in range(5):
+        spool.put(QUEUE_SCORE_RANK, {"waves_id": str(uid)})
+    assert len(spool.claim(limit=2)) == 2
+    assert len(spool.claim(limit=10)) == 3
+
+
+def test_ack_keeps_newer_generation(clock):
+    spool.put(QUEUE_SCORE_RANK, {"waves_id": "100", "v": 1})
+    (queue, key, gen, _, _), = spool.claim()
+    # 发送期间又写入了同键新记录: 租约不变, 其它 worker 领不到
+    spool.put(QUEUE_SCORE_RANK, {"waves_id": "100", "v": 2})
+    assert spool.claim() == []
+    spool.ack(queue, key, gen)
+    rows = _rows()
+    assert len(rows) == 1 and rows[0][2] == gen + 1
+    # 新记录立即到期, 不受旧租约影响
+    assert [r[1] for r in spool.claim()] == ["100"]
+
+    spool.ack(queue, key, gen + 1)
+    assert _rows() == []
+
+
+def test_backoff_grows_then_drops(clock):
+    spool.put(QUEUE_SCORE_RANK, {"waves_id": "100"})
+    attempts = 0
+    delays = []
+    while True:
+        (queue, key, gen, _, attempts), = spool.claim()
+        if not spool.backoff(queue, key, gen, attempts):
+            break
+        next_at = _rows()[0][5]
+        delays.append(next_at - clock.now)
+        assert spool.claim() == []
+        clock.now = next_at
+    assert attempts + 1 == spool._MAX_ATTEMPTS
+    assert delays == sorted(delays)
+    assert delays[0] == pytest.approx(spool._BACKOFF_BASE * 2)
+    assert max(delays) <= spool._BACKOFF_MAX
+    assert _rows() == []
+
+
+def test_put_on_leased_row_keeps_lease_until_it_expires(clock):
+    spool.put(QUEUE_SCORE_RANK, {"waves_id": "100", "v": 1})
+    (row,) = spool.claim()
+    clock.now += 10
+    spool.put(QUEUE_SCORE_RANK, {"waves_id": "100", "v": 2})
+    assert spool.claim() == []
+    assert spool.next_due() == pytest.approx(clock.now - 10 + spool._LEASE)
+
+    # 旧发送者失联: 租约到期后新记录照常被领取
+    clock.now += spool._LEASE
+    (queue, key, gen, payload, attempts), = spool.claim()
+    assert gen == row[2] + 1 and '"v": 2' in payload and attempts == 0
+
+
+def test_backoff_of_replaced_row_releases_newer_record(clock):
+    spool.put(QUEUE_SCORE_RANK, {"waves_id": "100", "v": 1})
+    (queue, key, gen, _, attempts), = spool.claim()
+    spool.put(QUEUE_SCORE_RANK, {"waves_id": "100", "v": 2})
+    assert spool.backoff(queue, key, gen, attempts)
+    # 旧记录的失败不拖累新记录: 不退避, 立即可领
+    (_, _, new_gen, payload, new_attempts), = spool.claim()
+    assert new_gen == gen + 1 and '"v": 2' in payload and new_attempts == 0
+
+
+def test_init_db_adds_lease_column(tmp_path, monkeypatch):
+    monkeypatch.setattr(spool, "SPOOL_PATH", tmp_path / "old.db")
+    with spool.closing(spool._connect()) as conn:
+        with conn:
+            conn.execute(
+                "CREATE TABLE upload_spool ("
+                "queue TEXT NOT NULL, key TEXT NOT NULL, gen INTEGER NOT NULL, "
+                "payload TEXT NOT NULL, attempts INTEGER NOT NULL, next_at REAL NOT NULL, "
+                "created REAL NOT NULL, PRIMARY KEY (queue, key))"
+            )
+            conn.execute("INSERT INTO upload_spool VALUES ('q', 'k', 1, '{}', 0, 0, 0)")
+    spool._init_db()
+    spool._init_db()
+    assert [r[1] for r in spool.claim()] == ["k"]
+
+
+def test_put_resets_attempts(clock):
+    spool.put(QUEUE_SCORE_RANK, {"waves_id": "100"})
+    (queue, key, gen, _, attempts), = spool.claim()
+    spool.backoff(queue, key, gen, attempts)
+    spool.put(QUEUE_SCORE_RANK, {"waves_id": "100", "v": 2})
+    (_, _, _, _, attempts), = spool.claim()
+    assert attempts == 0
+
+
+@pytest.mark.parametrize(
+    "result,left",
+    [(spool.SEND_OK, 0), (spool.SEND_DROP, 0), (spool.SEND_RETRY, 1)],
+)
+def test_worker_send_acks_or_backs_off(clock, result, left):
+    sent = []
+
+    async def sender(queue, item):
+        sent.append((queue, item))
+        return result
+
+    worker = spool.SpoolWorker()
+    worker._sender = sender
+    spool.put(QUEUE_SCORE_RANK, {"waves_id": "100"})
+    (row,) = spool.claim()
+
+    asyncio.run(worker._send(asyncio.Semaphore(1), row))
+
+    assert sent == [(QUEUE_SCORE_RANK, {"waves_id": "100"})]
+    rows = _rows()
+    assert len(rows) == left
+    if left:
+        assert rows[0][4] == 1 and rows[0][5] > clock.now
+
+
+def test_worker_send_exception_is_retried(clock):
+    async def sender(queue, item):
+        raise RuntimeError("boom")
+
+    worker = spool.SpoolWorker()
+    worker._sender = sender
+    spool.put(QUEUE_SCORE_RANK, {"waves_id": "100"})
+    (row,) = spool.claim()
+
+    asyncio.run(worker._send(asyncio.Semaphore(1), row))
+
+    (row,) = _rows()
+    assert row[4] == 1
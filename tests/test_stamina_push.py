@@ -0,0 +1,95 @@
+"""体力推送: 越线推送一次; 之后复核仍在阈值之上时间隔翻倍封顶, 观察到回落即重新布防。"""
+
+import time
+import asyncio
+
+import pytest
+
+pytest.importorskip("gsuid_core")
+
+from XutheringWavesUID.wutheringwaves_stamina import stamina_push as sp  # noqa: E402
+
+KEY = ("u1", "onebot", "100000001")
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    energy = {"cur": 100, "total": 240}
+
+    async def fetch_energy(self, sub):
+        self.api_calls += 1
+        return energy["cur"], energy["total"]
+
+    async def upsert_stamina_query(**kwargs):
+        return None
+
+    monkeypatch.setattr(sp.StaminaPushEngine, "_fetch_energy", fetch_energy)
+    monkeypatch.setattr(sp.WavesStaminaRecord, "upsert_stamina_query", upsert_stamina_query)
+    e = sp.StaminaPushEngine()
+    e._upsert(*KEY[:2], "self", KEY[2], "on", 180, 100, int(time.time()))
+    return e, energy
+
+
+def _verify(e):
+    sub = e._subs[KEY]
+    return asyncio.run(e._verify(asyncio.Semaphore(1), sub))
+
+
+def _next_due(e):
+    sub = e._subs[KEY]
+    return max(due for due, _, key, version in e._heap if key == KEY and version == sub.version)
+
+
+def test_rearm_delay_doubles_and_caps():
+    delays = [sp.rearm_delay(n) for n in range(8)]
+    assert delays[:3] == [sp._REARM_CHECK, 2 * sp._REARM_CHECK, 4 * sp._REARM_CHECK]
+    assert max(delays) == sp._REARM_MAX == delays[-1]
+    assert sp.rearm_delay(10_000) == sp._REARM_MAX
+
+
+def test_push_once_then_back_off_while_full(engine):
+    e, energy = engine
+    assert e._subs[KEY].armed
+
+    energy["cur"] = 200
+    assert _verify(e) is not None  # 越线推送
+    sub = e._subs[KEY]
+    assert not sub.armed
+    assert _next_due(e) - sub.mr_query_time == sp._REARM_CHECK
+
+    gaps = []
+    for _ in range(5):
+        assert _verify(e) is None  # 仍在阈值之上: 不重复推送
+        gaps.append(_next_due(e) - e._subs[KEY].mr_query_time)
+    assert gaps == [sp.rearm_delay(n) for n in range(1, 6)]
+    assert gaps[-1] == sp._REARM_MAX
+
+
+def test_query_below_threshold_rearms_and_resets_backoff(engine):
+    e, energy = engine
+    energy["cur"] = 200
+    _verify(e)
+    _verify(e)
+    _verify(e)
+    assert e._subs[KEY].rearm_checks == 2
+
+    now = int(time.time()) + 1
+    e.on_stamina_query(*KEY, mr_value=20, mr_query_time=now)
+    sub = e._subs[KEY]
+    assert sub.armed and sub.rearm_checks == 0
+    assert _next_due(e) == sp.project_cross_time(20, now, 180)
+
+    energy["cur"] = 181
+    assert _verify(e) is not None
+
+
+def test_recheck_that_finds_consumption_rearms(engine):
+    e, energy = engine
+    energy["cur"] = 200
+    _verify(e)
+    _verify(e)
+    energy["cur"] = 150
+    assert _verify(e) is None
+    sub = e._subs[KEY]
+    assert sub.armed and sub.rearm_checks == 0
+    assert _next_due(e) == sp.project_cross_time(150, sub.mr_query_time, 180)
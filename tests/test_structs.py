@@ -0,0 +1,191 @@
+"""msgspec 孪生 Struct 与 pydantic 模型解码结果一致。"""
+
+import copy
+import json
+import pickle
+
+import pytest
+
+pytest.importorskip("msgspec")
+
+from XutheringWavesUID.utils.api.model import RoleList, SlashDetail, RoleDetailData  # noqa: E402
+from XutheringWavesUID.utils.api.model import structs  # noqa: E402
+
+
+def _props(n):
+    return [{"attributeName": f"属性{i}", "iconUrl": None, "attributeValue": f"{i}.5%"} for i in range(n)]
+
+
+def _phantom(i):
+    return {
+        "phantomProp": {
+            "phantomPropId": 390070050 + i,
+            "name": f"声骸{i}",
+            "phantomId": 6000040 + i,
+            "quality": 5,
+            "cost": 4 if i == 0 else 1,
+            "iconUrl": "https://example.com/p.png",
+            "skillDescription": None,
+        },
+        "cost": 4 if i == 0 else 1,
+        "quality": 5,
+        "level": 25,
+        "fetterDetail": {"groupId": 8, "name": "啸谷长风", "num": 5},
+        "mainProps": _props(2),
+        "subProps": _props(5),
+    }
+
+
+ROLE_DETAIL = {
+    "role": {
+        "roleId": 1304,
+        "level": 90,
+        "breach": 6,
+        "roleName": "今汐",
+        "starLevel": 5,
+        "attributeId": 4,
+        "attributeName": "衍射",
+        "weaponTypeId": 2,
+        "chainUnlockNum": 2,
+        "isMainRole": False,
+        "roleSkin": {"skinId": 1, "skinName": "默认", "isAddition": False},
+    },
+    "level": 90,
+    "chainList": [
+        {"name": f"链{i}", "order": i, "description": None, "iconUrl": None, "unlocked": i <= 2}
+        for i in range(1, 7)
+    ],
+    "weaponData": {
+        "weapon": {
+            "weaponId": 21020026,
+            "weaponName": "时和岁稔",
+            "weaponType": 2,
+            "weaponStarLevel": 5,
+            "weaponIcon": None,
+            "weaponEffectName": "岁稔",
+        },
+        "level": 90,
+        "breach": 6,
+        "resonLevel": 1,
+    },
+    "phantomData": {"cost": 12, "equipPhantomList": [_phantom(0), None, _phantom(2), _phantom(3), None]},
+    "equipPhantomAddPropList": _props(3),
+    "skillList": [
+        {
+            "skill": {"id": i, "type": t, "name": t, "description": "", "iconUrl": ""},
+            "level": 10,
+        }
+        for i, t in enumerate(["常态攻击", "共鸣技能", "共鸣回路", "共鸣解放", "变奏技能", "延奏技能"])
+    ],
+}
+
+ROLE_LIST = {
+    "roleList": [dict(ROLE_DETAIL["role"], roleId=1300 + i, roleSkin=None) for i in range(4)],
+    "showRoleIdList": [1300, 1302],
+    "showToGuest": True,
+}
+
+SLASH_DETAIL = {
+    "isUnlock": True,
+    "seasonEndTime": 1760000000,
+    "difficultyList": [
+        {
+            "allScore": 30000,
+            "difficulty": 1,
+            "difficultyName": "无尽",
+            "homePageBG": "",
+            "maxScore": 60000,
+            "teamIcon": "",
+            "challengeList": [
+                {
+                    "challengeId": 12,
+                    "challengeName": "无尽·12",
+                    "rank": "SSS",
+                    "score": 30000,
+                    "halfList": [
+                        None,
+                        {
+                            "buffDescription": "",
+                            "buffIcon": "",
+                            "buffName": "增益",
+                            "buffQuality": 5,
+                            "roleList": [],
+                            "score": 15000,
+                        },
+                        None,
+                    ],
+                }
+            ],
+        }
+    ],
+}
+
+
+def _pydantic_dump(model, data, many=False):
+    data = copy.deepcopy(data)
+    if many:
+        return [model.model_validate(d).model_dump() for d in data]
+    return model.model_validate(data).model_dump()
+
+
+@pytest.mark.parametrize(
+    "model,data",
+    [(RoleDetailData, ROLE_DETAIL), (RoleList, ROLE_LIST), (SlashDetail, SLASH_DETAIL)],
+)
+def test_decode_json_matches_pydantic(model, data):
+    raw = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    obj = structs.decode_json(model, raw)
+    assert structs.is_struct(obj)
+    assert obj.model_dump() == _pydantic_dump(model, data)
+
+
+def test_decode_many_and_convert_match_pydantic():
+    data = [ROLE_DETAIL, dict(ROLE_DETAIL, level=80)]
+    expected = _pydantic_dump(RoleDetailData, data, many=True)
+    from_bytes = structs.decode_json(RoleDetailData, json.dumps(data).encode("utf-8"), many=True)
+    from_obj = structs.convert(RoleDetailData, copy.deepcopy(data), many=True)
+    assert [o.model_dump() for o in from_bytes] == expected
+    assert [o.model_dump() for o in from_obj] == expected
+
+
+def test_lax_numeric_strings_like_pydantic():
+    data = copy.deepcopy(ROLE_DETAIL)
+    data["level"] = "90"
+    data["weaponData"]["resonLevel"] = "5"
+    obj = structs.convert(RoleDetailData, data)
+    assert obj.level == 90
+    assert obj.weaponData.resonLevel == 5
+    assert obj.model_dump() == _pydantic_dump(RoleDetailData, data)
+
+
+def test_model_methods_are_copied():
+    model = RoleDetailData.model_validate(copy.deepcopy(ROLE_DETAIL))
+    obj = structs.convert(RoleDetailData, copy.deepcopy(ROLE_DETAIL))
+    assert obj.get_chain_num() == model.get_chain_num() == 2
+    assert obj.get_chain_name() == model.get_chain_name()
+    assert obj.get_skill_level("共鸣解放") == model.get_skill_level("共鸣解放")
+    assert [s.skill.type for s in obj.get_skill_list()] == [s.skill.type for s in model.get_skill_list()]
+    phantoms = [p for p in obj.phantomData.equipPhantomList if p is not None]
+    assert [len(p.get_props()) for p in phantoms] == [7, 7, 7]
+
+
+def test_slash_none_halves_dropped():
+    obj = structs.convert(SlashDetail, copy.deepcopy(SLASH_DETAIL))
+    halves = obj.difficultyList[0].challengeList[0].halfList
+    assert len(halves) == 1 and halves[0].buffName == "增益"
+
+
+def test_to_model_copy_and_pickle_round_trip():
+    obj = structs.convert(RoleDetailData, copy.deepcopy(ROLE_DETAIL))
+    model = obj.to_model()
+    assert isinstance(model, RoleDetailData)
+    assert model.model_dump() == obj.model_dump()
+    assert json.loads(obj.model_dump_json()) == json.loads(model.model_dump_json())
+
+    changed = obj.model_copy(update={"level": 1})
+    assert changed.level == 1 and obj.level == 90
+    deep = obj.model_copy(deep=True)
+    deep.role.level = 1
+    assert obj.role.level == 90
+
+    assert pickle.loads(pickle.dumps(obj)) == obj